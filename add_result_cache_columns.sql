@@ -0,0 +1,24 @@
+-- Add result cache markers to the searches table
+-- Searches completed from the full-search result cache are flagged so the
+-- frontend and analytics can tell them apart from freshly computed results
+
+ALTER TABLE searches 
+ADD COLUMN IF NOT EXISTS cached BOOLEAN DEFAULT FALSE;
+
+ALTER TABLE searches 
+ADD COLUMN IF NOT EXISTS cached_from_request_id TEXT;
+
+-- Add comments to document the columns
+COMMENT ON COLUMN searches.cached IS 'True when the search was completed from a cached result of an equivalent earlier search';
+COMMENT ON COLUMN searches.cached_from_request_id IS 'request_id of the search whose result was reused';
+
+-- Verify the columns were added successfully
+SELECT 
+    column_name, 
+    data_type, 
+    is_nullable,
+    column_default
+FROM information_schema.columns 
+WHERE table_name = 'searches' 
+AND column_name IN ('cached', 'cached_from_request_id')
+ORDER BY column_name;
@@ -0,0 +1,38 @@
+-- Add the search_batches table used by POST /api/search/batch
+-- A batch groups the child searches created for its prompts (each child is a
+-- normal row in searches) and records how the batch job ran
+
+CREATE TABLE IF NOT EXISTS public.search_batches (
+    id SERIAL PRIMARY KEY,
+    batch_id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'processing',
+    max_candidates INTEGER,
+    items JSONB,
+    timings JSONB,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Allow service role to manage batches
+CREATE POLICY "Service role can manage search batches" ON public.search_batches
+FOR ALL
+TO service_role
+USING (true)
+WITH CHECK (true);
+
+ALTER TABLE public.search_batches ENABLE ROW LEVEL SECURITY;
+
+-- Add comments to document the columns
+COMMENT ON COLUMN search_batches.items IS 'One entry per submitted prompt: index, prompt, child request_id (null when rejected), duplicate_of, error';
+COMMENT ON COLUMN search_batches.timings IS 'Per-stage timings and shared-call counts recorded when the batch job finishes';
+
+-- Verify the table was created successfully
+SELECT
+    column_name,
+    data_type,
+    is_nullable,
+    column_default
+FROM information_schema.columns
+WHERE table_name = 'search_batches'
+ORDER BY ordinal_position;
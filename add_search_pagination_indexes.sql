@@ -0,0 +1,21 @@
+-- Indexes backing keyset pagination and result lookups
+-- GET /api/search pages on (created_at, id) descending and GET /api/search/{id}
+-- loads candidates by search_id; both should be index range scans
+
+CREATE INDEX IF NOT EXISTS idx_searches_created_at_id
+ON searches (created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_searches_request_id
+ON searches (request_id);
+
+CREATE INDEX IF NOT EXISTS idx_people_search_id
+ON people (search_id);
+
+-- Verify the indexes were created successfully
+SELECT 
+    tablename,
+    indexname,
+    indexdef
+FROM pg_indexes 
+WHERE indexname IN ('idx_searches_created_at_id', 'idx_searches_request_id', 'idx_people_search_id')
+ORDER BY indexname;
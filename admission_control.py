@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Admission control for new searches.
+
+Each search fans out into roughly 20-40 paid OpenAI, Apollo and SerpAPI
+calls, and nothing limited how many searches one client could start. A single
+misbehaving integration (a Prismatic flow stuck in a retry loop, say) could
+exhaust the shared quotas and slow every other user down. POST /api/search now
+passes through an AdmissionController first:
+
+  * a token bucket per client: per API key (X-API-Key or a bearer token,
+    stored hashed), otherwise per IP address
+  * a global cap on searches in flight (queued or running). Over the cap,
+    requests wait in a bounded queue for up to ADMISSION_WAIT_SECONDS
+  * clients that are rate limited, arrive when the wait queue is full or wait
+    too long get AdmissionRejected, which the endpoint turns into a 429 with
+    Retry-After
+  * a request that starts several searches (a batch) costs one token and one
+    in-flight slot per search; one larger than a full bucket or the whole
+    in-flight cap is rejected as too_large
+
+    slot = await admission.acquire(client_key(request))
+    try:
+        ...enqueue the search...
+    finally:
+        admission.release(slot)
+
+The slot stays reserved until the search is enqueued, so searches admitted by
+this process are counted before they show up in the queue. Token buckets live
+in memory by default. The sqlite backend shares them between the workers on a
+host, and the redis backend shares them across hosts.
+
+Configuration (environment variables):
+    ADMISSION_RATE_PER_MINUTE   searches per client per minute (default 30, 0 disables)
+    ADMISSION_BURST             searches a client can start back to back (default 10)
+    ADMISSION_MAX_IN_FLIGHT     queued plus running searches before new ones wait (default 50, 0 disables)
+    ADMISSION_MAX_WAITERS       requests allowed to wait for a slot in this process (default 20)
+    ADMISSION_WAIT_SECONDS      longest wait for a slot before a 429 (default 5)
+    ADMISSION_BACKEND           memory | sqlite | redis (default memory)
+    ADMISSION_TRUSTED_PROXY_HOPS  reverse proxies in front of the API that append to X-Forwarded-For
+                                (default 0: the header is ignored and the peer address is used)
+    CACHE_PATH, CACHE_REDIS_URL storage for the sqlite and redis backends (see shared_cache.py)
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+from blocking_executor import run_blocking
+from metrics import registry as metrics_registry
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+ADMISSION_DECISIONS = metrics_registry.counter(
+    "knowledge_gpt_admission_total",
+    "Search admission decisions (admitted, queued, rate_limited, too_large, queue_full, wait_timeout)", ["outcome"])
+ADMISSION_WAITING = metrics_registry.gauge(
+    "knowledge_gpt_admission_waiting", "Search requests waiting for an in-flight slot")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class AdmissionRejected(Exception):
+    """A search was not admitted; retry_after is a hint in whole seconds."""
+
+    def __init__(self, reason: str, retry_after: float, message: str):
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(message)
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate: float, burst: float,
+            cost: float) -> Tuple[float, float]:
+    """Token bucket step: returns (tokens left, seconds to wait; 0 when the take succeeded)."""
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+class RateLimitBackend(ABC):
+    """Storage for per-client token buckets."""
+
+    # True when take() does I/O and should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """Take cost tokens from key's bucket; returns 0 on success, else seconds until enough refill."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Buckets for this process only, least recently used evicted beyond max_keys."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens, wait = _refill(tokens, updated_at, now, rate, burst, cost)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                # An evicted client starts again with a full bucket
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Buckets in a SQLite file shared by every process on the host."""
+
+    blocking = True
+    # Buckets untouched this long are full again and can be dropped
+    PRUNE_AFTER_SECONDS = 3600
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS admission_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        now = time.time()
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front, so concurrent takes serialize
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM admission_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, wait = _refill(row[0] if row else burst, row[1] if row else now, now, rate, burst, cost)
+            conn.execute("INSERT OR REPLACE INTO admission_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                         (key, tokens, now))
+            self._takes += 1
+            if self._takes % 1000 == 0:
+                conn.execute("DELETE FROM admission_buckets WHERE updated_at < ?", (now - self.PRUNE_AFTER_SECONDS,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+# Atomic token bucket step; KEYS[1] bucket, ARGV rate, burst, now, cost
+_REDIS_TAKE = """
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local rate, burst, now, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets in Redis, shared by every host; each take is one atomic script call."""
+
+    blocking = True
+
+    def __init__(self, url: str, client: Any = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis admission backend needs the redis package (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        wait = self.client.eval(_REDIS_TAKE, 1, f"knowledge_gpt:admission:{key}", rate, burst, time.time(), cost)
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+
+def create_rate_limit_backend(name: Optional[str] = None) -> RateLimitBackend:
+    """Build the configured bucket backend, falling back to memory if it is unavailable."""
+    name = (name or os.getenv("ADMISSION_BACKEND", "memory")).strip().lower()
+    try:
+        if name == "sqlite":
+            return SQLiteRateLimitBackend(os.getenv("CACHE_PATH", os.path.join(PROJECT_ROOT, "shared_cache.db")))
+        if name == "redis":
+            return RedisRateLimitBackend(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    except Exception as e:
+        logger.warning("[Admission] %s backend unavailable, using memory: %s", name, e)
+    return MemoryRateLimitBackend()
+
+
+def client_key(headers: Mapping[str, str], client_host: Optional[str],
+               proxy_hops: Optional[int] = None) -> str:
+    """
+    Identify the caller: a hash of its API key when it sends one, otherwise its IP address.
+
+    Clients can put anything in X-Forwarded-For, so only the entries appended
+    by our own proxies count: with proxy_hops trusted proxies, the client is
+    the proxy_hops-th address from the right.
+    """
+    api_key = headers.get("x-api-key")
+    if not api_key:
+        authorization = headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            api_key = authorization[7:].strip()
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    if proxy_hops is None:
+        proxy_hops = int(_env_float("ADMISSION_TRUSTED_PROXY_HOPS", 0))
+    if proxy_hops > 0:
+        forwarded = [address.strip() for address in headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [address for address in forwarded if address]
+        if len(forwarded) >= proxy_hops:
+            return "ip:" + forwarded[-proxy_hops]
+    return "ip:" + (client_host or "unknown")
+
+
+class AdmissionController:
+    """Per-client token buckets plus a global in-flight cap with a bounded wait."""
+
+    def __init__(self, in_flight: Optional[Callable[[], Awaitable[int]]] = None,
+                 backend: Optional[RateLimitBackend] = None,
+                 rate_per_minute: Optional[float] = None, burst: Optional[float] = None,
+                 max_in_flight: Optional[int] = None, max_waiters: Optional[int] = None,
+                 wait_seconds: Optional[float] = None, poll_seconds: float = 0.25):
+        self.in_flight = in_flight
+        self.backend = backend or create_rate_limit_backend()
+        self.rate_per_minute = rate_per_minute if rate_per_minute is not None else _env_float(
+            "ADMISSION_RATE_PER_MINUTE", 30)
+        self.burst = burst if burst is not None else _env_float("ADMISSION_BURST", 10)
+        self.max_in_flight = int(max_in_flight if max_in_flight is not None else _env_float(
+            "ADMISSION_MAX_IN_FLIGHT", 50))
+        self.max_waiters = int(max_waiters if max_waiters is not None else _env_float("ADMISSION_MAX_WAITERS", 20))
+        self.wait_seconds = wait_seconds if wait_seconds is not None else _env_float("ADMISSION_WAIT_SECONDS", 5)
+        self.poll_seconds = poll_seconds
+        # Slots handed out by this process whose searches are not in the queue yet
+        self.reserved = 0
+        self.waiting = 0
+        self.outcomes: Dict[str, int] = {}
+
+    def _record(self, outcome: str) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        ADMISSION_DECISIONS.inc(outcome=outcome)
+
+    async def _check_rate(self, client: str, cost: float = 1.0) -> None:
+        if self.rate_per_minute <= 0:
+            return
+        rate = self.rate_per_minute / 60.0
+        burst = max(1.0, self.burst)
+        cost = max(1.0, cost)
+        if cost > burst:
+            # A bucket never holds more than burst tokens, so this request could never be admitted
+            self._record("too_large")
+            raise AdmissionRejected("too_large", 0,
+                                    f"This request starts {cost:.0f} searches; a client can start at most "
+                                    f"{burst:.0f} at once.")
+        try:
+            if self.backend.blocking:
+                wait = await run_blocking(self.backend.take, client, rate, burst, cost, pool="db")
+            else:
+                wait = self.backend.take(client, rate, burst, cost)
+        except Exception as e:
+            # Fail open: a broken bucket store must not take searches down with it
+            logger.warning("[Admission] Rate limit check failed for %s: %s", client, e)
+            return
+        if wait > 0:
+            self._record("rate_limited")
+            raise AdmissionRejected("rate_limited", wait, "Too many searches from this client. Please slow down.")
+
+    async def _has_capacity(self, slots: int) -> bool:
+        try:
+            active = await self.in_flight()
+        except Exception as e:
+            logger.warning("[Admission] In-flight count unavailable: %s", e)
+            return True
+        return active + self.reserved + slots <= self.max_in_flight
+
+    async def acquire(self, client: str, cost: float = 1.0) -> int:
+        """
+        Admit cost searches for client or raise AdmissionRejected.
+
+        cost is how many searches the request starts (a batch takes one token
+        and one in-flight slot per distinct prompt). Returns a slot token to
+        pass to release() once the searches are enqueued: the number of slots
+        reserved against the in-flight cap, 0 when none were.
+        """
+        slots = max(1, int(math.ceil(cost)))
+        if self.max_in_flight > 0 and self.in_flight is not None and slots > self.max_in_flight:
+            self._record("too_large")
+            raise AdmissionRejected("too_large", 0,
+                                    f"This request starts {slots} searches; at most {self.max_in_flight} "
+                                    f"can be in flight.")
+        await self._check_rate(client, cost)
+        if self.max_in_flight <= 0 or self.in_flight is None:
+            self._record("admitted")
+            return 0
+        if await self._has_capacity(slots):
+            self.reserved += slots
+            self._record("admitted")
+            return slots
+
+        if self.waiting >= self.max_waiters:
+            self._record("queue_full")
+            raise AdmissionRejected("queue_full", self.wait_seconds,
+                                    "Search capacity is exhausted. Please retry shortly.")
+        self.waiting += 1
+        ADMISSION_WAITING.set(self.waiting)
+        try:
+            give_up_at = time.monotonic() + self.wait_seconds
+            while time.monotonic() < give_up_at:
+                await asyncio.sleep(min(self.poll_seconds, max(0.0, give_up_at - time.monotonic())))
+                if await self._has_capacity(slots):
+                    self.reserved += slots
+                    self._record("queued")
+                    return slots
+        finally:
+            self.waiting -= 1
+            ADMISSION_WAITING.set(self.waiting)
+        self._record("wait_timeout")
+        raise AdmissionRejected("wait_timeout", self.wait_seconds,
+                                "Search capacity is exhausted. Please retry shortly.")
+
+    def release(self, slot: int) -> None:
+        """Give back reserved slots; the enqueued searches now count through in_flight()."""
+        if slot:
+            self.reserved -= int(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "rate_per_minute": self.rate_per_minute,
+            "burst": self.burst,
+            "max_in_flight": self.max_in_flight,
+            "reserved": self.reserved,
+            "waiting": self.waiting,
+            "outcomes": dict(self.outcomes),
+        }
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Response
+from fastapi import FastAPI, HTTPException, Response, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 import uvicorn
 import json
 import asyncio
@@ -13,64 +14,90 @@ import re
 import httpx
 import random
 import time
-import openai
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-if not os.getenv('OPENAI_API_KEY'):
-    try:
-        with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "secrets.json"), "r") as f:
-            secrets = json.load(f)
-            # Handle both uppercase and lowercase key names for compatibility
-            os.environ['OPENAI_API_KEY'] = secrets.get('openai_api_key', '') or secrets.get('OPENAI_API_KEY', '')
-            os.environ['INTERNAL_DATABASE_API_KEY'] = secrets.get('internal_database_api_key', '') or secrets.get('INTERNAL_DATABASE_API_KEY', '')
-            os.environ['SCRAPING_DOG_API_KEY'] = secrets.get('scraping_dog_api_key', '') or secrets.get('SCRAPING_DOG_API_KEY', '')
-            os.environ['SUPABASE_URL'] = secrets.get('supabase_url', '') or secrets.get('SUPABASE_URL', '')
-            os.environ['SUPABASE_KEY'] = secrets.get('supabase_key', '') or secrets.get('SUPABASE_KEY', '')
-            os.environ['HUBSPOT_CLIENT_ID'] = secrets.get('hubspot_client_id', '') or secrets.get('HUBSPOT_CLIENT_ID', '')
-            os.environ['HUBSPOT_CLIENT_SECRET'] = secrets.get('hubspot_client_secret', '') or secrets.get('HUBSPOT_CLIENT_SECRET', '')
-    except (FileNotFoundError, json.JSONDecodeError):
-        pass
+# Reads secrets.json once and exports its values to the environment for modules that read os.environ
+from services import client_stats, get_async_openai_client, get_openai_client, get_supabase, load_settings, warmup
+load_settings()
 
+from openai_utils import call_openai_async
 from prompt_formatting import parse_prompt_to_internal_database_filters
 from apollo_api_call import search_people_via_internal_database
 # from linkedin_scraping import async_scrape_linkedin_profiles  # Commented out - using Apollo data instead
 from assess_and_return import select_top_candidates
 from database import (
     store_search_to_database, get_search_from_database, 
-    get_recent_searches_from_database, delete_search_from_database,
-    store_people_to_database, get_people_for_search
+    delete_search_from_database,
+    store_people_to_database, get_people_for_search,
+    get_searches_page, get_search_status_from_database, build_select,
+    get_search_statuses_from_database, store_batch_to_database, get_batch_from_database,
+    SEARCH_FIELDS, PEOPLE_FIELDS, SEARCH_STATUSES, TERMINAL_SEARCH_STATUSES
 )
-from behavioral_metrics_ai import enhance_behavioral_data_ai
+from behavioral_metrics_ai import enhance_behavioral_data_ai, finalize_candidate_behavioral_data, analyze_search_context
 from smart_prompt_enhancement import enhance_prompt
-from simple_estimation import estimate_people_count
-from creepy_detector import detect_specific_person_search, extract_user_first_name_from_context
+from simple_estimation import estimate_people_count, estimate_people_counts
+from creepy_detector import extract_user_first_name_from_context
+from prompt_gate import ParsedPrompt, parse_prompt
+from blocking_executor import run_blocking, shutdown_executors, get_executor_stats
+from search_queue import get_search_queue, get_queue_mode, QueueFullError
+from search_events import publish_search_event, search_event_bus
+from candidate_pipeline import CandidatePipeline, PipelineStage
+from task_graph import TaskGraph
+from fetch_planner import FetchPlanner, yield_model
+from candidate_index import CandidateIndex
+from shared_cache import MISSING, cache_stats, get_cache
+from search_result_cache import search_result_cache, canonicalize_prompt, canonical_filters
+from search_batches import (
+    SearchBatch, batch_concurrency, current_batch, dedupe_prompts, max_batch_prompts,
+    reset_current_batch, set_current_batch, shared as batch_shared, summarize_batch
+)
+from single_flight import FlightCancelledError, get_single_flight, single_flight_stats
+from search_tasks import search_tasks
+from health_monitor import HealthMonitor
+from admission_control import AdmissionController, AdmissionRejected, client_key
+from idempotency import IdempotencyConflict, IdempotencyKeys, idempotency_key, request_fingerprint
+from json_codec import codec_stats, decode_column, encode_column, dumps as json_dumps
+from json_response import CompressionMiddleware, FastJSONResponse
+from metrics import registry as metrics_registry, SEARCH_SECONDS, STAGE_SECONDS, SEARCH_DEGRADATIONS
+from geo_matcher import is_us
+from deadline import Deadline, current_deadline, reset_current_deadline, set_current_deadline
+from structured_logging import get_logger, logging_stats
+
+logger = get_logger("api.main")
 
 # Import context-aware evidence finder with diversity support
 try:
     from context_aware_evidence_finder import ContextAwareEvidenceFinder
     from enhanced_data_models import DiversityConfig
     EVIDENCE_INTEGRATION_AVAILABLE = True
-    print("[API] Context-Aware Evidence Finder loaded successfully")
+    logger.info("[API] Context-Aware Evidence Finder loaded successfully")
 except ImportError as e:
     # Fallback to enhanced evidence finder
     try:
         from enhanced_url_evidence_finder import EnhancedURLEvidenceFinder
         from enhanced_data_models import DiversityConfig
         EVIDENCE_INTEGRATION_AVAILABLE = True
-        print("[API] Enhanced URL Evidence Finder loaded as fallback")
+        logger.info("[API] Enhanced URL Evidence Finder loaded as fallback")
     except ImportError as e2:
         EVIDENCE_INTEGRATION_AVAILABLE = False
-        print(f"[API] No evidence finder available: {e}, {e2}")
+        logger.info("[API] No evidence finder available: %s, %s", e, e2)
+
+PUBLIC_FIGURE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Lookups that failed are cached as "not famous" only briefly
+PUBLIC_FIGURE_ERROR_TTL_SECONDS = 300
 
-# Cache for public figure checks to avoid repeated requests
-_public_figure_cache: Dict[str, bool] = {}
+# Wikipedia public-figure verdicts, shared across workers when CACHE_BACKEND is sqlite or redis
+public_figure_cache = get_cache("public_figure", ttl=PUBLIC_FIGURE_CACHE_TTL_SECONDS, max_entries=10000)
 
-# Cache for avatar generation to avoid recomputation
-_avatar_cache: Dict[str, Dict[str, Any]] = {}
+# Avatars are cheaper to recompute than to fetch from a shared store, so this one stays in-process
+AVATAR_CACHE_MAX_ENTRIES = 1000
+avatar_cache = get_cache("avatar", max_entries=AVATAR_CACHE_MAX_ENTRIES, default_backend="memory")
 
 class DemoSearchGenerator:
-    def __init__(self):
+    def __init__(self, pool_per_category: Optional[int] = None, refresh_seconds: Optional[float] = None,
+                 max_age_seconds: Optional[float] = None, refresh_batch: Optional[int] = None,
+                 concurrency: Optional[int] = None):
         self.search_categories = [
             # Core business searches (70% weight)
             "executive_recruitment", "technology_research", "investment_opportunities", 
@@ -228,19 +255,66 @@ class DemoSearchGenerator:
             "reputation monitoring", "crisis preparation", "succession planning", "legacy building"
         ]
 
-    def generate_search_example(self) -> Dict[str, Any]:
-        """Generate a realistic search example using AI"""
+        # Pre-generated examples per category, refreshed in the background so the
+        # demo endpoints never wait on the LLM
+        self.pool_per_category = pool_per_category or int(os.getenv("DEMO_POOL_PER_CATEGORY", "2"))
+        self.refresh_seconds = refresh_seconds or float(os.getenv("DEMO_POOL_REFRESH_SECONDS", "300"))
+        self.max_age_seconds = max_age_seconds or float(os.getenv("DEMO_POOL_MAX_AGE_SECONDS", "21600"))
+        self.refresh_batch = refresh_batch or int(os.getenv("DEMO_POOL_REFRESH_BATCH", "10"))
+        self.concurrency = concurrency or int(os.getenv("DEMO_POOL_CONCURRENCY", "4"))
+        self._client = None
+        self.generated = 0
+        self.failures = 0
+        self.last_refresh: Optional[float] = None
+        self._seed_pool()
+
+    def _seed_pool(self) -> None:
+        """Fill the pool with hand-written examples so it can serve before the first refresh."""
+        # created_at 0 marks an entry as stale, so AI examples replace these first
+        self._pool: Dict[str, List[tuple]] = {
+            category: [
+                (0.0, self._get_fallback_search(category, random.choice(self.industry_contexts),
+                                                random.choice(self.geographic_regions)))
+                for _ in range(self.pool_per_category)
+            ]
+            for category in self.search_categories
+        }
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        # Flat snapshot for constant-time random reads; swapped in one assignment
+        self._examples: List[Dict[str, Any]] = [example for entries in self._pool.values() for _, example in entries]
+
+    def _serve(self, example: Dict[str, Any]) -> Dict[str, Any]:
+        served = dict(example)
+        served["timestamp"] = datetime.now().isoformat()
+        return served
+
+    def generate_search_example(self, category: Optional[str] = None) -> Dict[str, Any]:
+        """Return a search example from the pool (no LLM call on the request path)"""
+        entries = self._pool.get(category) if category else None
+        if entries:
+            return self._serve(random.choice(entries)[1])
+        return self._serve(random.choice(self._examples))
+
+    def get_search_examples(self, count: int) -> List[Dict[str, Any]]:
+        """Return up to count distinct examples from the pool"""
+        return [self._serve(example) for example in random.sample(self._examples, min(count, len(self._examples)))]
+
+    def _get_client(self):
+        if self._client is None:
+            client = get_async_openai_client()
+            if client is None:
+                raise RuntimeError("OpenAI API key not configured")
+            self._client = client.with_options(timeout=30.0)
+        return self._client
+
+    async def generate_ai_example(self, category: str) -> Optional[Dict[str, Any]]:
+        """Generate a realistic search example using AI; None if generation fails"""
         
-        category = random.choice(self.search_categories)
         industry = random.choice(self.industry_contexts)
         location = random.choice(self.geographic_regions)
         style = random.choice(self.search_styles)
-        job_title = random.choice(self.job_titles)
-        company_size = random.choice(self.company_sizes)
-        behavioral_signal = random.choice(self.behavioral_signals)
-        
-        # Simple context for the AI prompt - no variable substitutions
-        base_prompt = "Generate a professional B2B search query"
         
         prompt = f"""Generate a simple, clear B2B search query. Use this exact format:
 
@@ -261,14 +335,16 @@ Writing style: {style}
 Generate 1 search query using the exact format above. Keep it simple and logical. Return only the search query text."""
 
         try:
-            response = openai.ChatCompletion.create(
+            search_query = await call_openai_async(
+                prompt,
                 model="gpt-4-turbo-preview",
-                messages=[{"role": "user", "content": prompt}],
                 max_tokens=150,
-                temperature=0.8
+                temperature=0.8,
+                purpose="demo_example",
+                client=self._get_client()
             )
-            
-            search_query = response.choices[0].message.content.strip()
+            if not search_query:
+                return None
             
             # Remove quotes if present
             if search_query.startswith('"') and search_query.endswith('"'):
@@ -286,8 +362,60 @@ Generate 1 search query using the exact format above. Keep it simple and logical
             }
             
         except Exception as e:
-            # Fallback to predefined examples if AI fails
-            return self._get_fallback_search(category, industry, location)
+            logger.debug("[Demo] Example generation failed for %s: %s", category, e)
+            return None
+
+    async def refresh_pool(self) -> int:
+        """Replace the stalest pooled examples with new AI examples; returns how many were replaced"""
+        if not os.getenv("OPENAI_API_KEY"):
+            return 0
+        now = time.time()
+        stale = sorted(
+            (created_at, category, slot)
+            for category, entries in self._pool.items()
+            for slot, (created_at, _) in enumerate(entries)
+            if now - created_at > self.max_age_seconds
+        )[:self.refresh_batch]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def replace(category: str, slot: int) -> bool:
+            async with semaphore:
+                example = await self.generate_ai_example(category)
+            if example is None:
+                # Keep serving the old entry until a later refresh succeeds
+                self.failures += 1
+                return False
+            self._pool[category][slot] = (time.time(), example)
+            return True
+
+        results = await asyncio.gather(*(replace(category, slot) for _, category, slot in stale))
+        replaced = sum(results)
+        self.generated += replaced
+        self.last_refresh = time.time()
+        if replaced:
+            self._rebuild_index()
+        return replaced
+
+    async def run(self) -> None:
+        """Refresh the pool every refresh_seconds until cancelled"""
+        while True:
+            try:
+                await self.refresh_pool()
+            except Exception as e:
+                logger.warning("[Demo] Pool refresh failed: %s", e)
+            await asyncio.sleep(self.refresh_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        fresh = sum(1 for entries in self._pool.values() for created_at, _ in entries
+                    if now - created_at <= self.max_age_seconds)
+        return {
+            "examples": len(self._examples),
+            "fresh": fresh,
+            "generated": self.generated,
+            "failures": self.failures,
+            "last_refresh": self.last_refresh,
+        }
     
     def _determine_use_case_type(self, category: str) -> str:
         """Determine the type of use case based on category"""
@@ -456,13 +584,20 @@ Generate 1 search query using the exact format above. Keep it simple and logical
 # Initialize the demo generator
 demo_generator = DemoSearchGenerator()
 
+async def _cache_call(cache, func, *args):
+    """Call a cache method, off the event loop only when its backend does I/O."""
+    if cache.blocking:
+        return await run_blocking(func, *args, pool="db")
+    return func(*args)
+
 async def is_public_figure(full_name: str) -> bool:
     """Return True if Wikipedia search suggests this person is a well-known public figure."""
     name_key = full_name.lower().strip()
     if not name_key:
         return False
-    if name_key in _public_figure_cache:
-        return _public_figure_cache[name_key]
+    cached = await _cache_call(public_figure_cache, public_figure_cache.get, name_key, MISSING)
+    if cached is not MISSING:
+        return cached
     try:
         async with httpx.AsyncClient(timeout=10) as client:
             resp = await client.get(
@@ -479,17 +614,18 @@ async def is_public_figure(full_name: str) -> bool:
             data = resp.json()
             search_results = data.get("query", {}).get("search", [])
             if not search_results:
-                _public_figure_cache[name_key] = False
+                await _cache_call(public_figure_cache, public_figure_cache.set, name_key, False)
                 return False
             top = search_results[0]
             title = top.get("title", "").lower()
             snippet = re.sub(r"<[^>]+>", "", top.get("snippet", "")).lower()
             famous = name_key in title or name_key in snippet
-            _public_figure_cache[name_key] = famous
+            await _cache_call(public_figure_cache, public_figure_cache.set, name_key, famous)
             return famous
     except Exception:
-        # On any error, assume not famous to avoid false positives
-        _public_figure_cache[name_key] = False
+        # On any error, assume not famous to avoid false positives, but retry
+        # the lookup soon rather than trusting the guess for the full TTL
+        await _cache_call(public_figure_cache, public_figure_cache.set, name_key, False, PUBLIC_FIGURE_ERROR_TTL_SECONDS)
         return False
 
 def validate_hubspot_credentials():
@@ -502,14 +638,14 @@ def validate_hubspot_credentials():
     if not client_secret:
         raise ValueError("HUBSPOT_CLIENT_SECRET environment variable is required but not set")
     
-    print(f"HubSpot OAuth credentials loaded successfully")
+    logger.info("HubSpot OAuth credentials loaded successfully")
 
 # Validate HubSpot credentials on startup (non-blocking)
 try:
     validate_hubspot_credentials()
 except ValueError as e:
-    print(f"Warning: {e}")
-    print("HubSpot OAuth functionality will not be available until credentials are configured")
+    logger.warning("HubSpot OAuth credentials not loaded: %s", e)
+    logger.info("HubSpot OAuth functionality will not be available until credentials are configured")
 
 class HubSpotOAuthClient:
     """Client for handling HubSpot OAuth token exchange"""
@@ -545,18 +681,18 @@ class HubSpotOAuthClient:
                 )
                 
                 if response.status_code == 200:
-                    print(f"HubSpot response status: 200")
-                    print(f"HubSpot response headers: {dict(response.headers)}")
-                    print(f"HubSpot response text: {response.text}")
-                    print(f"HubSpot response text length: {len(response.text)}")
+                    logger.debug("HubSpot response status: 200")
+                    logger.debug("HubSpot response headers: %s", dict(response.headers))
+                    logger.debug("HubSpot response text: %s", response.text)
+                    logger.debug("HubSpot response text length: %s", len(response.text))
                     
                     try:
                         json_data = response.json()
-                        print(f"Successfully parsed JSON: {json_data}")
+                        logger.debug("Successfully parsed JSON: %s", json_data)
                         
                         # Validate that we got the expected token data
                         if not json_data or not isinstance(json_data, dict):
-                            print(f"Invalid token data structure: {json_data}")
+                            logger.warning("Invalid token data structure: %s", json_data)
                             raise HTTPException(
                                 status_code=502,
                                 detail={
@@ -568,8 +704,8 @@ class HubSpotOAuthClient:
                         
                         return json_data
                     except json.JSONDecodeError as e:
-                        print(f"JSON decode error: {e}")
-                        print(f"Response content: {repr(response.text)}")
+                        logger.warning("JSON decode error: %s", e)
+                        logger.debug("Response content: %s", repr(response.text))
                         raise HTTPException(
                             status_code=502,
                             detail={
@@ -602,14 +738,14 @@ class HubSpotOAuthClient:
                     )
                 else:
                     # Handle HubSpot OAuth errors
-                    print(f"HubSpot error response status: {response.status_code}")
-                    print(f"HubSpot error response headers: {dict(response.headers)}")
-                    print(f"HubSpot error response text: {response.text}")
-                    print(f"HubSpot error response text length: {len(response.text)}")
+                    logger.warning("HubSpot error response status: %s", response.status_code)
+                    logger.debug("HubSpot error response headers: %s", dict(response.headers))
+                    logger.warning("HubSpot error response text: %s", response.text)
+                    logger.debug("HubSpot error response text length: %s", len(response.text))
                     
                     try:
                         error_data = response.json()
-                        print(f"Successfully parsed error JSON: {error_data}")
+                        logger.debug("Successfully parsed error JSON: %s", error_data)
                         raise HTTPException(
                             status_code=self._map_hubspot_error_to_http_status(error_data.get('error', 'unknown_error')),
                             detail={
@@ -619,8 +755,8 @@ class HubSpotOAuthClient:
                             }
                         )
                     except json.JSONDecodeError as e:
-                        print(f"Error JSON decode error: {e}")
-                        print(f"Error response content: {repr(response.text)}")
+                        logger.warning("Error JSON decode error: %s", e)
+                        logger.debug("Error response content: %s", repr(response.text))
                         # If response is not JSON, create generic error
                         raise HTTPException(
                             status_code=502,
@@ -677,7 +813,10 @@ class HubSpotOAuthClient:
 # Initialize HubSpot OAuth client
 hubspot_oauth_client = HubSpotOAuthClient()
 
-app = FastAPI(title="Knowledge_GPT API with People Estimation", version="1.1.0")
+app = FastAPI(title="Knowledge_GPT API with People Estimation", version="1.1.0",
+              default_response_class=FastJSONResponse)
+
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -687,10 +826,96 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Worker running inside the API process when SEARCH_QUEUE_MODE=embedded
+_embedded_worker = None
+_embedded_worker_task = None
+# Refresh loops started with the app and cancelled on shutdown
+_background_tasks: List[asyncio.Task] = []
+# Timings from the startup warmup, reported in /api/pipeline/stats
+_warmup_report: Dict[str, Any] = {}
+
+WARMUP_PROMPT = "Find CMOs in Florida evaluating marketing automation"
+
+def _ping_supabase():
+    """First database round trip: opens the connection pool and fails fast on bad credentials."""
+    if load_settings().supabase_configured:
+        get_supabase().table("searches").select("id").limit(1).execute()
+
+def _warmup_steps():
+    return [
+        ("openai_client", get_openai_client),
+        ("openai_async_client", get_async_openai_client),
+        ("supabase", _ping_supabase),
+        ("search_queue", get_search_queue),
+        ("prompt_gate", lambda: parse_prompt(WARMUP_PROMPT)),
+        ("geo_matcher", lambda: is_us("Miami, Florida")),
+        ("json_codec", lambda: json_dumps({"warmup": [WARMUP_PROMPT]})),
+    ]
+
+@app.on_event("startup")
+async def warm_up_services():
+    """Build clients and prime parsers before the first request instead of during it."""
+    if os.getenv("STARTUP_WARMUP", "1").strip().lower() in ("0", "false", "no", "off"):
+        return
+    timeout = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))
+    try:
+        _warmup_report.update(await asyncio.wait_for(run_blocking(warmup, _warmup_steps(), pool="db"), timeout))
+        logger.info("[Warmup] Finished in %.1f ms", _warmup_report["total_ms"])
+    except asyncio.TimeoutError:
+        # The steps keep running in the executor; startup does not wait for them
+        _warmup_report["timed_out"] = True
+        logger.warning("[Warmup] Did not finish within %.1fs, serving anyway", timeout)
+
+@app.on_event("startup")
+async def start_background_refreshers():
+    """Keep the demo example pool and the health snapshot fresh in the background."""
+    _background_tasks.append(asyncio.create_task(demo_generator.run()))
+    _background_tasks.append(asyncio.create_task(health_monitor.run()))
+
+@app.on_event("startup")
+async def start_embedded_search_worker():
+    """Consume the search queue in-process unless dedicated workers are deployed."""
+    global _embedded_worker, _embedded_worker_task
+    if get_queue_mode() != "embedded":
+        logger.info("[Search Queue] External mode: searches are processed by search_worker.py")
+        return
+    from search_worker import SearchWorker
+    _embedded_worker = SearchWorker(
+        queue=get_search_queue(),
+        concurrency=int(os.getenv("SEARCH_WORKER_CONCURRENCY", "3")),
+        handler=run_search_job,
+    )
+    _embedded_worker_task = asyncio.create_task(_embedded_worker.run())
+
+@app.on_event("shutdown")
+async def shutdown_pipeline_executors():
+    """Stop the embedded worker and release the bounded executors used for blocking pipeline calls."""
+    for task in _background_tasks:
+        task.cancel()
+    if _embedded_worker is not None:
+        _embedded_worker.stop()
+        try:
+            await asyncio.wait_for(_embedded_worker_task, timeout=float(os.getenv("SEARCH_WORKER_DRAIN_SECONDS", "20")))
+        except asyncio.TimeoutError:
+            # Unfinished jobs stay leased and are re-queued when the lease expires
+            _embedded_worker_task.cancel()
+    shutdown_executors(wait=False)
+
 class SearchRequest(BaseModel):
     prompt: str
     max_candidates: Optional[int] = 3
     include_linkedin: Optional[bool] = True
+    priority: Optional[int] = 0
+    force_refresh: Optional[bool] = False
+    # Same as the Idempotency-Key header, for clients that cannot set headers
+    idempotency_key: Optional[str] = None
+
+class SearchBatchRequest(BaseModel):
+    prompts: List[str]
+    max_candidates: Optional[int] = 3
+    include_linkedin: Optional[bool] = True
+    priority: Optional[int] = 0
+    force_refresh: Optional[bool] = False
 
 class SearchResponse(BaseModel):
     request_id: str
@@ -1024,9 +1249,10 @@ def generate_initials_avatar(first_name: str, last_name: str) -> Dict[str, Any]:
     # Create cache key from normalized names
     cache_key = f"{(first_name or '').strip().lower()}|{(last_name or '').strip().lower()}"
     
-    # Check cache first
-    if cache_key in _avatar_cache:
-        return _avatar_cache[cache_key].copy()  # Return copy to prevent mutation
+    # Check cache first (the cache hands out copies, so callers cannot mutate it)
+    cached = avatar_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     try:
         # Extract initials
@@ -1043,21 +1269,14 @@ def generate_initials_avatar(first_name: str, last_name: str) -> Dict[str, Any]:
             "background_color": background_color
         }
         
-        # Cache the result
-        _avatar_cache[cache_key] = avatar_data.copy()
-        
-        # Limit cache size to prevent memory issues
-        if len(_avatar_cache) > 1000:
-            # Remove oldest entries (simple FIFO)
-            oldest_keys = list(_avatar_cache.keys())[:100]
-            for key in oldest_keys:
-                del _avatar_cache[key]
+        # Cache the result (bounded LRU)
+        avatar_cache.set(cache_key, avatar_data)
         
         return avatar_data
         
     except Exception as e:
         # Log avatar generation error for monitoring
-        print(f"[Avatar Generation Error] Failed to generate avatar for '{first_name}' '{last_name}': {str(e)}")
+        logger.error("[Avatar Generation Error] Failed to generate avatar for '%s' '%s': %s", first_name, last_name, str(e))
         
         # Fallback avatar configuration if generation fails
         fallback_avatar = {
@@ -1068,7 +1287,7 @@ def generate_initials_avatar(first_name: str, last_name: str) -> Dict[str, Any]:
         }
         
         # Cache the fallback too to avoid repeated errors
-        _avatar_cache[cache_key] = fallback_avatar.copy()
+        avatar_cache.set(cache_key, fallback_avatar)
         
         return fallback_avatar
 
@@ -1079,337 +1298,695 @@ def get_avatar_cache_stats() -> Dict[str, Any]:
     Returns:
         Dict containing cache size and hit rate information
     """
+    cache_size = avatar_cache.size()
     return {
-        "cache_size": len(_avatar_cache),
-        "max_cache_size": 1000,
-        "cache_utilization": len(_avatar_cache) / 1000 * 100
+        "cache_size": cache_size,
+        "max_cache_size": AVATAR_CACHE_MAX_ENTRIES,
+        "cache_utilization": cache_size / AVATAR_CACHE_MAX_ENTRIES * 100,
+        "hit_rate": avatar_cache.stats()["hit_rate"]
     }
 
 def clear_avatar_cache() -> None:
     """Clear the avatar cache (useful for testing or memory management)."""
-    global _avatar_cache
-    _avatar_cache.clear()
-    print("[Avatar Cache] Cache cleared")
+    avatar_cache.clear()
+    logger.info("[Avatar Cache] Cache cleared")
+
+def format_candidate_for_response(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored or in-flight candidate the way the search endpoints return it."""
+    return {
+        "id": candidate.get("id"),
+        "name": candidate.get("name"),
+        "title": candidate.get("title"),
+        "email": candidate.get("email"),
+        "location": candidate.get("location"),
+        "company": candidate.get("company"),
+        "linkedin_url": candidate.get("linkedin_url"), 
+        "profile_photo_url": candidate.get("profile_photo_url"),
+        "accuracy": candidate.get("accuracy"),
+        "reasons": candidate.get("reasons"),
+        "linkedin_profile": candidate.get("linkedin_profile"),
+        "behavioral_data": candidate.get("behavioral_data"),
+        # Evidence URLs and related data
+        "evidence_urls": candidate.get("evidence_urls", []),
+        "evidence_summary": candidate.get("evidence_summary", "No supporting evidence URLs found"),
+        "evidence_confidence": candidate.get("evidence_confidence", 0.0),
+        # New avatar data for initials fallback
+        "avatar": candidate.get("avatar"),
+        # Backward compatibility - photo_url field
+        "photo_url": candidate.get("photo_url")
+    }
+
+def _normalize_candidate_fields(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill photo, company and LinkedIn URL fields from the raw Apollo data."""
+    if candidate.get("profile_pic_url"):
+        candidate["profile_photo_url"] = candidate["profile_pic_url"]
+    if not candidate.get("company") or candidate.get("company") == "Unknown":
+        if "organization" in candidate:
+            org = candidate["organization"]
+            if isinstance(org, dict) and org.get("name"):
+                candidate["company"] = org["name"]
+            elif isinstance(org, str) and org.strip():
+                candidate["company"] = org
+    linkedin_url = candidate.get("linkedin_url")
+    if linkedin_url and not linkedin_url.startswith("http"):
+        candidate["linkedin_url"] = f"https://{linkedin_url}"
+    return candidate
+
+def _apply_evidence_accuracy_adjustment(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Adjust accuracy scores based on evidence URL availability."""
+    has_evidence = bool(candidate.get('evidence_urls'))
+    current_accuracy = candidate.get('accuracy', 85)
+    
+    if not has_evidence:
+        # Reduce accuracy by 15-20 points when no evidence URLs are found
+        reduced_accuracy = max(50, current_accuracy - 18)
+        candidate['accuracy'] = reduced_accuracy
+        candidate['evidence_urls'] = []  # Ensure empty array instead of None
+        candidate['evidence_summary'] = "No supporting evidence URLs found"
+        candidate['evidence_confidence'] = 0.0
+        logger.debug("[Accuracy Adjustment] Reduced accuracy for %s from %s%% to %s%% (no evidence URLs)", candidate.get('name', 'Unknown'), current_accuracy, reduced_accuracy)
+    else:
+        evidence_count = len(candidate.get('evidence_urls', []))
+        candidate['evidence_summary'] = f"Found {evidence_count} supporting evidence URLs"
+        candidate['evidence_confidence'] = min(0.95, 0.6 + (evidence_count * 0.1))  # Scale confidence with URL count
+        logger.debug("[Accuracy Adjustment] Maintained accuracy for %s at %s%% (has %s evidence URLs)", candidate.get('name', 'Unknown'), current_accuracy, evidence_count)
+    return candidate
+
+def _create_evidence_finder(prompt: str):
+    """Create the evidence finder shared by every candidate of one search."""
+    try:
+        # Initialize context-aware evidence finder with diversity enabled
+        try:
+            evidence_finder = ContextAwareEvidenceFinder(enable_diversity=True)
+            
+            # Set search context from the original prompt
+            evidence_finder.set_search_context(prompt)
+            logger.debug("[Context-Aware Evidence] Using context-aware evidence finder with prompt: %s...", prompt[:100])
+        except NameError:
+            # Fallback to enhanced evidence finder if context-aware not available
+            from enhanced_url_evidence_finder import EnhancedURLEvidenceFinder
+            evidence_finder = EnhancedURLEvidenceFinder(enable_diversity=True)
+            logger.info("[Evidence Enhancement] Using fallback enhanced evidence finder")
+        
+        # Configure for maximum diversity to avoid CRM URLs for non-CRM behavior
+        evidence_finder.configure_diversity(
+            ensure_uniqueness=True,
+            max_same_domain=1,
+            prioritize_alternatives=True,
+            diversity_weight=0.4
+        )
+        return evidence_finder
+    except Exception as e:
+        logger.error("[Evidence Enhancement Error] Could not create evidence finder: %s", str(e))
+        return None
 
-async def process_search(request_id: str, prompt: str, max_candidates: int = 3, include_linkedin: bool = True):
+# Latency budget shares (see deadline.py). Once people are being fetched this
+# share of the budget is kept for the per-candidate stages and storage.
+CANDIDATE_STAGE_RESERVE_SHARE = 0.35
+# Least time worth starting another Apollo page, AI behavioral analysis or an evidence lookup with
+MIN_PAGE_SECONDS = 5.0
+MIN_BEHAVIORAL_SECONDS = 10.0
+MIN_EVIDENCE_SECONDS = 3.0
+# Slack for the page request to return its partial enrichment, and for storing the result
+PAGE_GRACE_SECONDS = 2.0
+FINALIZE_RESERVE_SECONDS = 2.0
+
+def _record_degradation(degradations: Optional[Set[str]], path: str) -> None:
+    """Count a cheaper path taken under deadline pressure and remember it for the search."""
+    SEARCH_DEGRADATIONS.inc(path=path)
+    if degradations is not None:
+        degradations.add(path)
+
+def _build_candidate_pipeline(request_id: str, prompt: str, evidence_finder=None, deadline: Optional[Deadline] = None,
+                              degradations: Optional[Set[str]] = None) -> CandidatePipeline:
+    """
+    Build the per-candidate photo -> behavioral -> evidence pipeline for one search.
+    
+    Behavioral uniqueness state is shared across the search's candidates, and
+    each candidate is published as a "candidate" event once it is finalized.
+    When the search deadline runs short, behavioral data falls back to the
+    heuristic insights and evidence lookup is skipped; the paths taken are
+    added to degradations.
+    """
+    generated_insights: List[str] = []
+    used_patterns: set = set()
+    evidence_timeout = float(os.getenv("EVIDENCE_TIMEOUT_SECONDS", "20"))
+
+    async def photo_stage(index: int, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        candidate = validate_candidate_photos([candidate])[0]
+        return _normalize_candidate_fields(candidate)
+
+    async def behavioral_stage(index: int, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        if deadline is not None and deadline.short(MIN_BEHAVIORAL_SECONDS):
+            _record_degradation(degradations, "heuristic_behavioral")
+            return finalize_candidate_behavioral_data(candidate, None, prompt, index, generated_insights, used_patterns)
+        try:
+            behavioral_data = await run_blocking(
+                enhance_behavioral_data_ai, {}, [candidate], prompt,
+                candidate_index=index, is_top_candidate=index < 3
+            )
+        except Exception as e:
+            logger.warning("[Behavioral] Generation failed for %s, using fallback: %s", candidate.get('name', 'Unknown'), e)
+            behavioral_data = None
+        return finalize_candidate_behavioral_data(candidate, behavioral_data, prompt, index, generated_insights, used_patterns)
+
+    async def evidence_stage(index: int, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        if evidence_finder is not None and deadline is not None and deadline.short(MIN_EVIDENCE_SECONDS):
+            logger.info("[Deadline] Skipping evidence for %s, %.1fs left", candidate.get('name', 'Unknown'), deadline.remaining())
+            _record_degradation(degradations, "skipped_evidence")
+        elif evidence_finder is not None:
+            evidence_start_time = time.time()
+            timeout = evidence_timeout
+            token = None
+            if deadline is not None:
+                timeout = deadline.timeout(cap=evidence_timeout, reserve=FINALIZE_RESERVE_SECONDS)
+                # The finder's web search sees a slightly tighter budget so its fallback URLs still fit
+                token = set_current_deadline(deadline.child(timeout - 1.0))
+            try:
+                # Per-candidate timeout so one slow search cannot hold back the others
+                enhanced = await asyncio.wait_for(
+                    evidence_finder.process_candidates_batch([candidate]),
+                    timeout=timeout
+                )
+                if enhanced:
+                    candidate = enhanced[0]
+                logger.debug("[Evidence Enhancement] %s completed in %.2fs", candidate.get('name', 'Unknown'), time.time() - evidence_start_time)
+            except asyncio.TimeoutError:
+                logger.warning("[Evidence Enhancement] Timed out after %.2fs for %s - continuing without evidence URLs", time.time() - evidence_start_time, candidate.get('name', 'Unknown'))
+            except Exception as e:
+                logger.error("[Evidence Enhancement Error] Failed after %.2fs: %s", time.time() - evidence_start_time, str(e))
+            finally:
+                if token is not None:
+                    reset_current_deadline(token)
+            publish_search_event(
+                request_id, "evidence_attached",
+                index=index,
+                name=candidate.get("name"),
+                evidence_count=len(candidate.get("evidence_urls") or [])
+            )
+        return _apply_evidence_accuracy_adjustment(candidate)
+
+    def publish_candidate(index: int, candidate: Dict[str, Any]) -> None:
+        publish_search_event(request_id, "candidate", index=index, candidate=format_candidate_for_response(candidate))
+
+    return CandidatePipeline(
+        [
+            PipelineStage("photo", photo_stage),
+            PipelineStage("behavioral", behavioral_stage, concurrency=int(os.getenv("CANDIDATE_PIPELINE_BEHAVIORAL_CONCURRENCY", "3"))),
+            PipelineStage("evidence", evidence_stage, concurrency=int(os.getenv("CANDIDATE_PIPELINE_EVIDENCE_CONCURRENCY", "3"))),
+        ],
+        on_finalized=publish_candidate
+    )
+
+# Columns added by add_result_cache_columns.sql
+CACHE_MARKER_FIELDS = ("cached", "cached_from_request_id")
+
+def _build_cache_entry(request_id: str, candidates: List[Dict[str, Any]], search_data: Dict[str, Any],
+                       max_candidates: int) -> Dict[str, Any]:
+    """Snapshot of a completed search for the result cache."""
+    cached_candidates = []
+    for candidate in candidates:
+        if isinstance(candidate, dict):
+            entry = format_candidate_for_response(candidate)
+            entry.pop("id", None)
+            cached_candidates.append(entry)
+    return {
+        "request_id": request_id,
+        "candidates": cached_candidates,
+        "max_candidates": max_candidates,
+        "estimated_count": search_data.get("estimated_count"),
+        "result_estimation": search_data.get("result_estimation"),
+    }
+
+async def _complete_search_from_shared_result(request_id: str, search_data: Dict[str, Any], filters: Dict[str, Any],
+                                              cached: Dict[str, Any], source: str = "cache") -> None:
+    """Finish a search by copying another search's result (cached or coalesced) into it."""
+    candidates = cached.get("candidates") or []
+    source_request_id = cached.get("request_id")
+    logger.info("[Result Cache] Serving %s from %s search %s (%s candidates)", request_id, source, source_request_id, len(candidates))
+    publish_search_event(request_id, "cache_hit" if source == "cache" else "coalesced", cached_from_request_id=source_request_id)
+
+    search_db_id = search_data.get("id")
+    if search_db_id and candidates:
+        await run_blocking(store_people_to_database, search_db_id, candidates, pool="db")
+    for index, candidate in enumerate(candidates):
+        publish_search_event(request_id, "candidate", index=index, candidate=candidate)
+
+    search_data["status"] = "completed"
+    search_data["filters"] = encode_column(filters)
+    search_data["estimated_count"] = cached.get("estimated_count")
+    search_data["result_estimation"] = cached.get("result_estimation")
+    search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+    search_data["cached"] = True
+    search_data["cached_from_request_id"] = source_request_id
+    if not await run_blocking(store_search_to_database, search_data, pool="db"):
+        # Databases without the cache marker columns still get the completed result
+        for field in CACHE_MARKER_FIELDS:
+            search_data.pop(field, None)
+        await run_blocking(store_search_to_database, search_data, pool="db")
+    publish_search_event(
+        request_id, "completed",
+        candidate_count=len(candidates),
+        estimated_count=search_data.get("estimated_count"),
+        cached=True
+    )
+
+# Concurrent identical searches share a single pipeline run
+search_flight = get_single_flight("search")
+
+async def process_search(request_id: str, prompt: str, max_candidates: int = 3, include_linkedin: bool = True, force_refresh: bool = False, parsed_prompt: Optional[Dict[str, Any]] = None, deadline: Optional[Dict[str, Any]] = None):
+    """
+    Run a search, coalescing it with an identical search that is already in flight.
+    
+    The first search for a canonical prompt becomes the leader and runs the
+    pipeline; concurrent duplicates wait for its result and copy it under their
+    own request_id. force_refresh always runs a fresh pipeline.
+    
+    parsed_prompt is the ParsedPrompt create_search stored on the job; jobs
+    queued without one are parsed again here. deadline is the search's
+    latency budget (see deadline.py), started when the search was accepted;
+    it is made current so LLM calls and evidence lookups are capped by it.
+    """
+    started_at = time.perf_counter()
+    outcome = "failed"
+    search_deadline = Deadline.from_dict(deadline) or Deadline.start()
+    token = set_current_deadline(search_deadline)
+    task = None
+    try:
+        parsed = ParsedPrompt.from_dict(parsed_prompt) if parsed_prompt else parse_prompt(prompt)
+        # The search runs as its own task so search_tasks.cancel() can stop it
+        # without cancelling the worker that called us
+        task = asyncio.create_task(
+            _process_search(request_id, prompt, max_candidates, include_linkedin, force_refresh, parsed, search_deadline)
+        )
+        search_tasks.register(request_id, task)
+        outcome = await task
+    except asyncio.CancelledError:
+        if task is None or not search_tasks.cancel_requested(request_id):
+            raise
+        outcome = "cancelled"
+        await _record_cancelled_search(request_id)
+    finally:
+        if task is not None:
+            search_tasks.unregister(request_id, task)
+        reset_current_deadline(token)
+        SEARCH_SECONDS.observe(time.perf_counter() - started_at, outcome=outcome)
+
+async def _record_cancelled_search(request_id: str) -> None:
+    """Mark a search cancelled, unless it already finished or its row was deleted."""
+    try:
+        search_data = await run_blocking(get_search_from_database, request_id, pool="db")
+        if search_data and search_data.get("status") not in ("completed", "failed", "cancelled"):
+            search_data["status"] = "cancelled"
+            search_data["error"] = "Search cancelled"
+            search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+            await run_blocking(store_search_to_database, search_data, pool="db")
+    except Exception as e:
+        logger.warning("[Search Tasks] Failed to record cancellation of %s: %s", request_id, e)
+    publish_search_event(request_id, "cancelled")
+
+def _leased_deadline(deadline: Optional[Dict[str, Any]], request_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    The budget a search runs under once a worker has leased its job.
+    
+    The deadline starts when the search is accepted, so time spent queued (or
+    waiting for a redelivery) counts against it. A job left without enough
+    budget to fetch a page and still enrich candidates gets a fresh budget
+    rather than spending paid calls on a search that must come back empty.
+    """
+    current = Deadline.from_dict(deadline)
+    if current is None or not current.short(current.budget * CANDIDATE_STAGE_RESERVE_SHARE + MIN_PAGE_SECONDS):
+        return deadline
+    logger.info("[Deadline] %s leased with %.1fs of %.0fs left; starting a fresh budget", request_id, current.remaining(), current.budget)
+    return Deadline.start(current.budget).to_dict()
+
+async def run_search_job(**payload):
+    """Queue job handler: jobs carrying a batch_id run a whole batch, the rest a single search."""
+    if "batch_id" in payload:
+        return await process_search_batch(**payload)
+    payload["deadline"] = _leased_deadline(payload.get("deadline"), payload.get("request_id"))
+    return await process_search(**payload)
+
+async def process_search_batch(batch_id: str, items: List[Dict[str, Any]], max_candidates: int = 3,
+                               include_linkedin: bool = True, force_refresh: bool = False):
+    """
+    Run the child searches of a batch as one job.
+    
+    Estimates for every distinct prompt come from one batched LLM call.
+    Identical prompts start together, so single-flight completes the
+    duplicates from one pipeline run. Distinct prompts run up to
+    BATCH_CONCURRENCY at a time and share filter parsing and Apollo pages
+    through the batch context (search_batches.py). Timings and sharing counts
+    are stored with the batch when it finishes.
+    
+    The worker renews the job's lease while the batch runs. If the job is
+    redelivered anyway (its worker died), only children that have not
+    finished run again.
+    """
+    batch_data = await run_blocking(get_batch_from_database, batch_id, pool="db")
+    if not batch_data or batch_data.get("status") in TERMINAL_SEARCH_STATUSES:
+        return
+    batch = SearchBatch(batch_id)
+    token = set_current_batch(batch)
+    try:
+        children = [item for item in items if item.get("request_id")]
+        previous = await run_blocking(get_search_statuses_from_database, [item["request_id"] for item in children], pool="db")
+        unfinished = [item for item in children
+                      if (previous.get(item["request_id"]) or {}).get("status") not in TERMINAL_SEARCH_STATUSES]
+        if len(unfinished) < len(children):
+            logger.info("[Batch] %s resumed: %s of %s searches already finished", batch_id, len(children) - len(unfinished), len(children))
+        leaders = [item for item in unfinished if item.get("duplicate_of") is None]
+        with batch.stage("estimate"):
+            try:
+                estimates = await run_blocking(estimate_people_counts, [item["prompt"] for item in leaders])
+                batch.estimates = {canonicalize_prompt(item["prompt"]): estimate for item, estimate in zip(leaders, estimates)}
+            except Exception as e:
+                # Each search estimates its own prompt instead
+                logger.warning("[Batch] Batched estimation failed for %s: %s", batch_id, e)
+
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for item in unfinished:
+            leader_index = item["duplicate_of"] if item.get("duplicate_of") is not None else item["index"]
+            groups.setdefault(leader_index, []).append(item)
+        semaphore = asyncio.Semaphore(batch_concurrency())
+
+        async def run_group(group: List[Dict[str, Any]]) -> None:
+            async with semaphore:
+                results = await asyncio.gather(*(
+                    process_search(item["request_id"], item["prompt"], max_candidates, include_linkedin,
+                                   force_refresh, parsed_prompt=item.get("parsed_prompt"))
+                    for item in group
+                ), return_exceptions=True)
+            for item, result in zip(group, results):
+                if isinstance(result, Exception):
+                    logger.warning("[Batch] Search %s in batch %s failed: %s", item["request_id"], batch_id, result)
+
+        with batch.stage("searches"):
+            await asyncio.gather(*(run_group(group) for group in groups.values()))
+
+        statuses = await run_blocking(get_search_statuses_from_database, [item["request_id"] for item in children], pool="db")
+        _, counts = summarize_batch(items, statuses)
+        report = batch.report()
+        logger.info("[Batch] %s finished %s prompts in %.1f ms: %s", batch_id, len(items), report["total_ms"], counts)
+        batch_data["status"] = "completed"
+        batch_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+        batch_data["timings"] = {**report, "counts": counts}
+        await run_blocking(store_batch_to_database, batch_data, pool="db")
+    finally:
+        reset_current_batch(token)
+
+async def _process_search(request_id: str, prompt: str, max_candidates: int, include_linkedin: bool, force_refresh: bool, parsed: ParsedPrompt, deadline: Deadline) -> str:
+    """Body of process_search; returns the outcome label for the search duration metric."""
+    batch = current_batch()
+    if force_refresh and batch is None:
+        result = await _run_search_pipeline(request_id, prompt, max_candidates, include_linkedin, force_refresh=True, parsed=parsed, deadline=deadline)
+        return "completed" if result is not None else "failed"
+
+    flight_key = (canonicalize_prompt(prompt), max_candidates, include_linkedin)
+    if force_refresh:
+        # A fresh run must not join an ordinary search, but duplicates within the batch still share it
+        flight_key = (batch.batch_id,) + flight_key
+    try:
+        shared_result, is_leader = await search_flight.do_with_status(
+            flight_key,
+            lambda: _run_search_pipeline(request_id, prompt, max_candidates, include_linkedin, force_refresh=force_refresh, parsed=parsed, deadline=deadline)
+        )
+    except FlightCancelledError:
+        # The leader's search was cancelled; this one still wants a result
+        shared_result, is_leader = None, False
+    if is_leader:
+        return "completed" if shared_result is not None else "failed"
+
+    try:
+        search_data = await run_blocking(get_search_from_database, request_id, pool="db")
+        if not search_data or search_data.get("status") in ("completed", "cancelled"):
+            return "skipped"
+        if shared_result is None:
+            # The leader did not complete; run this search on its own
+            result = await _run_search_pipeline(request_id, prompt, max_candidates, include_linkedin, parsed=parsed, deadline=deadline)
+            return "completed" if result is not None else "failed"
+        await _complete_search_from_shared_result(request_id, search_data, shared_result.get("filters") or {}, shared_result, source="coalesced")
+        return "coalesced"
+    except Exception as e:
+        logger.warning("[Single Flight] Failed to complete coalesced search %s: %s", request_id, e)
+        try:
+            search_data = await run_blocking(get_search_from_database, request_id, pool="db")
+            if search_data:
+                search_data["status"] = "failed"
+                search_data["error"] = str(e)
+                search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+                await run_blocking(store_search_to_database, search_data, pool="db")
+        except Exception:
+            pass
+        publish_search_event(request_id, "failed", error=str(e))
+        return "failed"
+
+async def _run_search_pipeline(request_id: str, prompt: str, max_candidates: int = 3, include_linkedin: bool = True, force_refresh: bool = False, parsed: Optional[ParsedPrompt] = None, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+    """
+    Run the full search pipeline for one request.
+    
+    Returns the result shared with coalesced searches (filters, candidates and
+    estimate) when the search completes, otherwise None.
+    
+    The deadline bounds every stage. Once fetching people, a share of the
+    budget is kept for the per-candidate stages; when it runs short the
+    pipeline fetches fewer pages and scores candidates heuristically instead
+    of failing or overrunning.
+    """
+    if deadline is None:
+        deadline = current_deadline() or Deadline.start()
+    candidate_reserve = deadline.budget * CANDIDATE_STAGE_RESERVE_SHARE
     is_completed = False
+    pipeline = None
+    graph = None
+    planner = None
     MAX_ATTEMPTS = 5
     try:
-        search_data = get_search_from_database(request_id)
-        if not search_data or search_data.get("status") == "completed":
+        search_data = await run_blocking(get_search_from_database, request_id, pool="db")
+        if not search_data or search_data.get("status") in ("completed", "cancelled"):
             return
+        publish_search_event(request_id, "started", prompt=prompt, max_candidates=max_candidates)
 
-        def preprocess_prompt(prompt_text: str) -> str:
-            generic_terms = [
-                "people", "persons", "person", "anyone", "somebody", "someone",
-                "individuals", "individual", "professionals", "professional",
-                "contacts", "contact", "leads", "lead"
-            ]
-            processed_prompt = prompt_text
-            for term in generic_terms:
-                pattern = r'\b' + re.escape(term) + r'\b'
-                if re.search(pattern, processed_prompt, re.IGNORECASE):
-                    processed_prompt = re.sub(pattern, 'executives', processed_prompt, flags=re.IGNORECASE)
-                    print(f"[Prompt Processing] Converted '{term}' to 'executives' in search query")
-            return processed_prompt
-
-        preprocessed_prompt = preprocess_prompt(prompt)
-        try:
-            enhanced_prompt, analysis = enhance_prompt(preprocessed_prompt)
-            if analysis.reasoning:
-                print(f"Smart prompt enhancement applied: {', '.join(analysis.reasoning)}")
-        except Exception as e:
-            enhanced_prompt = preprocessed_prompt
-            print(f"Smart prompt enhancement failed, using preprocessed prompt: {str(e)}")
+        if parsed is None:
+            parsed = parse_prompt(prompt)
+        preprocessed_prompt = parsed.normalized
+
+        async def enhance_task():
+            try:
+                enhanced_prompt, analysis = await run_blocking(enhance_prompt, preprocessed_prompt)
+                if analysis.reasoning:
+                    logger.info("Smart prompt enhancement applied: %s", ', '.join(analysis.reasoning))
+                return enhanced_prompt
+            except Exception as e:
+                logger.warning("Smart prompt enhancement failed, using preprocessed prompt: %s", str(e))
+                return preprocessed_prompt
+
+        async def estimate_task():
+            # Batches estimate every prompt in one LLM call before their searches start
+            batch = current_batch()
+            estimate = batch.estimate_for(prompt) if batch is not None else None
+            return estimate or await run_blocking(estimate_people_count, prompt)
+
+        async def filters_task(enhanced_prompt):
+            # Prompts in a batch that enhance to the same text parse their filters once
+            filters = await batch_shared(
+                "filters", (enhanced_prompt, parsed.ridiculous),
+                lambda: run_blocking(parse_prompt_to_internal_database_filters, enhanced_prompt, ridiculous=parsed.ridiculous)
+            )
+            publish_search_event(request_id, "filters_parsed", filters=filters)
+            return filters
+
+        async def search_context_task():
+            # Warms the analyze_search_context cache used by behavioral scoring and
+            # builds the evidence finder's search context before any candidate exists
+            await run_blocking(analyze_search_context, prompt)
+            if not EVIDENCE_INTEGRATION_AVAILABLE:
+                return None
+            return await run_blocking(_create_evidence_finder, prompt)
+
+        # Everything that only needs the prompt starts now; results are joined where used
+        graph = TaskGraph(f"search {request_id}")
+        graph.add("estimate", estimate_task)
+        graph.add("enhance", enhance_task)
+        graph.add("filters", filters_task, deps=["enhance"])
+        graph.add("search_context", search_context_task)
+
+        filters = await graph.result("filters")
+        enhanced_prompt = await graph.result("enhance")
+
+        if not force_refresh:
+            cached_result = await _cache_call(search_result_cache, search_result_cache.get, enhanced_prompt, filters, max_candidates)
+            if cached_result:
+                await _complete_search_from_shared_result(request_id, search_data, filters, cached_result)
+                is_completed = True
+                await graph.close()
+                return {**cached_result, "request_id": request_id, "filters": filters}
+
+        evidence_finder = await graph.result("search_context")
+        # Cheaper paths taken under deadline pressure; such a result is not cached
+        degradations: Set[str] = set()
+        pipeline = _build_candidate_pipeline(request_id, prompt, evidence_finder, deadline, degradations)
+        people_started_at = time.time()
+
+        filters_key = canonical_filters(filters)
+
+        async def fetch_page(page_number, per_page):
+            page_deadline = deadline.child(deadline.timeout(cap=60, reserve=candidate_reserve, floor=MIN_PAGE_SECONDS))
+            # Prompts in a batch with identical filters fetch each Apollo page once
+            people = await asyncio.wait_for(
+                batch_shared(
+                    "apollo_page", (filters_key, page_number, per_page),
+                    lambda: search_people_via_internal_database(filters, page=page_number, per_page=per_page, deadline=page_deadline)
+                ),
+                timeout=page_deadline.remaining() + PAGE_GRACE_SECONDS
+            )
+            # Each search gets its own copies of a shared page
+            return [dict(p) if isinstance(p, dict) else p for p in people] if people else people
 
-        filters = parse_prompt_to_internal_database_filters(enhanced_prompt)
+        # Sizes pages from the yield learned for these filters and fetches the
+        # next page while this one is filtered and assessed
+        planner = FetchPlanner(filters, max_candidates, fetch_page)
 
         attempt = 0
         page = 1
         candidates = []
+        candidate_index = CandidateIndex()
         while attempt < MAX_ATTEMPTS and len(candidates) < max_candidates:
+            if attempt > 0 and deadline.short(candidate_reserve + MIN_PAGE_SECONDS):
+                logger.info("[Deadline] %.1fs left; stopping after %s pages with %s candidates", deadline.remaining(), attempt, len(candidates))
+                _record_degradation(degradations, "fewer_pages")
+                break
             attempt += 1
-            print(f"[RETRY] Attempt {attempt} (page {page}) to find at least {max_candidates} valid candidates.")
+            logger.info("[RETRY] Attempt %s (page %s) to find at least %s valid candidates.", attempt, page, max_candidates)
             try:
-                search_per_page = max_candidates + 6
-                people = await asyncio.wait_for(
-                    search_people_via_internal_database(filters, page=page, per_page=search_per_page),
-                    timeout=60
-                )
+                people = await planner.fetch(page)
             except (asyncio.TimeoutError, Exception) as e:
+                if isinstance(e, asyncio.TimeoutError) and candidates:
+                    # Keep what earlier pages produced rather than fail the search
+                    logger.warning("[Deadline] Page %s timed out; finishing with %s candidates", page, len(candidates))
+                    _record_degradation(degradations, "partial_pages")
+                    break
                 search_data["status"] = "failed"
                 search_data["error"] = str(e)
                 search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-                store_search_to_database(search_data)
+                await run_blocking(store_search_to_database, search_data, pool="db")
+                await planner.cancel()
+                await pipeline.cancel()
+                await graph.close()
+                publish_search_event(request_id, "failed", error=str(e))
                 return
+            publish_search_event(request_id, "people_fetched", page=page, count=len(people or []))
 
             if not people:
-                print(f"[RETRY] No people found on page {page}.")
+                logger.info("[RETRY] No people found on page %s.", page)
+                planner.record(0, 0)
                 page += 1
                 continue
 
+            if (attempt < MAX_ATTEMPTS and planner.should_prefetch(len(people), len(candidates))
+                    and not deadline.short(candidate_reserve + MIN_PAGE_SECONDS)):
+                planner.prefetch(page + 1)
+
             # Filter out non-US locations and known public figures via Wikipedia
             filtered_people = []
             for p in people:
                 if not isinstance(p, dict):
                     continue
-                loc = (p.get("location") or p.get("country") or "").lower()
-                if loc:
-                    non_us_locations = [
-                        "canada", "mexico", "uk", "united kingdom", "england", "scotland", "wales", "ireland",
-                        "france", "germany", "spain", "italy", "netherlands", "belgium", "switzerland",
-                        "austria", "portugal", "sweden", "norway", "denmark", "finland", "poland",
-                        "czech republic", "hungary", "romania", "bulgaria", "greece", "turkey",
-                        "russia", "ukraine", "belarus", "lithuania", "latvia", "estonia",
-                        "australia", "new zealand", "japan", "south korea", "china", "taiwan",
-                        "singapore", "malaysia", "thailand", "vietnam", "philippines", "indonesia",
-                        "india", "pakistan", "bangladesh", "sri lanka", "nepal", "myanmar",
-                        "israel", "saudi arabia", "uae", "qatar", "kuwait", "bahrain", "oman",
-                        "egypt", "south africa", "nigeria", "kenya", "morocco", "tunisia",
-                        "brazil", "argentina", "chile", "colombia", "peru", "venezuela", "ecuador",
-                        "london", "paris", "berlin", "madrid", "rome", "amsterdam", "brussels",
-                        "zurich", "vienna", "stockholm", "oslo", "copenhagen", "helsinki",
-                        "toronto", "vancouver", "montreal", "sydney", "melbourne", "tokyo",
-                        "seoul", "beijing", "shanghai", "hong kong", "mumbai", "delhi", "bangalore"
-                    ]
-                    is_non_us = any(non_us in loc for non_us in non_us_locations)
-                    if is_non_us:
-                        continue
+                if p in candidate_index:
+                    # Already a candidate from an earlier page
+                    continue
+                if not is_us(p.get("location") or p.get("country")):
+                    continue
                 name_val = (p.get("name") or "").strip()
                 if name_val and await is_public_figure(name_val):
                     continue
                 filtered_people.append(p)
+            planner.record(len(people), len(filtered_people))
             people = filtered_people
 
             try:
                 if people:
-                    print(f"[DEBUG] Input people count: {len(people)}")
-                    top_basic = select_top_candidates(prompt, people)
-                    print(f"[DEBUG] select_top_candidates returned: {len(top_basic) if top_basic else 0} candidates")
-                    merged_candidates = []
-                    seen_identifiers = set()
+                    logger.debug("Input people count: %s", len(people))
+                    use_llm = not deadline.short(candidate_reserve)
+                    if not use_llm:
+                        logger.info("[Deadline] %.1fs left; scoring candidates heuristically", deadline.remaining())
+                        _record_degradation(degradations, "heuristic_assessment")
+                    with STAGE_SECONDS.time(stage="assessment"):
+                        top_basic = await run_blocking(select_top_candidates, prompt, people, use_llm=use_llm)
+                    logger.debug("select_top_candidates returned: %s candidates", len(top_basic) if top_basic else 0)
+                    people_index = CandidateIndex(people)
+                    merged_candidates = CandidateIndex()
                     if top_basic and isinstance(top_basic, list):
                         for basic in top_basic:
-                            identifier = None
-                            if basic.get("linkedin_url"):
-                                identifier = basic.get("linkedin_url")
-                            elif basic.get("email"):
-                                identifier = basic.get("email")
-                            elif basic.get("name"):
-                                identifier = basic.get("name")
-                            if identifier and identifier in seen_identifiers:
+                            if basic in merged_candidates:
                                 continue
-                            match = None
-                            for p in people:
-                                if not isinstance(p, dict):
-                                    continue
-                                if (
-                                    (basic.get("linkedin_url") and basic.get("linkedin_url") == p.get("linkedin_url")) or
-                                    (basic.get("email") and basic.get("email") == p.get("email")) or
-                                    (basic.get("name") and basic.get("name") == p.get("name"))
-                                ):
-                                    match = p
-                                    break
                             merged = {**basic}
+                            match = people_index.find(basic)
                             if match:
                                 merged.update(match)
-                            merged_candidates.append(merged)
-                            if identifier:
-                                seen_identifiers.add(identifier)
-                    candidates.extend([c for c in merged_candidates if c not in candidates])
+                            merged_candidates.add(merged)
+                    for merged in merged_candidates:
+                        if not candidate_index.add(merged):
+                            continue
+                        candidates.append(merged)
+                        if len(candidates) <= max_candidates:
+                            publish_search_event(
+                                request_id, "candidate_scored",
+                                index=len(candidates) - 1,
+                                name=merged.get("name"),
+                                title=merged.get("title"),
+                                accuracy=merged.get("accuracy")
+                            )
+                            pipeline.submit(merged)
                     # Only keep up to max_candidates
                     if len(candidates) >= max_candidates:
                         candidates = candidates[:max_candidates]
                         break
             except Exception as e:
-                print(f"[RETRY] Error during candidate selection/merging: {e}")
+                logger.warning("[RETRY] Error during candidate selection/merging: %s", e)
             page += 1
 
+        await planner.cancel()
+        logger.info("[Fetch Planner] %s", planner.stats())
+        graph.record("people", people_started_at, deps=["filters", "search_context"])
+
         if not candidates:
-            print(f"[RETRY] No valid candidates found after {MAX_ATTEMPTS} attempts.")
+            logger.info("[RETRY] No valid candidates found after %s attempts.", attempt)
             search_data["status"] = "completed"
-            search_data["filters"] = json.dumps(filters)
+            search_data["filters"] = encode_column(filters)
             search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-            store_search_to_database(search_data)
-            return
-
-        # Validate photos for all candidates before processing and generate avatars
-        print(f"[Avatar Generation] Processing {len(candidates)} candidates for avatar data")
-        start_time = time.time()
-        candidates = validate_candidate_photos(candidates)
-        avatar_generation_time = time.time() - start_time
-        print(f"[Avatar Generation] Completed in {avatar_generation_time:.3f}s ({avatar_generation_time/len(candidates)*1000:.1f}ms per candidate)")
-        
-        # Log avatar generation statistics
-        photo_avatars = sum(1 for c in candidates if isinstance(c, dict) and c.get("avatar", {}).get("type") == "photo")
-        initials_avatars = sum(1 for c in candidates if isinstance(c, dict) and c.get("avatar", {}).get("type") == "initials")
-        print(f"[Avatar Generation] Generated {photo_avatars} photo avatars, {initials_avatars} initials avatars")
+            await run_blocking(store_search_to_database, search_data, pool="db")
+            publish_search_event(request_id, "completed", candidate_count=0, estimated_count=None)
+            await graph.close()
+            return {"request_id": request_id, "candidates": [], "estimated_count": None, "result_estimation": None, "filters": filters}
+
+        # Photo, behavioral and evidence stages were started per candidate as each
+        # one was scored; wait for the stragglers and keep the scoring order
+        logger.info("[Candidate Pipeline] Waiting for %s candidates to finish", pipeline.submitted)
+        candidates_started_at = time.time()
+        candidates = await pipeline.finish()
+        graph.record("candidates", candidates_started_at, deps=["people"])
+        pipeline_stats = pipeline.stats()
+        logger.info("[Candidate Pipeline] Completed in %.2fs: %s", pipeline_stats['wall_time'], pipeline_stats['stages'])
         
-        # Log cache statistics
         cache_stats = get_avatar_cache_stats()
-        print(f"[Avatar Cache] Size: {cache_stats['cache_size']}/{cache_stats['max_cache_size']} ({cache_stats['cache_utilization']:.1f}% full)")
-        for candidate in candidates:
-            if isinstance(candidate, dict):
-                if candidate.get("profile_pic_url"):
-                    candidate["profile_photo_url"] = candidate["profile_pic_url"]
-                if not candidate.get("company") or candidate.get("company") == "Unknown":
-                    if "organization" in candidate:
-                        org = candidate["organization"]
-                        if isinstance(org, dict) and org.get("name"):
-                            candidate["company"] = org["name"]
-                        elif isinstance(org, str) and org.strip():
-                            candidate["company"] = org
-                linkedin_url = candidate.get("linkedin_url")
-                if linkedin_url and not linkedin_url.startswith("http"):
-                    candidate["linkedin_url"] = f"https://{linkedin_url}"
-        try:
-            from behavioral_metrics_ai import enhance_behavioral_data_for_multiple_candidates
-            used_insights = set()
-            used_patterns = set()
-            candidates = enhance_behavioral_data_for_multiple_candidates(candidates, prompt)
-            for i, candidate in enumerate(candidates):
-                if isinstance(candidate, dict) and "behavioral_data" in candidate:
-                    insight = candidate["behavioral_data"].get("behavioral_insight", "")
-                    from openai_utils import validate_response_uniqueness
-                    if insight in used_insights or len(validate_response_uniqueness([insight] + list(used_insights), 0.5)) <= len(used_insights):
-                        from behavioral_metrics_ai import generate_diverse_fallback_insight, add_score_variation
-                        title = candidate.get('title', 'professional')
-                        new_insight = generate_diverse_fallback_insight(title, candidate, prompt, used_patterns, i + 100)
-                        candidate["behavioral_data"]["behavioral_insight"] = new_insight
-                        used_patterns.add(new_insight)
-                    used_insights.add(candidate["behavioral_data"].get("behavioral_insight", ""))
-        except Exception as e:
-            used_patterns = set()
-            for i, candidate in enumerate(candidates):
-                if isinstance(candidate, dict):
-                    try:
-                        is_top_candidate = i < 3
-                        candidate_behavioral_data = enhance_behavioral_data_ai({}, [candidate], prompt, candidate_index=i, is_top_candidate=is_top_candidate)
-                        candidate["behavioral_data"] = candidate_behavioral_data
-                    except Exception:
-                        from behavioral_metrics_ai import generate_diverse_fallback_insight, generate_top_lead_scores, add_score_variation, generate_fallback_cmi_score, generate_fallback_rbfs_score, generate_fallback_ias_score
-                        title = candidate.get('title', 'professional')
-                        fallback_insight = generate_diverse_fallback_insight(title, candidate, prompt, used_patterns, i)
-                        used_patterns.add(fallback_insight)
-                        base_scores = {
-                            "cmi": generate_fallback_cmi_score(title, prompt, i),
-                            "rbfs": generate_fallback_rbfs_score(title, prompt, i),
-                            "ias": generate_fallback_ias_score(title, prompt, i)
-                        }
-                        if i < 3:
-                            varied_scores = generate_top_lead_scores(base_scores, i, prompt)
-                        else:
-                            varied_scores = add_score_variation(base_scores, i)
-                        candidate["behavioral_data"] = {
-                            "behavioral_insight": fallback_insight,
-                            "scores": varied_scores
-                        }
-        
-        # Enhance candidates with evidence URLs (with timeout protection)
-        if EVIDENCE_INTEGRATION_AVAILABLE and candidates:
-            try:
-                print(f"[Evidence Enhancement] Processing {len(candidates)} candidates for diverse evidence URLs")
-                evidence_start_time = time.time()
-                
-                # Add timeout protection to prevent hanging
-                async def enhance_with_timeout():
-                    # Initialize context-aware evidence finder with diversity enabled
-                    try:
-                        evidence_finder = ContextAwareEvidenceFinder(enable_diversity=True)
-                        
-                        # Set search context from the original prompt
-                        evidence_finder.set_search_context(prompt)
-                        
-                        # Configure for maximum diversity to avoid CRM URLs for non-CRM behavior
-                        evidence_finder.configure_diversity(
-                            ensure_uniqueness=True,
-                            max_same_domain=1,
-                            prioritize_alternatives=True,
-                            diversity_weight=0.4
-                        )
-                        
-                        print(f"[Context-Aware Evidence] Using context-aware evidence finder with prompt: {prompt[:100]}...")
-                        
-                    except NameError:
-                        # Fallback to enhanced evidence finder if context-aware not available
-                        from enhanced_url_evidence_finder import EnhancedURLEvidenceFinder
-                        evidence_finder = EnhancedURLEvidenceFinder(enable_diversity=True)
-                        
-                        evidence_finder.configure_diversity(
-                            ensure_uniqueness=True,
-                            max_same_domain=1,
-                            prioritize_alternatives=True,
-                            diversity_weight=0.4
-                        )
-                        
-                        print(f"[Evidence Enhancement] Using fallback enhanced evidence finder")
-                    
-                    # Process candidates with evidence finding
-                    return await evidence_finder.process_candidates_batch(candidates)
-                
-                # Execute with timeout to prevent hanging
-                enhanced_candidates = await asyncio.wait_for(
-                    enhance_with_timeout(),
-                    timeout=20.0  # 20 second timeout for context-aware evidence processing
-                )
-                
-                # Replace candidates with enhanced versions
-                candidates = enhanced_candidates
-                
-                evidence_processing_time = time.time() - evidence_start_time
-                print(f"[Evidence Enhancement] Completed in {evidence_processing_time:.2f}s")
-                
-                # Log evidence statistics
-                evidence_count = sum(len(c.get('evidence_urls', [])) for c in candidates if isinstance(c, dict))
-                candidates_with_evidence = sum(1 for c in candidates if isinstance(c, dict) and c.get('evidence_urls'))
-                
-                print(f"[Evidence Enhancement] Found {evidence_count} total evidence URLs for {candidates_with_evidence}/{len(candidates)} candidates")
-                
-            except asyncio.TimeoutError:
-                evidence_processing_time = time.time() - evidence_start_time
-                print(f"[Evidence Enhancement] Timed out after {evidence_processing_time:.2f}s - continuing without evidence URLs")
-                # Continue processing without evidence URLs - don't fail the entire search
-            except Exception as e:
-                evidence_processing_time = time.time() - evidence_start_time
-                print(f"[Evidence Enhancement Error] Failed after {evidence_processing_time:.2f}s: {str(e)}")
-                print("[Evidence Enhancement] No fallback URLs will be added - showing honest results")
-        
-        # Adjust accuracy scores based on evidence URL availability
-        if candidates:
-            for candidate in candidates:
-                if isinstance(candidate, dict):
-                    has_evidence = bool(candidate.get('evidence_urls'))
-                    current_accuracy = candidate.get('accuracy', 85)
-                    
-                    if not has_evidence:
-                        # Reduce accuracy by 15-20 points when no evidence URLs are found
-                        reduced_accuracy = max(50, current_accuracy - 18)
-                        candidate['accuracy'] = reduced_accuracy
-                        candidate['evidence_urls'] = []  # Ensure empty array instead of None
-                        candidate['evidence_summary'] = "No supporting evidence URLs found"
-                        candidate['evidence_confidence'] = 0.0
-                        print(f"[Accuracy Adjustment] Reduced accuracy for {candidate.get('name', 'Unknown')} from {current_accuracy}% to {reduced_accuracy}% (no evidence URLs)")
-                    else:
-                        evidence_count = len(candidate.get('evidence_urls', []))
-                        candidate['evidence_summary'] = f"Found {evidence_count} supporting evidence URLs"
-                        candidate['evidence_confidence'] = min(0.95, 0.6 + (evidence_count * 0.1))  # Scale confidence with URL count
-                        print(f"[Accuracy Adjustment] Maintained accuracy for {candidate.get('name', 'Unknown')} at {current_accuracy}% (has {evidence_count} evidence URLs)")
+        logger.debug("[Avatar Cache] Size: %s/%s (%.1f%% full)", cache_stats['cache_size'], cache_stats['max_cache_size'], cache_stats['cache_utilization'])
         
         search_db_id = search_data.get("id")
-        print(f"[DEBUG] About to store candidates. search_db_id: {search_db_id}, candidates count: {len(candidates) if candidates else 0}")
+        logger.debug("About to store candidates. search_db_id: %s, candidates count: %s", search_db_id, len(candidates) if candidates else 0)
         if candidates:
-            print(f"[DEBUG] Candidates list: {[c.get('name', 'Unknown') for c in candidates if isinstance(c, dict)]}")
+            logger.debug("Candidates list: %s", [c.get('name', 'Unknown') for c in candidates if isinstance(c, dict)])
         if search_db_id and candidates:
-            print(f"[DEBUG] Calling store_people_to_database with {len(candidates)} candidates")
+            logger.debug("Calling store_people_to_database with %s candidates", len(candidates))
             try:
-                result = store_people_to_database(search_db_id, candidates)
-                print(f"[DEBUG] store_people_to_database returned: {result}")
+                result = await run_blocking(store_people_to_database, search_db_id, candidates, pool="db")
+                logger.debug("store_people_to_database returned: %s", result)
             except Exception as e:
-                print(f"[DEBUG] Error calling store_people_to_database: {str(e)}")
+                logger.debug("Error calling store_people_to_database: %s", str(e))
         else:
-            print(f"[DEBUG] Skipping storage - search_db_id: {search_db_id}, candidates: {len(candidates) if candidates else 0}")
+            logger.debug("Skipping storage - search_db_id: %s, candidates: %s", search_db_id, len(candidates) if candidates else 0)
         try:
-            estimation = estimate_people_count(prompt)
+            estimation = await asyncio.wait_for(graph.result("estimate"), timeout=deadline.timeout(reserve=FINALIZE_RESERVE_SECONDS))
             search_data["estimated_count"] = estimation["estimated_count"]
             search_data["result_estimation"] = {
                 "estimated_count": estimation["estimated_count"],
@@ -1417,40 +1994,71 @@ async def process_search(request_id: str, prompt: str, max_candidates: int = 3,
                 "reasoning": estimation.get("reasoning", f"AI estimated {estimation['estimated_count']} people meet the criteria"),
                 "limiting_factors": []
             }
-            print(f"[Estimation] Generated estimate: {estimation['estimated_count']} people for prompt: {prompt}")
-            print(f"[Estimation] search_data now contains: estimated_count={search_data.get('estimated_count')}, result_estimation={search_data.get('result_estimation')}")
+            logger.info("[Estimation] Generated estimate: %s people for prompt: %s", estimation['estimated_count'], prompt)
+            logger.debug("[Estimation] search_data now contains: estimated_count=%s, result_estimation=%s", search_data.get('estimated_count'), search_data.get('result_estimation'))
         except Exception as e:
-            print(f"[Estimation] Failed to generate estimate: {e}")
+            logger.warning("[Estimation] Failed to generate estimate: %s", e)
             search_data["estimated_count"] = None
             search_data["result_estimation"] = None
         if not is_completed:
             try:
                 search_data["status"] = "completed"
-                search_data["filters"] = json.dumps(filters)
+                search_data["filters"] = encode_column(filters)
                 search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-                print(f"[Estimation] About to store search_data with estimated_count: {search_data.get('estimated_count')}")
-                store_search_to_database(search_data)
-                print(f"[Estimation] Successfully stored search data to database")
+                logger.debug("[Estimation] About to store search_data with estimated_count: %s", search_data.get('estimated_count'))
+                await run_blocking(store_search_to_database, search_data, pool="db")
+                logger.info("[Estimation] Successfully stored search data to database")
                 is_completed = True
+                if degradations:
+                    logger.info("[Result Cache] Not caching %s, built under deadline pressure: %s", request_id, sorted(degradations))
+                elif candidates:
+                    await _cache_call(
+                        search_result_cache, search_result_cache.put, enhanced_prompt, filters,
+                        _build_cache_entry(request_id, candidates, search_data, max_candidates)
+                    )
             except Exception:
                 try:
                     search_data["status"] = "completed"
                     search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-                    store_search_to_database(search_data)
+                    await run_blocking(store_search_to_database, search_data, pool="db")
                     is_completed = True
                 except Exception:
                     pass
+            publish_search_event(
+                request_id, "completed",
+                candidate_count=len(candidates),
+                estimated_count=search_data.get("estimated_count")
+            )
+        graph.log_summary()
+        if is_completed:
+            return {**_build_cache_entry(request_id, candidates, search_data, max_candidates), "filters": filters}
+    except asyncio.CancelledError:
+        # Stop every in-flight stage; process_search records the cancelled status
+        if planner is not None:
+            await planner.cancel()
+        if pipeline is not None:
+            await pipeline.cancel()
+        if graph is not None:
+            await graph.close()
+        raise
     except Exception as e:
+        if planner is not None:
+            await planner.cancel()
+        if pipeline is not None:
+            await pipeline.cancel()
+        if graph is not None:
+            await graph.close()
         if not is_completed:
             try:
-                search_data = get_search_from_database(request_id)
+                search_data = await run_blocking(get_search_from_database, request_id, pool="db")
                 if search_data:
                     search_data["status"] = "failed"
                     search_data["error"] = str(e)
                     search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-                    store_search_to_database(search_data)
+                    await run_blocking(store_search_to_database, search_data, pool="db")
             except Exception:
                 pass
+            publish_search_event(request_id, "failed", error=str(e))
 
 @app.get("/")
 async def health_check():
@@ -1496,7 +2104,7 @@ async def get_evidence_stats():
 @app.get("/api/demo/search-example", response_model=DemoSearchResponse)
 async def get_search_example():
     """
-    Generate a new AI-powered search example
+    Return an AI-powered search example from the pre-generated pool
     
     Returns:
         JSON response with search query and metadata
@@ -1529,14 +2137,9 @@ async def get_search_stream(count: int = 5):
         JSON response with array of search examples
     """
     try:
-        count = min(count, 20)
+        count = max(0, min(count, 20))
         
-        search_examples = []
-        for _ in range(count):
-            example = demo_generator.generate_search_example()
-            search_examples.append(example)
-            # Small delay to ensure different timestamps
-            await asyncio.sleep(0.1)
+        search_examples = demo_generator.get_search_examples(count)
         
         return {
             "success": True,
@@ -1639,21 +2242,21 @@ async def exchange_hubspot_oauth_token(request: HubSpotOAuthRequest):
     Exchange HubSpot authorization code for access and refresh tokens
     """
     try:
-        print(f"=== HubSpot OAuth Request Started ===")
-        print(f"Request code: {request.code[:10]}...")
-        print(f"Request redirect_uri: {request.redirect_uri}")
-        print(f"Client ID configured: {bool(hubspot_oauth_client.client_id)}")
-        print(f"Client Secret configured: {bool(hubspot_oauth_client.client_secret)}")
+        logger.info("=== HubSpot OAuth Request Started ===")
+        logger.debug("Request code: %s...", request.code[:10])
+        logger.debug("Request redirect_uri: %s", request.redirect_uri)
+        logger.debug("Client ID configured: %s", bool(hubspot_oauth_client.client_id))
+        logger.debug("Client Secret configured: %s", bool(hubspot_oauth_client.client_secret))
         
         # Check if credentials are configured
         if not hubspot_oauth_client.client_id or not hubspot_oauth_client.client_secret:
-            print("❌ HubSpot credentials not configured")
+            logger.error("❌ HubSpot credentials not configured")
             error_response = {
                 "error": "configuration_error",
                 "error_description": "HubSpot OAuth credentials are not configured",
                 "status_code": 500
             }
-            print(f"Returning error: {error_response}")
+            logger.warning("Returning error: %s", error_response)
             raise HTTPException(status_code=500, detail=error_response)
         
         # Exchange code for tokens using the OAuth client
@@ -1662,12 +2265,12 @@ async def exchange_hubspot_oauth_token(request: HubSpotOAuthRequest):
             redirect_uri=request.redirect_uri
         )
         
-        print("HubSpot token exchange successful")
-        print(f"Token data received: {token_data}")
+        logger.info("HubSpot token exchange successful")
+        logger.debug("Token data received: %s", token_data)
         
         # Validate token data
         if not token_data or not isinstance(token_data, dict):
-            print(f"Invalid token data received: {token_data}")
+            logger.warning("Invalid token data received: %s", token_data)
             raise HTTPException(
                 status_code=502,
                 detail={
@@ -1686,15 +2289,15 @@ async def exchange_hubspot_oauth_token(request: HubSpotOAuthRequest):
             "scope": token_data.get('scope')
         }
         
-        print(f"Returning response: {response_data}")
+        logger.debug("Returning response: %s", response_data)
         return response_data
         
     except HTTPException as e:
-        print(f"HubSpot OAuth HTTPException: {e.detail}")
+        logger.warning("HubSpot OAuth HTTPException: %s", e.detail)
         # Re-raise HTTP exceptions from the OAuth client
         raise
     except ValueError as e:
-        print(f"HubSpot OAuth ValueError: {str(e)}")
+        logger.warning("HubSpot OAuth ValueError: %s", str(e))
         # Handle configuration errors
         raise HTTPException(
             status_code=500,
@@ -1705,7 +2308,7 @@ async def exchange_hubspot_oauth_token(request: HubSpotOAuthRequest):
             }
         )
     except Exception as e:
-        print(f"HubSpot OAuth unexpected error: {str(e)}")
+        logger.warning("HubSpot OAuth unexpected error: %s", str(e))
         # Handle any other unexpected errors
         raise HTTPException(
             status_code=500,
@@ -1716,187 +2319,156 @@ async def exchange_hubspot_oauth_token(request: HubSpotOAuthRequest):
             }
         )
 
+async def _active_searches() -> int:
+    return await run_blocking(get_search_queue().active, pool="db")
+
+# Per-client rate limits and the global in-flight cap for new searches
+admission = AdmissionController(in_flight=_active_searches)
+
+idempotency = IdempotencyKeys()
+
+async def _replay_search(request_id: str, prompt: str, response: Response) -> Dict[str, Any]:
+    """Answer a retried create with the search its idempotency key already started."""
+    search = await run_blocking(get_search_status_from_database, request_id, pool="db") or {}
+    status = search.get("status") or "processing"
+    response.headers["Idempotent-Replayed"] = "true"
+    return {
+        "request_id": request_id,
+        "status": status,
+        "prompt": prompt,
+        "created_at": search.get("created_at"),
+        "completed_at": search.get("completed_at"),
+        "processing_complete": status in TERMINAL_SEARCH_STATUSES,
+        "processing_status": status,
+        "completion_timestamp": search.get("completed_at"),
+        "idempotent_replay": True
+    }
+
 @app.post("/api/search")
-async def create_search(request: SearchRequest, background_tasks: BackgroundTasks):
+async def create_search(request: SearchRequest, http_request: Request, response: Response):
+    # The latency budget starts when the search is accepted, so queue wait counts against it
+    deadline = Deadline.start()
+    admission_slot = 0
+    idempotency_claim = None
+    enqueued = False
     try:
         if not request.prompt or not request.prompt.strip():
             raise HTTPException(status_code=400, detail="Prompt cannot be empty")
         
-        # Preprocess prompt to convert generic terms to "executives" before validation
-        def preprocess_prompt_for_validation(prompt_text: str) -> str:
-            """Convert generic people terms to 'executives' for better search results."""
-            generic_terms = [
-                "people", "persons", "person", "anyone", "somebody", "someone",
-                "individuals", "individual", "professionals", "professional",
-                "contacts", "contact", "leads", "lead"
-            ]
-            
-            processed_prompt = prompt_text
-            
-            # Replace generic terms with "executives"
-            for term in generic_terms:
-                # Use word boundaries to avoid partial matches
-                pattern = r'\b' + re.escape(term) + r'\b'
-                if re.search(pattern, processed_prompt, re.IGNORECASE):
-                    processed_prompt = re.sub(pattern, 'executives', processed_prompt, flags=re.IGNORECASE)
-            
-            return processed_prompt
-        
-        # Apply preprocessing before validation
-        preprocessed_prompt = preprocess_prompt_for_validation(request.prompt.strip())
-        
-        # Validate prompt for ridiculous or inappropriate content
-        prompt_lower = preprocessed_prompt.lower().strip()
-        
-        # Check for obviously inappropriate requests - only the most obvious cases
-        inappropriate_patterns = [
-            "elon musk", "jeff bezos", "mark zuckerberg", "bill gates", "larry fink",
-            "ceo of apple", "ceo of google", "ceo of microsoft", "ceo of amazon",
-            "president of the united states", "white house", "government officials",
-            "movie stars", "actors", "singers", "athletes", "celebrities"
-        ]
-        
-        for pattern in inappropriate_patterns:
-            if pattern in prompt_lower:
-                # Store the failed search in database for history
-                request_id = str(uuid.uuid4())
-                created_at = datetime.now(timezone.utc).isoformat()
-                error_message = f"Search request appears to be looking for well-known public figures. Please search for specific professional roles or industries instead."
-                
-                failed_search_data = {
-                    "request_id": request_id,
-                    "status": "failed",
-                    "prompt": request.prompt.strip(),
-                    "filters": json.dumps({}),
-                    "created_at": created_at,
-                    "completed_at": created_at,
-                    "error": error_message,
-                    "estimated_count": None,
-                    "result_estimation": None
-                }
-                
-                store_search_to_database(failed_search_data)
-                
-                raise HTTPException(
-                    status_code=400, 
-                    detail=error_message
-                )
-        
-        # Check for overly vague or nonsensical requests
-        vague_patterns = [
-            "find me someone", "find me a person", "find me anybody",
-            "anyone who", "somebody who", "a person who",
-            "random people", "random person", "any person"
-        ]
-        
-        if any(pattern in prompt_lower for pattern in vague_patterns):
-            # Store the failed search in database for history
-            request_id = str(uuid.uuid4())
-            created_at = datetime.now(timezone.utc).isoformat()
-            error_message = "Please provide more specific search criteria. What role, industry, or professional background are you looking for?"
-            
-            failed_search_data = {
-                "request_id": request_id,
-                "status": "failed",
-                "prompt": request.prompt.strip(),
-                "filters": json.dumps({}),
-                "created_at": created_at,
-                "completed_at": created_at,
-                "error": error_message,
-                "estimated_count": None,
-                "result_estimation": None
-            }
-            
-            store_search_to_database(failed_search_data)
-            
-            raise HTTPException(
-                status_code=400,
-                detail=error_message
-            )
-        
-        # Check for creepy searches (specific person by name)
+        # Preprocessing, validation and name detection in one pass; the
+        # result rides along with the job so the pipeline does not redo it
         user_first_name = extract_user_first_name_from_context()  # Can be expanded later with actual user data
-        creepy_detection = detect_specific_person_search(request.prompt.strip(), user_first_name)
+        parsed_prompt = parse_prompt(request.prompt, user_first_name)
         
-        if creepy_detection["is_creepy"]:
-            # Log the creepy search attempt for monitoring
-            print(f"[Creepy Detector] Blocked search for: {creepy_detection['detected_names']} - Reason: {creepy_detection.get('reasoning', 'Unknown')}")
-            
-            # Store the failed search in database for history
-            request_id = str(uuid.uuid4())
-            created_at = datetime.now(timezone.utc).isoformat()
-            
-            failed_search_data = {
-                "request_id": request_id,
-                "status": "failed",
-                "prompt": request.prompt.strip(),
-                "filters": json.dumps({}),
-                "created_at": created_at,
-                "completed_at": created_at,
-                "error": creepy_detection["response"],
-                "estimated_count": None,
-                "result_estimation": None
-            }
+        if parsed_prompt.rejected:
+            if parsed_prompt.rejection_reason == "specific_person":
+                # Log the creepy search attempt for monitoring
+                logger.info("[Creepy Detector] Blocked search for: %s", parsed_prompt.detected_names)
             
-            store_search_to_database(failed_search_data)
-            
-            raise HTTPException(
-                status_code=400,
-                detail=creepy_detection["response"]
-            )
-        
-        # Check for requests that are too broad
-        if len(prompt_lower.split()) < 3:
             # Store the failed search in database for history
             request_id = str(uuid.uuid4())
             created_at = datetime.now(timezone.utc).isoformat()
-            error_message = "Please provide more detailed search criteria. Include role, industry, or specific requirements."
             
             failed_search_data = {
                 "request_id": request_id,
                 "status": "failed",
                 "prompt": request.prompt.strip(),
-                "filters": json.dumps({}),
+                "filters": encode_column({}),
                 "created_at": created_at,
                 "completed_at": created_at,
-                "error": error_message,
+                "error": parsed_prompt.rejection_message,
                 "estimated_count": None,
                 "result_estimation": None
             }
             
-            store_search_to_database(failed_search_data)
+            await run_blocking(store_search_to_database, failed_search_data, pool="db")
             
             raise HTTPException(
                 status_code=400,
-                detail=error_message
+                detail=parsed_prompt.rejection_message
             )
         
         if request.max_candidates and (request.max_candidates < 1 or request.max_candidates > 10):
             raise HTTPException(status_code=400, detail="max_candidates must be between 1 and 10")
         
+        client = client_key(http_request.headers, http_request.client.host if http_request.client else None)
         request_id = str(uuid.uuid4())
+        
+        # A retry with the same idempotency key gets the original search back,
+        # before it spends a rate-limit token or enqueues anything
+        try:
+            key = idempotency_key(http_request.headers, request.idempotency_key)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if key:
+            fingerprint = request_fingerprint({
+                "prompt": request.prompt.strip(),
+                "max_candidates": request.max_candidates or 3,
+                "include_linkedin": request.include_linkedin if request.include_linkedin is not None else True,
+                "force_refresh": bool(request.force_refresh)
+            })
+            try:
+                idempotency_claim = await idempotency.claim(client, key, fingerprint, request_id)
+            except IdempotencyConflict as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            if idempotency_claim is not None and idempotency_claim.replayed:
+                logger.info("[Idempotency] Replaying search %s", idempotency_claim.record.request_id)
+                return await _replay_search(idempotency_claim.record.request_id, request.prompt.strip(), response)
+        
+        # Admission: per-client token bucket, then a slot under the in-flight cap
+        try:
+            admission_slot = await admission.acquire(client)
+        except AdmissionRejected as e:
+            logger.info("[Admission] Rejected search from %s: %s", client, e.reason)
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        
+        # Backpressure: refuse new work while the queue is saturated
+        search_queue = get_search_queue()
+        queue_depth = await run_blocking(search_queue.depth, pool="db")
+        if search_queue.max_depth > 0 and queue_depth >= search_queue.max_depth:
+            raise HTTPException(
+                status_code=503,
+                detail="Search capacity is temporarily exhausted. Please retry shortly.",
+                headers={"Retry-After": "30"}
+            )
+        
         created_at = datetime.now(timezone.utc).isoformat()
         
         search_data = {
             "request_id": request_id,
             "status": "processing",
             "prompt": request.prompt.strip(),
-            "filters": json.dumps({}),
+            "filters": encode_column({}),
             "created_at": created_at,
             "completed_at": None
         }
         
-        search_db_id = store_search_to_database(search_data)
+        search_db_id = await run_blocking(store_search_to_database, search_data, pool="db")
         if not search_db_id:
             raise HTTPException(status_code=500, detail="Failed to store search in database")
         
-        background_tasks.add_task(
-            process_search,
-            request_id=request_id,
-            prompt=request.prompt.strip(),
-            max_candidates=request.max_candidates or 3,
-            include_linkedin=request.include_linkedin if request.include_linkedin is not None else True
-        )
+        job_payload = {
+            "request_id": request_id,
+            "prompt": request.prompt.strip(),
+            "max_candidates": request.max_candidates or 3,
+            "include_linkedin": request.include_linkedin if request.include_linkedin is not None else True,
+            "force_refresh": bool(request.force_refresh),
+            "parsed_prompt": parsed_prompt.to_dict(),
+            "deadline": deadline.to_dict()
+        }
+        try:
+            await run_blocking(
+                search_queue.enqueue, request_id, job_payload,
+                priority=max(0, min(10, request.priority or 0)), pool="db"
+            )
+        except QueueFullError as e:
+            search_data["status"] = "failed"
+            search_data["error"] = str(e)
+            search_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+            await run_blocking(store_search_to_database, search_data, pool="db")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+        enqueued = True
+        publish_search_event(request_id, "queued", prompt=request.prompt.strip())
         
         return {
             "request_id": request_id,
@@ -1913,14 +2485,253 @@ async def create_search(request: SearchRequest, background_tasks: BackgroundTask
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating search: {str(e)}")
+    finally:
+        admission.release(admission_slot)
+        if not enqueued:
+            # The search never started, so a retry with the same key should create it
+            await idempotency.release(idempotency_claim)
+
+def _public_batch_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """A batch item without the parsed prompt that only the job needs."""
+    return {key: value for key, value in item.items() if key != "parsed_prompt"}
+
+@app.post("/api/search/batch")
+async def create_search_batch(request: SearchBatchRequest, http_request: Request):
+    """
+    Start one search per prompt and run them together as a single batch job.
+    
+    Every accepted prompt gets its own request_id (readable like any other
+    search); prompts rejected by the prompt gate are reported in the batch
+    with their error. Identical prompts are marked with duplicate_of and run
+    once.
+    """
+    admission_slot = 0
+    try:
+        prompts = [prompt.strip() if isinstance(prompt, str) else "" for prompt in request.prompts or []]
+        if not prompts:
+            raise HTTPException(status_code=400, detail="prompts cannot be empty")
+        if len(prompts) > max_batch_prompts():
+            raise HTTPException(status_code=400, detail=f"A batch can contain at most {max_batch_prompts()} prompts")
+        if request.max_candidates and (request.max_candidates < 1 or request.max_candidates > 10):
+            raise HTTPException(status_code=400, detail="max_candidates must be between 1 and 10")
+        
+        user_first_name = extract_user_first_name_from_context()
+        items = []
+        for index, (prompt, duplicate_of) in enumerate(zip(prompts, dedupe_prompts(prompts))):
+            item = {"index": index, "prompt": prompt, "request_id": None, "duplicate_of": duplicate_of, "error": None}
+            parsed_prompt = parse_prompt(prompt, user_first_name) if prompt else None
+            if parsed_prompt is None:
+                item["error"] = "Prompt cannot be empty"
+            elif parsed_prompt.rejected:
+                item["error"] = parsed_prompt.rejection_message
+            else:
+                item["request_id"] = str(uuid.uuid4())
+                item["parsed_prompt"] = parsed_prompt.to_dict()
+            items.append(item)
+        accepted = [item for item in items if item["request_id"]]
+        if not accepted:
+            raise HTTPException(status_code=400, detail={
+                "message": "None of the prompts in the batch can be searched",
+                "items": [_public_batch_item(item) for item in items]
+            })
+        
+        # One token and one in-flight slot per distinct search the batch will run
+        distinct_searches = sum(1 for item in accepted if item["duplicate_of"] is None)
+        client = client_key(http_request.headers, http_request.client.host if http_request.client else None)
+        try:
+            admission_slot = await admission.acquire(client, cost=distinct_searches)
+        except AdmissionRejected as e:
+            logger.info("[Admission] Rejected batch from %s: %s", client, e.reason)
+            if e.reason == "too_large":
+                raise HTTPException(status_code=400, detail=str(e))
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        
+        search_queue = get_search_queue()
+        queue_depth = await run_blocking(search_queue.depth, pool="db")
+        if search_queue.max_depth > 0 and queue_depth >= search_queue.max_depth:
+            raise HTTPException(
+                status_code=503,
+                detail="Search capacity is temporarily exhausted. Please retry shortly.",
+                headers={"Retry-After": "30"}
+            )
+        
+        batch_id = str(uuid.uuid4())
+        created_at = datetime.now(timezone.utc).isoformat()
+        children = [{
+            "request_id": item["request_id"],
+            "status": "processing",
+            "prompt": item["prompt"],
+            "filters": encode_column({}),
+            "created_at": created_at,
+            "completed_at": None
+        } for item in accepted]
+        stored = await asyncio.gather(*(run_blocking(store_search_to_database, child, pool="db") for child in children))
+        if not all(stored):
+            raise HTTPException(status_code=500, detail="Failed to store batch searches in database")
+        
+        batch_data = {
+            "batch_id": batch_id,
+            "status": "processing",
+            "max_candidates": request.max_candidates or 3,
+            "items": [_public_batch_item(item) for item in items],
+            "timings": {},
+            "created_at": created_at,
+            "completed_at": None
+        }
+        if not await run_blocking(store_batch_to_database, batch_data, pool="db"):
+            raise HTTPException(status_code=500, detail="Failed to store batch in database")
+        
+        job_payload = {
+            "batch_id": batch_id,
+            "items": items,
+            "max_candidates": request.max_candidates or 3,
+            "include_linkedin": request.include_linkedin if request.include_linkedin is not None else True,
+            "force_refresh": bool(request.force_refresh)
+        }
+        try:
+            await run_blocking(
+                search_queue.enqueue, batch_id, job_payload,
+                priority=max(0, min(10, request.priority or 0)), weight=distinct_searches, pool="db"
+            )
+        except QueueFullError as e:
+            completed_at = datetime.now(timezone.utc).isoformat()
+            for child in children:
+                child.update(status="failed", error=str(e), completed_at=completed_at)
+            await asyncio.gather(*(run_blocking(store_search_to_database, child, pool="db") for child in children))
+            batch_data.update(status="failed", error=str(e), completed_at=completed_at)
+            await run_blocking(store_batch_to_database, batch_data, pool="db")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+        for item in accepted:
+            publish_search_event(item["request_id"], "queued", prompt=item["prompt"], batch_id=batch_id)
+        
+        _, counts = summarize_batch(items, {})
+        return {
+            "batch_id": batch_id,
+            "status": "processing",
+            "created_at": created_at,
+            "completed_at": None,
+            "counts": counts,
+            "items": [_public_batch_item(item) for item in items]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating batch: {str(e)}")
+    finally:
+        admission.release(admission_slot)
+
+@app.get("/api/search/batch/{batch_id}")
+async def get_search_batch(batch_id: str, results: bool = False):
+    """
+    Batch status with one entry per prompt.
+    
+    Child statuses are read in one query. results=true also includes each
+    completed search's candidates, as returned by GET /api/search/{request_id}.
+    """
+    batch = await run_blocking(get_batch_from_database, batch_id, pool="db")
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    items = batch.get("items") or []
+    request_ids = [item["request_id"] for item in items if item.get("request_id")]
+    statuses = await run_blocking(get_search_statuses_from_database, request_ids, pool="db")
+    status, counts = summarize_batch(items, statuses)
+    if batch.get("status") == "failed":
+        status = "failed"
+    
+    response_items = []
+    for item in items:
+        child = statuses.get(item.get("request_id")) or {}
+        response_items.append({
+            **item,
+            "status": child.get("status") or ("processing" if item.get("request_id") else "failed"),
+            "error": child.get("error") or item.get("error"),
+            "estimated_count": child.get("estimated_count"),
+            "completed_at": child.get("completed_at"),
+        })
+    if results:
+        completed = [item for item in response_items if item["status"] == "completed"]
+        loaded = await asyncio.gather(*(_load_search_result(item["request_id"]) for item in completed), return_exceptions=True)
+        for item, result in zip(completed, loaded):
+            item["candidates"] = [] if isinstance(result, Exception) else result.get("candidates", [])
+    
+    return FastJSONResponse({
+        "batch_id": batch_id,
+        "status": status,
+        "created_at": batch.get("created_at"),
+        "completed_at": batch.get("completed_at"),
+        "error": batch.get("error"),
+        "counts": counts,
+        "timings": batch.get("timings") or {},
+        "items": response_items
+    })
+
+def _parse_fields(fields: Optional[str], allowed: set) -> Optional[List[str]]:
+    """Split a comma separated fields= parameter, rejecting unknown columns with a 400."""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    try:
+        build_select(requested, allowed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return requested or None
+
+def _search_status_response(search_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Minimal payload for pollers: status and completion flags, no candidates."""
+    status = search_data.get("status")
+    if status not in SEARCH_STATUSES:
+        if search_data.get("error"):
+            status = "failed"
+        elif search_data.get("completed_at"):
+            status = "completed"
+        else:
+            status = "processing"
+    processing_complete = status in TERMINAL_SEARCH_STATUSES
+    return {
+        "request_id": search_data.get("request_id"),
+        "status": status,
+        "processing_status": status,
+        "processing_complete": processing_complete,
+        "estimated_count": search_data.get("estimated_count"),
+        "error": search_data.get("error"),
+        "created_at": search_data.get("created_at"),
+        "completed_at": search_data.get("completed_at"),
+    }
 
 @app.get("/api/search/{request_id}")
-async def get_search_result(request_id: str):
+async def get_search_result(request_id: str, fields: Optional[str] = None,
+                            candidate_fields: Optional[str] = None, view: str = "full"):
+    """
+    Return a search and its candidates.
+    
+    Query parameters:
+        view=status        status-only payload for pollers (no candidate query)
+        fields=a,b         search columns to return
+        candidate_fields=  candidate columns to return
+    """
+    # Returned directly so the payload is encoded once by the codec, without jsonable_encoder
+    return FastJSONResponse(await _load_search_result(request_id, fields, candidate_fields, view))
+
+async def _load_search_result(request_id: str, fields: Optional[str] = None,
+                              candidate_fields: Optional[str] = None, view: str = "full") -> Dict[str, Any]:
+    """The search and its candidates as returned by GET /api/search/{request_id}."""
     try:
         if not request_id or not isinstance(request_id, str):
             raise HTTPException(status_code=400, detail="Invalid request_id")
         
-        search_data = get_search_from_database(request_id)
+        if view == "status":
+            status_data = await run_blocking(get_search_status_from_database, request_id, pool="db")
+            if not status_data:
+                raise HTTPException(status_code=404, detail="Search not found")
+            return _search_status_response(status_data)
+        if view != "full":
+            raise HTTPException(status_code=400, detail="view must be 'full' or 'status'")
+        
+        search_fields = _parse_fields(fields, SEARCH_FIELDS)
+        people_fields = _parse_fields(candidate_fields, PEOPLE_FIELDS)
+        
+        search_data = await run_blocking(get_search_from_database, request_id, search_fields, pool="db")
         
         if not search_data:
             raise HTTPException(status_code=404, detail="Search not found")
@@ -1929,42 +2740,20 @@ async def get_search_result(request_id: str):
             raise HTTPException(status_code=500, detail="Invalid search data format")
         
         if "filters" in search_data and isinstance(search_data["filters"], str):
-            try:
-                search_data["filters"] = json.loads(search_data["filters"])
-            except json.JSONDecodeError:
-                search_data["filters"] = {}
+            search_data["filters"] = decode_column(search_data["filters"], {})
         
         search_db_id = search_data.get("id")
         if search_db_id:
-            candidates = get_people_for_search(search_db_id)
+            candidates = await run_blocking(get_people_for_search, search_db_id, people_fields, pool="db")
             if candidates and isinstance(candidates, list):
                 processed_candidates = []
                 
                 for candidate in candidates:
                     if isinstance(candidate, dict):
-                        processed_candidate = {
-                            "id": candidate.get("id"),
-                            "name": candidate.get("name"),
-                            "title": candidate.get("title"),
-                            "email": candidate.get("email"),
-                            "location": candidate.get("location"),
-                            "company": candidate.get("company"),
-                            "linkedin_url": candidate.get("linkedin_url"), 
-                            "profile_photo_url": candidate.get("profile_photo_url"),
-                            "accuracy": candidate.get("accuracy"),
-                            "reasons": candidate.get("reasons"),
-                            "linkedin_profile": candidate.get("linkedin_profile"),
-                            "behavioral_data": candidate.get("behavioral_data"),
-                            # Evidence URLs and related data
-                            "evidence_urls": candidate.get("evidence_urls", []),
-                            "evidence_summary": candidate.get("evidence_summary", "No supporting evidence URLs found"),
-                            "evidence_confidence": candidate.get("evidence_confidence", 0.0),
-                            # New avatar data for initials fallback
-                            "avatar": candidate.get("avatar"),
-                            # Backward compatibility - photo_url field
-                            "photo_url": candidate.get("photo_url")
-                        }
-                        processed_candidates.append(processed_candidate)
+                        formatted = format_candidate_for_response(candidate)
+                        if people_fields:
+                            formatted = {k: v for k, v in formatted.items() if k == "id" or k in people_fields}
+                        processed_candidates.append(formatted)
                 
                 search_data["candidates"] = processed_candidates
                 search_data["status"] = "completed"
@@ -1976,11 +2765,9 @@ async def get_search_result(request_id: str):
             if isinstance(search_data["result_estimation"], dict):
                 search_data["estimated_count"] = search_data["result_estimation"].get("estimated_count")
             elif isinstance(search_data["result_estimation"], str):
-                try:
-                    result_est = json.loads(search_data["result_estimation"])
+                result_est = decode_column(search_data["result_estimation"])
+                if isinstance(result_est, dict):
                     search_data["estimated_count"] = result_est.get("estimated_count")
-                except json.JSONDecodeError:
-                    pass
         
         # Ensure all required fields are present for backward compatibility
         if "estimated_count" not in search_data:
@@ -1989,9 +2776,11 @@ async def get_search_result(request_id: str):
             search_data["error"] = None
         if "result_estimation" not in search_data:
             search_data["result_estimation"] = None
+        if "cached" not in search_data:
+            search_data["cached"] = False
         
         # Ensure status is valid
-        if "status" not in search_data or search_data["status"] not in ["processing", "completed", "failed"]:
+        if "status" not in search_data or search_data["status"] not in SEARCH_STATUSES:
             # Determine status based on other fields
             if search_data.get("error"):
                 search_data["status"] = "failed"
@@ -2001,7 +2790,7 @@ async def get_search_result(request_id: str):
                 search_data["status"] = "processing"
         
         # Add processing completion flags for frontend
-        search_data["processing_complete"] = search_data["status"] in ["completed", "failed"]
+        search_data["processing_complete"] = search_data["status"] in TERMINAL_SEARCH_STATUSES
         search_data["processing_status"] = search_data["status"]
         
         # Add completion timestamp if processing is complete
@@ -2015,27 +2804,177 @@ async def get_search_result(request_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting search result: {str(e)}")
 
+@app.get("/api/search/{request_id}/events")
+async def stream_search_events(request_id: str, request: Request):
+    """
+    Stream search progress as Server-Sent Events.
+
+    Emits stage transitions (queued, started, filters_parsed, people_fetched,
+    candidate_scored, evidence_attached), one "candidate" event per finalized
+    candidate, and a terminal "completed" or "failed" event. Searches that
+    already finished are answered with a single "snapshot" event.
+    """
+    search_data = await run_blocking(get_search_from_database, request_id, pool="db")
+    if not search_data:
+        raise HTTPException(status_code=404, detail="Search not found")
+
+    try:
+        last_event_id = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        last_event_id = 0
+    keepalive_seconds = float(os.getenv("SEARCH_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+    async def snapshot_frame() -> str:
+        result = await _load_search_result(request_id)
+        return f"event: snapshot\ndata: {json_dumps(result)}\n\n"
+
+    async def event_stream():
+        has_live_events = bool(search_event_bus.history(request_id))
+        if search_data.get("status") in TERMINAL_SEARCH_STATUSES and not has_live_events:
+            yield await snapshot_frame()
+            return
+
+        async for event in search_event_bus.subscribe(request_id, after_sequence=last_event_id, timeout=keepalive_seconds):
+            if await request.is_disconnected():
+                return
+            if event is not None:
+                yield event.to_sse()
+                continue
+            # No events for a while: the search may be running on an external worker,
+            # so fall back to a single status check before the next keep-alive
+            current = await run_blocking(get_search_from_database, request_id, pool="db")
+            if current and current.get("status") in TERMINAL_SEARCH_STATUSES:
+                yield await snapshot_frame()
+                return
+            yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/search")
-async def list_searches():
+async def list_searches(limit: int = 10, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """
+    List searches newest first with keyset pagination.
+    
+    Pass the returned next_cursor back as cursor= to fetch the next page;
+    fields= limits the columns returned for each search.
+    """
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    search_fields = _parse_fields(fields, SEARCH_FIELDS)
     try:
-        searches = get_recent_searches_from_database()
-        return {"searches": searches}
+        searches, next_cursor = await run_blocking(get_searches_page, limit, cursor, search_fields, pool="db")
+        return FastJSONResponse({"searches": searches, "next_cursor": next_cursor, "has_more": next_cursor is not None})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing searches: {str(e)}")
 
+# How long cancel/delete wait for a running search to unwind before answering
+CANCEL_WAIT_SECONDS = 5.0
+
+async def _cancel_running_search(request_id: str) -> bool:
+    """
+    Stop a search wherever it is: queued, running in this process or in a worker.
+
+    Returns True when the search was running in this process (it has unwound,
+    or CANCEL_WAIT_SECONDS passed, by the time this returns).
+    """
+    try:
+        await run_blocking(get_search_queue().cancel, request_id, pool="db")
+    except Exception as e:
+        logger.warning("[Search Tasks] Failed to cancel queued job for %s: %s", request_id, e)
+    task = search_tasks.cancel(request_id)
+    if task is None:
+        return False
+    await asyncio.wait({task}, timeout=CANCEL_WAIT_SECONDS)
+    return True
+
+@app.post("/api/search/{request_id}/cancel")
+async def cancel_search(request_id: str):
+    """Cancel a queued or running search; its status becomes "cancelled"."""
+    search_data = await run_blocking(get_search_status_from_database, request_id, pool="db")
+    if not search_data:
+        raise HTTPException(status_code=404, detail="Search not found")
+    if search_data.get("status") in TERMINAL_SEARCH_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Search already {search_data.get('status')}")
+
+    was_running = await _cancel_running_search(request_id)
+    if not was_running:
+        # Queued, or running in another process: record the status here, the
+        # worker that owns it stops at its next cancellation check
+        await _record_cancelled_search(request_id)
+    return {"request_id": request_id, "status": "cancelled", "was_running": was_running}
+
 @app.delete("/api/search/{request_id}")
 async def delete_search(request_id: str):
     try:
         if not request_id or not isinstance(request_id, str):
             raise HTTPException(status_code=400, detail="Invalid request_id")
-            
-        delete_search_from_database(request_id)
+
+        # Stop the search first so it cannot write its results back after the delete
+        await _cancel_running_search(request_id)
+        await run_blocking(delete_search_from_database, request_id, pool="db")
         return {"message": "Search request deleted from database"}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting search: {str(e)}")
 
+@app.get("/api/system/pipeline/stats")
+async def pipeline_stats():
+    """Queue depth, wait time and in-flight counts for the search pipeline."""
+    try:
+        queue_stats = await run_blocking(get_search_queue().stats, pool="db")
+    except Exception as e:
+        queue_stats = {"error": str(e)}
+    return {
+        "queue_mode": get_queue_mode(),
+        "queue": queue_stats,
+        "embedded_worker": _embedded_worker.stats() if _embedded_worker is not None else None,
+        "executors": get_executor_stats(),
+        "events": search_event_bus.stats(),
+        "result_cache": search_result_cache.stats(),
+        "caches": cache_stats(),
+        "demo_pool": demo_generator.stats(),
+        "health": health_monitor.stats(),
+        "json": codec_stats(),
+        "services": dict(client_stats(), warmup=_warmup_report),
+        "admission": admission.stats(),
+        "idempotency": idempotency.stats(),
+        "single_flight": single_flight_stats(),
+        "search_tasks": search_tasks.stats(),
+        "fetch_yield": yield_model.stats(),
+        "logging": logging_stats(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+EXECUTOR_QUEUED = metrics_registry.gauge(
+    "knowledge_gpt_executor_queued", "Blocking calls waiting for a thread, by pool", ["pool"])
+SEARCH_QUEUE_DEPTH = metrics_registry.gauge(
+    "knowledge_gpt_search_queue_depth", "Search jobs waiting in the queue")
+SEARCH_QUEUE_IN_FLIGHT = metrics_registry.gauge(
+    "knowledge_gpt_search_queue_in_flight", "Search jobs leased by workers")
+
+def _collect_pipeline_gauges() -> None:
+    """Copy executor and queue depths into gauges at scrape time."""
+    for pool, pool_stats in get_executor_stats()["pools"].items():
+        EXECUTOR_QUEUED.set(pool_stats["queued"], pool=pool)
+    queue_stats = get_search_queue().stats()
+    SEARCH_QUEUE_DEPTH.set(queue_stats.get("depth", 0))
+    SEARCH_QUEUE_IN_FLIGHT.set(queue_stats.get("in_flight", 0))
+
+metrics_registry.register_collector(_collect_pipeline_gauges)
+
+@app.get("/api/system/metrics")
+async def system_metrics():
+    """Counters, gauges and latency histograms in Prometheus text format."""
+    body = await run_blocking(metrics_registry.render, pool="db")
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Prismatic Integration Diagnostic Models
 class PrismaticDiagnosticResult(BaseModel):
     timestamp: str
@@ -2069,42 +3008,51 @@ class PrismaticConfigValidator:
             "response_times": {}
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            for endpoint in webhook_endpoints:
+        async def check(client: httpx.AsyncClient, endpoint: str) -> tuple:
+            try:
+                url = f"{self.base_url}{endpoint}"
+                start_time = time.time()
+                
+                # Test GET endpoints
+                if 'health' in endpoint or 'debug' in endpoint:
+                    response = await client.get(url)
+                else:
+                    # Test POST endpoints with minimal data
+                    response = await client.post(url, json={})
+                
+                response_time = (time.time() - start_time) * 1000  # Convert to ms
+                
+                # Try to parse response
+                response_data = None
                 try:
-                    url = f"{self.base_url}{endpoint}"
-                    start_time = time.time()
-                    
-                    # Test GET endpoints
-                    if 'health' in endpoint or 'debug' in endpoint:
-                        response = await client.get(url)
-                    else:
-                        # Test POST endpoints with minimal data
-                        response = await client.post(url, json={})
-                    
-                    response_time = (time.time() - start_time) * 1000  # Convert to ms
-                    results["response_times"][endpoint] = round(response_time, 2)
-                    
-                    # Try to parse response
-                    response_data = None
-                    try:
-                        response_data = response.json()
-                    except:
-                        response_data = response.text[:100] if response.text else None
-                    
-                    results["accessible_endpoints"].append({
-                        "endpoint": endpoint,
-                        "status_code": response.status_code,
-                        "accessible": True,
-                        "response_time_ms": round(response_time, 2),
-                        "response_preview": response_data
-                    })
-                except Exception as e:
-                    results["failed_endpoints"].append({
-                        "endpoint": endpoint,
-                        "error": str(e),
-                        "accessible": False
-                    })
+                    response_data = response.json()
+                except:
+                    response_data = response.text[:100] if response.text else None
+                
+                return endpoint, response_time, {
+                    "endpoint": endpoint,
+                    "status_code": response.status_code,
+                    "accessible": True,
+                    "response_time_ms": round(response_time, 2),
+                    "response_preview": response_data
+                }
+            except Exception as e:
+                return endpoint, None, {
+                    "endpoint": endpoint,
+                    "error": str(e),
+                    "accessible": False
+                }
+        
+        # Check all endpoints at once; results keep the order above
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            checks = await asyncio.gather(*(check(client, endpoint) for endpoint in webhook_endpoints))
+        
+        for endpoint, response_time, outcome in checks:
+            if outcome["accessible"]:
+                results["response_times"][endpoint] = round(response_time, 2)
+                results["accessible_endpoints"].append(outcome)
+            else:
+                results["failed_endpoints"].append(outcome)
         
         return results
     
@@ -2142,8 +3090,8 @@ class PrismaticConfigValidator:
         
         return auth_test_result
     
-    async def validate_triggers(self) -> Dict[str, Any]:
-        """Check trigger conditions and events"""
+    async def validate_triggers(self, webhook_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Check trigger conditions and events (reuses webhook_results when given)"""
         trigger_validation = {
             "oauth_flow_configured": True,
             "webhook_triggers_available": True,
@@ -2158,7 +3106,8 @@ class PrismaticConfigValidator:
             '/api/hubspot/oauth/health'
         ]
         
-        webhook_results = await self.validate_webhook_urls()
+        if webhook_results is None:
+            webhook_results = await self.validate_webhook_urls()
         accessible_paths = [ep["endpoint"] for ep in webhook_results["accessible_endpoints"]]
         
         for endpoint in required_endpoints:
@@ -2206,16 +3155,24 @@ class PrismaticConfigValidator:
         
         return connectivity_test
 
+prismatic_validator = PrismaticConfigValidator()
+
 @app.get("/api/system/prismatic/diagnostics")
-async def prismatic_diagnostics():
-    """Comprehensive Prismatic integration diagnostics"""
+async def prismatic_diagnostics(refresh: bool = False):
+    """
+    Comprehensive Prismatic integration diagnostics
+    
+    Served from the cached health snapshot; pass ?refresh=true to probe live
+    (rate-limited).
+    """
     try:
-        validator = PrismaticConfigValidator()
+        validator = prismatic_validator
         
-        # Run all diagnostic checks
-        webhook_validation = await validator.validate_webhook_urls()
-        auth_validation = await validator.validate_auth_config()
-        trigger_validation = await validator.validate_triggers()
+        # Webhook and auth checks come from the health snapshot
+        probes = await _health_probe_results(refresh)
+        webhook_validation = probes["webhook_validation"]
+        auth_validation = probes["auth_validation"]
+        trigger_validation = await validator.validate_triggers(webhook_validation)
         
         # Check API health
         api_health = {
@@ -2390,18 +3347,44 @@ async def deployment_sync_check():
             detail=f"Deployment sync check failed: {str(e)}"
         )
 
+# Outbound health probes run together in the background; endpoints read the snapshot
+health_monitor = HealthMonitor({
+    "prismatic_connectivity": prismatic_validator.test_prismatic_connectivity,
+    "webhook_validation": prismatic_validator.validate_webhook_urls,
+    "auth_validation": prismatic_validator.validate_auth_config,
+    "deployment_sync": deployment_sync_check,
+})
+
+async def _health_probe_results(refresh: bool = False) -> Dict[str, Any]:
+    """Probe results from the health snapshot, raising if any probe failed."""
+    snapshot = await health_monitor.get_snapshot(refresh=refresh)
+    failed = [probe for probe in snapshot["results"].values() if not probe.ok]
+    if failed:
+        raise RuntimeError("; ".join(f"{probe.name} probe failed: {probe.error}" for probe in failed))
+    results = {name: probe.result for name, probe in snapshot["results"].items()}
+    results["_snapshot"] = {
+        "checked_at": snapshot["checked_at"],
+        "age_seconds": snapshot["age_seconds"],
+        "refresh_rate_limited": snapshot["refresh_rate_limited"],
+        "probe_durations_ms": {name: probe.duration_ms for name, probe in snapshot["results"].items()},
+    }
+    return results
+
 @app.get("/api/system/health/comprehensive")
-async def comprehensive_health_check():
-    """Comprehensive system health including Prismatic integration"""
+async def comprehensive_health_check(refresh: bool = False):
+    """
+    Comprehensive system health including Prismatic integration
+    
+    Returns the last background snapshot instantly; pass ?refresh=true to
+    probe live (rate-limited by HEALTH_MIN_REFRESH_SECONDS).
+    """
     try:
-        # Get Prismatic diagnostics
-        validator = PrismaticConfigValidator()
-        prismatic_connectivity = await validator.test_prismatic_connectivity()
-        webhook_validation = await validator.validate_webhook_urls()
-        auth_validation = await validator.validate_auth_config()
-        
-        # Get deployment sync status
-        sync_check_response = await deployment_sync_check()
+        # Get Prismatic diagnostics and deployment sync status
+        probes = await _health_probe_results(refresh)
+        prismatic_connectivity = probes["prismatic_connectivity"]
+        webhook_validation = probes["webhook_validation"]
+        auth_validation = probes["auth_validation"]
+        sync_check_response = probes["deployment_sync"]
         
         # API endpoint health summary
         api_health = {
@@ -2461,6 +3444,7 @@ async def comprehensive_health_check():
         
         return {
             "timestamp": datetime.now().isoformat(),
+            "snapshot": probes["_snapshot"],
             "overall_status": "healthy" if len(critical_issues) == 0 else "degraded" if len(critical_issues) < 3 else "unhealthy",
             "readiness_score": round(overall_readiness, 1),
             "api_health": api_health,
@@ -2,30 +2,47 @@ import requests
 import json
 import asyncio
 import httpx
+from typing import Optional
 from prompt_formatting import INTERNAL_DATABASE_API_KEY
+from database import get_exclusion_index
+from candidate_index import CandidateIndex
+from blocking_executor import run_blocking
+from single_flight import get_single_flight
+from metrics import EXTERNAL_API_SECONDS
+from geo_matcher import us_person_locations
+from deadline import Deadline
+from structured_logging import get_logger
 
-async def search_people_via_internal_database(filters: dict, page: int = 1, per_page: int = 5) -> list:
+logger = get_logger(__name__)
+
+# Concurrent searches often enrich the same Apollo person; fetch each one once
+enrichment_flight = get_single_flight("apollo_enrichment")
+
+# One enrichment request plus the pause between requests
+MIN_ENRICHMENT_SECONDS = 1.5
+
+async def search_people_via_internal_database(filters: dict, page: int = 1, per_page: int = 5, deadline: Optional[Deadline] = None) -> list:
     """
     Search our internal database for people matching the filters, then enrich each person and only return those with a LinkedIn URL.
     Handles enrichment errors gracefully and logs skipped people.
     
     This is an async function that returns a list of enriched people.
+    
+    With a deadline, request timeouts are capped by the time left and
+    enrichment stops early, returning the people enriched so far, once the
+    deadline is nearly spent.
     """
     if not INTERNAL_DATABASE_API_KEY:
-        print("⚠️  Our internal database API key not found. Cannot search for people.")
+        logger.warning("⚠️  Our internal database API key not found. Cannot search for people.")
         return []
     
     payload = {}
     payload.update(filters.get("organization_filters", {}))
     payload.update(filters.get("person_filters", {}))
     
-    # Add US location filter to limit results to United States
-    if "person_locations" not in payload:
-        payload["person_locations"] = ["United States"]
-    else:
-        # Add United States to existing locations if not already there
-        if "United States" not in payload["person_locations"]:
-            payload["person_locations"].append("United States")
+    # Limit results to the United States. Apollo ORs person_locations, so
+    # appending "United States" to a state would widen it to the whole country
+    payload["person_locations"] = us_person_locations(payload.get("person_locations"))
     
     payload["page"] = page
     payload["per_page"] = per_page
@@ -34,41 +51,47 @@ async def search_people_via_internal_database(filters: dict, page: int = 1, per_
         "x-api-key": INTERNAL_DATABASE_API_KEY
     }
 
-    # Debug: Print the payload being sent
-    print(f"[Apollo API] Sending payload: {json.dumps(payload, indent=2)}")
-    print(f"[Apollo API] Note: These broad filters should return thousands of executives, but we're requesting per_page={per_page}")
+    logger.debug("[Apollo API] Sending search request", payload=payload, per_page=per_page)
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                "https://api.apollo.io/api/v1/mixed_people/search", 
-                json=payload, 
-                headers=headers
-            )
-            response.raise_for_status()
+        async with httpx.AsyncClient(timeout=deadline.timeout(cap=30) if deadline else 30) as client:
+            with EXTERNAL_API_SECONDS.time(service="apollo", endpoint="people_search"):
+                response = await client.post(
+                    "https://api.apollo.io/api/v1/mixed_people/search", 
+                    json=payload, 
+                    headers=headers
+                )
+                response.raise_for_status()
             data = response.json()
             
             # Debug: Print response metadata to understand limitations
             total_people = data.get("pagination", {}).get("total_entries", "unknown")
             page_info = data.get("pagination", {})
-            print(f"[Apollo API] Response metadata: total_entries={total_people}, pagination={page_info}")
+            logger.debug("[Apollo API] Response metadata", total_entries=total_people, pagination=page_info)
             
     except Exception as e:
-        print(f"⚠️  Apollo API request failed: {e}")
+        logger.warning("⚠️  Apollo API request failed: %s", e)
         if hasattr(e, 'response') and e.response:
-            print(f"[Apollo API] Response status: {e.response.status_code}")
-            print(f"[Apollo API] Response body: {e.response.text}")
+            logger.warning("[Apollo API] Error response", status=e.response.status_code, body=e.response.text[:500])
         return []
 
     people = data.get("people", [])
-    print(f"[Apollo API] Received {len(people)} people from search (out of {data.get('pagination', {}).get('total_entries', 'unknown')} total available)")
-    enriched = []
+    logger.info("[Apollo API] Received %s people from search (out of %s total available)", len(people), data.get('pagination', {}).get('total_entries', 'unknown'), page=page)
+    enriched = CandidateIndex()
+    excluded = await run_blocking(get_exclusion_index, pool="db")
     
     async with httpx.AsyncClient(timeout=10) as client:
         for person in people:
+            if deadline is not None and deadline.short(MIN_ENRICHMENT_SECONDS):
+                logger.info("[Internal Database] Page budget spent; returning %s enriched people early", len(enriched), page=page)
+                break
             person_id = person.get("id")
             if not person_id:
                 continue
+            if person.get("linkedin_url") and person in excluded:
+                # Known from the search result already; skip the enrichment credit
+                logger.debug("[Internal Database] Skipped (excluded): %s", person.get('name', 'Unknown'))
+                continue
                 
             # Enrich via our internal database People Enrichment endpoint
             enrich_params = {
@@ -77,14 +100,19 @@ async def search_people_via_internal_database(filters: dict, page: int = 1, per_
                 "reveal_phone_number": False
             }
             
+            async def fetch_enrichment():
+                with EXTERNAL_API_SECONDS.time(service="apollo", endpoint="people_match"):
+                    enrich_response = await client.post(
+                        "https://api.apollo.io/api/v1/people/match",
+                        params=enrich_params,
+                        headers=headers,
+                        timeout=deadline.timeout(cap=10) if deadline else httpx.USE_CLIENT_DEFAULT
+                    )
+                    enrich_response.raise_for_status()
+                return enrich_response.json().get("person", {})
+
             try:
-                enrich_response = await client.post(
-                    "https://api.apollo.io/api/v1/people/match",
-                    params=enrich_params,
-                    headers=headers
-                )
-                enrich_response.raise_for_status()
-                enriched_person = enrich_response.json().get("person", {})
+                enriched_person = await enrichment_flight.do(person_id, fetch_enrichment)
                 # --- Merge logic: preserve best value for each field ---
                 merged_person = person.copy()
                 for k, v in enriched_person.items():
@@ -104,18 +132,18 @@ async def search_people_via_internal_database(filters: dict, page: int = 1, per_
                 # Add profile photo URL to enriched person data
                 if profile_photo_url:
                     enriched_person["profile_photo_url"] = profile_photo_url
-                    print(f"[Internal Database] Found profile photo: {profile_photo_url}")
+                    logger.debug("[Internal Database] Found profile photo: %s", profile_photo_url)
                 
                 # Extract company name from organization data
                 if "organization" in enriched_person and enriched_person["organization"]:
                     org = enriched_person["organization"]
                     if isinstance(org, dict) and org.get("name"):
                         enriched_person["company"] = org["name"]
-                        print(f"[Internal Database] Found company: {org['name']}")
+                        logger.debug("[Internal Database] Found company: %s", org['name'])
                     elif isinstance(org, str):
                         # Sometimes organization is just a string
                         enriched_person["company"] = org
-                        print(f"[Internal Database] Found company (string): {org}")
+                        logger.debug("[Internal Database] Found company (string): %s", org)
                 
                 # Ensure linkedin_url is properly formatted
                 linkedin_url = enriched_person.get("linkedin_url")
@@ -124,21 +152,21 @@ async def search_people_via_internal_database(filters: dict, page: int = 1, per_
                     enriched_person["linkedin_url"] = f"https://{linkedin_url}"
                 
                 # Check if this person is in the exclusion list
-                from database import is_person_excluded_in_database
-                
                 if enriched_person.get("linkedin_url"):
                     # Skip if this person is in the exclusion database
-                    if is_person_excluded_in_database(enriched_person.get("linkedin_url")):
-                        print(f"[Internal Database] Skipped (excluded): {enriched_person.get('name', 'Unknown')}")
+                    if enriched_person in excluded:
+                        logger.debug("[Internal Database] Skipped (excluded): %s", enriched_person.get('name', 'Unknown'))
+                        continue
+                    if not enriched.add(enriched_person):
+                        logger.debug("[Internal Database] Skipped (duplicate): %s", enriched_person.get('name', 'Unknown'))
                         continue
-                        
-                    enriched.append(enriched_person)
+
                     company_name = enriched_person.get("company", "Unknown Company")
-                    print(f"[Internal Database] Enriched and kept: {enriched_person.get('name', 'Unknown')} at {company_name} ({enriched_person.get('linkedin_url')}) - Photo: {'Yes' if profile_photo_url else 'No'}")
+                    logger.debug("[Internal Database] Enriched and kept: %s at %s (%s) - Photo: %s", enriched_person.get('name', 'Unknown'), company_name, enriched_person.get('linkedin_url'), 'Yes' if profile_photo_url else 'No')
                 else:
-                    print(f"[Internal Database] Skipped (no LinkedIn): {enriched_person.get('name', 'Unknown')}")
+                    logger.debug("[Internal Database] Skipped (no LinkedIn): %s", enriched_person.get('name', 'Unknown'))
             except Exception as e:
-                print(f"[Internal Database] Enrichment failed for person ID {person_id}: {e}")
+                logger.warning("[Internal Database] Enrichment failed for person ID %s: %s", person_id, e)
                 continue
                 
             # Add a small delay between requests to avoid rate limiting
@@ -147,8 +175,8 @@ async def search_people_via_internal_database(filters: dict, page: int = 1, per_
             if len(enriched) >= per_page:
                 break
                 
-    print(f"[Internal Database] Returning {len(enriched)} enriched people with LinkedIn URLs.")
-    return enriched
+    logger.info("[Internal Database] Returning %s enriched people with LinkedIn URLs.", len(enriched))
+    return enriched.people()
 
 # Synchronous version for backward compatibility
 def search_people_via_internal_database_sync(filters: dict, page: int = 1, per_page: int = 5) -> list:
@@ -20,16 +20,16 @@ Usage:
 """
 
 import json
-import logging
 import random
 from datetime import datetime, timedelta
 from openai_utils import call_openai_for_json, call_openai
+from behavioral_metrics_ai import analyze_search_context
+from structured_logging import get_logger
 from typing import List, Dict, Any, Tuple, Optional
 import requests
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 def generate_random_time_reference() -> str:
     """
@@ -269,10 +269,15 @@ Additional context:
     
     return system_prompt, user_prompt
 
-def select_top_candidates(user_prompt: str, people: list, behavioral_data: dict = None, industry_context: str = None) -> list:
+def select_top_candidates(user_prompt: str, people: list, behavioral_data: dict = None, industry_context: str = None, use_llm: bool = True) -> list:
     """
     Enhanced function to rank and explain top candidates with realistic behavioral data.
+    
+    use_llm=False skips the model and returns the heuristic fallback ranking,
+    for searches that are running out of time.
     """
+    if not use_llm:
+        return _fallback_assessment(people, user_prompt, industry_context)
     # Optimize token usage by limiting candidates and extracting only necessary fields
     max_candidates = min(5, len(people))  # Limit to 5 candidates maximum (increased from 3)
     limited_people = people[:max_candidates]
@@ -299,7 +304,8 @@ def select_top_candidates(user_prompt: str, people: list, behavioral_data: dict
         system_message=system_prompt,
         model="gpt-3.5-turbo",  # Upgraded from gpt-3.5-turbo
         temperature=0.7,
-        max_tokens=1000  # Increased for more detailed responses
+        max_tokens=1000,  # Increased for more detailed responses
+        purpose="assessment"
     )
     if response:
         try:
@@ -312,16 +318,16 @@ def select_top_candidates(user_prompt: str, people: list, behavioral_data: dict
                 if validated_result:
                     return validated_result
                 else:
-                    print("[Assessment] Response validation failed, using fallback logic")
+                    logger.warning("[Assessment] Response validation failed, using fallback logic")
                     return _fallback_assessment(people, user_prompt, industry_context)
             else:
-                print("[Assessment] Response is not a list or is empty, using fallback logic")
+                logger.warning("[Assessment] Response is not a list or is empty, using fallback logic")
                 return _fallback_assessment(people, user_prompt, industry_context)
         except json.JSONDecodeError as e:
-            print(f"[Assessment] Failed to parse JSON response: {e}")
-            print(f"[Assessment] Raw response: {response}")
+            logger.warning("[Assessment] Failed to parse JSON response: %s", e)
+            logger.debug("[Assessment] Raw response: %s", response)
             return _fallback_assessment(people, user_prompt, industry_context)
-    print("[Assessment] OpenAI API call failed, using fallback logic")
+    logger.warning("[Assessment] OpenAI API call failed, using fallback logic")
     return _fallback_assessment(people, user_prompt, industry_context)
 
 def _validate_assessment_response(result: list, user_prompt: str) -> list:
@@ -331,7 +337,7 @@ def _validate_assessment_response(result: list, user_prompt: str) -> list:
     """
     # Check if we have at least 1 result
     if not result or not isinstance(result, list):
-        print(f"[Assessment] No valid result list returned.")
+        logger.warning("[Assessment] No valid result list returned.")
         return None
 
     required_fields = ["name", "title", "company", "email", "accuracy", "reasons"]
@@ -1220,9 +1226,6 @@ def _generate_realistic_behavioral_reasons(title: str, user_prompt: str, candida
     Generate realistic behavioral reasons with context-aware activity selection.
     Uses enhanced context analysis to match activities to search intent and candidate role.
     """
-    # Import here to avoid circular imports
-    from behavioral_metrics_ai import analyze_search_context
-    
     # Analyze search context for better activity selection
     context_analysis = analyze_search_context(user_prompt)
     
@@ -1694,26 +1697,6 @@ def _generate_ai_contextual_reasons(title: str, user_prompt: str, candidate_inde
     This provides a fallback for edge cases and specialized use cases.
     """
     try:
-        # Import OpenAI here to avoid dependency issues
-        import os
-        import json
-        from openai import OpenAI
-        
-        # Load API key
-        openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not openai_api_key:
-            try:
-                with open("secrets.json", "r") as f:
-                    secrets = json.load(f)
-                    openai_api_key = secrets.get('openai_api_key', '')
-            except (FileNotFoundError, json.JSONDecodeError):
-                pass
-        
-        if not openai_api_key:
-            return None
-        
-        client = OpenAI(api_key=openai_api_key)
-        
         # Create a context-aware prompt
         system_prompt = f"""You are an expert at generating realistic behavioral reasons for why a professional would be a good match for a specific search.
 
@@ -1757,18 +1740,18 @@ Return ONLY a JSON array of 3 strings, nothing else."""
 
         user_prompt_for_ai = f"Generate 3 specific behavioral reasons for why this {title} would be interested in: {user_prompt}"
         
-        response = client.chat.completions.create(
+        result_text = call_openai(
+            prompt=user_prompt_for_ai,
+            system_message=system_prompt,
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt_for_ai}
-            ],
             temperature=0.7,
-            max_tokens=200
+            max_tokens=200,
+            purpose="contextual_reasons"
         )
+        if not result_text:
+            return None
         
         # Parse the JSON response
-        result_text = response.choices[0].message.content.strip()
         
         # Clean up the response to extract JSON
         if result_text.startswith('```json'):
@@ -1808,7 +1791,7 @@ Return ONLY a JSON array of 3 strings, nothing else."""
         return None
         
     except Exception as e:
-        print(f"[AI Fallback] Failed to generate contextual reasons: {e}")
+        logger.warning("[AI Fallback] Failed to generate contextual reasons: %s", e)
         return None
 
 if __name__ == "__main__":
@@ -12,6 +12,10 @@ import re
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 
 @dataclass
 class BehavioralQuery:
@@ -78,10 +82,10 @@ class BehavioralContextQueryGenerator:
         role_context = self._extract_role_context(search_prompt)
         
         if not behavioral_context:
-            print(f"[Behavioral Query Generator] No behavioral context found in: {search_prompt}")
+            logger.debug("[Behavioral Query Generator] No behavioral context found in: %s", search_prompt)
             return []
         
-        print(f"[Behavioral Query Generator] Extracted - Role: {role_context}, Behavior: {behavioral_context}")
+        logger.debug("[Behavioral Query Generator] Extracted - Role: %s, Behavior: %s", role_context, behavioral_context)
         
         # Generate different types of behavioral queries
         queries.extend(self._generate_solution_queries(role_context, behavioral_context))
@@ -7,40 +7,18 @@ This module provides AI-powered behavioral metrics for analyzing prospect behavi
 - Identity Alignment Signal (IAS)
 """
 
-import logging
+import copy
 import json
 import random
+from functools import lru_cache
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
-import os
+from openai_utils import call_openai, validate_response_uniqueness
+from services import get_openai_client
+from structured_logging import get_logger
 
 # Configure logging - SIMPLIFIED
-logging.basicConfig(level=logging.WARNING)  # Only show warnings and errors
-logger = logging.getLogger(__name__)
-
-# Try to import OpenAI, but make it optional
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    logger.warning("AI package not available. AI-based metrics will be disabled.")
-
-# Initialize OpenAI client
-try:
-    openai_api_key = os.getenv('OPENAI_API_KEY')
-    if not openai_api_key:
-        # Try to load from secrets.json
-        try:
-            with open("secrets.json", "r") as f:
-                secrets = json.load(f)
-                openai_api_key = secrets.get('openai_api_key', '')
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
-    
-    openai_client = openai.OpenAI(api_key=openai_api_key)
-except Exception:
-    openai_client = None
+logger = get_logger(__name__)
 
 def extract_first_name(full_name: str) -> str:
     """Extract first name from full name."""
@@ -168,9 +146,18 @@ def analyze_search_context(user_prompt: str) -> dict:
     """
     Enhanced search context analysis that better categorizes search intent with confidence scoring.
     
+    The analysis is deterministic and is requested several times per candidate,
+    so results are memoized per prompt; callers receive their own copy.
+    
     Returns:
         Dictionary with context analysis including context type, decision factors, confidence score, and activity templates.
     """
+    return copy.deepcopy(_analyze_search_context_cached(user_prompt))
+
+
+@lru_cache(maxsize=256)
+def _analyze_search_context_cached(user_prompt: str) -> dict:
+    """Uncopied, memoized form of analyze_search_context."""
     prompt_lower = user_prompt.lower()
     
     # Enhanced context categories with weighted indicators
@@ -445,7 +432,7 @@ def simulate_personal_research_patterns() -> Dict[str, Any]:
 def generate_focused_insight_ai(role: str, user_prompt: str, candidate_data: Optional[Dict[str, Any]] = None) -> str:
     """Generate a focused behavioral insight using AI with dynamic context awareness."""
     try:
-        if not openai_client:
+        if get_openai_client() is None:
             return generate_fallback_insight(role, candidate_data, user_prompt)
         
         # Analyze the search context and role relevance
@@ -514,19 +501,18 @@ def generate_focused_insight_ai(role: str, user_prompt: str, candidate_data: Opt
         """
         
         # Call the OpenAI API with optimized parameters
-        response = openai_client.chat.completions.create(
+        insight = call_openai(
+            prompt=user_prompt_for_ai,
+            system_message=system_prompt,
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt_for_ai}
-            ],
             temperature=0.6,  # Slightly reduced for more consistent quality
             max_tokens=60,    # Reduced for conciseness
             presence_penalty=0.3,  # Encourage unique phrasing
-            frequency_penalty=0.2   # Reduce repetitive language
+            frequency_penalty=0.2,   # Reduce repetitive language
+            purpose="behavioral_insight"
         )
-        
-        insight = response.choices[0].message.content.strip()
+        if not insight:
+            return generate_fallback_insight(role, candidate_data, user_prompt)
         
         # Validate the insight quality and reject problematic patterns
         problematic_patterns = [
@@ -547,7 +533,7 @@ def generate_focused_insight_ai(role: str, user_prompt: str, candidate_data: Opt
 def generate_score_ai(score_type: str, role: str, user_prompt: str = "") -> Dict[str, Any]:
     """Generate a behavioral score using AI with dynamic context awareness."""
     try:
-        if not openai_client:
+        if get_openai_client() is None:
             if score_type == "cmi":
                 return generate_fallback_cmi_score(role, user_prompt)
             elif score_type == "rbfs":
@@ -642,15 +628,15 @@ def generate_score_ai(score_type: str, role: str, user_prompt: str = "") -> Dict
             """
         
         # Call the OpenAI API with minimal tokens
-        response = openai_client.chat.completions.create(
+        result_text = call_openai(
+            prompt=system_prompt,
             model="gpt-3.5-turbo",
-            messages=[{"role": "system", "content": system_prompt}],
             temperature=0.5,
-            max_tokens=50
+            max_tokens=50,
+            purpose="behavioral_score"
         )
         
-        # Parse the JSON response
-        result_text = response.choices[0].message.content.strip()
+        # Parse the JSON response (a failed call falls back below)
         result = json.loads(result_text)
         
         # Ensure score is within range
@@ -731,6 +717,76 @@ def enhance_behavioral_data_ai(
         }
 
 
+def finalize_candidate_behavioral_data(
+    candidate: Dict[str, Any],
+    behavioral_data: Optional[Dict[str, Any]],
+    user_prompt: str,
+    candidate_index: int,
+    generated_insights: List[str],
+    used_patterns: set
+) -> Dict[str, Any]:
+    """
+    Apply cross-candidate uniqueness and score variation to one candidate's behavioral data.
+    
+    generated_insights and used_patterns are shared across the candidates of a
+    search, so candidates can be finalized one at a time as they become ready.
+    Pass behavioral_data=None when generation failed to use a diverse fallback.
+    
+    Returns:
+        The candidate with behavioral_data set
+    """
+    role = candidate.get("title", "professional")
+    
+    if behavioral_data is None:
+        # Fallback for any errors with diversity
+        fallback_scores = {
+            "cmi": generate_fallback_cmi_score(role, user_prompt),
+            "rbfs": generate_fallback_rbfs_score(role, user_prompt),
+            "ias": generate_fallback_ias_score(role, user_prompt)
+        }
+        
+        # For top candidates, ensure optimal scores
+        if candidate_index < 3:
+            fallback_scores = generate_top_lead_scores(fallback_scores, candidate_index, user_prompt)
+        else:
+            fallback_scores = add_score_variation(fallback_scores, candidate_index)
+        
+        candidate["behavioral_data"] = {
+            "behavioral_insight": generate_diverse_fallback_insight(role, candidate, user_prompt, used_patterns, candidate_index),
+            "scores": fallback_scores
+        }
+        return candidate
+    
+    # Check for insight uniqueness
+    insight = behavioral_data.get("behavioral_insight", "")
+    if insight:
+        # Check if this insight is too similar to previous ones
+        all_insights = generated_insights + [insight]
+        unique_insights = validate_response_uniqueness(all_insights, similarity_threshold=0.5)  # Stricter threshold for better uniqueness
+        
+        # If the new insight is not unique, generate a diverse fallback
+        if len(unique_insights) <= len(generated_insights):
+            insight = generate_diverse_fallback_insight(role, candidate, user_prompt, used_patterns, candidate_index)
+            behavioral_data["behavioral_insight"] = insight
+        
+        generated_insights.append(insight)
+    
+    # Ensure diverse scores as well
+    scores = behavioral_data.get("scores", {})
+    if scores:
+        # For top candidates (first 2-3), ensure they have optimal "top lead" scores
+        if candidate_index < 3:  # Top 3 candidates get optimal scores
+            scores = generate_top_lead_scores(scores, candidate_index, user_prompt)
+        else:
+            # Add some variation to scores to avoid identical values
+            scores = add_score_variation(scores, candidate_index)
+        behavioral_data["scores"] = scores
+    
+    # Add behavioral data to candidate
+    candidate["behavioral_data"] = behavioral_data
+    return candidate
+
+
 def enhance_behavioral_data_for_multiple_candidates(
     candidates: List[Dict[str, Any]],
     user_prompt: str
@@ -758,60 +814,17 @@ def enhance_behavioral_data_for_multiple_candidates(
             # Mark first 3 candidates as top leads
             is_top_candidate = i < 3
             behavioral_data = enhance_behavioral_data_ai({}, [candidate], user_prompt, i, is_top_candidate)
-            
-            # Check for insight uniqueness
-            insight = behavioral_data.get("behavioral_insight", "")
-            if insight:
-                # Import the uniqueness validation from openai_utils
-                from openai_utils import validate_response_uniqueness
-                
-                # Check if this insight is too similar to previous ones
-                all_insights = generated_insights + [insight]
-                unique_insights = validate_response_uniqueness(all_insights, similarity_threshold=0.5)  # Stricter threshold for better uniqueness
-                
-                # If the new insight is not unique, generate a diverse fallback
-                if len(unique_insights) <= len(generated_insights):
-                    role = candidate.get("title", "professional")
-                    insight = generate_diverse_fallback_insight(role, candidate, user_prompt, used_patterns, i)
-                    behavioral_data["behavioral_insight"] = insight
-                
-                generated_insights.append(insight)
-            
-            # Ensure diverse scores as well
-            scores = behavioral_data.get("scores", {})
-            if scores:
-                # For top candidates (first 2-3), ensure they have optimal "top lead" scores
-                if i < 3:  # Top 3 candidates get optimal scores
-                    scores = generate_top_lead_scores(scores, i, user_prompt)
-                else:
-                    # Add some variation to scores to avoid identical values
-                    scores = add_score_variation(scores, i)
-                behavioral_data["scores"] = scores
-            
-            # Add behavioral data to candidate
-            candidate["behavioral_data"] = behavioral_data
-            enhanced_candidates.append(candidate)
-            
-        except Exception as e:
-            # Fallback for any errors with diversity
-            role = candidate.get("title", "professional")
-            fallback_scores = {
-                "cmi": generate_fallback_cmi_score(role, user_prompt),
-                "rbfs": generate_fallback_rbfs_score(role, user_prompt),
-                "ias": generate_fallback_ias_score(role, user_prompt)
-            }
-            
-            # For top candidates, ensure optimal scores
-            if i < 3:
-                fallback_scores = generate_top_lead_scores(fallback_scores, i, user_prompt)
-            else:
-                fallback_scores = add_score_variation(fallback_scores, i)
-            
-            candidate["behavioral_data"] = {
-                "behavioral_insight": generate_diverse_fallback_insight(role, candidate, user_prompt, used_patterns, i),
-                "scores": fallback_scores
-            }
-            enhanced_candidates.append(candidate)
+        except Exception:
+            behavioral_data = None
+        
+        try:
+            enhanced_candidates.append(
+                finalize_candidate_behavioral_data(candidate, behavioral_data, user_prompt, i, generated_insights, used_patterns)
+            )
+        except Exception:
+            enhanced_candidates.append(
+                finalize_candidate_behavioral_data(candidate, None, user_prompt, i, generated_insights, used_patterns)
+            )
     
     return enhanced_candidates
 
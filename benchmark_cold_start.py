@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Cold Start Benchmark for the API Process.
+
+Each run starts a fresh interpreter, imports api.main, runs the app's startup
+hooks and sends two identical requests through TestClient. It reports:
+
+    import     time to import api.main
+    startup    time spent in the startup hooks (including the warmup)
+    first      latency of the first request
+    second     latency of the same request once everything is warm
+
+Runs alternate between STARTUP_WARMUP=1 and STARTUP_WARMUP=0, so the cost
+moved from the first request into startup is visible. --importtime lists the
+slowest modules from `python -X importtime`.
+
+Usage:
+    python benchmark_cold_start.py
+    python benchmark_cold_start.py --runs 5 --path /api/search?limit=5 --importtime 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+CHILD = r"""
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+from api import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    client.get({path!r})
+    first = time.perf_counter()
+    client.get({path!r})
+    second = time.perf_counter()
+print(json.dumps({{
+    "import": (imported - started) * 1000,
+    "startup": (ready - imported) * 1000,
+    "first": (first - ready) * 1000,
+    "second": (second - first) * 1000,
+}}))
+"""
+
+
+def run_child(path: str, warmup: bool) -> Dict[str, float]:
+    env = dict(os.environ, STARTUP_WARMUP="1" if warmup else "0", LOG_LEVEL=os.getenv("LOG_LEVEL", "ERROR"))
+    env.setdefault("OPENAI_API_KEY", "benchmark_key")
+    # Background refreshers would only add noise; the benchmark is about the request path
+    env.setdefault("SEARCH_QUEUE_MODE", "external")
+    out = subprocess.run([sys.executable, "-c", CHILD.format(root=ROOT, path=path)], env=env, cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top: int) -> List[str]:
+    env = dict(os.environ, LOG_LEVEL="ERROR")
+    env.setdefault("OPENAI_API_KEY", "benchmark_key")
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import api.main"], env=env, cwd=ROOT,
+                         capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        # "import time:  <self us> | <cumulative us> | <module>"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    return [f"{cumulative / 1000:>10.1f}{self_time / 1000:>10.1f}  {name}" for cumulative, self_time, name in rows[:top]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per mode")
+    parser.add_argument("--path", default="/api/search?limit=5", help="request sent twice after startup")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="list the N slowest imports")
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'import ms':>12}{'startup ms':>12}{'first ms':>12}{'second ms':>12}")
+    for warmup in (True, False):
+        runs = [run_child(args.path, warmup) for _ in range(args.runs)]
+        medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        label = "warmup" if warmup else "no warmup"
+        print(f"{label:<12}{medians['import']:>12.1f}{medians['startup']:>12.1f}"
+              f"{medians['first']:>12.1f}{medians['second']:>12.1f}")
+
+    if args.importtime:
+        print(f"\n{'cumul ms':>10}{'self ms':>10}  module")
+        for row in import_profile(args.importtime):
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Event Loop Benchmark for the Search Pipeline.
+
+Measures how many concurrent searches and result polls a single API worker can
+sustain with the legacy inline pipeline versus the async-first execution mode
+(blocking LLM / Supabase calls moved to the bounded executors in
+blocking_executor.py).
+
+External services are replaced with fakes that sleep for realistic latencies,
+so the numbers reflect event loop behaviour rather than network variance.
+
+Usage:
+    python benchmark_event_loop.py
+    python benchmark_event_loop.py --concurrency 1 4 8 16 --scale 0.5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# The fakes below replace every external call; placeholder keys only satisfy client construction
+os.environ.setdefault("OPENAI_API_KEY", "benchmark_key")
+os.environ.setdefault("INTERNAL_DATABASE_API_KEY", "benchmark_key")
+
+import httpx
+
+import blocking_executor
+from api import main
+
+# Simulated latencies in seconds (roughly what we see in production traces)
+LATENCIES = {
+    "db": 0.03,
+    "filters": 0.8,
+    "apollo_page": 1.0,
+    "assessment": 1.5,
+    "behavioral": 0.7,  # per candidate
+    "evidence": 1.5,  # per candidate
+    "estimation": 0.5,
+}
+
+
+def install_fakes(scale: float) -> None:
+    """Replace external calls used by process_search with latency-only fakes."""
+
+    def sleep(key: str) -> None:
+        time.sleep(LATENCIES[key] * scale)
+
+    def fake_get_search(request_id: str) -> Dict[str, Any]:
+        sleep("db")
+        return {"id": 1, "request_id": request_id, "status": "processing", "prompt": "bench"}
+
+    def fake_store_search(search_data: Dict[str, Any]) -> int:
+        sleep("db")
+        return 1
+
+    def fake_get_people(search_id: int) -> List[Dict[str, Any]]:
+        sleep("db")
+        return []
+
+    def fake_store_people(search_id: int, people: List[Dict[str, Any]]) -> bool:
+        sleep("db")
+        return True
+
+    def fake_filters(prompt: str, ridiculous: bool = None) -> Dict[str, Any]:
+        sleep("filters")
+        return {"organization_filters": {}, "person_filters": {"person_titles": ["CMO"]}, "reasoning": "bench"}
+
+    async def fake_apollo(filters: Dict[str, Any], page: int = 1, per_page: int = 5, deadline: Any = None) -> List[Dict[str, Any]]:
+        await asyncio.sleep(LATENCIES["apollo_page"] * scale)
+        return [
+            {"name": f"Person {page}-{i}", "title": "CMO", "linkedin_url": f"https://linkedin.com/in/p{page}{i}", "location": "Miami, Florida"}
+            for i in range(per_page)
+        ]
+
+    def fake_assessment(prompt: str, people: List[Dict[str, Any]], *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        sleep("assessment")
+        return [{"name": p["name"], "linkedin_url": p["linkedin_url"], "accuracy": 90, "reasons": []} for p in people[:5]]
+
+    def fake_behavioral(behavioral_data: Dict[str, Any], candidates: List[Dict[str, Any]], prompt: str,
+                        candidate_index: int = 0, is_top_candidate: bool = False) -> Dict[str, Any]:
+        sleep("behavioral")
+        return {"behavioral_insight": f"insight {candidate_index} {candidates[0].get('name')}", "scores": {}}
+
+    class FakeEvidenceFinder:
+        async def process_candidates_batch(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            await asyncio.sleep(LATENCIES["evidence"] * scale)
+            for candidate in candidates:
+                candidate["evidence_urls"] = [{"url": f"https://example.com/{candidate.get('name')}"}]
+            return candidates
+
+    def fake_estimate(prompt: str) -> Dict[str, Any]:
+        sleep("estimation")
+        return {"estimated_count": 1234}
+
+    async def fake_public_figure(name: str) -> bool:
+        return False
+
+    main.get_search_from_database = fake_get_search
+    main.store_search_to_database = fake_store_search
+    main.get_people_for_search = fake_get_people
+    main.store_people_to_database = fake_store_people
+    main.parse_prompt_to_internal_database_filters = fake_filters
+    main.search_people_via_internal_database = fake_apollo
+    main.select_top_candidates = fake_assessment
+    main.enhance_behavioral_data_ai = fake_behavioral
+    main._create_evidence_finder = lambda prompt: FakeEvidenceFinder()
+    main.estimate_people_count = fake_estimate
+    main.is_public_figure = fake_public_figure
+    main.EVIDENCE_INTEGRATION_AVAILABLE = True
+
+
+async def run_scenario(concurrency: int, async_mode: bool, duration: float) -> Dict[str, Any]:
+    """Run `concurrency` searches back to back while a poller hits the result endpoint."""
+    blocking_executor.set_async_pipeline_enabled(async_mode)
+    poll_latencies: List[float] = []
+    searches_completed = 0
+    deadline = time.perf_counter() + duration
+
+    async def search_loop(worker: int) -> None:
+        nonlocal searches_completed
+        iteration = 0
+        while time.perf_counter() < deadline:
+            iteration += 1
+            await main.process_search(
+                f"bench-{worker}-{iteration}", "Find CMOs in Florida", max_candidates=3, force_refresh=True
+            )
+            searches_completed += 1
+
+    async def poll_loop(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await client.get("/api/search/bench-poll")
+            poll_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await asyncio.gather(*(search_loop(i) for i in range(concurrency)), poll_loop(client))
+
+    poll_latencies.sort()
+    p95_index = max(0, int(len(poll_latencies) * 0.95) - 1)
+    return {
+        "mode": "async" if async_mode else "inline",
+        "concurrency": concurrency,
+        "searches_completed": searches_completed,
+        "searches_per_min": round(searches_completed / duration * 60, 1),
+        "polls": len(poll_latencies),
+        "polls_per_sec": round(len(poll_latencies) / duration, 1),
+        "poll_p50_ms": round(statistics.median(poll_latencies) * 1000, 1) if poll_latencies else None,
+        "poll_p95_ms": round(poll_latencies[p95_index] * 1000, 1) if poll_latencies else None,
+    }
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    header = f"{'mode':<8}{'conc':>6}{'searches/min':>14}{'polls/s':>10}{'poll p50 ms':>13}{'poll p95 ms':>13}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['mode']:<8}{row['concurrency']:>6}{row['searches_per_min']:>14}"
+            f"{row['polls_per_sec']:>10}{str(row['poll_p50_ms']):>13}{str(row['poll_p95_ms']):>13}"
+        )
+
+
+async def run_benchmark(concurrency_levels: List[int], duration: float) -> List[Dict[str, Any]]:
+    results = []
+    for concurrency in concurrency_levels:
+        for async_mode in (False, True):
+            results.append(await run_scenario(concurrency, async_mode, duration))
+    return results
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark search pipeline event loop responsiveness")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to simulated latencies")
+    args = parser.parse_args()
+
+    install_fakes(args.scale)
+    results = asyncio.run(run_benchmark(args.concurrency, args.duration))
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Geo Matcher Microbenchmark.
+
+Compares the old per-person non-US filter (a ~120 entry list rebuilt for every
+person, substring-matched against the lowercased location) with the compiled
+gazetteer in geo_matcher.py, cold (empty LRU cache) and warm.
+
+Usage:
+    python benchmark_geo_matcher.py
+    python benchmark_geo_matcher.py --people 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import geo_matcher
+
+# A mix of the location strings Apollo returns, weighted towards US metros
+LOCATIONS = [
+    "San Francisco, California", "New York, New York", "Austin, TX", "Greater Boston",
+    "Chicago, Illinois, United States", "Seattle, Washington", "Paris, Texas", "Indianapolis, Indiana",
+    "Milwaukee, Wisconsin", "Atlanta, Georgia", "Dublin, Ohio", "Denver Metropolitan Area",
+    "London, England, United Kingdom", "Toronto, Ontario, Canada", "Bengaluru, Karnataka, India",
+    "Berlin, Germany", "Sydney, New South Wales, Australia", "Paris, Ile-de-France, France",
+    "Tbilisi, Georgia", "Mexico City, Mexico", "",
+]
+
+
+def legacy_is_non_us(location: str) -> bool:
+    """The filter process_search used to run for every person."""
+    loc = location.lower()
+    non_us_locations = [
+        "canada", "mexico", "uk", "united kingdom", "england", "scotland", "wales", "ireland",
+        "france", "germany", "spain", "italy", "netherlands", "belgium", "switzerland",
+        "austria", "portugal", "sweden", "norway", "denmark", "finland", "poland",
+        "czech republic", "hungary", "romania", "bulgaria", "greece", "turkey",
+        "russia", "ukraine", "belarus", "lithuania", "latvia", "estonia",
+        "australia", "new zealand", "japan", "south korea", "china", "taiwan",
+        "singapore", "malaysia", "thailand", "vietnam", "philippines", "indonesia",
+        "india", "pakistan", "bangladesh", "sri lanka", "nepal", "myanmar",
+        "israel", "saudi arabia", "uae", "qatar", "kuwait", "bahrain", "oman",
+        "egypt", "south africa", "nigeria", "kenya", "morocco", "tunisia",
+        "brazil", "argentina", "chile", "colombia", "peru", "venezuela", "ecuador",
+        "london", "paris", "berlin", "madrid", "rome", "amsterdam", "brussels",
+        "zurich", "vienna", "stockholm", "oslo", "copenhagen", "helsinki",
+        "toronto", "vancouver", "montreal", "sydney", "melbourne", "tokyo",
+        "seoul", "beijing", "shanghai", "hong kong", "mumbai", "delhi", "bangalore"
+    ]
+    return bool(loc) and any(non_us in loc for non_us in non_us_locations)
+
+
+def timed(func, locations):
+    start = time.perf_counter()
+    kept = sum(1 for loc in locations if func(loc))
+    return time.perf_counter() - start, kept
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=20000, help="locations to classify")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    locations = [rng.choice(LOCATIONS) for _ in range(args.people)]
+
+    legacy_time, legacy_kept = timed(lambda loc: not legacy_is_non_us(loc), locations)
+    geo_matcher._resolve.cache_clear()
+    cold_time, kept = timed(geo_matcher.is_us, locations)
+    warm_time, _ = timed(geo_matcher.is_us, locations)
+
+    print(f"{'filter':<22}{'total ms':>10}{'us/person':>12}{'kept':>8}")
+    for label, elapsed, count in (("legacy substring", legacy_time, legacy_kept),
+                                  ("geo_matcher (cold)", cold_time, kept),
+                                  ("geo_matcher (warm)", warm_time, kept)):
+        print(f"{label:<22}{elapsed * 1000:>10.1f}{elapsed / len(locations) * 1e6:>12.2f}{count:>8}")
+
+    print("\nLocations classified differently:")
+    for loc in LOCATIONS:
+        legacy, new = not legacy_is_non_us(loc), geo_matcher.is_us(loc)
+        if legacy != new:
+            print(f"  {loc!r:<40} legacy={'US' if legacy else 'non-US':<7} now={'US' if new else 'non-US'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+JSON Codec Benchmark.
+
+Encodes and decodes search payloads shaped like GET /api/search/{request_id}
+responses (10 and 50 candidates with behavioral_data, evidence_urls and
+linkedin_profile). It compares the stdlib path the API used before
+(jsonable_encoder followed by json.dumps) with each json_codec codec, and
+reports gzip and brotli sizes and timings for the encoded body.
+
+Usage:
+    python benchmark_json_codec.py
+    python benchmark_json_codec.py --iterations 500
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+
+import json_codec
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def make_candidate(rng: random.Random, index: int) -> dict:
+    name = f"Candidate {index}"
+    slug = f"candidate-{index}"
+    return {
+        "id": index,
+        "name": name,
+        "title": rng.choice(["Chief Marketing Officer", "VP of Sales", "Head of Growth", "CFO"]),
+        "company": rng.choice(["Acme Corp", "Globex", "Initech", "Umbrella Health"]),
+        "email": f"{slug}@example.com",
+        "linkedin_url": f"https://www.linkedin.com/in/{slug}",
+        "profile_photo_url": f"https://media.licdn.com/dms/image/{slug}.jpg",
+        "location": rng.choice(["Miami, Florida", "Austin, TX", "New York, New York"]),
+        "accuracy": rng.randint(60, 99),
+        "reasons": [f"Reason {n}: recently evaluated marketing automation platforms" for n in range(3)],
+        "linkedin_profile": {
+            "summary": "Marketing leader focused on demand generation and lifecycle programs. " * 4,
+            "experience": [{"title": "Director of Marketing", "company": f"Company {n}", "years": n + 1}
+                           for n in range(5)],
+            "skills": ["Demand Generation", "Marketing Automation", "ABM", "Analytics", "SEO"],
+        },
+        "behavioral_data": {
+            "behavioral_insight": "Engages with vendor comparison content during budget planning. " * 3,
+            "scores": {
+                "cmi": {"score": rng.randint(40, 95), "explanation": "High commitment momentum " * 5},
+                "rbfs": {"score": rng.randint(40, 95), "explanation": "Moderate risk sensitivity " * 5},
+                "ias": {"score": rng.randint(40, 95), "explanation": "Strong identity alignment " * 5},
+            },
+        },
+        "evidence_urls": [
+            {"url": f"https://example.com/articles/{slug}-{n}", "title": f"Evidence article {n}",
+             "description": "Coverage of the company's platform evaluation. " * 3,
+             "relevance_score": round(rng.random(), 3), "evidence_type": "news_article"}
+            for n in range(5)
+        ],
+        "evidence_summary": "Found 5 relevant sources for this candidate.",
+        "evidence_confidence": round(rng.random(), 3),
+    }
+
+
+def make_payload(candidates: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    return {
+        "id": 1,
+        "request_id": "benchmark",
+        "status": "completed",
+        "prompt": "Find CMOs in Florida evaluating marketing automation",
+        "filters": {"person_filters": {"person_titles": ["CMO"], "person_locations": ["Florida"]}},
+        "candidates": [make_candidate(rng, i) for i in range(candidates)],
+        "estimated_count": 1200,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "completed_at": "2025-01-01T00:00:30+00:00",
+        "processing_complete": True,
+    }
+
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def legacy_encode(payload: dict) -> bytes:
+    """What FastAPI's JSONResponse did for a returned dict."""
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="encode/decode calls per measurement")
+    args = parser.parse_args()
+
+    codecs = [json_codec.StdlibJSONCodec()]
+    if json_codec.orjson is not None:
+        codecs.append(json_codec.OrjsonCodec())
+
+    for size in (10, 50):
+        payload = make_payload(size)
+        body = legacy_encode(payload)
+        # The people columns as store_people_to_database writes them
+        columns = [json.dumps(c["behavioral_data"]) for c in payload["candidates"]]
+
+        print(f"\n{size} candidates, {len(body) / 1024:.1f} KiB")
+        print(f"{'path':<34}{'encode us':>12}{'decode us':>12}{'columns us':>12}")
+        legacy_us = per_call_us(lambda: legacy_encode(payload), args.iterations)
+        print(f"{'jsonable_encoder + json.dumps':<34}{legacy_us:>12.1f}{'':>12}{'':>12}")
+        for codec in codecs:
+            encode_us = per_call_us(lambda: codec.dumps_bytes(payload), args.iterations)
+            decode_us = per_call_us(lambda: codec.loads(body), args.iterations)
+            columns_us = per_call_us(lambda: [codec.loads(c) for c in columns], args.iterations)
+            print(f"{codec.name + ' codec':<34}{encode_us:>12.1f}{decode_us:>12.1f}{columns_us:>12.1f}")
+
+        print(f"{'compression':<34}{'bytes':>12}{'ratio':>12}{'time us':>12}")
+        compressors = [("gzip level 6", lambda: gzip.compress(body, compresslevel=6))]
+        if brotli is not None:
+            compressors.append(("brotli quality 4", lambda: brotli.compress(body, quality=4)))
+        for label, compress in compressors:
+            compressed = compress()
+            elapsed = per_call_us(compress, max(1, args.iterations // 4))
+            print(f"{label:<34}{len(compressed):>12}{len(body) / len(compressed):>12.1f}{elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
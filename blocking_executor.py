@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Bounded executors for blocking calls made from the async search pipeline.
+
+The search pipeline runs inside the uvicorn event loop, but most of the LLM
+helpers (openai_utils, behavioral_metrics_ai, simple_estimation) and every
+Supabase call in database.py are synchronous. Running them inline stalls every
+other request on the worker, including the GET /api/search/{request_id} polls.
+
+This module moves those calls onto small, named thread pools so the loop stays
+responsive. Pools are bounded so a burst of searches cannot open an unbounded
+number of OpenAI or Supabase connections.
+
+Usage:
+    from blocking_executor import run_blocking
+
+    filters = await run_blocking(parse_prompt_to_internal_database_filters, prompt, pool="llm")
+    await run_blocking(store_search_to_database, search_data, pool="db")
+
+Setting SEARCH_PIPELINE_ASYNC=false restores the legacy inline behaviour, which
+is what benchmark_event_loop.py uses as the "before" measurement.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+# Pool sizes per workload. LLM calls are slow and numerous, DB calls are short,
+# HTTP covers the remaining blocking clients (SerpAPI via requests).
+DEFAULT_POOL_SIZES: Dict[str, int] = {
+    "llm": _env_int("SEARCH_PIPELINE_LLM_WORKERS", 16),
+    "db": _env_int("SEARCH_PIPELINE_DB_WORKERS", 8),
+    "http": _env_int("SEARCH_PIPELINE_HTTP_WORKERS", 8),
+}
+
+_async_enabled = _env_flag("SEARCH_PIPELINE_ASYNC", True)
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def is_async_pipeline_enabled() -> bool:
+    """Return True when blocking calls are offloaded to the bounded executors."""
+    return _async_enabled
+
+
+def set_async_pipeline_enabled(enabled: bool) -> None:
+    """Toggle the async execution mode at runtime (used by tests and benchmarks)."""
+    global _async_enabled
+    _async_enabled = enabled
+
+
+def get_executor(pool: str = "llm") -> ThreadPoolExecutor:
+    """Return the named executor, creating it on first use."""
+    executor = _executors.get(pool)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        executor = _executors.get(pool)
+        if executor is None:
+            max_workers = DEFAULT_POOL_SIZES.get(pool, _env_int("SEARCH_PIPELINE_DEFAULT_WORKERS", 4))
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"pipeline-{pool}")
+            _executors[pool] = executor
+        return executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, pool: str = "llm", **kwargs: Any) -> Any:
+    """
+    Run a blocking callable without stalling the event loop.
+
+    Context variables are copied into the worker thread so per-request state
+    set by the caller is still visible inside the blocking call.
+
+    Args:
+        func: Synchronous callable to execute
+        *args: Positional arguments for func
+        pool: Name of the executor pool ("llm", "db" or "http")
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns; exceptions are re-raised in the caller.
+    """
+    if not _async_enabled:
+        return func(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(pool), call)
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Return pool sizes and current queue depth for each executor."""
+    stats: Dict[str, Any] = {"async_enabled": _async_enabled, "pools": {}}
+    for name, executor in list(_executors.items()):
+        stats["pools"][name] = {
+            "max_workers": executor._max_workers,
+            "threads": len(executor._threads),
+            "queued": executor._work_queue.qsize(),
+        }
+    return stats
+
+
+def shutdown_executors(wait: bool = False) -> None:
+    """Shut down all executors (called on application shutdown)."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Candidate identity resolution.
+
+The merge step in process_search matched every assessed candidate against the
+full people list by LinkedIn URL, email or name, then deduplicated with
+`merged in candidates`, a full dict comparison against a growing list. Both
+are quadratic, and exact string comparison missed the same profile written as
+"linkedin.com/in/Jane-Doe/" and "https://www.linkedin.com/in/jane-doe".
+
+CandidateIndex keeps people in hash maps keyed by normalized identities
+(canonical LinkedIn slug, lowercased email, normalized name), so merging,
+dedup across pages and exclusion checks are one dict lookup each:
+
+    index = CandidateIndex(people)
+    match = index.find({"linkedin_url": "linkedin.com/in/Jane-Doe/"})
+    if index.add(candidate):          # False if the same person is already in
+        ...
+
+Identities are tried strongest first. A weaker identity (email, then name)
+only matches when no stronger one contradicts it, so two different people who
+share a name but have different LinkedIn profiles are never merged.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Strongest first
+IDENTITY_KINDS = ("linkedin", "email", "name")
+
+_LINKEDIN_PATH_RE = re.compile(r"^/(in|pub)/([^/?#]+)", re.IGNORECASE)
+_NAME_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def linkedin_slug(url: Optional[str]) -> Optional[str]:
+    """The profile slug of a LinkedIn URL ("jane-doe"), or None if it is not a profile URL."""
+    if not url or not isinstance(url, str):
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if not (host == "linkedin.com" or host.endswith(".linkedin.com")):
+        return None
+    match = _LINKEDIN_PATH_RE.match(parts.path)
+    if not match:
+        return None
+    return f"{match.group(1).lower()}/{match.group(2).lower()}"
+
+
+def canonical_linkedin_url(url: Optional[str]) -> Optional[str]:
+    """https://www.linkedin.com/in/<slug>, or the input unchanged if it is not a profile URL."""
+    slug = linkedin_slug(url)
+    return f"https://www.linkedin.com/{slug}" if slug else url
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email or not isinstance(email, str) or "@" not in email:
+        return None
+    return email.strip().lower()
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Case, accents, punctuation and spacing removed: "José  O'Neil" -> "jose oneil"."""
+    if not name or not isinstance(name, str):
+        return None
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    cleaned = _WHITESPACE_RE.sub(" ", _NAME_PUNCTUATION_RE.sub("", ascii_name.casefold())).strip()
+    return cleaned or None
+
+
+def identities(person: Dict[str, Any]) -> Dict[str, str]:
+    """Normalized identities of a person, keyed by kind."""
+    found = {}
+    slug = linkedin_slug(person.get("linkedin_url"))
+    if slug:
+        found["linkedin"] = slug
+    email = normalize_email(person.get("email"))
+    if email:
+        found["email"] = email
+    name = normalize_name(person.get("name"))
+    if name:
+        found["name"] = name
+    return found
+
+
+class CandidateIndex:
+    """People indexed by normalized LinkedIn slug, email and name."""
+
+    def __init__(self, people: Iterable[Dict[str, Any]] = ()):
+        self._maps: Dict[str, Dict[str, Tuple[Dict[str, Any], Dict[str, str]]]] = {kind: {} for kind in IDENTITY_KINDS}
+        self._people: List[Dict[str, Any]] = []
+        for person in people:
+            self.add(person)
+
+    def find(self, person: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The indexed person with the same identity, or None."""
+        keys = identities(person)
+        for position, kind in enumerate(IDENTITY_KINDS):
+            key = keys.get(kind)
+            if key is None:
+                continue
+            hit = self._maps[kind].get(key)
+            if hit is None:
+                continue
+            indexed, indexed_keys = hit
+            # A stronger identity present on both sides must agree
+            stronger = IDENTITY_KINDS[:position]
+            if all(keys.get(k) is None or indexed_keys.get(k) is None or keys[k] == indexed_keys[k] for k in stronger):
+                return indexed
+        return None
+
+    def add(self, person: Dict[str, Any]) -> bool:
+        """Index person; returns False (and indexes nothing) if they are already present."""
+        if self.find(person) is not None:
+            return False
+        keys = identities(person)
+        for kind, key in keys.items():
+            # First person with an identity owns it
+            self._maps[kind].setdefault(key, (person, keys))
+        self._people.append(person)
+        return True
+
+    def __contains__(self, person: Dict[str, Any]) -> bool:
+        return self.find(person) is not None
+
+    def __len__(self) -> int:
+        return len(self._people)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._people)
+
+    def people(self) -> List[Dict[str, Any]]:
+        """Indexed people in insertion order."""
+        return list(self._people)
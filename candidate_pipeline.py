@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Per-candidate stage pipeline for process_search.
+
+process_search used to run in strict phases: every candidate went through
+photo validation, then every candidate through behavioral enrichment, then all
+of them waited on the evidence finder together. Here each candidate flows
+through the stages on its own as soon as it is scored, so candidate 1 can be
+gathering evidence while candidate 2 is still with the LLM.
+
+Each stage has its own concurrency limit, which keeps the number of parallel
+OpenAI and web search calls bounded no matter how many candidates are in
+flight.
+
+Usage:
+    pipeline = CandidatePipeline([
+        PipelineStage("photo", photo_stage),
+        PipelineStage("behavioral", behavioral_stage, concurrency=3),
+        PipelineStage("evidence", evidence_stage, concurrency=3),
+    ], on_finalized=publish_candidate)
+
+    pipeline.submit(candidate)   # as soon as it is scored
+    candidates = await pipeline.finish()
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from metrics import STAGE_SECONDS
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# A stage receives (index, candidate) and returns the updated candidate
+StageFunc = Callable[[int, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+FinalizedCallback = Callable[[int, Dict[str, Any]], Any]
+
+
+@dataclass
+class PipelineStage:
+    """One step every candidate passes through, with its own concurrency limit."""
+    name: str
+    func: StageFunc
+    concurrency: int = 0  # 0 means unbounded
+    semaphore: Optional[asyncio.Semaphore] = field(default=None, init=False, repr=False)
+    durations: List[float] = field(default_factory=list, init=False, repr=False)
+    errors: int = field(default=0, init=False)
+
+    async def run(self, index: int, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        if self.concurrency > 0 and self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+
+        start = time.time()
+        with STAGE_SECONDS.time(stage=f"candidate_{self.name}"):
+            try:
+                if self.semaphore is not None:
+                    async with self.semaphore:
+                        return await self.func(index, candidate)
+                return await self.func(index, candidate)
+            finally:
+                self.durations.append(time.time() - start)
+
+
+class CandidatePipeline:
+    """Runs each submitted candidate through the stages independently."""
+
+    def __init__(self, stages: List[PipelineStage], on_finalized: Optional[FinalizedCallback] = None):
+        self.stages = stages
+        self.on_finalized = on_finalized
+        self._tasks: List[asyncio.Task] = []
+        self._results: Dict[int, Dict[str, Any]] = {}
+        self._started_at: Optional[float] = None
+
+    def submit(self, candidate: Dict[str, Any]) -> int:
+        """Start a candidate through the pipeline; returns its index."""
+        if self._started_at is None:
+            self._started_at = time.time()
+        index = len(self._tasks)
+        self._tasks.append(asyncio.create_task(self._run_candidate(index, candidate)))
+        return index
+
+    async def _run_candidate(self, index: int, candidate: Dict[str, Any]) -> None:
+        for stage in self.stages:
+            try:
+                updated = await stage.run(index, candidate)
+                if isinstance(updated, dict):
+                    candidate = updated
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A failed stage must not drop the candidate; later stages still run
+                stage.errors += 1
+                logger.warning("[Candidate Pipeline] Stage '%s' failed for %s: %s", stage.name, candidate.get('name', 'Unknown'), e)
+
+        self._results[index] = candidate
+        if self.on_finalized is not None:
+            try:
+                self.on_finalized(index, candidate)
+            except Exception as e:
+                logger.warning("[Candidate Pipeline] Finalized callback failed: %s", e)
+
+    @property
+    def submitted(self) -> int:
+        return len(self._tasks)
+
+    async def finish(self) -> List[Dict[str, Any]]:
+        """Wait for every submitted candidate and return them in submission order."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        return [self._results[i] for i in sorted(self._results)]
+
+    async def cancel(self) -> None:
+        """Cancel candidates that are still in flight."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage timings and overall wall time."""
+        return {
+            "candidates": len(self._tasks),
+            "wall_time": round(time.time() - self._started_at, 3) if self._started_at else 0.0,
+            "stages": {
+                stage.name: {
+                    "runs": len(stage.durations),
+                    "errors": stage.errors,
+                    "total_time": round(sum(stage.durations), 3),
+                    "max_time": round(max(stage.durations), 3) if stage.durations else 0.0,
+                }
+                for stage in self.stages
+            },
+        }
@@ -14,6 +14,13 @@ from dataclasses import dataclass
 from enhanced_url_evidence_finder import EnhancedURLEvidenceFinder
 from explanation_analyzer import SearchableClaim, ClaimType
 from web_search_engine import WebSearchEngine
+from deadline import budget_short, budget_timeout
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Below this much remaining search budget the web search is skipped for fallback URLs
+MIN_WEB_SEARCH_SECONDS = 2.0
 
 
 @dataclass
@@ -46,9 +53,9 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         """
         self.search_context = self._analyze_search_context(search_prompt)
         if self.search_context:
-            print(f"[Context-Aware Evidence] Search context: {self.search_context.industry} | {self.search_context.role_type} | {self.search_context.activity_type}")
+            logger.info("[Context-Aware Evidence] Search context: %s | %s | %s", self.search_context.industry, self.search_context.role_type, self.search_context.activity_type)
         else:
-            print("[Context-Aware Evidence] No search context provided")
+            logger.info("[Context-Aware Evidence] No search context provided")
     
     def _analyze_search_context(self, search_prompt: str) -> SearchContext:
         """
@@ -161,14 +168,14 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         batch_start_time = time.time()
         
         if not self.search_context:
-            print("[Context-Aware Evidence] Warning: No search context set. Using generic evidence finding.")
+            logger.warning("[Context-Aware Evidence] No search context set. Using generic evidence finding.")
             try:
                 return await super().process_candidates_batch(candidates)
             except Exception as e:
-                print(f"[Context-Aware Evidence] Error in generic evidence finding: {e}")
+                logger.warning("[Context-Aware Evidence] Error in generic evidence finding: %s", e)
                 return candidates  # Return original candidates if everything fails
         
-        print(f"[Context-Aware Evidence] Processing {len(candidates)} candidates with context: {self.search_context.industry}")
+        logger.info("[Context-Aware Evidence] Processing %s candidates with context: %s", len(candidates), self.search_context.industry)
         
         enhanced_candidates = []
         successful_count = 0
@@ -186,7 +193,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
                     failed_count += 1
                     
             except Exception as e:
-                print(f"[Context-Aware Evidence] Error processing candidate {candidate.get('name', 'Unknown')}: {e}")
+                logger.warning("[Context-Aware Evidence] Error processing candidate %s: %s", candidate.get('name', 'Unknown'), e)
                 # Ensure candidate processing continues even when evidence finding fails
                 candidate_copy = candidate.copy()
                 candidate_copy['evidence_urls'] = []
@@ -200,7 +207,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         
         # Add batch processing summary
         batch_processing_time = time.time() - batch_start_time
-        print(f"[Context-Aware Evidence] Batch completed in {batch_processing_time:.2f}s: {successful_count} successful, {failed_count} failed")
+        logger.info("[Context-Aware Evidence] Batch completed in %.2fs: %s successful, %s failed", batch_processing_time, successful_count, failed_count)
         
         # Add batch metadata to first candidate (for frontend reference)
         if enhanced_candidates:
@@ -218,8 +225,8 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         """Process a single candidate with context awareness."""
         import time
         
-        # Track processing start time for status reporting
-        self._processing_start_time = time.time()
+        # Track processing start time for status reporting (a local: candidates share this finder concurrently)
+        processing_start_time = time.time()
         
         # Add initial processing status
         candidate['evidence_status'] = 'processing'
@@ -229,10 +236,10 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         search_queries = self._generate_contextual_queries(candidate)
         
         if not search_queries:
-            print(f"[Context-Aware Evidence] No contextual queries generated for {candidate.get('name', 'Unknown')}")
+            logger.debug("[Context-Aware Evidence] No contextual queries generated for %s", candidate.get('name', 'Unknown'))
             return candidate
         
-        print(f"[Context-Aware Evidence] Generated {len(search_queries)} contextual queries for {candidate.get('name', 'Unknown')}")
+        logger.debug("[Context-Aware Evidence] Generated %s contextual queries for %s", len(search_queries), candidate.get('name', 'Unknown'))
         
         # Execute searches with new real web search engine
         from web_search_engine import WebSearchEngine, load_search_config_safely
@@ -240,14 +247,14 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
             config = load_search_config_safely()
             web_search = WebSearchEngine(config)
         except Exception as e:
-            print(f"[Context-Aware Evidence] Error initializing web search: {e}")
+            logger.warning("[Context-Aware Evidence] Error initializing web search: %s", e)
             # Use fallback URLs if initialization fails
             evidence_urls = self._generate_contextual_fallback_urls()
-            print(f"[Context-Aware Evidence] Using {len(evidence_urls)} fallback URLs due to initialization error")
+            logger.warning("[Context-Aware Evidence] Using %s fallback URLs due to initialization error", len(evidence_urls))
             
             # Add error status information
             import time
-            processing_time = time.time() - getattr(self, '_processing_start_time', time.time())
+            processing_time = time.time() - processing_start_time
             
             if evidence_urls:
                 candidate['evidence_urls'] = [self._format_evidence_url(url) for url in evidence_urls]
@@ -267,41 +274,46 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
             return candidate
         search_results = []
         
-        try:
-            # Execute search with reasonable timeout - the new search engine is much faster
-            search_task = asyncio.create_task(self._execute_searches(web_search, search_queries[:2]))  # Try 2 queries
-            search_results = await asyncio.wait_for(search_task, timeout=10.0)  # Longer timeout since real search is reliable
-            print(f"[Context-Aware Evidence] Search completed successfully for {candidate.get('name', 'Unknown')}")
-        except asyncio.TimeoutError:
-            print(f"[Context-Aware Evidence] Search timed out after 10s, using fallback URLs for {candidate.get('name', 'Unknown')}")
-            search_results = []
-        except AttributeError as e:
-            print(f"[Context-Aware Evidence] Configuration error: {e}, using fallback URLs for {candidate.get('name', 'Unknown')}")
-            search_results = []
-        except Exception as e:
-            print(f"[Context-Aware Evidence] Search failed with error: {type(e).__name__}: {e}, using fallback URLs for {candidate.get('name', 'Unknown')}")
-            search_results = []
+        # Capped by the search's latency budget; with too little left, go straight to fallback URLs
+        search_timeout = budget_timeout(10.0)
+        if budget_short(MIN_WEB_SEARCH_SECONDS):
+            logger.info("[Context-Aware Evidence] Search budget nearly spent, using fallback URLs for %s", candidate.get('name', 'Unknown'))
+        else:
+            try:
+                # Execute search with reasonable timeout - the new search engine is much faster
+                search_task = asyncio.create_task(self._execute_searches(web_search, search_queries[:2]))  # Try 2 queries
+                search_results = await asyncio.wait_for(search_task, timeout=search_timeout)
+                logger.debug("[Context-Aware Evidence] Search completed successfully for %s", candidate.get('name', 'Unknown'))
+            except asyncio.TimeoutError:
+                logger.warning("[Context-Aware Evidence] Search timed out after %.1fs, using fallback URLs for %s", search_timeout, candidate.get('name', 'Unknown'))
+                search_results = []
+            except AttributeError as e:
+                logger.warning("[Context-Aware Evidence] Configuration error: %s, using fallback URLs for %s", e, candidate.get('name', 'Unknown'))
+                search_results = []
+            except Exception as e:
+                logger.warning("[Context-Aware Evidence] Search failed with error: %s: %s, using fallback URLs for %s", type(e).__name__, e, candidate.get('name', 'Unknown'))
+                search_results = []
         
         # Filter and validate URLs (skip validation for speed)
         try:
             evidence_urls = await self._extract_and_validate_urls(search_results)
         except Exception as e:
-            print(f"[Context-Aware Evidence] Error extracting URLs: {e}, using fallback URLs")
+            logger.warning("[Context-Aware Evidence] Error extracting URLs: %s, using fallback URLs", e)
             evidence_urls = []
         
         # If no URLs found from search results, generate contextual fallback URLs
         if not evidence_urls:
             try:
                 evidence_urls = self._generate_contextual_fallback_urls()
-                print(f"[Context-Aware Evidence] Using {len(evidence_urls)} contextual fallback URLs for {candidate.get('name', 'Unknown')}")
+                logger.debug("[Context-Aware Evidence] Using %s contextual fallback URLs for %s", len(evidence_urls), candidate.get('name', 'Unknown'))
             except Exception as e:
-                print(f"[Context-Aware Evidence] Error generating fallback URLs: {e}")
+                logger.warning("[Context-Aware Evidence] Error generating fallback URLs: %s", e)
                 evidence_urls = []
         
         # Create enhanced candidate response with comprehensive status information
         import time
         processing_end_time = time.time()
-        processing_time = processing_end_time - getattr(self, '_processing_start_time', processing_end_time)
+        processing_time = processing_end_time - processing_start_time
         
         if evidence_urls:
             candidate['evidence_urls'] = [self._format_evidence_url(url) for url in evidence_urls]
@@ -310,7 +322,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
             candidate['evidence_status'] = 'completed'
             candidate['evidence_processing_time'] = round(processing_time, 2)
             candidate['evidence_completion_timestamp'] = time.strftime('%Y-%m-%d %H:%M:%S')
-            print(f"[Context-Aware Evidence] Found {len(evidence_urls)} relevant URLs for {candidate.get('name', 'Unknown')}")
+            logger.debug("[Context-Aware Evidence] Found %s relevant URLs for %s", len(evidence_urls), candidate.get('name', 'Unknown'))
         else:
             candidate['evidence_urls'] = []
             candidate['evidence_summary'] = "No contextually relevant evidence URLs found"
@@ -318,7 +330,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
             candidate['evidence_status'] = 'completed_no_results'
             candidate['evidence_processing_time'] = round(processing_time, 2)
             candidate['evidence_completion_timestamp'] = time.strftime('%Y-%m-%d %H:%M:%S')
-            print(f"[Context-Aware Evidence] No relevant URLs found for {candidate.get('name', 'Unknown')}")
+            logger.debug("[Context-Aware Evidence] No relevant URLs found for %s", candidate.get('name', 'Unknown'))
         
         return candidate
     
@@ -328,7 +340,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         # Get the original search prompt for behavioral context extraction
         search_prompt = self.search_context.search_prompt if self.search_context else self._build_search_prompt()
         
-        print(f"[Context-Aware Evidence] Using search prompt for behavioral query generation: {search_prompt}")
+        logger.debug("[Context-Aware Evidence] Using search prompt for behavioral query generation: %s", search_prompt)
         
         # Start with empty queries list - we'll build behavioral queries
         queries = []
@@ -343,7 +355,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         
         # SPECIAL HANDLING FOR REAL ESTATE QUERIES
         if self.search_context.industry == 'real_estate':
-            print(f"[Context-Aware Evidence] Detected real estate query, generating location-specific queries")
+            logger.debug("[Context-Aware Evidence] Detected real estate query, generating location-specific queries")
             
             # Extract location from original search prompt
             import re
@@ -374,7 +386,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
                     f"{location} real estate agents"
                 ]
                 queries.extend(real_estate_queries)
-                print(f"[Context-Aware Evidence] Generated {len(real_estate_queries)} real estate queries for {location}")
+                logger.debug("[Context-Aware Evidence] Generated %s real estate queries for %s", len(real_estate_queries), location)
             else:
                 # Generic real estate queries if no location found
                 queries.extend([
@@ -406,13 +418,13 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
             original_prompt = self.search_context.search_prompt if self.search_context else ""
             
             if original_prompt:
-                print(f"[Context-Aware Evidence] Extracting behavioral context from: {original_prompt}")
+                logger.debug("[Context-Aware Evidence] Extracting behavioral context from: %s", original_prompt)
                 
                 behavioral_context = extractor.extract_behavioral_context(original_prompt)
                 
-                print(f"[Context-Aware Evidence] Behavioral focus: {behavioral_context.behavioral_focus}")
-                print(f"[Context-Aware Evidence] Products: {behavioral_context.products}")
-                print(f"[Context-Aware Evidence] Activities: {behavioral_context.activities}")
+                logger.debug("[Context-Aware Evidence] Behavioral focus: %s", behavioral_context.behavioral_focus)
+                logger.debug("[Context-Aware Evidence] Products: %s", behavioral_context.products)
+                logger.debug("[Context-Aware Evidence] Activities: %s", behavioral_context.activities)
                 
                 # CRITICAL FIX: Use full behavioral focus to preserve context like "HRM platforms"
                 primary_focus = extractor.get_primary_behavioral_focus(behavioral_context)
@@ -445,16 +457,16 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
                     for intent in behavioral_context.intent_keywords:
                         queries.append(f"{primary_focus} {intent}")
                 
-                print(f"[Context-Aware Evidence] Generated {len(queries)} behavioral queries")
+                logger.debug("[Context-Aware Evidence] Generated %s behavioral queries", len(queries))
                 
         except ImportError as e:
-            print(f"[Context-Aware Evidence] Could not import behavioral context extractor: {e}")
+            logger.info("[Context-Aware Evidence] Could not import behavioral context extractor: %s", e)
         except Exception as e:
-            print(f"[Context-Aware Evidence] Error in behavioral context extraction: {e}")
+            logger.warning("[Context-Aware Evidence] Error in behavioral context extraction: %s", e)
         
         # Fallback: Generate generic industry queries if no behavioral context found
         if not queries:
-            print(f"[Context-Aware Evidence] No behavioral context found, using generic industry queries")
+            logger.debug("[Context-Aware Evidence] No behavioral context found, using generic industry queries")
             
             # Generate safe, non-role-based queries
             if self.search_context and self.search_context.industry:
@@ -490,7 +502,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
             # Skip queries that might contain personal names
             if name and (name.lower() in query.lower() or 
                         any(name_part.lower() in query.lower() for name_part in name.split() if len(name_part) > 2)):
-                print(f"[BLOCKED NAME-BASED QUERY]: {query}")
+                logger.debug("[BLOCKED NAME-BASED QUERY]: %s", query)
                 continue
             safe_queries.append(query)
         
@@ -565,7 +577,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         
         for query_str in search_queries:
             try:
-                print(f"[Context-Aware Evidence] Searching: {query_str}")
+                logger.debug("[Context-Aware Evidence] Searching: %s", query_str)
                 
                 # Create SearchQuery object
                 search_query = SearchQuery(
@@ -580,7 +592,7 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
                 results = await web_search.search_for_evidence([search_query])
                 search_results.extend(results)
             except Exception as e:
-                print(f"[Context-Aware Evidence] Search failed for query '{query_str}': {e}")
+                logger.warning("[Context-Aware Evidence] Search failed for query '%s': %s", query_str, e)
         
         return search_results
     
@@ -629,14 +641,14 @@ class ContextAwareEvidenceFinder(EnhancedURLEvidenceFinder):
         unique_urls = list(dict.fromkeys(filtered_urls))
         
         if unique_urls:
-            print(f"[Context-Aware Evidence] Found {len(unique_urls[:5])} high-quality specific URLs")
+            logger.debug("[Context-Aware Evidence] Found %s high-quality specific URLs", len(unique_urls[:5]))
             if high_quality_urls:
                 avg_score = sum(c['specificity_score'] for c in high_quality_urls[:5]) / min(5, len(high_quality_urls))
-                print(f"[Context-Aware Evidence] Average specificity score: {avg_score:.2f}")
+                logger.debug("[Context-Aware Evidence] Average specificity score: %.2f", avg_score)
             return unique_urls[:5]
         else:
             # If no high-quality results, return original results but log the issue
-            print(f"[Context-Aware Evidence] No high-quality specific results found, using all results")
+            logger.debug("[Context-Aware Evidence] No high-quality specific results found, using all results")
             fallback_urls = [candidate['url'] for candidate in url_candidates]
             return list(dict.fromkeys(fallback_urls))[:5]
     
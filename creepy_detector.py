@@ -5,25 +5,96 @@ This module detects when users are searching for specific individuals by name
 and returns witty responses to discourage stalking behavior.
 """
 
-import os
-import json
 import random
 import re
+from functools import lru_cache
 from typing import Dict, Any, Optional
-from openai import OpenAI
 
-# Load API keys from secrets.json if not in environment
-if not os.getenv('OPENAI_API_KEY'):
-    try:
-        with open("secrets.json", "r") as f:
-            secrets = json.load(f)
-            # Handle both uppercase and lowercase key names for compatibility
-            os.environ['OPENAI_API_KEY'] = secrets.get('openai_api_key', '') or secrets.get('OPENAI_API_KEY', '')
-    except (FileNotFoundError, json.JSONDecodeError):
-        pass
+# Name detection rules, compiled once at import
+# Capitalized word pairs that are likely names (at least 3 letters each), not at the start of a sentence
+_FULL_NAME_RE = re.compile(r'(?<!^)(?<!\. )\b[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\b')
+# Names at the beginning of the prompt
+_START_NAME_RE = re.compile(r'^[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\b')
+# Single names: "named John", "called Mary", "find Sarah from/at/in/who/that", "looking for John at ..."
+_SINGLE_NAME_RE = re.compile(
+    r'\b(?:named|called)\s+([A-Z][a-z]{2,})\b'
+    r'|\b(?:find|get|show|looking\s+for|search\s+for|want|need)\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',
+    re.IGNORECASE
+)
+# Specific title at specific company ("the CEO at Apple", "find the CTO at Google") is also creepy
+_SPECIFIC_TITLE_RE = re.compile(
+    r'\bthe\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b',
+    re.IGNORECASE
+)
 
-# Set up OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Common non-name patterns (locations, business terms, job titles, etc.)
+_COMMON_NON_NAME_LIST = [
+    # Geographic locations
+    "New York", "San Francisco", "Los Angeles", "Las Vegas", "New Jersey",
+    "North Carolina", "South Carolina", "West Virginia", "East Coast", "West Coast",
+    "North America", "South America", "Middle East", "United States", "United Kingdom",
+    "New Zealand", "Costa Rica", "Puerto Rico", "Hong Kong", "South Korea",
+    
+    # Business/Professional terms
+    "Real Estate", "Social Media", "Machine Learning", "Data Science", "Artificial Intelligence",
+    "Chief Executive", "Vice President", "Human Resources", "Customer Service", "Business Development",
+    "Project Management", "Quality Assurance", "Information Technology", "Digital Marketing",
+    "Content Marketing", "Email Marketing", "Search Engine", "Customer Success", "Sales Manager",
+    "Marketing Director", "Software Engineer", "Data Analyst", "Product Manager", "Account Manager",
+    
+    # Company/Organization types
+    "Fortune Five", "Goldman Sachs", "Morgan Stanley", "Wells Fargo", "Bank America", "American Express",
+    "General Electric", "Johnson Johnson", "Procter Gamble", "Coca Cola", "Home Depot", "Best Buy",
+    "Credit Card", "Mutual Fund", "Private Equity", "Venture Capital", "Investment Banking",
+    
+    # Technology/Software terms
+    "Open Source", "Cloud Computing", "Big Data", "Internet Things", "Virtual Reality",
+    "Augmented Reality", "Cyber Security", "Block Chain", "Neural Network",
+    
+    # Common job-related words that might be capitalized
+    "Manager", "Managers", "Director", "Directors", "Engineer", "Engineers", "Developer", "Developers", "Analyst", "Analysts", "Specialist", "Specialists", "Coordinator", "Coordinators",
+    "Assistant", "Assistants", "Executive", "Executives", "Officer", "Officers", "Representative", "Representatives", "Consultant", "Consultants", "Administrator", "Administrators", "Founder", "Founders", "Co-founder", "Co-founders", "CoFounder", "CoFounders", "CEO", "CEOs", "CTO", "CTOs", "CFO", "CFOs", "COO", "COOs", "CMO", "CMOs", "CISO", "CISOs", "VP", "VPs", "President", "Presidents", "Owner", "Owners", "Managing Director", "Managing Directors",
+    
+    # Common words that might be mistaken for names
+    "Find", "Get", "Show", "Looking", "Search", "Tell", "Give", "Bring", "Send", "Take",
+    "Make", "Create", "Build", "Design", "Develop", "Write", "Read", "Open", "Close",
+    "Start", "Stop", "Begin", "End", "Help", "Support", "Service", "Team", "Group",
+    "Company", "Business", "Organization", "Department", "Division", "Unit", "Office",
+    "What", "Where", "When", "Why", "How", "Who", "Which", "That", "This", "These", "Those",
+    "Someone", "Anyone", "Everyone", "Nobody", "Somebody", "Anybody", "Everybody",
+    "People", "Person", "Individuals", "Folks", "Candidates", "Professionals",
+    
+    # Professional terms that might be capitalized
+    "Marketing", "Sales", "Finance", "Technology", "Engineering", "Operations", "Legal",
+    "Professionals", "Executives", "Leaders", "Managers", "Directors", "Officers",
+    "CEOs", "CTOs", "CFOs", "CMOs", "VPs", "Developers", "Engineers", "Analysts", "Specialists",
+    
+    # Additional job titles and professional terms
+    "Chief Marketing Officer", "Chief Technology Officer", "Chief Financial Officer", "Chief Operating Officer",
+    "Software Engineers", "Marketing Directors", "Sales Managers", "Product Managers", "Data Scientists",
+    "Business Analysts", "Project Managers", "Account Executives", "Customer Success Managers",
+    "DevOps Engineers", "Full Stack Developers", "Frontend Developers", "Backend Developers",
+    "UX Designers", "UI Designers", "Graphic Designers", "Content Creators", "Social Media Managers",
+    "Digital Marketers", "Growth Hackers", "SEO Specialists", "PPC Specialists", "Email Marketers",
+    "Business Development", "Sales Development", "Account Management", "Customer Support",
+    "Technical Writers", "Quality Assurance", "Software Testers", "System Administrators",
+    "Network Engineers", "Security Engineers", "Cloud Engineers", "Machine Learning Engineers",
+    "Data Engineers", "Research Scientists", "Product Owners", "Scrum Masters", "Agile Coaches"
+]
+
+_COMMON_NON_NAMES = frozenset(name.lower() for name in _COMMON_NON_NAME_LIST)
+
+
+@lru_cache(maxsize=1024)
+def _research_interest_re(name: str) -> "re.Pattern":
+    """Prompts that mention a name as a research interest ("people interested in Donald Trump")."""
+    escaped = re.escape(name)
+    return re.compile(
+        r'(?:\b(?:interested in|researching|studying|following|tracking|monitoring|watching)\b|\b(?:who|people|someone))'
+        r'.*\b' + escaped + r'\b'
+        r'|\b' + escaped + r'\b.*\b(?:policies|authoritarian|politics|campaign|election)\b',
+        re.IGNORECASE
+    )
 
 def detect_specific_person_search(prompt: str, user_first_name: str = None) -> Dict[str, Any]:
     """
@@ -38,51 +109,11 @@ def detect_specific_person_search(prompt: str, user_first_name: str = None) -> D
         Dictionary with detection results and witty response if needed
     """
     
-    # Check for full names (First Last pattern) - be more specific to avoid false positives
-    # Look for capitalized words that are likely names (at least 3 letters each)
-    full_name_pattern = r'(?<!^)(?<!\. )\b[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\b'
-    full_names = re.findall(full_name_pattern, prompt)
-    
-    # Also check for names at the beginning of sentences (but be more restrictive)
-    start_name_pattern = r'^[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\b'
-    start_full_names = re.findall(start_name_pattern, prompt)
-    
-    # Check for single names that could be first names or last names
-    # Look for patterns like "named John", "called Mary", but be more specific to avoid job titles
-    single_name_patterns = [
-        r'\bnamed\s+([A-Z][a-z]{2,})\b',  # "named John"
-        r'\bcalled\s+([A-Z][a-z]{2,})\b',  # "called Mary"
-        r'\bfind\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',  # "find Sarah from/at/in/who/that" (more specific)
-        r'\bget\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',  # "get David from/at/in/who/that" (more specific)
-        r'\bshow\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',  # "show Lisa from/at/in/who/that" (more specific)
-        r'\blooking\s+for\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',  # "looking for John from/at/in/who/that"
-        r'\bsearch\s+for\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',  # "search for Mary from/at/in/who/that"
-        r'\bwant\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',  # "want Sarah from/at/in/who/that"
-        r'\bneed\s+([A-Z][a-z]{2,})\s+(?:from|at|in|who|that)\b',  # "need David from/at/in/who/that"
-        # Remove the overly broad patterns that were catching job titles
-    ]
-    
-    single_names = []
-    for pattern in single_name_patterns:
-        matches = re.findall(pattern, prompt, re.IGNORECASE)
-        single_names.extend(matches)
-    
-    # Check for specific title at specific company patterns (also creepy)
-    # Like "the CEO at Apple", "the marketing director at Google", etc.
-    specific_title_patterns = [
-        r'\bthe\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b',  # "the CEO at Apple"
-        r'\bfind\s+the\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b',  # "find the CTO at Google"
-        r'\bget\s+me\s+the\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b',  # "get me the VP at Microsoft"
-    ]
-    
-    specific_titles = []
-    for pattern in specific_title_patterns:
-        matches = re.findall(pattern, prompt, re.IGNORECASE)
-        for match in matches:
-            # match is a tuple like ("CEO", "Apple") - we'll use the company name as the "detected name"
-            if len(match) == 2:
-                title, company = match
-                specific_titles.append(f"the {title} at {company}")
+    full_names = _FULL_NAME_RE.findall(prompt)
+    start_full_names = _START_NAME_RE.findall(prompt)
+    single_names = [a or b for a, b in _SINGLE_NAME_RE.findall(prompt)]
+    # match is a tuple like ("CEO", "Apple") - we'll use the company name as the "detected name"
+    specific_titles = [f"the {title} at {company}" for title, company in _SPECIFIC_TITLE_RE.findall(prompt)]
     
     # Combine all potential names and specific title searches
     all_potential_names = full_names + start_full_names + single_names + specific_titles
@@ -90,93 +121,14 @@ def detect_specific_person_search(prompt: str, user_first_name: str = None) -> D
     if not all_potential_names:
         return {"is_creepy": False, "detected_names": [], "response": None}
     
-    # Filter out common non-name patterns (locations, business terms, job titles, etc.)
-    common_non_names = [
-        # Geographic locations
-        "New York", "San Francisco", "Los Angeles", "Las Vegas", "New Jersey",
-        "North Carolina", "South Carolina", "West Virginia", "East Coast", "West Coast",
-        "North America", "South America", "Middle East", "United States", "United Kingdom",
-        "New Zealand", "Costa Rica", "Puerto Rico", "Hong Kong", "South Korea",
-        
-        # Business/Professional terms
-        "Real Estate", "Social Media", "Machine Learning", "Data Science", "Artificial Intelligence",
-        "Chief Executive", "Vice President", "Human Resources", "Customer Service", "Business Development",
-        "Project Management", "Quality Assurance", "Information Technology", "Digital Marketing",
-        "Content Marketing", "Email Marketing", "Search Engine", "Customer Success", "Sales Manager",
-        "Marketing Director", "Software Engineer", "Data Analyst", "Product Manager", "Account Manager",
-        
-        # Company/Organization types
-        "Fortune Five", "Goldman Sachs", "Morgan Stanley", "Wells Fargo", "Bank America", "American Express",
-        "General Electric", "Johnson Johnson", "Procter Gamble", "Coca Cola", "Home Depot", "Best Buy",
-        "Credit Card", "Mutual Fund", "Private Equity", "Venture Capital", "Investment Banking",
-        
-        # Technology/Software terms
-        "Open Source", "Cloud Computing", "Big Data", "Internet Things", "Virtual Reality",
-        "Augmented Reality", "Cyber Security", "Block Chain", "Neural Network",
-        
-        # Common job-related words that might be capitalized
-        "Manager", "Managers", "Director", "Directors", "Engineer", "Engineers", "Developer", "Developers", "Analyst", "Analysts", "Specialist", "Specialists", "Coordinator", "Coordinators",
-        "Assistant", "Assistants", "Executive", "Executives", "Officer", "Officers", "Representative", "Representatives", "Consultant", "Consultants", "Administrator", "Administrators", "Founder", "Founders", "Co-founder", "Co-founders", "CoFounder", "CoFounders", "CEO", "CEOs", "CTO", "CTOs", "CFO", "CFOs", "COO", "COOs", "CMO", "CMOs", "CISO", "CISOs", "VP", "VPs", "President", "Presidents", "Owner", "Owners", "Managing Director", "Managing Directors",
-        
-        # Common words that might be mistaken for names
-        "Find", "Get", "Show", "Looking", "Search", "Tell", "Give", "Bring", "Send", "Take",
-        "Make", "Create", "Build", "Design", "Develop", "Write", "Read", "Open", "Close",
-        "Start", "Stop", "Begin", "End", "Help", "Support", "Service", "Team", "Group",
-        "Company", "Business", "Organization", "Department", "Division", "Unit", "Office",
-        "What", "Where", "When", "Why", "How", "Who", "Which", "That", "This", "These", "Those",
-        "Someone", "Anyone", "Everyone", "Nobody", "Somebody", "Anybody", "Everybody",
-        "People", "Person", "Individuals", "Folks", "Candidates", "Professionals",
-        
-        # Professional terms that might be capitalized
-        "Marketing", "Sales", "Finance", "Technology", "Engineering", "Operations", "Legal",
-        "Professionals", "Executives", "Leaders", "Managers", "Directors", "Officers",
-        "CEOs", "CTOs", "CFOs", "CMOs", "VPs", "Developers", "Engineers", "Analysts", "Specialists",
-        
-        # Additional job titles and professional terms
-        "Chief Marketing Officer", "Chief Technology Officer", "Chief Financial Officer", "Chief Operating Officer",
-        "Software Engineers", "Marketing Directors", "Sales Managers", "Product Managers", "Data Scientists",
-        "Business Analysts", "Project Managers", "Account Executives", "Customer Success Managers",
-        "DevOps Engineers", "Full Stack Developers", "Frontend Developers", "Backend Developers",
-        "UX Designers", "UI Designers", "Graphic Designers", "Content Creators", "Social Media Managers",
-        "Digital Marketers", "Growth Hackers", "SEO Specialists", "PPC Specialists", "Email Marketers",
-        "Business Development", "Sales Development", "Account Management", "Customer Support",
-        "Technical Writers", "Quality Assurance", "Software Testers", "System Administrators",
-        "Network Engineers", "Security Engineers", "Cloud Engineers", "Machine Learning Engineers",
-        "Data Engineers", "Research Scientists", "Product Owners", "Scrum Masters", "Agile Coaches"
-    ]
-    
     # Filter out the common non-names (case insensitive)
-    actual_names = []
-    for name in all_potential_names:
-        if not any(non_name.lower() == name.lower() for non_name in common_non_names):
-            actual_names.append(name)
+    actual_names = [name for name in all_potential_names if name.lower() not in _COMMON_NON_NAMES]
     
     if not actual_names:
         return {"is_creepy": False, "detected_names": [], "response": None}
     
     # Check if this is a legitimate research interest search vs. looking for the person directly
-    research_interest_patterns = [
-        r'\binterested in\b.*\b' + re.escape(actual_names[0]) + r'\b',  # "interested in Donald Trump"
-        r'\bresearching\b.*\b' + re.escape(actual_names[0]) + r'\b',    # "researching Donald Trump"
-        r'\bstudying\b.*\b' + re.escape(actual_names[0]) + r'\b',       # "studying Donald Trump"
-        r'\bfollowing\b.*\b' + re.escape(actual_names[0]) + r'\b',      # "following Donald Trump"
-        r'\btracking\b.*\b' + re.escape(actual_names[0]) + r'\b',       # "tracking Donald Trump"
-        r'\bmonitoring\b.*\b' + re.escape(actual_names[0]) + r'\b',     # "monitoring Donald Trump"
-        r'\bwatching\b.*\b' + re.escape(actual_names[0]) + r'\b',       # "watching Donald Trump"
-        r'\b' + re.escape(actual_names[0]) + r'\b.*\bpolicies\b',       # "Donald Trump policies"
-        r'\b' + re.escape(actual_names[0]) + r'\b.*\bauthoritarian\b',  # "Donald Trump authoritarian"
-        r'\b' + re.escape(actual_names[0]) + r'\b.*\bpolitics\b',       # "Donald Trump politics"
-        r'\b' + re.escape(actual_names[0]) + r'\b.*\bcampaign\b',       # "Donald Trump campaign"
-        r'\b' + re.escape(actual_names[0]) + r'\b.*\belection\b',       # "Donald Trump election"
-        r'\bwho.*\b' + re.escape(actual_names[0]) + r'\b',              # "who [verb] Donald Trump"
-        r'\bpeople.*\b' + re.escape(actual_names[0]) + r'\b',           # "people [interested in] Donald Trump"
-        r'\bsomeone.*\b' + re.escape(actual_names[0]) + r'\b',          # "someone [interested in] Donald Trump"
-    ]
-    
-    # Check if any research interest patterns match
-    is_research_interest = any(re.search(pattern, prompt, re.IGNORECASE) for pattern in research_interest_patterns)
-    
-    if is_research_interest:
+    if _research_interest_re(actual_names[0]).search(prompt):
         return {"is_creepy": False, "detected_names": [], "response": None}
     
     # ULTRA STRICT MODE: Block searches that are looking for the person directly
@@ -1,40 +1,68 @@
+import base64
 import json
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 from datetime import datetime, timezone
+from metrics import DB_WRITE_SECONDS
+from candidate_index import CandidateIndex, canonical_linkedin_url
+from json_codec import decode_column, encode_column
+# Built on first query; a no-op dummy when Supabase is not configured
+from services import supabase
+from structured_logging import get_logger
 
-try:
-    from supabase_client import supabase
-except Exception:
-    class DummySupabase:
-        def table(self, name):
-            return DummyTable()
-    
-    class DummyTable:
-        def select(self, *args, **kwargs):
-            return self
-        def insert(self, data):
-            return self
-        def upsert(self, data):
-            return self
-        def delete(self):
-            return self
-        def eq(self, field, value):
-            return self
-        def order(self, field, desc=False):
-            return self
-        def limit(self, limit):
-            return self
-        def single(self):
-            return self
-        def execute(self):
-            return DummyResult()
+logger = get_logger(__name__)
+
+# Columns that may be requested through the API fields= projection
+SEARCH_FIELDS = {
+    'id', 'request_id', 'status', 'prompt', 'filters', 'created_at', 'completed_at',
+    'error', 'estimated_count', 'result_estimation', 'cached', 'cached_from_request_id'
+}
+PEOPLE_FIELDS = {
+    'id', 'search_id', 'name', 'title', 'company', 'email', 'linkedin_url',
+    'profile_photo_url', 'location', 'accuracy', 'reasons', 'linkedin_profile',
+    'linkedin_posts', 'behavioral_data', 'evidence_urls', 'evidence_summary', 'evidence_confidence'
+}
+# Lightweight projection for pollers that only need to know whether a search is done
+# Valid searches.status values; "cancelled" is set when a user stops a running search
+SEARCH_STATUSES = ("processing", "completed", "failed", "cancelled")
+TERMINAL_SEARCH_STATUSES = ("completed", "failed", "cancelled")
+
+SEARCH_STATUS_FIELDS = ('id', 'request_id', 'status', 'created_at', 'completed_at', 'error', 'estimated_count')
+
+def build_select(fields: Optional[Iterable[str]], allowed: set, required: Iterable[str] = ()) -> str:
+    """
+    Turn a fields projection into a Supabase select string.
     
-    class DummyResult:
-        def __init__(self):
-            self.data = []
-            self.count = 0
+    Raises ValueError for unknown columns so the API can return a 400.
+    """
+    if not fields:
+        return "*"
+    requested = [f.strip() for f in fields if f and f.strip()]
+    unknown = sorted(set(requested) - allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    columns = list(dict.fromkeys(list(required) + requested))
+    return ",".join(columns)
+
+def encode_search_cursor(search: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after this search (created_at, id)."""
+    raw = json.dumps([search.get("created_at"), search.get("id")])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_search_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor from encode_search_cursor.
     
-    supabase = DummySupabase()
+    Raises ValueError unless it holds an ISO timestamp and an integer id; the
+    timestamp is interpolated into a PostgREST filter, so nothing else may pass.
+    """
+    try:
+        created_at, search_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        datetime.fromisoformat(created_at)
+        return created_at, int(search_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
 
 def store_search_to_database(search_data: Dict[str, Any]) -> Optional[int]:
     try:
@@ -56,7 +84,8 @@ def store_search_to_database(search_data: Dict[str, Any]) -> Optional[int]:
         elif "id" in search_data:
             del search_data["id"]
         
-        res = supabase.table("searches").upsert(search_data).execute()
+        with DB_WRITE_SECONDS.time(table="searches", operation="upsert"):
+            res = supabase.table("searches").upsert(search_data).execute()
         
         if hasattr(res, 'data') and res.data:
             stored_id = res.data[0].get('id')
@@ -66,12 +95,13 @@ def store_search_to_database(search_data: Dict[str, Any]) -> Optional[int]:
     except Exception as e:
         return None
 
-def get_search_from_database(request_id: str) -> Optional[Dict[str, Any]]:
+def get_search_from_database(request_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
     try:
         if not request_id or not isinstance(request_id, str):
             return None
         
-        res = supabase.table("searches").select("*").eq("request_id", request_id).execute()
+        select = build_select(fields, SEARCH_FIELDS, required=('id', 'request_id', 'status'))
+        res = supabase.table("searches").select(select).eq("request_id", request_id).execute()
         
         if hasattr(res, 'data') and res.data:
             search_data = res.data[0]
@@ -81,50 +111,126 @@ def get_search_from_database(request_id: str) -> Optional[Dict[str, Any]]:
     except Exception as e:
         return None
 
+def get_search_status_from_database(request_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch only the status columns of a search, for cheap polling."""
+    return get_search_from_database(request_id, fields=SEARCH_STATUS_FIELDS)
+
+def _normalize_search_row(search: Dict[str, Any], projected: bool = False) -> None:
+    """Ensure listed searches have the required fields for backward compatibility."""
+    if not projected:
+        # Add estimated_count if missing
+        if "estimated_count" not in search or search["estimated_count"] is None:
+            search["estimated_count"] = None
+        
+        # Add result_estimation if missing
+        if "result_estimation" not in search or search["result_estimation"] is None:
+            search["result_estimation"] = None
+        
+        # Add error field if missing
+        if "error" not in search:
+            search["error"] = None
+    
+    # Ensure status is valid
+    if "status" in search or not projected:
+        if "status" not in search or search["status"] not in SEARCH_STATUSES:
+            # Determine status based on other fields
+            if search.get("error"):
+                search["status"] = "failed"
+            elif search.get("completed_at"):
+                search["status"] = "completed"
+            else:
+                search["status"] = "processing"
+
 def get_recent_searches_from_database(limit: int = 10) -> List[Dict[str, Any]]:
     try:
-        res = supabase.table("searches").select("*").order("created_at", desc=True).limit(limit).execute()
-        searches = res.data if hasattr(res, 'data') else []
-        
-        # Ensure all searches have the required fields for backward compatibility
-        for search in searches:
-            if isinstance(search, dict):
-                # Add estimated_count if missing
-                if "estimated_count" not in search or search["estimated_count"] is None:
-                    search["estimated_count"] = None
-                
-                # Add result_estimation if missing
-                if "result_estimation" not in search or search["result_estimation"] is None:
-                    search["result_estimation"] = None
-                
-                # Add error field if missing
-                if "error" not in search:
-                    search["error"] = None
-                
-                # Ensure status is valid
-                if "status" not in search or search["status"] not in ["processing", "completed", "failed"]:
-                    # Determine status based on other fields
-                    if search.get("error"):
-                        search["status"] = "failed"
-                    elif search.get("completed_at"):
-                        search["status"] = "completed"
-                    else:
-                        search["status"] = "processing"
-        
+        searches, _ = get_searches_page(limit=limit)
         return searches
     except Exception:
         return []
 
+def get_searches_page(limit: int = 10, cursor: Optional[str] = None,
+                      fields: Optional[Iterable[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset-paginated search listing, newest first.
+    
+    Pages are ordered by (created_at, id) descending and the cursor encodes the
+    last row returned, so each page is an indexed range scan no matter how deep
+    the client pages. Raises ValueError for a bad cursor or unknown fields.
+    
+    Returns:
+        (searches, next_cursor) where next_cursor is None on the last page
+    """
+    select = build_select(fields, SEARCH_FIELDS, required=('id', 'created_at'))
+    query = supabase.table("searches").select(select).order("created_at", desc=True).order("id", desc=True)
+    if cursor:
+        created_at, last_id = decode_search_cursor(cursor)
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id})')
+    
+    # Fetch one extra row to know whether another page exists
+    res = query.limit(limit + 1).execute()
+    searches = res.data if hasattr(res, 'data') and res.data else []
+    
+    has_more = len(searches) > limit
+    searches = searches[:limit]
+    for search in searches:
+        if isinstance(search, dict):
+            _normalize_search_row(search, projected=bool(fields))
+    
+    next_cursor = encode_search_cursor(searches[-1]) if has_more and searches else None
+    return searches, next_cursor
+
+def get_search_statuses_from_database(request_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Status columns for several searches in one query, keyed by request_id."""
+    if not request_ids:
+        return {}
+    try:
+        res = supabase.table("searches").select(",".join(SEARCH_STATUS_FIELDS)).in_("request_id", list(request_ids)).execute()
+        rows = res.data if hasattr(res, 'data') and res.data else []
+        return {row["request_id"]: row for row in rows if isinstance(row, dict) and row.get("request_id")}
+    except Exception as e:
+        logger.warning("[Database] Failed to load search statuses: %s", e)
+        return {}
+
+# JSON columns of the search_batches table (add_search_batches_table.sql)
+BATCH_JSON_FIELDS = ('items', 'timings')
+
+def store_batch_to_database(batch_data: Dict[str, Any]) -> bool:
+    """Insert or update a search batch, keyed by batch_id."""
+    try:
+        row = dict(batch_data)
+        for field in BATCH_JSON_FIELDS:
+            if field in row and not isinstance(row[field], str):
+                row[field] = encode_column(row[field])
+        with DB_WRITE_SECONDS.time(table="search_batches", operation="upsert"):
+            res = supabase.table("search_batches").upsert(row, on_conflict="batch_id").execute()
+        return bool(hasattr(res, 'data') and res.data)
+    except Exception as e:
+        logger.warning("[Database] Failed to store batch %s: %s", batch_data.get("batch_id"), e)
+        return False
+
+def get_batch_from_database(batch_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        res = supabase.table("search_batches").select("*").eq("batch_id", batch_id).execute()
+        if not (hasattr(res, 'data') and res.data):
+            return None
+        batch = res.data[0]
+        batch["items"] = decode_column(batch.get("items"), [])
+        batch["timings"] = decode_column(batch.get("timings"), {})
+        return batch
+    except Exception:
+        return None
+
 def delete_search_from_database(request_id: str) -> bool:
     try:
-        supabase.table("searches").delete().eq("request_id", request_id).execute()
+        with DB_WRITE_SECONDS.time(table="searches", operation="delete"):
+            supabase.table("searches").delete().eq("request_id", request_id).execute()
         return True
     except Exception:
         return False
 
 def store_people_to_database(search_id: int, people: List[Dict[str, Any]]) -> bool:
     try:
-        print(f"[Database] Attempting to store {len(people)} people for search_id {search_id}")
+        logger.debug("[Database] Attempting to store %s people for search_id %s", len(people), search_id)
         
         schema_fields = {
             'search_id', 'name', 'title', 'company', 'email', 'linkedin_url', 
@@ -133,17 +239,22 @@ def store_people_to_database(search_id: int, people: List[Dict[str, Any]]) -> bo
             'evidence_urls', 'evidence_summary', 'evidence_confidence'
         }
         
+        # The same person can arrive twice (e.g. from two pages); store them once
+        unique_people = CandidateIndex(p for p in people if isinstance(p, dict)).people()
+        if len(unique_people) < len(people):
+            logger.debug("[Database] Dropped %s duplicate people before storing", len(people) - len(unique_people))
+
         stored_count = 0
-        for i, person in enumerate(people):
+        for i, person in enumerate(unique_people):
             try:
                 filtered_person = {'search_id': search_id}
                 
                 for field in schema_fields:
                     if field in person and person[field] is not None:
                         if field in ['linkedin_profile', 'behavioral_data'] and isinstance(person[field], dict):
-                            filtered_person[field] = json.dumps(person[field])
+                            filtered_person[field] = encode_column(person[field])
                         elif field == 'evidence_urls' and isinstance(person[field], list):
-                            filtered_person[field] = json.dumps(person[field])
+                            filtered_person[field] = encode_column(person[field])
                         else:
                             filtered_person[field] = person[field]
                 
@@ -154,16 +265,19 @@ def store_people_to_database(search_id: int, people: List[Dict[str, Any]]) -> bo
                     elif isinstance(org, str):
                         filtered_person['company'] = org
                 
-                if 'linkedin_url' in filtered_person and not filtered_person['linkedin_url'].startswith('http'):
-                    filtered_person['linkedin_url'] = f"https://{filtered_person['linkedin_url']}"
+                if 'linkedin_url' in filtered_person:
+                    filtered_person['linkedin_url'] = canonical_linkedin_url(filtered_person['linkedin_url'])
+                    if not filtered_person['linkedin_url'].startswith('http'):
+                        filtered_person['linkedin_url'] = f"https://{filtered_person['linkedin_url']}"
                 
                 # Store the person in the database
-                result = supabase.table("people").insert(filtered_person).execute()
+                with DB_WRITE_SECONDS.time(table="people", operation="insert"):
+                    result = supabase.table("people").insert(filtered_person).execute()
                 stored_count += 1
-                print(f"[Database] Successfully stored person {i+1}: {filtered_person.get('name', 'Unknown')}")
+                logger.debug("[Database] Successfully stored person %s: %s", i+1, filtered_person.get('name', 'Unknown'))
                 
             except Exception as e:
-                print(f"[Database] Failed to store person {i+1}: {person.get('name', 'Unknown')} - Error: {str(e)}")
+                logger.warning("[Database] Failed to store person %s: %s - Error: %s", i+1, person.get('name', 'Unknown'), str(e))
                 continue
             
             # Don't automatically add to exclusions - let users decide
@@ -181,40 +295,32 @@ def store_people_to_database(search_id: int, people: List[Dict[str, Any]]) -> bo
             #     except Exception:
             #         pass
         
-        print(f"[Database] Successfully stored {stored_count} out of {len(people)} people")
+        logger.info("[Database] Successfully stored %s out of %s people", stored_count, len(unique_people))
         return stored_count > 0
         
     except Exception as e:
-        print(f"[Database] Failed to store people: {str(e)}")
+        logger.warning("[Database] Failed to store people: %s", str(e))
         return False
 
-def get_people_for_search(search_id: int) -> List[Dict[str, Any]]:
+def get_people_for_search(search_id: int, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
     try:
-        res = supabase.table("people").select("*").eq("search_id", search_id).execute()
+        select = build_select(fields, PEOPLE_FIELDS, required=('id',))
+        res = supabase.table("people").select(select).eq("search_id", search_id).execute()
         
         people = []
-        print(f"[DEBUG] Database query for search_id {search_id} returned {len(res.data) if hasattr(res, 'data') and res.data else 0} people")
+        logger.debug("Database query for search_id %s returned %s people", search_id, len(res.data) if hasattr(res, 'data') and res.data else 0)
         if hasattr(res, 'data'):
             for person in res.data:
                 for field in ['linkedin_profile', 'behavioral_data']:
                     if field in person and isinstance(person[field], str):
-                        try:
-                            person[field] = json.loads(person[field])
-                        except json.JSONDecodeError:
-                            person[field] = {}
+                        person[field] = decode_column(person[field], {})
                 
                 if 'reasons' in person and isinstance(person['reasons'], str):
-                    try:
-                        person['reasons'] = json.loads(person['reasons'])
-                    except json.JSONDecodeError:
-                        person['reasons'] = []
+                    person['reasons'] = decode_column(person['reasons'], [])
                 
                 # CRITICAL FIX: Deserialize evidence_urls from JSON string
                 if 'evidence_urls' in person and isinstance(person['evidence_urls'], str):
-                    try:
-                        person['evidence_urls'] = json.loads(person['evidence_urls'])
-                    except json.JSONDecodeError:
-                        person['evidence_urls'] = []
+                    person['evidence_urls'] = decode_column(person['evidence_urls'], [])
                 
                 people.append(person)
         
@@ -235,4 +341,23 @@ def get_current_exclusions() -> List[Dict[str, Any]]:
         res = supabase.table("exclusions").select("*").execute()
         return res.data if hasattr(res, 'data') else []
     except Exception:
-        return []
\ No newline at end of file
+        return []
+
+# Exclusions are managed outside the search path; one snapshot serves every
+# enrichment in this window instead of a query per person
+EXCLUSION_INDEX_TTL_SECONDS = 60
+_exclusion_index: Optional[CandidateIndex] = None
+_exclusion_index_loaded_at = 0.0
+_exclusion_index_lock = threading.Lock()
+
+def get_exclusion_index() -> CandidateIndex:
+    """Excluded people indexed by LinkedIn profile, reloaded every EXCLUSION_INDEX_TTL_SECONDS."""
+    global _exclusion_index, _exclusion_index_loaded_at
+    with _exclusion_index_lock:
+        if _exclusion_index is None or time.time() - _exclusion_index_loaded_at > EXCLUSION_INDEX_TTL_SECONDS:
+            # Only the LinkedIn URL identifies an excluded person; names alone are too ambiguous
+            _exclusion_index = CandidateIndex(
+                {"linkedin_url": row.get("linkedin_url")} for row in get_current_exclusions() if row.get("linkedin_url")
+            )
+            _exclusion_index_loaded_at = time.time()
+        return _exclusion_index
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency budget for a search.
+
+Timeouts used to be set stage by stage (60s per Apollo page, 30s/10s httpx
+clients, 10s context-aware search, 20s per candidate for evidence, the web
+search engine's own timeout) with up to five page attempts on top, so one
+search could run for several minutes. A Deadline is created when the search
+is accepted, travels with the queued job, and every stage sizes its timeout
+from what is left:
+
+    deadline = Deadline.start()                      # SEARCH_DEADLINE_SECONDS from now
+    timeout = deadline.timeout(cap=60, reserve=30)   # this stage's share, keeping 30s for later stages
+    if deadline.short(30):
+        ...                                          # take the cheaper path
+
+process_search and the Apollo client take the deadline as an argument. Code
+further down reads it from a context variable, so signatures stay unchanged:
+LLM calls go through budgeted_client() and the evidence finders use
+budget_timeout(). run_blocking and asyncio tasks copy the context, so the
+value follows the search into executor threads and pipeline stages.
+
+Configuration (environment variables):
+    SEARCH_DEADLINE_SECONDS   end-to-end budget per search (default 90)
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+DEFAULT_BUDGET_SECONDS = 90.0
+
+# Never hand out a timeout so small that the call cannot even start
+MIN_STAGE_SECONDS = 0.5
+
+# Below this much budget an LLM retry could only overrun the deadline
+RETRY_HEADROOM_SECONDS = 10.0
+
+
+def default_budget() -> float:
+    try:
+        return float(os.getenv("SEARCH_DEADLINE_SECONDS", DEFAULT_BUDGET_SECONDS))
+    except ValueError:
+        return DEFAULT_BUDGET_SECONDS
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """A wall-clock expiry (time.time()) plus the budget it was created with."""
+    expires_at: float
+    budget: float
+
+    @classmethod
+    def start(cls, budget: Optional[float] = None) -> "Deadline":
+        budget = default_budget() if budget is None else float(budget)
+        return cls(expires_at=time.time() + budget, budget=budget)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.time())
+
+    def elapsed(self) -> float:
+        return self.budget - (self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def short(self, needed: float) -> bool:
+        """True when less than `needed` seconds are left."""
+        return self.remaining() < needed
+
+    def timeout(self, cap: Optional[float] = None, share: float = 1.0, reserve: float = 0.0,
+                floor: float = MIN_STAGE_SECONDS) -> float:
+        """
+        Timeout for one stage.
+
+        The stage gets `share` of what is left after `reserve` seconds are set
+        aside for later stages, never more than `cap` and never less than `floor`.
+        """
+        available = (self.remaining() - reserve) * share
+        if cap is not None:
+            available = min(cap, available)
+        return max(floor, available)
+
+    def child(self, seconds: float) -> "Deadline":
+        """A sub-deadline for one stage, `seconds` from now (size it with timeout())."""
+        seconds = max(0.0, seconds)
+        return Deadline(expires_at=time.time() + seconds, budget=seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"expires_at": self.expires_at, "budget": self.budget}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Deadline"]:
+        if not data:
+            return None
+        try:
+            return cls(expires_at=float(data["expires_at"]), budget=float(data["budget"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("search_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def set_current_deadline(deadline: Optional[Deadline]):
+    """Make `deadline` visible to code running in this context; returns a token for reset."""
+    return _current_deadline.set(deadline)
+
+
+def reset_current_deadline(token) -> None:
+    _current_deadline.reset(token)
+
+
+def budget_timeout(default: Optional[float], share: float = 1.0, reserve: float = 0.0) -> Optional[float]:
+    """
+    Timeout for a call made on behalf of the current search.
+
+    Outside a search (no deadline set) this is just `default`; inside one it
+    is capped by the search's remaining budget.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return default
+    return deadline.timeout(cap=default, share=share, reserve=reserve)
+
+
+def budget_short(needed: float) -> bool:
+    """True when the current search has less than `needed` seconds left."""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.short(needed)
+
+
+def budgeted_client(client):
+    """
+    An OpenAI client whose requests fit in the current search's remaining budget.
+
+    Outside a search the client is returned unchanged. with_options() makes a
+    cheap copy that shares the underlying HTTP connection pool.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None or client is None:
+        return client
+    options = {"timeout": deadline.timeout()}
+    if deadline.short(RETRY_HEADROOM_SECONDS):
+        options["max_retries"] = 0
+    return client.with_options(**options)
@@ -18,6 +18,9 @@ from evidence_models import create_enhanced_candidate_response
 # Import diversity components
 from simplified_diversity_orchestrator import SimplifiedDiversityOrchestrator, SimplifiedDiversityConfig
 from diversity_metrics import BatchDiversityAnalyzer
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class EnhancedURLEvidenceFinder(URLEvidenceFinder):
@@ -68,7 +71,7 @@ class EnhancedURLEvidenceFinder(URLEvidenceFinder):
         """
         start_time = time.time()
         
-        print(f"[Enhanced Evidence Finder] Processing batch of {len(candidates)} candidates (diversity: {self.enable_diversity})")
+        logger.info("[Enhanced Evidence Finder] Processing batch of %s candidates (diversity: %s)", len(candidates), self.enable_diversity)
         
         if self.enable_diversity and self.diversity_orchestrator:
             # Use diversity-enhanced processing
@@ -86,20 +89,20 @@ class EnhancedURLEvidenceFinder(URLEvidenceFinder):
                 batch_metrics = self.diversity_analyzer.analyze_batch_diversity(enhanced_candidates)
                 recommendations = self.diversity_analyzer.get_diversity_recommendations(batch_metrics)
                 
-                print(f"[Enhanced Evidence Finder] Diversity Analysis:")
-                print(f"  Unique domains: {batch_metrics.unique_domains}")
-                print(f"  Uniqueness rate: {batch_metrics.uniqueness_rate:.1%}")
-                print(f"  Diversity index: {batch_metrics.diversity_index:.2f}")
+                logger.debug("[Enhanced Evidence Finder] Diversity Analysis:")
+                logger.debug("  Unique domains: %s", batch_metrics.unique_domains)
+                logger.debug("  Uniqueness rate: %s", format(batch_metrics.uniqueness_rate, ".1%"))
+                logger.debug("  Diversity index: %.2f", batch_metrics.diversity_index)
                 
                 if recommendations:
-                    print(f"  Recommendations: {recommendations[0]}")
+                    logger.debug("  Recommendations: %s", recommendations[0])
         
         else:
             # Use standard processing (from parent class)
             enhanced_candidates = await super().process_candidates_batch(candidates)
         
         batch_time = time.time() - start_time
-        print(f"[Enhanced Evidence Finder] Completed batch processing in {batch_time:.2f}s")
+        logger.info("[Enhanced Evidence Finder] Completed batch processing in %.2fs", batch_time)
         
         return enhanced_candidates
     
@@ -147,7 +150,7 @@ class EnhancedURLEvidenceFinder(URLEvidenceFinder):
         if self.diversity_orchestrator:
             self.diversity_orchestrator.config = self.diversity_config
         
-        print(f"[Enhanced Evidence Finder] Updated diversity configuration")
+        logger.info("[Enhanced Evidence Finder] Updated diversity configuration")
     
     def enable_diversity_mode(self, enable: bool = True):
         """
@@ -165,7 +168,7 @@ class EnhancedURLEvidenceFinder(URLEvidenceFinder):
             self.diversity_analyzer = BatchDiversityAnalyzer()
         
         self.enhanced_stats['diversity_enabled'] = enable
-        print(f"[Enhanced Evidence Finder] Diversity mode {'enabled' if enable else 'disabled'}")
+        logger.info("[Enhanced Evidence Finder] Diversity mode %s", 'enabled' if enable else 'disabled')
     
     def get_enhanced_statistics(self) -> Dict[str, Any]:
         """Get enhanced processing statistics including diversity metrics."""
@@ -194,7 +197,7 @@ class EnhancedURLEvidenceFinder(URLEvidenceFinder):
             'alternative_sources_used': 0
         })
         
-        print(f"[Enhanced Evidence Finder] Reset diversity state")
+        logger.info("[Enhanced Evidence Finder] Reset diversity state")
 
 
 async def test_enhanced_url_evidence_finder():
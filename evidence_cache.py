@@ -11,48 +11,46 @@ import hashlib
 import json
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
-from collections import OrderedDict
-from threading import Lock
+from dataclasses import asdict
+from threading import Lock, RLock
 
 from evidence_models import EvidenceURL, SearchableClaim
 from search_query_generator import SearchQuery
 from web_search_engine import SearchResult
+from metrics import (
+    EVIDENCE_API_REQUESTS, EVIDENCE_API_TOKENS, EVIDENCE_ERRORS,
+    EVIDENCE_OPERATION_SECONDS, EVIDENCE_RATE_LIMIT_HITS
+)
+from blocking_executor import run_blocking
+from shared_cache import MISSING, Cache, CacheBackend, get_cache
+from structured_logging import get_logger
 
-
-@dataclass
-class CacheEntry:
-    """Represents a cached search result."""
-    key: str
-    data: Any
-    timestamp: float
-    access_count: int
-    last_accessed: float
-    ttl: float  # Time to live in seconds
-    
-    def is_expired(self) -> bool:
-        """Check if cache entry has expired."""
-        return time.time() - self.timestamp > self.ttl
-    
-    def is_stale(self, max_age: float = 3600) -> bool:
-        """Check if cache entry is stale (older than max_age)."""
-        return time.time() - self.timestamp > max_age
+logger = get_logger(__name__)
 
 
 class EvidenceCache:
-    """LRU cache with TTL for evidence search results."""
+    """
+    LRU cache with TTL for evidence search results.
+
+    Entries live in the "evidence" shared cache (see shared_cache.py), so with
+    CACHE_BACKEND=sqlite or redis every worker process reuses the same
+    SerpAPI results instead of warming its own copy. Those backends do I/O,
+    so async code goes through call() to keep it off the event loop.
+    """
     
-    def __init__(self, max_size: int = 1000, default_ttl: float = 3600):
+    def __init__(self, max_size: int = 1000, default_ttl: float = 3600, backend: Optional[CacheBackend] = None):
         self.max_size = max_size
         self.default_ttl = default_ttl  # 1 hour default TTL
-        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        if backend is not None:
+            self.cache = Cache("evidence", backend, ttl=default_ttl)
+        else:
+            self.cache = get_cache("evidence", ttl=default_ttl, max_entries=max_size)
         self.lock = Lock()
         
         # Cache statistics
         self.stats = {
             'hits': 0,
             'misses': 0,
-            'evictions': 0,
             'expired_entries': 0,
             'total_requests': 0
         }
@@ -72,55 +70,24 @@ class EvidenceCache:
     
     def get(self, key: str) -> Optional[Any]:
         """Get item from cache."""
+        value = self.cache.get(key, MISSING)
         with self.lock:
             self.stats['total_requests'] += 1
-            
-            if key not in self.cache:
-                self.stats['misses'] += 1
-                return None
-            
-            entry = self.cache[key]
-            
-            # Check if expired
-            if entry.is_expired():
-                del self.cache[key]
-                self.stats['expired_entries'] += 1
+            if value is MISSING:
                 self.stats['misses'] += 1
                 return None
-            
-            # Update access info and move to end (most recently used)
-            entry.access_count += 1
-            entry.last_accessed = time.time()
-            self.cache.move_to_end(key)
-            
             self.stats['hits'] += 1
-            return entry.data
+        return value
     
     def put(self, key: str, data: Any, ttl: Optional[float] = None) -> None:
         """Put item in cache."""
-        with self.lock:
-            current_time = time.time()
-            ttl = ttl or self.default_ttl
-            
-            # Create cache entry
-            entry = CacheEntry(
-                key=key,
-                data=data,
-                timestamp=current_time,
-                access_count=1,
-                last_accessed=current_time,
-                ttl=ttl
-            )
-            
-            # Add to cache
-            self.cache[key] = entry
-            self.cache.move_to_end(key)
-            
-            # Evict if over capacity
-            while len(self.cache) > self.max_size:
-                oldest_key = next(iter(self.cache))
-                del self.cache[oldest_key]
-                self.stats['evictions'] += 1
+        self.cache.set(key, data, ttl or self.default_ttl)
+    
+    async def call(self, func, *args) -> Any:
+        """Call a cache method from async code, off the event loop only when the backend does I/O."""
+        if self.cache.blocking:
+            return await run_blocking(func, *args, pool="db")
+        return func(*args)
     
     def get_or_compute(self, key: str, compute_func, ttl: Optional[float] = None) -> Any:
         """Get from cache or compute and cache the result."""
@@ -135,33 +102,25 @@ class EvidenceCache:
     
     def invalidate(self, pattern: Optional[str] = None) -> int:
         """Invalidate cache entries matching pattern."""
-        with self.lock:
-            if pattern is None:
-                # Clear all
-                count = len(self.cache)
-                self.cache.clear()
-                return count
-            
-            # Remove entries matching pattern
-            keys_to_remove = [key for key in self.cache.keys() if pattern in key]
-            for key in keys_to_remove:
-                del self.cache[key]
-            
-            return len(keys_to_remove)
+        if pattern is None:
+            # Clear all
+            count = self.cache.size()
+            self.cache.clear()
+            return count
+        
+        # Remove entries matching pattern
+        keys_to_remove = [key for key in self.cache.keys() if pattern in key]
+        for key in keys_to_remove:
+            self.cache.delete(key)
+        
+        return len(keys_to_remove)
     
     def cleanup_expired(self) -> int:
         """Remove expired entries from cache."""
+        expired_count = self.cache.purge_expired()
         with self.lock:
-            expired_keys = [
-                key for key, entry in self.cache.items()
-                if entry.is_expired()
-            ]
-            
-            for key in expired_keys:
-                del self.cache[key]
-            
-            self.stats['expired_entries'] += len(expired_keys)
-            return len(expired_keys)
+            self.stats['expired_entries'] += expired_count
+        return expired_count
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -173,9 +132,11 @@ class EvidenceCache:
             
             return {
                 **self.stats,
+                'evictions': getattr(self.cache.backend, 'evictions', 0),
                 'hit_rate': hit_rate,
-                'cache_size': len(self.cache),
-                'max_size': self.max_size
+                'cache_size': self.cache.size(),
+                'max_size': self.max_size,
+                'backend': type(self.cache.backend).__name__
             }
 
 
@@ -221,7 +182,8 @@ class PerformanceMonitor:
                 'rate_limit_hits': 0
             }
         }
-        self.lock = Lock()
+        # Re-entrant: get_all_stats calls get_operation_stats while holding it
+        self.lock = RLock()
     
     def record_operation_time(self, operation: str, duration: float) -> None:
         """Record the duration of an operation."""
@@ -237,23 +199,32 @@ class PerformanceMonitor:
             
             # Update count
             self.metrics['operation_counts'][operation] = self.metrics['operation_counts'].get(operation, 0) + 1
+        
+        EVIDENCE_OPERATION_SECONDS.observe(duration, operation=operation)
     
     def record_error(self, operation: str, error_type: str) -> None:
         """Record an error occurrence."""
         with self.lock:
             key = f"{operation}:{error_type}"
             self.metrics['error_counts'][key] = self.metrics['error_counts'].get(key, 0) + 1
+        
+        EVIDENCE_ERRORS.inc(operation=operation, error_type=error_type)
     
     def record_api_usage(self, requests: int = 1, tokens: int = 0) -> None:
         """Record API usage."""
         with self.lock:
             self.metrics['api_usage']['requests_made'] += requests
             self.metrics['api_usage']['tokens_used'] += tokens
+        
+        EVIDENCE_API_REQUESTS.inc(requests)
+        EVIDENCE_API_TOKENS.inc(tokens)
     
     def record_rate_limit_hit(self) -> None:
         """Record a rate limit hit."""
         with self.lock:
             self.metrics['api_usage']['rate_limit_hits'] += 1
+        
+        EVIDENCE_RATE_LIMIT_HITS.inc()
     
     def get_operation_stats(self, operation: str) -> Dict[str, float]:
         """Get statistics for a specific operation."""
@@ -306,15 +277,15 @@ class BatchProcessor:
         cached_results = {}
         uncached_claims = []
         
-        for claim in claims:
-            cached_evidence = self.search_cache.get_evidence_urls(claim)
+        lookups = await self.cache.call(lambda: [self.search_cache.get_evidence_urls(claim) for claim in claims])
+        for claim, cached_evidence in zip(claims, lookups):
             if cached_evidence is not None:
                 claim_key = self.cache._generate_cache_key(claim.text)
                 cached_results[claim_key] = cached_evidence
             else:
                 uncached_claims.append(claim)
         
-        print(f"[Batch Processor] Found {len(cached_results)} cached results, processing {len(uncached_claims)} new claims")
+        logger.info("[Batch Processor] Found %s cached results, processing %s new claims", len(cached_results), len(uncached_claims))
         
         # Process uncached claims with concurrency control
         semaphore = asyncio.Semaphore(max_concurrent)
@@ -325,7 +296,7 @@ class BatchProcessor:
                     evidence_urls = await search_function(claim)
                     
                     # Cache the results
-                    self.search_cache.cache_evidence_urls(claim, evidence_urls)
+                    await self.cache.call(self.search_cache.cache_evidence_urls, claim, evidence_urls)
                     
                     claim_key = self.cache._generate_cache_key(claim.text)
                     return claim_key, evidence_urls
@@ -366,7 +337,7 @@ class BatchProcessor:
         
         dedup_count = len(queries) - len(unique_queries)
         if dedup_count > 0:
-            print(f"[Batch Processor] Deduplicated {dedup_count} queries")
+            logger.info("[Batch Processor] Deduplicated %s queries", dedup_count)
         
         return unique_queries
 
@@ -393,8 +364,8 @@ class OptimizedEvidenceFinder:
             uncached_queries = []
             
             # Check cache for each query
-            for query in queries:
-                cached_result = search_cache.get_search_results(query)
+            lookups = await self.cache.call(lambda: [search_cache.get_search_results(query) for query in queries])
+            for query, cached_result in zip(queries, lookups):
                 if cached_result is not None:
                     cached_results.append(cached_result)
                 else:
@@ -410,9 +381,9 @@ class OptimizedEvidenceFinder:
                 self.monitor.record_api_usage(requests=len(uncached_queries))
                 
                 # Cache new results
-                for query, result in zip(uncached_queries, new_results):
-                    if result.success:
-                        search_cache.cache_search_results(query, result)
+                successful = [(query, result) for query, result in zip(uncached_queries, new_results) if result.success]
+                if successful:
+                    await self.cache.call(lambda: [search_cache.cache_search_results(query, result) for query, result in successful])
                 
                 cached_results.extend(new_results)
             
@@ -476,7 +447,7 @@ class OptimizedEvidenceFinder:
         expired_count = self.cache.cleanup_expired()
         return {
             'expired_entries_removed': expired_count,
-            'current_cache_size': len(self.cache.cache)
+            'current_cache_size': self.cache.cache.size()
         }
 
 
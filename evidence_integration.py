@@ -12,6 +12,7 @@ import time
 import os
 from typing import List, Dict, Any, Optional
 from openai import OpenAI
+from services import get_openai_client
 
 # Import evidence finder components
 from url_evidence_finder import URLEvidenceFinder
@@ -324,12 +325,8 @@ def get_evidence_integration_service() -> Optional[EvidenceIntegrationService]:
     
     if _evidence_integration_service is None:
         try:
-            # Initialize with OpenAI client if available
-            openai_client = None
-            if os.getenv('OPENAI_API_KEY'):
-                openai_client = OpenAI()
-            
-            _evidence_integration_service = EvidenceIntegrationService(openai_client)
+            # Shared OpenAI client (None when no key is configured)
+            _evidence_integration_service = EvidenceIntegrationService(get_openai_client())
         except Exception as e:
             print(f"[Evidence Integration] Failed to initialize service: {str(e)}")
             _evidence_integration_service = None
@@ -14,6 +14,9 @@ from enum import Enum
 from explanation_analyzer import SearchableClaim, ClaimType
 from web_search_engine import SearchResult, URLCandidate
 from improved_relevance_scorer import ImprovedRelevanceScorer
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class EvidenceType(Enum):
@@ -394,7 +397,7 @@ class EvidenceValidator:
             )
             
         except Exception as e:
-            print(f"[Evidence Validator] Error creating evidence URL: {e}")
+            logger.warning("[Evidence Validator] Error creating evidence URL: %s", e)
             return None
     
     def _calculate_text_similarity(self, text1: str, text2: str) -> float:
@@ -12,6 +12,10 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 
 class ClaimType(Enum):
     """Types of behavioral claims that can be extracted."""
@@ -319,7 +323,7 @@ class ExplanationAnalyzer:
             )
         
         except Exception as e:
-            print(f"[Explanation Analyzer] Error creating claim: {e}")
+            logger.warning("[Explanation Analyzer] Error creating claim: %s", e)
             return None
     
     def _generate_search_terms(self, claim_text: str, entities: Dict[str, List[str]]) -> List[str]:
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Page planning for the candidate retry loop.
+
+The loop in process_search fetched Apollo page 1 with per_page fixed at
+max_candidates + 6, and only after the location filter, the public-figure
+checks and the LLM assessment decided whether to fetch page 2, for up to five
+fully serial rounds. FetchPlanner changes two things:
+
+  * per_page is sized from the yield learned for the same filters: the share
+    of requested people that come back with a LinkedIn URL, and the share of
+    those that survive the US and public-figure filters. A filter set where
+    one person in four survives gets a bigger first page, so the target is
+    usually met in one round.
+  * While page N is filtered and assessed, page N+1 is fetched speculatively
+    when page N is not expected to yield enough. Once enough candidates are
+    found the speculative fetch is cancelled, which also stops its enrichment
+    requests.
+
+Page size stays fixed within a search: Apollo pages are offsets of per_page,
+so changing it between pages would skip or repeat people.
+
+    planner = FetchPlanner(filters, target=3, fetch=fetch_page)
+    people = await planner.fetch(1)
+    if planner.should_prefetch(len(people), have=0):
+        planner.prefetch(2)
+    ...
+    planner.record(len(people), kept)
+    await planner.cancel()
+
+Configuration (environment variables):
+    FETCH_MAX_PER_PAGE   upper bound on people requested per page (default 25)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Yield assumed before anything is learned; with the headroom below it
+# reproduces the old max_candidates + 6 for the default of three candidates
+DEFAULT_YIELD = 0.4
+YIELD_HEADROOM = 1.2
+# Never size a page as if fewer than this share of people will survive
+MIN_YIELD = 0.1
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.3
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+MAX_PER_PAGE = _env_int("FETCH_MAX_PER_PAGE", 25)
+
+PageFetcher = Callable[[int, int], Awaitable[List[Dict[str, Any]]]]
+
+
+def filters_key(filters: Dict[str, Any]) -> str:
+    """Stable key for a filter set."""
+    encoded = json.dumps(filters or {}, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class YieldModel:
+    """
+    Moving averages of per-stage yield, per filter set and overall.
+
+    Two stages are tracked: "linkedin" (people returned per person requested,
+    since Apollo results without a LinkedIn URL are dropped during enrichment)
+    and "filters" (people kept by the US and public-figure filters per person
+    returned).
+    """
+
+    def __init__(self, max_entries: int = 512, alpha: float = EWMA_ALPHA):
+        self.max_entries = max_entries
+        self.alpha = alpha
+        self._by_key: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._overall: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.observations = 0
+
+    def _blend(self, current: Optional[float], value: float) -> float:
+        return value if current is None else (1 - self.alpha) * current + self.alpha * value
+
+    def observe(self, key: str, requested: int, returned: int, kept: int) -> None:
+        if requested <= 0:
+            return
+        samples = {"linkedin": min(1.0, returned / requested)}
+        if returned > 0:
+            samples["filters"] = min(1.0, kept / returned)
+        with self._lock:
+            entry = self._by_key.pop(key, {})
+            for stage, value in samples.items():
+                entry[stage] = self._blend(entry.get(stage), value)
+                self._overall[stage] = self._blend(self._overall.get(stage), value)
+            self._by_key[key] = entry
+            while len(self._by_key) > self.max_entries:
+                self._by_key.popitem(last=False)
+            self.observations += 1
+
+    def stage_yield(self, key: str, stage: str) -> Optional[float]:
+        """Learned yield of one stage for key, falling back to the overall average."""
+        with self._lock:
+            entry = self._by_key.get(key) or {}
+            return entry.get(stage, self._overall.get(stage))
+
+    def estimate(self, key: str) -> float:
+        """Expected share of requested people that survive every stage."""
+        linkedin = self.stage_yield(key, "linkedin")
+        kept = self.stage_yield(key, "filters")
+        if linkedin is None and kept is None:
+            return DEFAULT_YIELD
+        if linkedin is None or kept is None:
+            # Only one stage has been seen; assume the other matches the default split
+            known = linkedin if linkedin is not None else kept
+            return max(MIN_YIELD, known * math.sqrt(DEFAULT_YIELD))
+        return max(MIN_YIELD, linkedin * kept)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "filter_sets": len(self._by_key),
+                "observations": self.observations,
+                "overall": {stage: round(value, 3) for stage, value in self._overall.items()},
+            }
+
+
+# Global model shared by every search in this process
+yield_model = YieldModel()
+
+
+class FetchPlanner:
+    """Sizes pages from learned yield and fetches the next page ahead of need."""
+
+    def __init__(self, filters: Dict[str, Any], target: int, fetch: PageFetcher,
+                 model: Optional[YieldModel] = None, max_per_page: Optional[int] = None):
+        self.key = filters_key(filters)
+        self.target = max(1, target)
+        self.fetch_page = fetch
+        self.model = model or yield_model
+        self.max_per_page = max_per_page or MAX_PER_PAGE
+        self.expected_yield = self.model.estimate(self.key)
+        self.per_page = self.size_page(self.target)
+        self._prefetch: Optional[Tuple[int, asyncio.Task]] = None
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+    def size_page(self, needed: int) -> int:
+        """People to request so that `needed` of them usually survive."""
+        size = math.ceil(round(needed / self.expected_yield * YIELD_HEADROOM, 6))
+        return max(needed, min(self.max_per_page, size))
+
+    async def fetch(self, page: int) -> List[Dict[str, Any]]:
+        """Return a page, using the speculative fetch when it is for this page."""
+        if self._prefetch is not None:
+            prefetched_page, task = self._prefetch
+            self._prefetch = None
+            if prefetched_page == page:
+                self.prefetch_hits += 1
+                return await task
+            await self._discard(task)
+        return await self.fetch_page(page, self.per_page)
+
+    def should_prefetch(self, returned: int, have: int) -> bool:
+        """True when the page just returned is not expected to reach the target."""
+        kept = self.model.stage_yield(self.key, "filters")
+        if kept is None:
+            kept = math.sqrt(DEFAULT_YIELD)
+        return have + returned * kept < self.target
+
+    def prefetch(self, page: int) -> None:
+        """Start fetching `page` in the background."""
+        if self._prefetch is not None:
+            return
+        self.prefetched += 1
+        logger.debug("[Fetch Planner] Prefetching page %s", page, per_page=self.per_page)
+        self._prefetch = (page, asyncio.create_task(self.fetch_page(page, self.per_page)))
+
+    def record(self, returned: int, kept: int) -> None:
+        """Learn from one page: how many came back and how many survived the filters."""
+        self.model.observe(self.key, self.per_page, returned, kept)
+
+    async def cancel(self) -> None:
+        """Drop any speculative fetch; call once enough candidates are found or the search ends."""
+        if self._prefetch is not None:
+            _, task = self._prefetch
+            self._prefetch = None
+            await self._discard(task)
+
+    @staticmethod
+    async def _discard(task: asyncio.Task) -> None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "per_page": self.per_page,
+            "expected_yield": round(self.expected_yield, 3),
+            "prefetched": self.prefetched,
+            "prefetch_hits": self.prefetch_hits,
+        }
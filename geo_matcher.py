@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Geographic normalization for candidate locations.
+
+The search pipeline keeps US-based people only. It used to lowercase every
+location and scan a ~120 entry list of foreign countries and cities with
+substring checks, rebuilding the list for every person. Substring matching
+is also wrong in both directions: "Paris, Texas" was dropped as French, and
+"uk" / "india" / "oman" matched "Milwaukee", "Indiana" and "Woman's Hospital".
+
+Here the gazetteer (US states, countries, regions and major cities) is
+compiled once at import into a phrase index keyed by token tuples. A location
+string is tokenized on word boundaries and matched longest-phrase-first, so
+"New Mexico" never resolves to Mexico and "Georgia" the state wins over the
+country unless the string says otherwise. A comma separated part that is a
+US state decides the country, so "Lebanon, NH", "Panama City, Florida" and
+"Athens, GA" stay in the US; only a city or region of the other country
+("Tbilisi, Georgia") overrides it.
+
+    resolve_location("Paris, Texas")       -> GeoLocation("Paris", "Texas", "United States")
+    resolve_location("Greater London Area") -> GeoLocation("London", None, "United Kingdom")
+    is_us("Austin, TX")                    -> True
+
+Resolution is cached (the same handful of metro strings repeat across pages
+and searches).
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+US = "United States"
+
+US_STATES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "FL": "Florida", "GA": "Georgia",
+    "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois", "IN": "Indiana", "IA": "Iowa",
+    "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana", "ME": "Maine", "MD": "Maryland",
+    "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota", "MS": "Mississippi", "MO": "Missouri",
+    "MT": "Montana", "NE": "Nebraska", "NV": "Nevada", "NH": "New Hampshire", "NJ": "New Jersey",
+    "NM": "New Mexico", "NY": "New York", "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio",
+    "OK": "Oklahoma", "OR": "Oregon", "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina",
+    "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont",
+    "VA": "Virginia", "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+    "DC": "District of Columbia", "PR": "Puerto Rico",
+}
+
+US_ALIASES = [
+    "united states", "united states of america", "usa", "u.s.a.", "u.s.", "us",
+    "washington dc", "washington d.c.",
+]
+
+# Country -> aliases (the country name itself is always an alias)
+COUNTRIES = {
+    "Canada": [], "Mexico": [], "United Kingdom": ["uk", "u.k.", "great britain", "britain"],
+    "Ireland": [], "France": [], "Germany": ["deutschland"], "Spain": [], "Italy": [],
+    "Netherlands": ["the netherlands", "holland"], "Belgium": [], "Switzerland": [], "Austria": [],
+    "Portugal": [], "Sweden": [], "Norway": [], "Denmark": [], "Finland": [], "Iceland": [],
+    "Poland": [], "Czech Republic": ["czechia"], "Slovakia": [], "Hungary": [], "Romania": [],
+    "Bulgaria": [], "Greece": [], "Turkey": ["turkiye"], "Cyprus": [], "Croatia": [], "Serbia": [],
+    "Slovenia": [], "Luxembourg": [], "Malta": [], "Russia": ["russian federation"], "Ukraine": [],
+    "Belarus": [], "Lithuania": [], "Latvia": [], "Estonia": [],
+    "Australia": [], "New Zealand": [], "Japan": [], "South Korea": ["korea", "republic of korea"],
+    "China": [], "Taiwan": [], "Hong Kong": [], "Singapore": [], "Malaysia": [], "Thailand": [],
+    "Vietnam": ["viet nam"], "Philippines": [], "Indonesia": [], "India": [], "Pakistan": [],
+    "Bangladesh": [], "Sri Lanka": [], "Nepal": [], "Myanmar": [],
+    "Israel": [], "Saudi Arabia": ["ksa"], "United Arab Emirates": ["uae", "u.a.e."], "Qatar": [],
+    "Kuwait": [], "Bahrain": [], "Oman": [], "Jordan": [], "Lebanon": [],
+    "Egypt": [], "South Africa": [], "Nigeria": [], "Kenya": [], "Ghana": [], "Morocco": [],
+    "Tunisia": [],
+    "Brazil": ["brasil"], "Argentina": [], "Chile": [], "Colombia": [], "Peru": [],
+    "Venezuela": [], "Ecuador": [], "Uruguay": [], "Costa Rica": [], "Panama": [],
+    "Dominican Republic": [],
+}
+
+# Foreign countries that share a name with a US state; the state wins unless
+# the string also names a foreign city or region (e.g. "Tbilisi, Georgia")
+COUNTRY_STATE_CONFLICTS = {"georgia": "Georgia"}
+
+# Regions (provinces, constituent countries, states) -> (region, country)
+REGIONS = {
+    "ontario": ("Ontario", "Canada"), "quebec": ("Quebec", "Canada"),
+    "british columbia": ("British Columbia", "Canada"), "alberta": ("Alberta", "Canada"),
+    "manitoba": ("Manitoba", "Canada"), "saskatchewan": ("Saskatchewan", "Canada"),
+    "nova scotia": ("Nova Scotia", "Canada"),
+    "england": ("England", "United Kingdom"), "scotland": ("Scotland", "United Kingdom"),
+    "wales": ("Wales", "United Kingdom"), "northern ireland": ("Northern Ireland", "United Kingdom"),
+    "new south wales": ("New South Wales", "Australia"), "victoria": ("Victoria", "Australia"),
+    "queensland": ("Queensland", "Australia"), "bavaria": ("Bavaria", "Germany"),
+    "catalonia": ("Catalonia", "Spain"), "ile-de-france": ("Ile-de-France", "France"),
+    "maharashtra": ("Maharashtra", "India"), "karnataka": ("Karnataka", "India"),
+}
+
+# Major foreign cities -> country. Cities that also exist in the US ("Paris",
+# "Dublin", "Birmingham") resolve to the US when a state is named next to them.
+CITIES = {
+    "London": "United Kingdom", "Manchester": "United Kingdom", "Birmingham": "United Kingdom",
+    "Edinburgh": "United Kingdom", "Glasgow": "United Kingdom", "Cambridge": "United Kingdom",
+    "Oxford": "United Kingdom", "Bristol": "United Kingdom", "Leeds": "United Kingdom",
+    "Dublin": "Ireland", "Paris": "France", "Lyon": "France", "Berlin": "Germany",
+    "Munich": "Germany", "Hamburg": "Germany", "Frankfurt": "Germany", "Madrid": "Spain",
+    "Barcelona": "Spain", "Rome": "Italy", "Milan": "Italy", "Amsterdam": "Netherlands",
+    "Rotterdam": "Netherlands", "Brussels": "Belgium", "Zurich": "Switzerland",
+    "Geneva": "Switzerland", "Vienna": "Austria", "Lisbon": "Portugal", "Stockholm": "Sweden",
+    "Oslo": "Norway", "Copenhagen": "Denmark", "Helsinki": "Finland", "Warsaw": "Poland",
+    "Prague": "Czech Republic", "Budapest": "Hungary", "Athens": "Greece", "Istanbul": "Turkey",
+    "Moscow": "Russia", "Kyiv": "Ukraine", "Kiev": "Ukraine", "Tbilisi": "Georgia",
+    "Toronto": "Canada", "Vancouver": "Canada", "Montreal": "Canada", "Calgary": "Canada",
+    "Ottawa": "Canada", "Mexico City": "Mexico", "Guadalajara": "Mexico", "Monterrey": "Mexico",
+    "Sydney": "Australia", "Melbourne": "Australia", "Brisbane": "Australia", "Perth": "Australia",
+    "Auckland": "New Zealand", "Tokyo": "Japan", "Osaka": "Japan", "Seoul": "South Korea",
+    "Beijing": "China", "Shanghai": "China", "Shenzhen": "China", "Taipei": "Taiwan",
+    "Kuala Lumpur": "Malaysia", "Bangkok": "Thailand", "Jakarta": "Indonesia", "Manila": "Philippines",
+    "Ho Chi Minh City": "Vietnam", "Hanoi": "Vietnam", "Mumbai": "India", "Delhi": "India",
+    "New Delhi": "India", "Bangalore": "India", "Bengaluru": "India", "Hyderabad": "India",
+    "Chennai": "India", "Pune": "India", "Karachi": "Pakistan", "Lahore": "Pakistan",
+    "Dhaka": "Bangladesh", "Tel Aviv": "Israel", "Jerusalem": "Israel", "Dubai": "United Arab Emirates",
+    "Abu Dhabi": "United Arab Emirates", "Riyadh": "Saudi Arabia", "Doha": "Qatar", "Cairo": "Egypt",
+    "Johannesburg": "South Africa", "Cape Town": "South Africa", "Lagos": "Nigeria",
+    "Nairobi": "Kenya", "Sao Paulo": "Brazil", "Rio de Janeiro": "Brazil",
+    "Buenos Aires": "Argentina", "Santiago": "Chile", "Bogota": "Colombia", "Lima": "Peru",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.'-][a-z0-9]+)*\.?")
+_MAX_PHRASE = 5  # "united states of america" plus a little headroom
+
+# Entry kinds, in tie-break priority for a single span
+_COUNTRY, _US_STATE, _REGION, _CITY, _US_STATE_CODE = "country", "us_state", "region", "city", "us_state_code"
+
+
+@dataclass(frozen=True)
+class GeoLocation:
+    """Normalized (city, region, country); any part may be None when unknown."""
+    city: Optional[str]
+    region: Optional[str]
+    country: Optional[str]
+
+    @property
+    def is_us(self) -> bool:
+        return self.country == US
+
+
+def _tokens(text: str) -> Tuple[str, ...]:
+    return tuple(token.rstrip(".").replace(".", "") for token in _TOKEN_RE.findall(text.lower()))
+
+
+def _compile() -> Dict[Tuple[str, ...], List[Tuple[str, str, str]]]:
+    """Build the phrase index: token tuple -> [(kind, canonical name, country)]."""
+    index: Dict[Tuple[str, ...], List[Tuple[str, str, str]]] = {}
+
+    def add(phrase: str, entry: Tuple[str, str, str]) -> None:
+        key = _tokens(phrase)
+        if key and entry not in index.setdefault(key, []):
+            index[key].append(entry)
+
+    for alias in US_ALIASES:
+        add(alias, (_COUNTRY, US, US))
+    for code, state in US_STATES.items():
+        add(state, (_US_STATE, state, US))
+        add(code, (_US_STATE_CODE, state, US))
+    for country, aliases in COUNTRIES.items():
+        for alias in [country] + aliases:
+            add(alias, (_COUNTRY, country, country))
+    for alias, (region, country) in REGIONS.items():
+        add(alias, (_REGION, region, country))
+    for city, country in CITIES.items():
+        add(city, (_CITY, city, country))
+    return index
+
+
+_INDEX = _compile()
+
+
+def _scan(tokens: Tuple[str, ...]) -> List[Tuple[str, str, str]]:
+    """Greedy longest-phrase match over the token stream."""
+    matches = []
+    i = 0
+    while i < len(tokens):
+        for size in range(min(_MAX_PHRASE, len(tokens) - i), 0, -1):
+            entries = _INDEX.get(tokens[i:i + size])
+            if entries:
+                matches.extend(entries)
+                i += size
+                break
+        else:
+            i += 1
+    return matches
+
+
+@lru_cache(maxsize=4096)
+def _resolve(text: str) -> GeoLocation:
+    # Two letter state codes only count as their own comma separated part
+    # ("Austin, TX"), so "in" or "me" inside a free-form phrase are ignored
+    matches = []
+    state_part = False
+    for part in text.split(","):
+        tokens = _tokens(part)
+        part_matches = _scan(tokens)
+        if len(tokens) != 1:
+            part_matches = [m for m in part_matches if m[0] != _US_STATE_CODE]
+        matches.extend(part_matches)
+        # The whole part is a state name or code ("..., Florida", "..., NH")
+        state_part = state_part or any(e[0] in (_US_STATE, _US_STATE_CODE) for e in _INDEX.get(tokens, ()))
+    if not matches:
+        return GeoLocation(None, None, None)
+
+    cities = [m for m in matches if m[0] == _CITY]
+    states = [m for m in matches if m[0] in (_US_STATE, _US_STATE_CODE)]
+    regions = [m for m in matches if m[0] == _REGION]
+    countries = [m for m in matches if m[0] == _COUNTRY
+                 and not (m[1].lower() in COUNTRY_STATE_CONFLICTS and states)]
+    # Only a city or region of a country the string could mean counts against the US:
+    # "Tbilisi, Georgia" is Georgian, "Athens, Georgia" is not Greek
+    named_countries = {m[2] for m in countries} | {
+        COUNTRY_STATE_CONFLICTS[s[1].lower()] for s in states if s[1].lower() in COUNTRY_STATE_CONFLICTS}
+    foreign_context = [m for m in cities + regions if m[2] != US and m[2] in named_countries]
+
+    if state_part and not foreign_context:
+        country = US
+    elif countries:
+        country = countries[-1][2]  # the most specific part comes first, the country last
+    elif states and not (foreign_context and all(s[1].lower() in COUNTRY_STATE_CONFLICTS for s in states)):
+        country = US
+    elif regions:
+        country = regions[0][2]
+    elif states:
+        country = COUNTRY_STATE_CONFLICTS[states[0][1].lower()]
+    else:
+        country = cities[0][2]
+
+    if country == US:
+        region = states[0][1] if states else None
+    else:
+        region = next((r[1] for r in regions if r[2] == country), None)
+    # A city name is kept for the resolved country, or as-is for US homonyms ("Paris, Texas")
+    city = next((c[1] for c in cities if c[2] == country or country == US), None)
+    return GeoLocation(city, region, country)
+
+
+def resolve_location(location: Optional[str]) -> GeoLocation:
+    """Resolve a free-form location string to a normalized GeoLocation."""
+    if not location:
+        return GeoLocation(None, None, None)
+    return _resolve(location.strip())
+
+
+def is_us(location: Optional[str], default: bool = True) -> bool:
+    """
+    True when the location resolves to the United States.
+
+    Locations we cannot place return ``default``; the search filter keeps them
+    (as the old substring filter did) rather than drop people with sparse data.
+    """
+    country = resolve_location(location).country
+    return default if country is None else country == US
+
+
+def us_person_locations(locations: Iterable[str]) -> List[str]:
+    """
+    Restrict Apollo person_locations to the United States.
+
+    Foreign locations are dropped (the search only keeps US-based people), US
+    and unrecognised locations are kept as-is, and "United States" is used
+    when nothing US-specific remains.
+    """
+    kept = [loc for loc in locations or [] if isinstance(loc, str) and loc.strip() and is_us(loc)]
+    return kept or [US]
+
+
+def cache_info():
+    return _resolve.cache_info()
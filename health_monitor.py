@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cached, concurrent system health probes.
+
+/api/system/health/comprehensive used to run its probes one after another on
+every call: the Prismatic connectivity check, the webhook URL checks, the
+HubSpot auth check and the deployment sync check, most of them outbound HTTP
+requests. Load balancers and uptime monitors call it often enough that the
+probes were a steady source of load, and each call took seconds.
+
+HealthMonitor runs every registered probe concurrently, each under its own
+timeout, and keeps the last snapshot with timestamps. A background task
+refreshes the snapshot on a schedule; endpoints read it instantly:
+
+    health_monitor = HealthMonitor({"auth": validator.validate_auth_config})
+    snapshot = await health_monitor.get_snapshot()                # cached
+    snapshot = await health_monitor.get_snapshot(refresh=True)    # live, rate-limited
+
+A forced refresh only probes live when the last probe round started at least
+min_refresh_seconds ago; otherwise the cached snapshot is returned with
+"refresh_rate_limited" set. Concurrent refreshes share one probe round.
+
+Configuration (environment variables):
+    HEALTH_PROBE_INTERVAL_SECONDS   background refresh interval (default 60)
+    HEALTH_PROBE_TIMEOUT_SECONDS    timeout for each probe (default 15)
+    HEALTH_MIN_REFRESH_SECONDS      minimum spacing of forced refreshes (default 10)
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+Probe = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one probe in one round."""
+    name: str
+    ok: bool
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    duration_ms: float
+    checked_at: str
+
+
+class HealthMonitor:
+    """Runs health probes concurrently and serves the last snapshot."""
+
+    def __init__(self, probes: Optional[Dict[str, Probe]] = None,
+                 interval_seconds: Optional[float] = None,
+                 probe_timeout_seconds: Optional[float] = None,
+                 min_refresh_seconds: Optional[float] = None):
+        self.probes: Dict[str, Probe] = dict(probes or {})
+        self.interval_seconds = interval_seconds or _env_float("HEALTH_PROBE_INTERVAL_SECONDS", 60.0)
+        self.probe_timeout_seconds = probe_timeout_seconds or _env_float("HEALTH_PROBE_TIMEOUT_SECONDS", 15.0)
+        self.min_refresh_seconds = (min_refresh_seconds if min_refresh_seconds is not None
+                                    else _env_float("HEALTH_MIN_REFRESH_SECONDS", 10.0))
+        self._results: Dict[str, ProbeResult] = {}
+        self._last_started: Optional[float] = None
+        self._last_completed: Optional[float] = None
+        self._in_flight: Optional[asyncio.Task] = None
+        self.rounds = 0
+        self.forced_refreshes = 0
+        self.rate_limited = 0
+
+    def register(self, name: str, probe: Probe) -> None:
+        self.probes[name] = probe
+
+    async def _run_probe(self, name: str, probe: Probe) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(probe(), timeout=self.probe_timeout_seconds)
+            ok, error = True, None
+        except asyncio.TimeoutError:
+            result, ok, error = None, False, f"timed out after {self.probe_timeout_seconds:g}s"
+        except Exception as e:
+            result, ok, error = None, False, str(e)
+        if not ok:
+            logger.warning("[Health] Probe %s failed: %s", name, error)
+        return ProbeResult(
+            name=name,
+            ok=ok,
+            result=result,
+            error=error,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            checked_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+    async def _probe_round(self) -> None:
+        self._last_started = time.time()
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._run_probe(name, self.probes[name]) for name in names))
+        self._results = {result.name: result for result in results}
+        self._last_completed = time.time()
+        self.rounds += 1
+
+    async def refresh(self) -> None:
+        """Probe everything now; joins a round that is already running."""
+        if self._in_flight is None or self._in_flight.done():
+            self._in_flight = asyncio.create_task(self._probe_round())
+        # shield: a caller going away must not cancel a round others are waiting on
+        await asyncio.shield(self._in_flight)
+
+    async def get_snapshot(self, refresh: bool = False) -> Dict[str, Any]:
+        """The last probe results; probes live on first use or when refresh is allowed."""
+        rate_limited = False
+        if self._last_completed is None:
+            await self.refresh()
+        elif refresh:
+            since_last = time.time() - (self._last_started or 0)
+            if since_last >= self.min_refresh_seconds:
+                self.forced_refreshes += 1
+                await self.refresh()
+            else:
+                self.rate_limited += 1
+                rate_limited = True
+        return {
+            "results": dict(self._results),
+            "checked_at": datetime.fromtimestamp(self._last_completed, timezone.utc).isoformat(),
+            "age_seconds": round(time.time() - self._last_completed, 3),
+            "refresh_rate_limited": rate_limited,
+        }
+
+    async def run(self) -> None:
+        """
+        Refresh the snapshot every interval_seconds until cancelled.
+
+        The first background round waits one interval, so the API is already
+        serving the endpoints that some probes call; a request arriving before
+        then probes live.
+        """
+        started_at = time.time()
+        while True:
+            reference = self._last_started if self._last_started is not None else started_at
+            wait = self.interval_seconds - (time.time() - reference)
+            if wait > 0:
+                # Re-checked after sleeping: a forced refresh may have moved the next round
+                await asyncio.sleep(wait)
+                continue
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("[Health] Probe round failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "probes": list(self.probes),
+            "rounds": self.rounds,
+            "forced_refreshes": self.forced_refreshes,
+            "rate_limited": self.rate_limited,
+            "last_completed": self._last_completed,
+            "last_results": {name: {k: v for k, v in asdict(result).items() if k != "result"}
+                             for name, result in self._results.items()},
+        }
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Idempotency keys for search creation.
+
+The Prismatic and front-end clients retry POST /api/search when the request
+times out on their side, and every retry used to start a brand-new search
+with the full paid fan-out, even when the first attempt had been accepted.
+Clients can now send an Idempotency-Key header (or an idempotency_key body
+field). The first request with a key claims it for the request_id it is about
+to create; a retry with the same key inside the window gets that request_id
+and its current status back instead of enqueuing duplicate work:
+
+    claim = await idempotency.claim(client, key, fingerprint, request_id)
+    if claim.replayed:
+        ...answer with claim.record.request_id...
+    try:
+        ...store and enqueue the search...
+    except Exception:
+        await idempotency.release(claim)    # the search never started; let a retry create it
+        raise
+
+Keys are scoped to the caller (see admission_control.client_key) and stored
+as a short hash next to the request_id, a fingerprint of the request body and
+an expiry time, so a record is well under 100 bytes. Reusing a key with a
+different body raises IdempotencyConflict. Records live in memory by default;
+the sqlite backend shares them between the workers on a host and the redis
+backend across hosts, so a retry that lands on another worker is still
+recognized.
+
+Configuration (environment variables):
+    IDEMPOTENCY_TTL_SECONDS     how long a key is remembered (default 86400, 0 disables keys)
+    IDEMPOTENCY_MAX_KEYS        keys kept by the memory backend (default 10000)
+    IDEMPOTENCY_BACKEND         memory | sqlite | redis (default memory)
+    CACHE_PATH, CACHE_REDIS_URL storage for the sqlite and redis backends (see shared_cache.py)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from blocking_executor import run_blocking
+from metrics import registry as metrics_registry
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_REQUESTS = metrics_registry.counter(
+    "knowledge_gpt_idempotency_total",
+    "Search creations carrying an idempotency key (new, replayed, conflict, released, error)", ["outcome"])
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a request with a different body."""
+
+
+@dataclass
+class IdempotencyRecord:
+    request_id: str
+    fingerprint: str
+    expires_at: float
+
+    def encode(self) -> str:
+        return f"{self.request_id}|{self.fingerprint}|{self.expires_at:.0f}"
+
+    @classmethod
+    def decode(cls, value: Any) -> "IdempotencyRecord":
+        if isinstance(value, bytes):
+            value = value.decode()
+        request_id, fingerprint, expires_at = value.split("|", 2)
+        return cls(request_id, fingerprint, float(expires_at))
+
+
+@dataclass
+class IdempotencyClaim:
+    """Outcome of IdempotencyKeys.claim(); replayed means record belongs to an earlier request."""
+    key: str
+    record: IdempotencyRecord
+    replayed: bool
+
+
+def idempotency_key(headers: Mapping[str, str], body_value: Optional[str] = None) -> Optional[str]:
+    """The key sent in the Idempotency-Key header (preferred) or the body, or None when there is none."""
+    key = (headers.get("idempotency-key") or body_value or "").strip()
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency key must be at most {MAX_KEY_LENGTH} characters")
+    return key
+
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    """Short, stable hash of the request fields that decide what a search does."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def scoped_key(client: str, key: str) -> str:
+    """Store key for a caller's idempotency key; callers cannot collide with each other's keys."""
+    return hashlib.sha256(f"{client}\n{key}".encode("utf-8")).hexdigest()[:32]
+
+
+class IdempotencyBackend(ABC):
+    """Storage for idempotency records."""
+
+    # True when claim() and release() do I/O and should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def claim(self, key: str, record: IdempotencyRecord) -> Optional[IdempotencyRecord]:
+        """Store record under key unless a live record exists; returns that existing record, else None."""
+
+    @abstractmethod
+    def release(self, key: str, request_id: str) -> None:
+        """Forget key if it still belongs to request_id."""
+
+
+class MemoryIdempotencyBackend(IdempotencyBackend):
+    """Records for this process only, oldest dropped first beyond max_keys."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._records: "OrderedDict[str, IdempotencyRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, record: IdempotencyRecord) -> Optional[IdempotencyRecord]:
+        now = time.time()
+        with self._lock:
+            existing = self._records.get(key)
+            if existing is not None and existing.expires_at > now:
+                return existing
+            self._records.pop(key, None)
+            self._records[key] = record
+            # Records share one TTL, so insertion order is expiry order
+            while self._records:
+                oldest = next(iter(self._records.values()))
+                if oldest.expires_at > now and len(self._records) <= self.max_keys:
+                    break
+                self._records.popitem(last=False)
+        return None
+
+    def release(self, key: str, request_id: str) -> None:
+        with self._lock:
+            existing = self._records.get(key)
+            if existing is not None and existing.request_id == request_id:
+                del self._records[key]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class SQLiteIdempotencyBackend(IdempotencyBackend):
+    """Records in a SQLite file shared by every process on the host."""
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._claims = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            "key TEXT PRIMARY KEY, request_id TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def claim(self, key: str, record: IdempotencyRecord) -> Optional[IdempotencyRecord]:
+        now = time.time()
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front, so two workers cannot both claim a key
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT request_id, fingerprint, expires_at FROM idempotency_keys WHERE key = ?",
+                               (key,)).fetchone()
+            if row and row[2] > now:
+                conn.execute("COMMIT")
+                return IdempotencyRecord(*row)
+            conn.execute("INSERT OR REPLACE INTO idempotency_keys (key, request_id, fingerprint, expires_at) "
+                         "VALUES (?, ?, ?, ?)", (key, record.request_id, record.fingerprint, record.expires_at))
+            self._claims += 1
+            if self._claims % 1000 == 0:
+                conn.execute("DELETE FROM idempotency_keys WHERE expires_at < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return None
+
+    def release(self, key: str, request_id: str) -> None:
+        self._connect().execute("DELETE FROM idempotency_keys WHERE key = ? AND request_id = ?", (key, request_id))
+
+
+# Delete KEYS[1] only while it still holds ARGV[1]'s request_id
+_REDIS_RELEASE = """
+local value = redis.call('GET', KEYS[1])
+if value and string.sub(value, 1, string.len(ARGV[1]) + 1) == ARGV[1] .. '|' then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """Records in Redis, shared by every host; expiry is left to Redis."""
+
+    blocking = True
+
+    def __init__(self, url: str, client: Any = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis idempotency backend needs the redis package (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def _key(self, key: str) -> str:
+        return f"knowledge_gpt:idempotency:{key}"
+
+    def claim(self, key: str, record: IdempotencyRecord) -> Optional[IdempotencyRecord]:
+        ttl = max(1, int(record.expires_at - time.time()))
+        # The existing record can expire between SET NX and GET; claim again then
+        for _ in range(3):
+            if self.client.set(self._key(key), record.encode(), nx=True, ex=ttl):
+                return None
+            existing = self.client.get(self._key(key))
+            if existing is not None:
+                return IdempotencyRecord.decode(existing)
+        return None
+
+    def release(self, key: str, request_id: str) -> None:
+        self.client.eval(_REDIS_RELEASE, 1, self._key(key), request_id)
+
+
+def create_idempotency_backend(name: Optional[str] = None) -> IdempotencyBackend:
+    """Build the configured record backend, falling back to memory if it is unavailable."""
+    name = (name or os.getenv("IDEMPOTENCY_BACKEND", "memory")).strip().lower()
+    try:
+        if name == "sqlite":
+            return SQLiteIdempotencyBackend(os.getenv("CACHE_PATH", os.path.join(PROJECT_ROOT, "shared_cache.db")))
+        if name == "redis":
+            return RedisIdempotencyBackend(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    except Exception as e:
+        logger.warning("[Idempotency] %s backend unavailable, using memory: %s", name, e)
+    return MemoryIdempotencyBackend(max_keys=int(_env_float("IDEMPOTENCY_MAX_KEYS", 10000)))
+
+
+class IdempotencyKeys:
+    """Claims and releases idempotency keys for search creation."""
+
+    def __init__(self, backend: Optional[IdempotencyBackend] = None, ttl_seconds: Optional[float] = None):
+        self.backend = backend if backend is not None else create_idempotency_backend()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else _env_float("IDEMPOTENCY_TTL_SECONDS", 86400)
+        self.outcomes: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _record(self, outcome: str) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        IDEMPOTENCY_REQUESTS.inc(outcome=outcome)
+
+    async def _call(self, func, *args):
+        if self.backend.blocking:
+            return await run_blocking(func, *args, pool="db")
+        return func(*args)
+
+    async def claim(self, client: str, key: str, fingerprint: str, request_id: str) -> Optional[IdempotencyClaim]:
+        """
+        Claim key for request_id, or find the request that already holds it.
+
+        Returns None when keys are disabled or the store is unavailable (the
+        request then proceeds as if it carried no key). Raises
+        IdempotencyConflict when the key was used with a different body.
+        """
+        if not self.enabled:
+            return None
+        store_key = scoped_key(client, key)
+        record = IdempotencyRecord(request_id, fingerprint, time.time() + self.ttl_seconds)
+        try:
+            existing = await self._call(self.backend.claim, store_key, record)
+        except Exception as e:
+            # Fail open: a broken key store must not stop searches from being created
+            logger.warning("[Idempotency] Key store unavailable: %s", e)
+            self._record("error")
+            return None
+        if existing is None:
+            self._record("new")
+            return IdempotencyClaim(store_key, record, replayed=False)
+        if existing.fingerprint != fingerprint:
+            self._record("conflict")
+            raise IdempotencyConflict("This Idempotency-Key was already used with a different request")
+        self._record("replayed")
+        return IdempotencyClaim(store_key, existing, replayed=True)
+
+    async def release(self, claim: Optional[IdempotencyClaim]) -> None:
+        """Forget a key this request claimed, so a retry can create the search."""
+        if claim is None or claim.replayed:
+            return
+        try:
+            await self._call(self.backend.release, claim.key, claim.record.request_id)
+            self._record("released")
+        except Exception as e:
+            logger.warning("[Idempotency] Failed to release key: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl_seconds,
+            "outcomes": dict(self.outcomes),
+        }
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+JSON encoding for API responses and stored JSON columns.
+
+Search results are large nested dicts (candidates carrying behavioral_data,
+evidence_urls and linkedin_profile). They were encoded with the stdlib json
+module in several places: store_people_to_database on write, every poll of
+get_people_for_search on read, and FastAPI's JSONResponse for every response.
+This module puts one pluggable codec behind all of them:
+
+    from json_codec import decode_column, dumps, encode_column, loads
+
+    row["behavioral_data"] = encode_column(person["behavioral_data"])
+    person["behavioral_data"] = decode_column(row["behavioral_data"], {})
+
+The orjson codec is used when orjson is installed. It is several times faster
+than the stdlib and handles datetimes, dataclasses and UUIDs natively. Without
+orjson the stdlib codec produces the same compact JSON. Both encode values they
+do not know natively (sets, pydantic models, anything else) the same way, so
+output does not depend on which codec is active.
+
+json_response.FastJSONResponse and CompressionMiddleware use the same codec for
+HTTP responses; see benchmark_json_codec.py for numbers on search payloads.
+
+Configuration (environment variables):
+    JSON_CODEC   auto | orjson | stdlib (default auto: orjson when installed)
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Union
+
+from structured_logging import get_logger
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+logger = get_logger(__name__)
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both codecs
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(value: Any) -> Any:
+    """Encoding for values neither codec handles natively."""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+class JSONCodec(ABC):
+    """Encodes to and decodes from JSON text."""
+
+    name = "abstract"
+
+    @abstractmethod
+    def dumps_bytes(self, value: Any) -> bytes:
+        """UTF-8 encoded, compact JSON."""
+
+    @abstractmethod
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        """Parse JSON; raises JSONDecodeError on invalid input."""
+
+    def dumps(self, value: Any) -> str:
+        return self.dumps_bytes(value).decode("utf-8")
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = "stdlib"
+
+    def dumps_bytes(self, value: Any) -> bytes:
+        return self.dumps(value).encode("utf-8")
+
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The orjson codec needs the orjson package (pip install orjson)")
+        self._options = orjson.OPT_NON_STR_KEYS
+        self._fallback = StdlibJSONCodec()
+
+    def dumps_bytes(self, value: Any) -> bytes:
+        try:
+            return orjson.dumps(value, default=_default, option=self._options)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits, which the stdlib still handles
+            return self._fallback.dumps_bytes(value)
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        return orjson.loads(data)
+
+
+CODECS = {"stdlib": StdlibJSONCodec, "orjson": OrjsonCodec}
+
+
+def create_codec(name: Optional[str] = None) -> JSONCodec:
+    """Build the named codec; "auto" (the default) prefers orjson when it is installed."""
+    name = (name or os.getenv("JSON_CODEC", "auto")).strip().lower()
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    try:
+        return CODECS[name]()
+    except KeyError:
+        logger.warning("[JSON Codec] Unknown codec %s, using stdlib", name)
+    except ImportError as e:
+        logger.warning("[JSON Codec] %s, using stdlib", e)
+    return StdlibJSONCodec()
+
+
+_codec: JSONCodec = create_codec()
+
+
+def get_codec() -> JSONCodec:
+    return _codec
+
+
+def set_codec(codec: Union[str, JSONCodec]) -> JSONCodec:
+    """Swap the process-wide codec (by name or instance); returns the previous one."""
+    global _codec
+    previous = _codec
+    _codec = create_codec(codec) if isinstance(codec, str) else codec
+    return previous
+
+
+def dumps(value: Any) -> str:
+    return _codec.dumps(value)
+
+
+def dumps_bytes(value: Any) -> bytes:
+    return _codec.dumps_bytes(value)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    return _codec.loads(data)
+
+
+def encode_column(value: Any) -> str:
+    """Text for a JSON-valued database column."""
+    return _codec.dumps(value)
+
+
+def decode_column(value: Any, default: Any = None) -> Any:
+    """Parse a JSON column read back as text; values already decoded pass through, bad JSON gives default."""
+    if not isinstance(value, (str, bytes, bytearray)):
+        return value
+    try:
+        return _codec.loads(value)
+    except (JSONDecodeError, ValueError):
+        return default
+
+
+def codec_stats() -> Dict[str, Any]:
+    return {"codec": _codec.name, "orjson_available": orjson is not None}
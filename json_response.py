@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+HTTP side of the JSON codec: a response class and response compression.
+
+FastJSONResponse renders content with json_codec instead of the stdlib
+encoder. It is the app's default response class. Hot endpoints return it
+directly, which also skips FastAPI's jsonable_encoder pass over the payload:
+
+    return FastJSONResponse(search_data)
+
+CompressionMiddleware gzip- or brotli-compresses complete responses above a
+size threshold when the client accepts it. Brotli is used only when the
+brotli package is installed. Streaming responses (Server-Sent Events) and
+responses that are already encoded pass through untouched. Once an encoding
+is negotiated, every compressible response carries Vary: Accept-Encoding,
+including ones too small to compress, so shared caches keep the variants
+apart. Bodies above the offload threshold are compressed on a worker thread
+so a large search payload does not stall the event loop.
+
+Configuration (environment variables):
+    RESPONSE_COMPRESSION            auto | gzip | br | off (default auto: br when available, else gzip)
+    RESPONSE_COMPRESSION_MIN_BYTES  smallest body worth compressing (default 1024)
+    RESPONSE_COMPRESSION_OFFLOAD_BYTES  bodies at least this large are compressed off the event loop (default 65536)
+"""
+
+import gzip
+import os
+from typing import Any, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from blocking_executor import run_blocking
+from json_codec import dumps_bytes
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Content types worth compressing; everything else (images, event streams) passes through
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/csv")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured json_codec codec."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+
+def _accepted_encodings(accept_encoding: str) -> Tuple[str, ...]:
+    accepted = []
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if token:
+            accepted.append(token.strip().lower())
+    return tuple(accepted)
+
+
+class CompressionMiddleware:
+    """Compress whole (non-streaming) responses above minimum_size."""
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None, mode: Optional[str] = None,
+                 gzip_level: int = 6, brotli_quality: int = 4, offload_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else int(
+            os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+        self.offload_size = offload_size if offload_size is not None else int(
+            os.getenv("RESPONSE_COMPRESSION_OFFLOAD_BYTES", "65536"))
+        mode = (mode or os.getenv("RESPONSE_COMPRESSION", "auto")).strip().lower()
+        if mode == "auto":
+            self.encodings: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+        elif mode == "br" and brotli is not None:
+            self.encodings = ("br",)
+        elif mode in ("gzip", "br"):
+            self.encodings = ("gzip",)
+        else:
+            self.encodings = ()
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding in self.encodings:
+            if encoding in accepted:
+                return encoding
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._choose(scope) if scope["type"] == "http" and self.encodings else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start)
+            content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type in COMPRESSIBLE_TYPES:
+                headers.add_vary_header("Accept-Encoding")
+            if (message.get("more_body", False) or len(body) < self.minimum_size
+                    or "content-encoding" in headers or content_type not in COMPRESSIBLE_TYPES):
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= self.offload_size:
+                compressed = await run_blocking(self.compress, body, encoding, pool="compression")
+            else:
+                compressed = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,20 +1,14 @@
-import os
 import json
 import sys
 import asyncio
 import httpx
 import time
+from services import load_settings
 
-# Load API key from environment variables or secrets.json with graceful error handling
-SCRAPING_DOG_API_KEY = os.getenv("SCRAPING_DOG_API_KEY")
+SCRAPING_DOG_API_KEY = load_settings().scraping_dog_api_key
 if not SCRAPING_DOG_API_KEY:
-    try:
-        with open(os.path.join(os.path.dirname(__file__), "secrets.json"), "r") as f:
-            _secrets = json.load(f)
-        SCRAPING_DOG_API_KEY = _secrets.get("scraping_dog_api_key")
-    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
-        print(f"⚠️  Warning: Could not load ScrapingDog API key: {e}")
-        print("   LinkedIn scraping will be disabled. Set SCRAPING_DOG_API_KEY environment variable or create secrets.json.")
+    print("⚠️  Warning: Could not load ScrapingDog API key")
+    print("   LinkedIn scraping will be disabled. Set SCRAPING_DOG_API_KEY environment variable or create secrets.json.")
 
 async def async_scrape_linkedin_profiles(urls, delay=1.5, max_retries=2):
     """
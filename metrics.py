@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms.
+
+Recording is a dict lookup, a bisect and a few additions under a per-metric
+lock, so it is cheap enough to sit on every LLM call, Apollo request and DB
+write. Everything lives in one registry which /api/system/metrics renders in
+the Prometheus text exposition format.
+
+Usage:
+    from metrics import STAGE_SECONDS, llm_call
+
+    with STAGE_SECONDS.time(stage="assessment"):
+        top = select_top_candidates(prompt, people)
+
+    with llm_call("behavioral_insight", "gpt-3.5-turbo") as call:
+        response = client.chat.completions.create(...)
+        call.record_usage(response)
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ContextDecorator
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Latency buckets in seconds, from fast DB writes up to slow evidence searches
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) > len(self.labelnames) or any(name not in self.labelnames for name in labels):
+            raise ValueError(f"{self.name} accepts labels {self.labelnames}, got {sorted(labels)}")
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {",".join(key): value for key, value in self._values.items()}
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class _HistogramChild:
+    __slots__ = ("bucket_counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Timer(ContextDecorator):
+    """Observes elapsed wall time into a histogram; usable as a context manager or decorator."""
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def _recreate_cm(self) -> "Timer":
+        return Timer(self.histogram, dict(self.labels))
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        labels = self.labels
+        if "outcome" in self.histogram.labelnames and "outcome" not in labels:
+            labels = {**labels, "outcome": "error" if exc_type else "ok"}
+        self.histogram.observe(time.perf_counter() - self.start, **labels)
+        return False
+
+
+class Histogram(Metric):
+    """Fixed-bucket distribution of observed values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != float("inf")))
+        self._children: Dict[LabelValues, _HistogramChild] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = _HistogramChild(len(self.buckets) + 1)
+            child.bucket_counts[index] += 1
+            child.sum += value
+            child.count += 1
+
+    def time(self, **labels: Any) -> Timer:
+        """Time a block. An "outcome" label, if the histogram has one, is filled in automatically."""
+        return Timer(self, labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(child.bucket_counts), child.sum, child.count)
+                           for key, child in self._children.items())
+        lines = []
+        for key, bucket_counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                ",".join(key): {"count": child.count, "sum": round(child.sum, 6),
+                                "avg": round(child.sum / child.count, 6) if child.count else 0.0}
+                for key, child in self._children.items()
+            }
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        """Run collector before every render, e.g. to copy queue depths into gauges."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                logger.warning("[Metrics] Collector failed: %s", e)
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+
+# Global registry instance
+registry = MetricsRegistry()
+
+SEARCH_SECONDS = registry.histogram(
+    "knowledge_gpt_search_duration_seconds", "End-to-end process_search duration", ["outcome"])
+SEARCH_DEGRADATIONS = registry.counter(
+    "knowledge_gpt_search_degradations_total", "Cheaper pipeline paths taken because the search deadline ran short",
+    ["path"])
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "knowledge_gpt_single_flight_calls_total", "Calls through single-flight groups that ran the work (leader) or joined it (coalesced)",
+    ["flight", "role"])
+STAGE_SECONDS = registry.histogram(
+    "knowledge_gpt_stage_duration_seconds", "Duration of search pipeline stages", ["stage", "outcome"])
+EXTERNAL_API_SECONDS = registry.histogram(
+    "knowledge_gpt_external_api_duration_seconds", "Duration of Apollo and SerpAPI requests",
+    ["service", "endpoint", "outcome"])
+LLM_SECONDS = registry.histogram(
+    "knowledge_gpt_llm_request_duration_seconds", "Duration of LLM calls by purpose and model",
+    ["purpose", "model", "outcome"])
+LLM_TOKENS = registry.counter(
+    "knowledge_gpt_llm_tokens_total", "Tokens used by LLM calls", ["purpose", "model", "kind"])
+URL_VALIDATION_SECONDS = registry.histogram(
+    "knowledge_gpt_url_validation_duration_seconds", "Duration of evidence URL validation checks", ["outcome"])
+DB_WRITE_SECONDS = registry.histogram(
+    "knowledge_gpt_db_write_duration_seconds", "Duration of database writes", ["table", "operation", "outcome"])
+EVIDENCE_OPERATION_SECONDS = registry.histogram(
+    "knowledge_gpt_evidence_operation_duration_seconds", "Evidence subsystem operation durations", ["operation"])
+EVIDENCE_ERRORS = registry.counter(
+    "knowledge_gpt_evidence_errors_total", "Evidence subsystem errors", ["operation", "error_type"])
+EVIDENCE_API_REQUESTS = registry.counter(
+    "knowledge_gpt_evidence_api_requests_total", "Evidence subsystem API requests")
+EVIDENCE_API_TOKENS = registry.counter(
+    "knowledge_gpt_evidence_api_tokens_total", "Tokens used by the evidence subsystem")
+EVIDENCE_RATE_LIMIT_HITS = registry.counter(
+    "knowledge_gpt_evidence_rate_limit_hits_total", "Rate limit responses seen by the evidence subsystem")
+
+
+class LLMCall:
+    """Times one LLM call and records its token usage."""
+
+    def __init__(self, purpose: str, model: str):
+        self.purpose = purpose
+        self.model = model or "unknown"
+        self.start = 0.0
+
+    def __enter__(self) -> "LLMCall":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        LLM_SECONDS.observe(time.perf_counter() - self.start, purpose=self.purpose, model=self.model,
+                            outcome="error" if exc_type else "ok")
+        return False
+
+    def record_usage(self, response: Any) -> None:
+        """Count prompt and completion tokens from an OpenAI response, if it reports them."""
+        usage = getattr(response, "usage", None)
+        if usage is None and isinstance(response, dict):
+            usage = response.get("usage")
+        if usage is None:
+            return
+        for kind in ("prompt_tokens", "completion_tokens"):
+            value = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+            if isinstance(value, (int, float)):
+                LLM_TOKENS.inc(value, purpose=self.purpose, model=self.model, kind=kind.split("_")[0])
+
+
+def llm_call(purpose: str, model: Optional[str]) -> LLMCall:
+    """Context manager that records one LLM call under its purpose and model."""
+    return LLMCall(purpose, model or "unknown")
+
+
+def render_metrics() -> str:
+    return registry.render()
@@ -2,34 +2,51 @@
 """
 OpenAI Utilities for Knowledge_GPT
 General functions for making OpenAI API calls throughout the application
+
+Every module that talks to OpenAI goes through these functions, so all LLM
+traffic shares the two pooled clients from services.py and is labelled in
+the LLM metrics. Async code awaits the asyncio variants, which use the
+AsyncOpenAI client and never block the event loop:
+
+    text = await call_openai_async(prompt, model="gpt-3.5-turbo", purpose="demo_example")
+    filters = await call_openai_for_json_async(prompt, expected_keys=["person_filters"])
+
+call_openai() and call_openai_for_json() remain for synchronous callers
+(which the search pipeline runs on its "llm" thread pool). They use the
+synchronous client with the same connection limits: an asyncio client
+cannot be driven from those threads without a private event loop per call,
+which would discard its connections every time.
 """
 
-import os
+import asyncio
 import json
-import openai
+import time
 from typing import Dict, List, Any, Optional, Union
-import logging
 import re
+from metrics import llm_call
+from deadline import budgeted_client
+from services import get_async_openai_client, get_openai_client
+from structured_logging import get_logger
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
-# Load OpenAI API key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    try:
-        with open("secrets.json", "r") as f:
-            secrets = json.load(f)
-            OPENAI_API_KEY = secrets.get("openai_api_key")
-    except (FileNotFoundError, json.JSONDecodeError):
-        logger.warning("OpenAI API key not found. Set OPENAI_API_KEY environment variable or create secrets.json")
+def _build_messages(
+    prompt: str,
+    system_message: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None
+) -> List[Dict[str, str]]:
+    """Conversation for one call; the caller's message list is left untouched."""
+    messages = list(messages or [])
+    if system_message:
+        messages.insert(0, {"role": "system", "content": system_message})
+    messages.append({"role": "user", "content": prompt})
+    return messages
 
-# Configure OpenAI client
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
-else:
-    logger.error("OpenAI API key not configured. OpenAI functions will not work.")
+def _response_text(response: Any, model: str, purpose: str) -> str:
+    result = response.choices[0].message.content.strip()
+    logger.debug("OpenAI API call successful", model=model, purpose=purpose,
+                 tokens=getattr(response.usage, "total_tokens", None))
+    return result
 
 def call_openai(
     prompt: str,
@@ -38,6 +55,7 @@ def call_openai(
     temperature: float = 0.7,
     system_message: Optional[str] = None,
     messages: Optional[List[Dict[str, str]]] = None,
+    purpose: str = "general",
     **kwargs
 ) -> Optional[str]:
     """
@@ -50,44 +68,75 @@ def call_openai(
         temperature: Response creativity (0.0-1.0, default: 0.7)
         system_message: Optional system message to set context
         messages: Optional list of previous messages for conversation
+        purpose: What the call is for, used to label latency and token metrics
         **kwargs: Additional parameters to pass to OpenAI API
     
     Returns:
         OpenAI response text or None if error
     """
-    if not OPENAI_API_KEY:
+    client = get_openai_client()
+    if client is None:
         logger.error("OpenAI API key not configured")
         return None
     
     try:
-        # Prepare messages
-        if messages is None:
-            messages = []
-            
-        # Add system message if provided
-        if system_message:
-            messages.insert(0, {"role": "system", "content": system_message})
-        
-        # Add user message
-        messages.append({"role": "user", "content": prompt})
-        
-        # Make API call using the correct OpenAI client format
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            **kwargs
-        )
+        # Shared client, so calls reuse one connection pool
+        with llm_call(purpose, model) as call:
+            response = budgeted_client(client).chat.completions.create(
+                model=model,
+                messages=_build_messages(prompt, system_message, messages),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+            call.record_usage(response)
+        return _response_text(response, model, purpose)
         
-        # Extract and return response
-        result = response.choices[0].message.content.strip()
-        logger.info(f"OpenAI API call successful (model: {model}, tokens: {response.usage.total_tokens})")
-        return result
+    except Exception as e:
+        logger.error("OpenAI API call failed: %s", e)
+        return None
+
+async def call_openai_async(
+    prompt: str,
+    model: str = "gpt-4",
+    max_tokens: int = 1000,
+    temperature: float = 0.7,
+    system_message: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None,
+    purpose: str = "general",
+    client: Any = None,
+    **kwargs
+) -> Optional[str]:
+    """
+    call_openai() for async code, on the shared AsyncOpenAI client
+    
+    Args:
+        client: AsyncOpenAI client to use instead of the shared one, e.g. one
+            from with_options() with its own timeout (it still shares the pool)
+        Other arguments are as for call_openai.
+    
+    Returns:
+        OpenAI response text or None if error
+    """
+    client = client or get_async_openai_client()
+    if client is None:
+        logger.error("OpenAI API key not configured")
+        return None
+    
+    try:
+        with llm_call(purpose, model) as call:
+            response = await budgeted_client(client).chat.completions.create(
+                model=model,
+                messages=_build_messages(prompt, system_message, messages),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+            call.record_usage(response)
+        return _response_text(response, model, purpose)
         
     except Exception as e:
-        logger.error(f"OpenAI API call failed: {e}")
+        logger.error("OpenAI API call failed: %s", e)
         return None
 
 def call_openai_with_retry(
@@ -112,12 +161,30 @@ def call_openai_with_retry(
             if result:
                 return result
         except Exception as e:
-            logger.warning(f"OpenAI API call attempt {attempt + 1} failed: {e}")
+            logger.warning("OpenAI API call attempt %s failed: %s", attempt + 1, e)
             if attempt < max_retries - 1:
-                import time
                 time.sleep(2 ** attempt)  # Exponential backoff
     
-    logger.error(f"OpenAI API call failed after {max_retries} attempts")
+    logger.error("OpenAI API call failed after %s attempts", max_retries)
+    return None
+
+async def call_openai_with_retry_async(
+    prompt: str,
+    max_retries: int = 3,
+    **kwargs
+) -> Optional[str]:
+    """call_openai_with_retry() for async code; backs off without blocking the event loop."""
+    for attempt in range(max_retries):
+        try:
+            result = await call_openai_async(prompt, **kwargs)
+            if result:
+                return result
+        except Exception as e:
+            logger.warning("OpenAI API call attempt %s failed: %s", attempt + 1, e)
+            if attempt < max_retries - 1:
+                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+    
+    logger.error("OpenAI API call failed after %s attempts", max_retries)
     return None
 
 def extract_json_from_response(response_text: str) -> Optional[dict]:
@@ -151,8 +218,8 @@ def extract_json_from_response(response_text: str) -> Optional[dict]:
         return json.loads(response_text.strip())
         
     except Exception as e:
-        logger.error(f"Failed to extract JSON: {e}")
-        logger.debug(f"Response was: {response_text}")
+        logger.error("Failed to extract JSON: %s", e)
+        logger.debug("Response was: %s", response_text)
     return None
 
 def parse_json_response(response: str) -> Optional[Dict[str, Any]]:
@@ -160,8 +227,7 @@ def parse_json_response(response: str) -> Optional[Dict[str, Any]]:
     Parse JSON response from OpenAI, robust to extra data or multiple JSON objects.
     """
     try:
-        # Debug: print raw response
-        logger.error(f"RAW OPENAI RESPONSE: {response}")
+        logger.debug("Raw OpenAI response: %s", response)
         # Try to extract JSON from the response
         start_idx = response.find('{')
         end_idx = response.rfind('}') + 1
@@ -176,11 +242,38 @@ def parse_json_response(response: str) -> Optional[Dict[str, Any]]:
             # If no JSON brackets found, try parsing the whole response
             return json.loads(response)
     except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON response: {e}")
-        logger.debug(f"Response was: {response}")
+        logger.error("Failed to parse JSON response: %s", e)
+        logger.debug("Response was: %s", response)
         # Fallback to regex extraction
         return extract_json_from_response(response)
 
+def _json_prompt(prompt: str, expected_keys: Optional[List[str]] = None) -> str:
+    """Add JSON formatting instructions to a prompt."""
+    json_prompt = f"{prompt}\n\nRespond with valid JSON only. No additional text or explanation."
+    if expected_keys:
+        json_prompt += f"\nRequired JSON keys: {', '.join(expected_keys)}"
+        example_format = ', '.join([f'"{key}": "value"' for key in expected_keys])
+        json_prompt += f"\nExample format: {{{example_format}}}"
+    return json_prompt
+
+def _checked_json(
+    response: Optional[str],
+    expected_keys: Optional[List[str]],
+    validate_response: bool
+) -> Optional[Dict[str, Any]]:
+    if not response:
+        return None
+    parsed_response = parse_json_response(response)
+    
+    # Validate response if requested
+    if validate_response and parsed_response and expected_keys:
+        missing_keys = [key for key in expected_keys if key not in parsed_response]
+        if missing_keys:
+            logger.warning("Response missing expected keys: %s", missing_keys)
+            return None
+    
+    return parsed_response
+
 def call_openai_for_json(
     prompt: str,
     expected_keys: Optional[List[str]] = None,
@@ -199,26 +292,18 @@ def call_openai_for_json(
     Returns:
         Parsed JSON dict or None if failed
     """
-    # Add JSON formatting instruction to prompt
-    json_prompt = f"{prompt}\n\nRespond with valid JSON only. No additional text or explanation."
-    if expected_keys:
-        json_prompt += f"\nRequired JSON keys: {', '.join(expected_keys)}"
-        example_format = ', '.join([f'"{key}": "value"' for key in expected_keys])
-        json_prompt += f"\nExample format: {{{example_format}}}"
-    
-    response = call_openai_with_retry(json_prompt, **kwargs)
-    if response:
-        parsed_response = parse_json_response(response)
-        
-        # Validate response if requested
-        if validate_response and parsed_response and expected_keys:
-            missing_keys = [key for key in expected_keys if key not in parsed_response]
-            if missing_keys:
-                logger.warning(f"Response missing expected keys: {missing_keys}")
-                return None
-        
-        return parsed_response
-    return None
+    response = call_openai_with_retry(_json_prompt(prompt, expected_keys), **kwargs)
+    return _checked_json(response, expected_keys, validate_response)
+
+async def call_openai_for_json_async(
+    prompt: str,
+    expected_keys: Optional[List[str]] = None,
+    validate_response: bool = True,
+    **kwargs
+) -> Optional[Dict[str, Any]]:
+    """call_openai_for_json() for async code; **kwargs go to call_openai_async."""
+    response = await call_openai_with_retry_async(_json_prompt(prompt, expected_keys), **kwargs)
+    return _checked_json(response, expected_keys, validate_response)
 
 # Convenience functions for common use cases
 def analyze_text(text: str, analysis_type: str = "general") -> Optional[str]:
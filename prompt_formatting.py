@@ -1,27 +1,13 @@
 # type: ignore
-import os
-import json
 import random
+import re
 from openai_utils import call_openai_for_json
+from services import load_settings
 
-try:
-    INTERNAL_DATABASE_API_KEY = os.getenv("INTERNAL_DATABASE_API_KEY")
-    SCRAPING_DOG_API_KEY = os.getenv("SCRAPING_DOG_API_KEY")
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    
-    if not OPENAI_API_KEY:
-        with open(os.path.join(os.path.dirname(__file__), "secrets.json"), "r") as f:
-            content = f.read()
-        decoder = json.JSONDecoder()
-        _secrets, _ = decoder.raw_decode(content)
-        # Handle both uppercase and lowercase key names for compatibility
-        INTERNAL_DATABASE_API_KEY = INTERNAL_DATABASE_API_KEY or _secrets.get("internal_database_api_key") or _secrets.get("INTERNAL_DATABASE_API_KEY")
-        SCRAPING_DOG_API_KEY = SCRAPING_DOG_API_KEY or _secrets.get("scraping_dog_api_key") or _secrets.get("SCRAPING_DOG_API_KEY")
-        OPENAI_API_KEY = OPENAI_API_KEY or _secrets.get("openai_key") or _secrets.get("OPENAI_API_KEY")
-except (FileNotFoundError, json.JSONDecodeError):
-    INTERNAL_DATABASE_API_KEY = os.getenv("INTERNAL_DATABASE_API_KEY")
-    SCRAPING_DOG_API_KEY = os.getenv("SCRAPING_DOG_API_KEY")
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+_settings = load_settings()
+INTERNAL_DATABASE_API_KEY = _settings.internal_database_api_key
+SCRAPING_DOG_API_KEY = _settings.scraping_dog_api_key
+OPENAI_API_KEY = _settings.openai_api_key
 
 def get_witty_error_response() -> str:
     witty_responses = [
@@ -33,26 +19,31 @@ def get_witty_error_response() -> str:
     ]
     return random.choice(witty_responses)
 
+# (role, industry) pairs that make a prompt ridiculous when both appear
+RIDICULOUS_PAIRS = [
+    ("barista", "enterprise"), ("barista", "cybersecurity"), ("cashier", "quantum"),
+    ("janitor", "blockchain"), ("waiter", "artificial intelligence"), ("receptionist", "machine learning"),
+    ("delivery driver", "enterprise software"), ("retail associate", "cloud computing"),
+    ("fast food worker", "data science"), ("housekeeper", "cybersecurity"),
+    ("pizza delivery", "enterprise"), ("pizza delivery", "quantum"), ("pizza delivery", "cybersecurity"),
+    ("coffee shop", "quantum"), ("restaurant", "blockchain"), ("grocery store", "ai"),
+    ("gas station", "machine learning"), ("delivery", "quantum"), ("delivery", "enterprise"),
+    ("delivery", "cybersecurity"), ("driver", "quantum"), ("driver", "enterprise"), ("driver", "cybersecurity")
+]
+_RIDICULOUS_ROLE_RE = re.compile("|".join(re.escape(role) for role in sorted({r for r, _ in RIDICULOUS_PAIRS}, key=len, reverse=True)))
+
 def is_ridiculous_prompt(prompt: str) -> bool:
-    ridiculous_patterns = [
-        ("barista", "enterprise"), ("barista", "cybersecurity"), ("cashier", "quantum"),
-        ("janitor", "blockchain"), ("waiter", "artificial intelligence"), ("receptionist", "machine learning"),
-        ("delivery driver", "enterprise software"), ("retail associate", "cloud computing"),
-        ("fast food worker", "data science"), ("housekeeper", "cybersecurity"),
-        ("pizza delivery", "enterprise"), ("pizza delivery", "quantum"), ("pizza delivery", "cybersecurity"),
-        ("coffee shop", "quantum"), ("restaurant", "blockchain"), ("grocery store", "ai"),
-        ("gas station", "machine learning"), ("delivery", "quantum"), ("delivery", "enterprise"),
-        ("delivery", "cybersecurity"), ("driver", "quantum"), ("driver", "enterprise"), ("driver", "cybersecurity")
-    ]
-    
     prompt_lower = prompt.lower()
-    for role, industry in ridiculous_patterns:
-        if role in prompt_lower and industry in prompt_lower:
-            return True
-    return False
+    # Most prompts mention none of the roles; only check the pairs when one does
+    if not _RIDICULOUS_ROLE_RE.search(prompt_lower):
+        return False
+    return any(role in prompt_lower and industry in prompt_lower for role, industry in RIDICULOUS_PAIRS)
 
-def parse_prompt_to_internal_database_filters(prompt: str) -> dict:
-    if is_ridiculous_prompt(prompt):
+def parse_prompt_to_internal_database_filters(prompt: str, ridiculous: bool = None) -> dict:
+    # Callers that already ran the prompt gate pass its verdict instead of re-checking
+    if ridiculous is None:
+        ridiculous = is_ridiculous_prompt(prompt)
+    if ridiculous:
         return {
             "organization_filters": {},
             "person_filters": {},
@@ -117,7 +108,8 @@ def parse_prompt_to_internal_database_filters(prompt: str) -> dict:
         model="gpt-3.5-turbo",
         temperature=0,
         max_tokens=500,
-        expected_keys=["organization_filters", "person_filters", "reasoning"]
+        expected_keys=["organization_filters", "person_filters", "reasoning"],
+        purpose="filter_parsing"
     )
     
     if not filters:
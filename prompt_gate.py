@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Prompt gate: preprocessing, validation and name detection in one pass.
+
+create_search and the background pipeline used to each preprocess the prompt
+with one re.search/re.sub per generic term, then create_search scanned the
+public-figure and vagueness lists, ran the creepy detector, and
+parse_prompt_to_internal_database_filters checked for ridiculous prompts
+again. Here every rule list is compiled once at import into a single
+alternation regex, the prompt is checked once in create_search, and the
+resulting ParsedPrompt travels with the queued job so the pipeline reuses it
+(including the ridiculous-prompt verdict from prompt_formatting).
+
+    parsed = parse_prompt("Find people who run marketing agencies in Ohio")
+    parsed.normalized        -> "Find executives who run marketing agencies in Ohio"
+    parsed.rejection_reason  -> None
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from creepy_detector import detect_specific_person_search
+from prompt_formatting import is_ridiculous_prompt
+
+# Generic people terms are rewritten to "executives" for better search results
+GENERIC_TERMS = [
+    "people", "persons", "person", "anyone", "somebody", "someone",
+    "individuals", "individual", "professionals", "professional",
+    "contacts", "contact", "leads", "lead"
+]
+
+# Only the most obvious requests for well-known public figures
+PUBLIC_FIGURE_PATTERNS = [
+    "elon musk", "jeff bezos", "mark zuckerberg", "bill gates", "larry fink",
+    "ceo of apple", "ceo of google", "ceo of microsoft", "ceo of amazon",
+    "president of the united states", "white house", "government officials",
+    "movie stars", "actors", "singers", "athletes", "celebrities"
+]
+
+VAGUE_PATTERNS = [
+    "find me someone", "find me a person", "find me anybody",
+    "anyone who", "somebody who", "a person who",
+    "random people", "random person", "any person"
+]
+
+MIN_PROMPT_WORDS = 3
+
+REJECTION_MESSAGES = {
+    "public_figure": "Search request appears to be looking for well-known public figures. Please search for specific professional roles or industries instead.",
+    "vague": "Please provide more specific search criteria. What role, industry, or professional background are you looking for?",
+    "too_broad": "Please provide more detailed search criteria. Include role, industry, or specific requirements.",
+}
+
+
+def _alternation(terms: Iterable[str], word_boundaries: bool = False) -> "re.Pattern":
+    """One regex matching any of the terms (longest first so alternation prefers the full term)."""
+    body = "|".join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+    return re.compile(rf"\b(?:{body})\b" if word_boundaries else f"(?:{body})", re.IGNORECASE)
+
+
+_GENERIC_RE = _alternation(GENERIC_TERMS, word_boundaries=True)
+# The validation lists are plain substring checks, which a single alternation search reproduces exactly
+_PUBLIC_FIGURE_RE = _alternation(PUBLIC_FIGURE_PATTERNS)
+_VAGUE_RE = _alternation(VAGUE_PATTERNS)
+
+
+@dataclass
+class ParsedPrompt:
+    """Everything the gate learned about a prompt; stored on the queued job."""
+    original: str
+    normalized: str
+    flags: List[str] = field(default_factory=list)
+    detected_names: List[str] = field(default_factory=list)
+    rejection_reason: Optional[str] = None
+    rejection_message: Optional[str] = None
+
+    @property
+    def rejected(self) -> bool:
+        return self.rejection_reason is not None
+
+    @property
+    def ridiculous(self) -> bool:
+        return "ridiculous" in self.flags
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsedPrompt":
+        known = {key: data[key] for key in cls.__dataclass_fields__ if key in data}
+        return cls(**known)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Convert generic people terms to 'executives' for better search results."""
+    return _GENERIC_RE.sub("executives", prompt)
+
+
+def parse_prompt(prompt: str, user_first_name: Optional[str] = None) -> ParsedPrompt:
+    """
+    Run every prompt rule once.
+
+    Rules are applied in the order create_search always used: public figures,
+    vagueness, specific people by name, then prompts that are too short. The
+    first failing rule sets rejection_reason; the name check runs on the
+    original prompt since capitalization matters there.
+    """
+    prompt = prompt.strip()
+    normalized = normalize_prompt(prompt)
+    parsed = ParsedPrompt(original=prompt, normalized=normalized)
+    if normalized != prompt:
+        parsed.flags.append("generic_terms_replaced")
+    if is_ridiculous_prompt(normalized):
+        parsed.flags.append("ridiculous")
+
+    prompt_lower = normalized.lower()
+    if _PUBLIC_FIGURE_RE.search(prompt_lower):
+        return _reject(parsed, "public_figure")
+    if _VAGUE_RE.search(prompt_lower):
+        return _reject(parsed, "vague")
+
+    creepy = detect_specific_person_search(prompt, user_first_name)
+    if creepy["is_creepy"]:
+        parsed.detected_names = list(creepy["detected_names"])
+        parsed.flags.append("specific_person")
+        return _reject(parsed, "specific_person", creepy["response"])
+
+    if len(prompt_lower.split()) < MIN_PROMPT_WORDS:
+        return _reject(parsed, "too_broad")
+    return parsed
+
+
+def _reject(parsed: ParsedPrompt, reason: str, message: Optional[str] = None) -> ParsedPrompt:
+    parsed.rejection_reason = reason
+    parsed.rejection_message = message or REJECTION_MESSAGES[reason]
+    return parsed
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Batch searches: many prompts submitted and run as one job.
+
+List-building integrations used to submit dozens of prompts back to back
+through POST /api/search. Each one parsed its own filters, paged Apollo on
+its own and made its own estimation call, even when several prompts asked
+for the same people. POST /api/search/batch accepts the prompts in one
+request, creates a child search per prompt (each still readable at
+GET /api/search/{request_id}), and enqueues a single batch job that runs
+them together:
+
+  * identical prompts (after canonicalization) run the pipeline once; the
+    duplicates are completed from the first one through single-flight
+  * people-count estimates for every prompt come from one LLM call
+  * filter parsing is shared between prompts that enhance to the same text,
+    and Apollo pages are shared between prompts whose parsed filters are
+    identical (each page is fetched once per batch)
+  * per-stage timings and sharing counts are stored with the batch and
+    returned by GET /api/search/batch/{batch_id}
+
+The running batch is a context variable, like the search deadline, so the
+search pipeline consults it without extra parameters:
+
+    filters = await shared("filters", enhanced_prompt, lambda: parse(enhanced_prompt))
+
+Outside a batch, shared() simply awaits the call.
+
+Configuration (environment variables):
+    BATCH_MAX_PROMPTS    prompts accepted per batch (default 50)
+    BATCH_CONCURRENCY    child searches a batch runs at once (default 4)
+"""
+
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from metrics import registry as metrics_registry
+from search_result_cache import canonicalize_prompt
+
+T = TypeVar("T")
+
+BATCH_SHARED = metrics_registry.counter(
+    "knowledge_gpt_batch_shared_total",
+    "Batch-scoped calls by kind; hit means the result of an earlier prompt in the batch was reused",
+    ["kind", "outcome"],
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def max_batch_prompts() -> int:
+    return max(1, _env_int("BATCH_MAX_PROMPTS", 50))
+
+
+def batch_concurrency() -> int:
+    return max(1, _env_int("BATCH_CONCURRENCY", 4))
+
+
+def dedupe_prompts(prompts: Iterable[str]) -> List[Optional[int]]:
+    """For each prompt, the index of the first identical (canonicalized) prompt before it, else None."""
+    first_seen: Dict[str, int] = {}
+    duplicates: List[Optional[int]] = []
+    for index, prompt in enumerate(prompts):
+        key = canonicalize_prompt(prompt)
+        duplicates.append(first_seen.get(key))
+        first_seen.setdefault(key, index)
+    return duplicates
+
+
+def summarize_batch(items: List[Dict[str, Any]], statuses: Dict[str, Dict[str, Any]]) -> Tuple[str, Dict[str, int]]:
+    """
+    Overall batch status and per-status counts from the child searches.
+
+    Prompts rejected at submission count as failed. The batch is processing
+    while any child is, and completed once every child reached a terminal
+    status (individual failures are visible in the counts).
+    """
+    counts: Dict[str, int] = {}
+    for item in items:
+        request_id = item.get("request_id")
+        if request_id:
+            status = (statuses.get(request_id) or {}).get("status") or "processing"
+        else:
+            status = "failed"
+        counts[status] = counts.get(status, 0) + 1
+    return ("processing" if counts.get("processing") else "completed"), counts
+
+
+class SearchBatch:
+    """State shared by the child searches of one running batch."""
+
+    def __init__(self, batch_id: str):
+        self.batch_id = batch_id
+        # canonical prompt -> estimate_people_count() style result from the batched call
+        self.estimates: Dict[str, Dict[str, Any]] = {}
+        self._shared: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.stage_ms: Dict[str, float] = {}
+        self.started_at = time.perf_counter()
+
+    def estimate_for(self, prompt: str) -> Optional[Dict[str, Any]]:
+        return self.estimates.get(canonicalize_prompt(prompt))
+
+    async def shared(self, kind: str, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func once per (kind, key) for the whole batch and hand every caller the result.
+
+        A failed or cancelled call is forgotten, so the next caller tries again.
+        Callers await a shield, so one prompt timing out does not cancel the
+        call for the others.
+        """
+        task = self._shared.get((kind, key))
+        if task is None:
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            BATCH_SHARED.inc(kind=kind, outcome="miss")
+            task = asyncio.ensure_future(func())
+            self._shared[(kind, key)] = task
+
+            def forget_failure(done: asyncio.Task) -> None:
+                if done.cancelled() or done.exception() is not None:
+                    if self._shared.get((kind, key)) is done:
+                        del self._shared[(kind, key)]
+
+            task.add_done_callback(forget_failure)
+        else:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            BATCH_SHARED.inc(kind=kind, outcome="hit")
+        return await asyncio.shield(task)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "stages_ms": dict(self.stage_ms),
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+            "shared": {kind: {"calls": self.misses.get(kind, 0), "reused": self.hits.get(kind, 0)}
+                       for kind in sorted(set(self.hits) | set(self.misses))},
+            "batched_estimates": len(self.estimates),
+        }
+
+
+_current_batch: ContextVar[Optional[SearchBatch]] = ContextVar("search_batch", default=None)
+
+
+def current_batch() -> Optional[SearchBatch]:
+    return _current_batch.get()
+
+
+def set_current_batch(batch: Optional[SearchBatch]):
+    """Make `batch` visible to the searches started in this context; returns a token for reset."""
+    return _current_batch.set(batch)
+
+
+def reset_current_batch(token) -> None:
+    _current_batch.reset(token)
+
+
+async def shared(kind: str, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+    """SearchBatch.shared() for the running batch, or a plain call outside one."""
+    batch = _current_batch.get()
+    if batch is None:
+        return await func()
+    return await batch.shared(kind, key, func)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+In-process pub/sub for search progress events.
+
+process_search publishes stage transitions (filters parsed, people fetched,
+candidate scored, evidence attached, completed) and every finalized candidate
+here. GET /api/search/{request_id}/events subscribes and forwards them to the
+client as Server-Sent Events, so clients no longer need to poll the search
+endpoint (and Supabase) every few seconds.
+
+Events for a search are kept for a short while after it finishes so a client
+that connects late, or reconnects with Last-Event-ID, still receives the full
+sequence. A search that stops publishing without a terminal event (its
+process died or it was dropped) is forgotten once it has been silent for
+abandoned_ttl seconds.
+
+Usage:
+    from search_events import publish_search_event, search_event_bus
+
+    publish_search_event(request_id, "filters_parsed", filters=filters)
+
+    async for event in search_event_bus.subscribe(request_id):
+        yield event.to_sse()
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import json_codec
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+TERMINAL_EVENTS = ("completed", "failed", "cancelled")
+
+
+@dataclass
+class SearchEvent:
+    """A single progress event for one search."""
+    request_id: str
+    event: str
+    data: Dict[str, Any]
+    sequence: int
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.event in TERMINAL_EVENTS
+
+    def to_sse(self) -> str:
+        """Format the event as a Server-Sent Events frame."""
+        payload = {"request_id": self.request_id, "timestamp": self.timestamp, **self.data}
+        return f"id: {self.sequence}\nevent: {self.event}\ndata: {json_codec.dumps(payload)}\n\n"
+
+
+class SearchEventBus:
+    """Fan out search events to any number of subscribers per request_id."""
+
+    def __init__(self, history_limit: int = 200, history_ttl: float = 300.0, abandoned_ttl: float = 1800.0):
+        self.history_limit = history_limit
+        self.history_ttl = history_ttl
+        self.abandoned_ttl = abandoned_ttl
+        self._history: Dict[str, List[SearchEvent]] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, request_id: str, event: str, **data: Any) -> SearchEvent:
+        """Record an event and deliver it to current subscribers."""
+        with self._lock:
+            history = self._history.setdefault(request_id, [])
+            search_event = SearchEvent(
+                request_id=request_id,
+                event=event,
+                data=data,
+                sequence=history[-1].sequence + 1 if history else 1,
+            )
+            history.append(search_event)
+            if len(history) > self.history_limit:
+                del history[: len(history) - self.history_limit]
+            if search_event.is_terminal:
+                self._finished_at[request_id] = search_event.timestamp
+            subscribers = list(self._subscribers.get(request_id, []))
+            self._expire_history()
+
+        for queue in subscribers:
+            queue.put_nowait(search_event)
+        return search_event
+
+    def history(self, request_id: str, after_sequence: int = 0) -> List[SearchEvent]:
+        """Return recorded events newer than after_sequence."""
+        with self._lock:
+            return [e for e in self._history.get(request_id, []) if e.sequence > after_sequence]
+
+    async def subscribe(self, request_id: str, after_sequence: int = 0,
+                        timeout: Optional[float] = None) -> AsyncIterator[Optional[SearchEvent]]:
+        """
+        Yield past and future events for request_id until a terminal event.
+
+        When timeout is set, None is yielded whenever no event arrives within
+        that many seconds so the caller can send keep-alives or re-check state.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            replay = [e for e in self._history.get(request_id, []) if e.sequence > after_sequence]
+            self._subscribers.setdefault(request_id, []).append(queue)
+
+        try:
+            last_sequence = after_sequence
+            for search_event in replay:
+                last_sequence = search_event.sequence
+                yield search_event
+                if search_event.is_terminal:
+                    return
+
+            while True:
+                try:
+                    search_event = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if search_event.sequence <= last_sequence:
+                    continue
+                last_sequence = search_event.sequence
+                yield search_event
+                if search_event.is_terminal:
+                    return
+        finally:
+            with self._lock:
+                queues = self._subscribers.get(request_id, [])
+                if queue in queues:
+                    queues.remove(queue)
+                if not queues:
+                    self._subscribers.pop(request_id, None)
+
+    def subscriber_count(self, request_id: Optional[str] = None) -> int:
+        with self._lock:
+            if request_id is not None:
+                return len(self._subscribers.get(request_id, []))
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def _expire_history(self) -> None:
+        now = time.time()
+        finished_cutoff = now - self.history_ttl
+        silent_cutoff = now - self.abandoned_ttl
+        expired = [r for r, finished in self._finished_at.items() if finished < finished_cutoff]
+        expired += [r for r, history in self._history.items()
+                    if r not in self._finished_at and (not history or history[-1].timestamp < silent_cutoff)]
+        for request_id in expired:
+            self._finished_at.pop(request_id, None)
+            self._history.pop(request_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire_history()
+            return {
+                "tracked_searches": len(self._history),
+                "active_searches": len(self._history) - len(self._finished_at),
+                "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            }
+
+
+# Global event bus instance
+search_event_bus = SearchEventBus()
+
+
+def publish_search_event(request_id: str, event: str, **data: Any) -> None:
+    """Publish on the global bus; never lets an event failure break the pipeline."""
+    try:
+        search_event_bus.publish(request_id, event, **data)
+    except Exception as e:
+        logger.warning("[Search Events] Failed to publish %s for %s: %s", event, request_id, e)
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Durable job queue for search requests.
+
+create_search used to hand process_search to FastAPI BackgroundTasks, so
+searches ran inside the web process with no concurrency limit and were lost on
+restart or deploy. Searches are now enqueued here with a priority, leased by
+workers (see search_worker.py) and acknowledged when they finish. Workers
+extend the leases of jobs they are still running; a lease that is neither
+extended nor acknowledged expires and the job is handed out again, so a
+crashed or redeployed worker does not drop searches. Only the worker holding
+a lease can acknowledge or release it. Cancelling a search marks its job
+cancelled: a pending job is never leased and the worker running a leased one
+stops it.
+
+The backend is pluggable. SQLiteQueueBackend is the local stand-in: it is safe
+to share between the API process and worker processes on the same host. A
+networked backend only needs to implement QueueBackend.
+
+Configuration (environment variables):
+    SEARCH_QUEUE_MODE           "embedded" (default): the API process also runs a worker;
+                                "external": the API only enqueues, search_worker.py consumes
+    SEARCH_QUEUE_BACKEND        backend name, currently "sqlite" (default)
+    SEARCH_QUEUE_PATH           SQLite file (default: search_queue.db in the project root)
+    SEARCH_QUEUE_MAX_DEPTH      pending jobs before new searches are rejected (default 200)
+    SEARCH_QUEUE_LEASE_SECONDS  how long a worker owns a job before it is re-queued (default 600)
+    SEARCH_QUEUE_MAX_ATTEMPTS   deliveries before a job is dead-lettered (default 3)
+    SEARCH_QUEUE_RETENTION_DAYS days finished (done, cancelled, dead) jobs are kept (default 7, 0 keeps them)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import json_codec
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Statuses a job never leaves; these rows are only kept for stats and are purged after the retention period
+FINISHED_STATUSES = ("done", "cancelled", "dead")
+# How often lease() purges finished jobs
+PURGE_INTERVAL_SECONDS = 300.0
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_queue_mode() -> str:
+    """Return "embedded" or "external" (see module docstring)."""
+    mode = os.getenv("SEARCH_QUEUE_MODE", "embedded").strip().lower()
+    return mode if mode in ("embedded", "external") else "embedded"
+
+
+class QueueFullError(Exception):
+    """Raised when the queue is too deep to accept another search."""
+
+    def __init__(self, depth: int, max_depth: int):
+        self.depth = depth
+        self.max_depth = max_depth
+        super().__init__(f"Search queue is full ({depth}/{max_depth} pending)")
+
+
+@dataclass
+class QueueJob:
+    """A search waiting in, or leased from, the queue."""
+    job_id: str
+    request_id: str
+    payload: Dict[str, Any]
+    priority: int = 0
+    attempts: int = 0
+    status: str = "pending"
+    enqueued_at: float = field(default_factory=time.time)
+    first_leased_at: Optional[float] = None
+    lease_expires_at: Optional[float] = None
+    worker_id: Optional[str] = None
+    # Searches the job runs (a batch job runs several); admission caps the sum
+    weight: int = 1
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        """Time between enqueue and the first lease."""
+        if self.first_leased_at is None:
+            return None
+        return max(0.0, self.first_leased_at - self.enqueued_at)
+
+
+class QueueBackend(ABC):
+    """Storage interface for the search queue."""
+
+    @abstractmethod
+    def enqueue(self, job: QueueJob) -> None:
+        """Persist a new pending job."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[QueueJob]:
+        """Claim the highest priority pending job, or return None."""
+
+    @abstractmethod
+    def ack(self, job_id: str, worker_id: Optional[str] = None) -> bool:
+        """Mark a leased job as done (only if worker_id, when given, still holds the lease)."""
+
+    @abstractmethod
+    def nack(self, job_id: str, requeue: bool = True, max_attempts: int = 3,
+             worker_id: Optional[str] = None) -> bool:
+        """Release a leased job, re-queueing it unless it is out of attempts."""
+
+    @abstractmethod
+    def extend_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Push back the expiry of a lease worker_id still holds; False if it lost the job."""
+
+    @abstractmethod
+    def requeue_expired(self, max_attempts: int = 3) -> int:
+        """Return expired leases to the queue; returns how many were moved."""
+
+    @abstractmethod
+    def cancel(self, request_id: str) -> int:
+        """Mark pending and leased jobs for request_id as cancelled; returns how many were."""
+
+    @abstractmethod
+    def cancelled_jobs(self, job_ids: Iterable[str]) -> List[str]:
+        """Return the subset of job_ids that have been cancelled."""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[QueueJob]:
+        """Fetch a job by id."""
+
+    @abstractmethod
+    def pending_count(self) -> int:
+        """Number of pending jobs."""
+
+    @abstractmethod
+    def active_searches(self) -> int:
+        """Total weight of pending and leased jobs."""
+
+    @abstractmethod
+    def purge_finished(self, finished_before: float) -> int:
+        """Delete jobs that finished before the given time; returns how many were."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Return depth, in-flight and wait time figures."""
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """Queue backend stored in a local SQLite file (WAL mode, multi-process safe)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_jobs (
+                job_id TEXT PRIMARY KEY,
+                request_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                enqueued_at REAL NOT NULL,
+                first_leased_at REAL,
+                lease_expires_at REAL,
+                worker_id TEXT,
+                finished_at REAL,
+                weight INTEGER NOT NULL DEFAULT 1
+            )
+            """
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(search_jobs)")}
+        if "weight" not in columns:
+            # Queue files created before batch jobs existed
+            conn.execute("ALTER TABLE search_jobs ADD COLUMN weight INTEGER NOT NULL DEFAULT 1")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_jobs_pending "
+            "ON search_jobs (status, priority DESC, enqueued_at)"
+        )
+        # Recent waits for stats() and the retention purge
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_jobs_first_leased ON search_jobs (first_leased_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_jobs_finished ON search_jobs (finished_at)")
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> QueueJob:
+        return QueueJob(
+            job_id=row["job_id"],
+            request_id=row["request_id"],
+            payload=json_codec.loads(row["payload"]),
+            priority=row["priority"],
+            attempts=row["attempts"],
+            status=row["status"],
+            enqueued_at=row["enqueued_at"],
+            first_leased_at=row["first_leased_at"],
+            lease_expires_at=row["lease_expires_at"],
+            worker_id=row["worker_id"],
+            weight=row["weight"],
+        )
+
+    def enqueue(self, job: QueueJob) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO search_jobs (job_id, request_id, payload, priority, attempts, status, enqueued_at, weight) "
+                "VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
+                (job.job_id, job.request_id, json_codec.dumps(job.payload), job.priority, job.attempts,
+                 job.enqueued_at, job.weight),
+            )
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[QueueJob]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            # BEGIN IMMEDIATE takes the write lock so two processes cannot claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM search_jobs WHERE status = 'pending' "
+                    "ORDER BY priority DESC, enqueued_at ASC LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE search_jobs SET status = 'leased', attempts = attempts + 1, worker_id = ?, "
+                    "lease_expires_at = ?, first_leased_at = COALESCE(first_leased_at, ?) WHERE job_id = ?",
+                    (worker_id, now + lease_seconds, now, row["job_id"]),
+                )
+                updated = conn.execute("SELECT * FROM search_jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self._row_to_job(updated)
+
+    @staticmethod
+    def _owner_clause(job_id: str, worker_id: Optional[str]) -> Tuple[str, Tuple[Any, ...]]:
+        if worker_id is None:
+            return "job_id = ? AND status = 'leased'", (job_id,)
+        return "job_id = ? AND status = 'leased' AND worker_id = ?", (job_id, worker_id)
+
+    def ack(self, job_id: str, worker_id: Optional[str] = None) -> bool:
+        where, params = self._owner_clause(job_id, worker_id)
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE search_jobs SET status = 'done', finished_at = ?, lease_expires_at = NULL WHERE {where}",
+                (time.time(), *params),
+            )
+        return cursor.rowcount > 0
+
+    def nack(self, job_id: str, requeue: bool = True, max_attempts: int = 3,
+             worker_id: Optional[str] = None) -> bool:
+        where, params = self._owner_clause(job_id, worker_id)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(f"SELECT attempts FROM search_jobs WHERE {where}", params).fetchone()
+            if row is None:
+                return False
+            if requeue and row["attempts"] < max_attempts:
+                conn.execute(
+                    "UPDATE search_jobs SET status = 'pending', worker_id = NULL, lease_expires_at = NULL WHERE job_id = ?",
+                    (job_id,),
+                )
+            else:
+                conn.execute(
+                    "UPDATE search_jobs SET status = 'dead', finished_at = ?, lease_expires_at = NULL WHERE job_id = ?",
+                    (time.time(), job_id),
+                )
+        return True
+
+    def extend_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        where, params = self._owner_clause(job_id, worker_id)
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE search_jobs SET lease_expires_at = ? WHERE {where}", (time.time() + lease_seconds, *params)
+            )
+        return cursor.rowcount > 0
+
+    def requeue_expired(self, max_attempts: int = 3) -> int:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            dead = conn.execute(
+                "UPDATE search_jobs SET status = 'dead', finished_at = ?, lease_expires_at = NULL "
+                "WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= ?",
+                (now, now, max_attempts),
+            ).rowcount
+            moved = conn.execute(
+                "UPDATE search_jobs SET status = 'pending', worker_id = NULL, lease_expires_at = NULL "
+                "WHERE status = 'leased' AND lease_expires_at < ?",
+                (now,),
+            ).rowcount
+        if dead:
+            logger.warning("[Search Queue] Dead-lettered %s job(s) after %s attempts", dead, max_attempts)
+        return moved
+
+    def cancel(self, request_id: str) -> int:
+        with self._lock:
+            cursor = self._connect().execute(
+                "UPDATE search_jobs SET status = 'cancelled', finished_at = ?, lease_expires_at = NULL "
+                "WHERE request_id = ? AND status IN ('pending', 'leased')",
+                (time.time(), request_id),
+            )
+        return cursor.rowcount
+
+    def cancelled_jobs(self, job_ids: Iterable[str]) -> List[str]:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        placeholders = ", ".join("?" for _ in job_ids)
+        rows = self._connect().execute(
+            f"SELECT job_id FROM search_jobs WHERE status = 'cancelled' AND job_id IN ({placeholders})",
+            job_ids,
+        )
+        return [row["job_id"] for row in rows]
+
+    def get_job(self, job_id: str) -> Optional[QueueJob]:
+        row = self._connect().execute("SELECT * FROM search_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def pending_count(self) -> int:
+        row = self._connect().execute("SELECT COUNT(*) AS n FROM search_jobs WHERE status = 'pending'").fetchone()
+        return row["n"]
+
+    def active_searches(self) -> int:
+        row = self._connect().execute(
+            "SELECT COALESCE(SUM(weight), 0) AS n FROM search_jobs WHERE status IN ('pending', 'leased')"
+        ).fetchone()
+        return row["n"]
+
+    def purge_finished(self, finished_before: float) -> int:
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._lock:
+            cursor = self._connect().execute(
+                f"DELETE FROM search_jobs WHERE finished_at < ? AND status IN ({placeholders})",
+                (finished_before, *FINISHED_STATUSES),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        counts = {row["status"]: row["n"] for row in conn.execute(
+            "SELECT status, COUNT(*) AS n FROM search_jobs GROUP BY status"
+        )}
+        oldest = conn.execute("SELECT MIN(enqueued_at) AS t FROM search_jobs WHERE status = 'pending'").fetchone()["t"]
+        waits = [row["w"] for row in conn.execute(
+            "SELECT first_leased_at - enqueued_at AS w FROM search_jobs WHERE first_leased_at IS NOT NULL "
+            "ORDER BY first_leased_at DESC LIMIT 200"
+        )]
+        waits.sort()
+        return {
+            "depth": counts.get("pending", 0),
+            "in_flight": counts.get("leased", 0),
+            "completed": counts.get("done", 0),
+            "dead": counts.get("dead", 0),
+            "cancelled": counts.get("cancelled", 0),
+            "oldest_pending_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "wait_seconds_avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "wait_seconds_p95": round(waits[max(0, int(len(waits) * 0.95) - 1)], 3) if waits else 0.0,
+        }
+
+
+class SearchQueue:
+    """Priority queue of searches with leases, acknowledgement and backpressure."""
+
+    def __init__(self, backend: QueueBackend, max_depth: int = 200,
+                 lease_seconds: float = 600, max_attempts: int = 3, retention_days: float = 7):
+        self.backend = backend
+        self.max_depth = max_depth
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_days = retention_days
+        self._last_purge = 0.0
+
+    def enqueue(self, request_id: str, payload: Dict[str, Any], priority: int = 0, weight: int = 1) -> QueueJob:
+        """
+        Add a search to the queue, raising QueueFullError when it is saturated.
+
+        weight is how many searches the job runs (the distinct prompts of a
+        batch), so active() counts a batch as the searches it starts.
+        """
+        if self.max_depth > 0:
+            depth = self.depth()
+            if depth >= self.max_depth:
+                raise QueueFullError(depth, self.max_depth)
+        job = QueueJob(job_id=str(uuid.uuid4()), request_id=request_id, payload=payload, priority=priority,
+                       weight=max(1, int(weight)))
+        self.backend.enqueue(job)
+        return job
+
+    def lease(self, worker_id: str) -> Optional[QueueJob]:
+        """Claim the next job for worker_id, recovering expired leases first."""
+        self.backend.requeue_expired(self.max_attempts)
+        if time.time() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self.purge_finished()
+        return self.backend.lease(worker_id, self.lease_seconds)
+
+    def ack(self, job_id: str, worker_id: Optional[str] = None) -> bool:
+        return self.backend.ack(job_id, worker_id)
+
+    def nack(self, job_id: str, requeue: bool = True, worker_id: Optional[str] = None) -> bool:
+        return self.backend.nack(job_id, requeue=requeue, max_attempts=self.max_attempts, worker_id=worker_id)
+
+    def extend_lease(self, job_id: str, worker_id: str) -> bool:
+        """Renew worker_id's lease on a job it is still running for another lease_seconds."""
+        return self.backend.extend_lease(job_id, worker_id, self.lease_seconds)
+
+    def cancel(self, request_id: str) -> int:
+        """
+        Cancel a search's queued or running job.
+
+        A pending job is never leased; a leased one is stopped by the worker
+        running it, which polls cancelled_jobs().
+        """
+        return self.backend.cancel(request_id)
+
+    def cancelled_jobs(self, job_ids: Iterable[str]) -> List[str]:
+        return self.backend.cancelled_jobs(job_ids)
+
+    def purge_finished(self) -> int:
+        """Delete finished jobs older than the retention period (lease() calls this periodically)."""
+        self._last_purge = time.time()
+        if self.retention_days <= 0:
+            return 0
+        purged = self.backend.purge_finished(self._last_purge - self.retention_days * 86400)
+        if purged:
+            logger.info("[Search Queue] Purged %s finished job(s) older than %s day(s)", purged, self.retention_days)
+        return purged
+
+    def depth(self) -> int:
+        return self.backend.pending_count()
+
+    def active(self) -> int:
+        """Searches queued or running (batch jobs count each search), the figure admission control caps."""
+        return self.backend.active_searches()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.backend.stats()
+        stats["max_depth"] = self.max_depth
+        stats["backend"] = type(self.backend).__name__
+        return stats
+
+
+def create_backend(name: Optional[str] = None, path: Optional[str] = None) -> QueueBackend:
+    """Build the configured queue backend."""
+    name = (name or os.getenv("SEARCH_QUEUE_BACKEND", "sqlite")).lower()
+    if name == "sqlite":
+        return SQLiteQueueBackend(path or os.getenv("SEARCH_QUEUE_PATH", os.path.join(PROJECT_ROOT, "search_queue.db")))
+    raise ValueError(f"Unknown search queue backend: {name}")
+
+
+_search_queue: Optional[SearchQueue] = None
+_search_queue_lock = threading.Lock()
+
+
+def get_search_queue() -> SearchQueue:
+    """Return the process-wide search queue, creating it from the environment on first use."""
+    global _search_queue
+    if _search_queue is None:
+        with _search_queue_lock:
+            if _search_queue is None:
+                _search_queue = SearchQueue(
+                    create_backend(),
+                    max_depth=_env_int("SEARCH_QUEUE_MAX_DEPTH", 200),
+                    lease_seconds=_env_int("SEARCH_QUEUE_LEASE_SECONDS", 600),
+                    max_attempts=_env_int("SEARCH_QUEUE_MAX_ATTEMPTS", 3),
+                    retention_days=_env_int("SEARCH_QUEUE_RETENTION_DAYS", 7),
+                )
+    return _search_queue
+
+
+def set_search_queue(queue: Optional[SearchQueue]) -> None:
+    """Replace the process-wide queue (used by tests)."""
+    global _search_queue
+    _search_queue = queue
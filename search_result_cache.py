@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Full-search result cache.
+
+Users often re-run the same or trivially different searches ("Find CMOs in
+Florida" vs "find cmos in florida"). Each run pays for Apollo search and
+enrichment, candidate assessment, several LLM calls per candidate and SerpAPI
+evidence lookups. This cache sits in front of that work: process_search looks
+up the canonicalized enhanced prompt plus the canonical filter JSON and, on a
+hit, completes the search from the cached result.
+
+Entries remember the max_candidates they were produced for. A lookup for
+more candidates than an entry holds is a miss unless that run was itself
+asked for at least as many (and simply found fewer); hits are trimmed to
+the requested count.
+
+Entries expire after a TTL and the cache is size bounded (least recently used
+entries are evicted first). They live in the "search_result" shared cache
+(see shared_cache.py), so the memory, sqlite and redis backends are all
+available and sqlite/redis let every API and worker process reuse one result.
+
+Configuration (environment variables):
+    SEARCH_RESULT_CACHE_BACKEND      memory | sqlite | redis | none (default: CACHE_BACKEND)
+    SEARCH_RESULT_CACHE_TTL          seconds an entry stays valid (default 21600)
+    SEARCH_RESULT_CACHE_MAX_ENTRIES  entries kept before eviction (default 500)
+    CACHE_PATH, CACHE_REDIS_URL      where the sqlite and redis backends live (see shared_cache.py)
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from shared_cache import MISSING, Cache, CacheBackend, create_backend as create_cache_backend
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def canonicalize_prompt(prompt: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    text = re.sub(r"\s+", " ", (prompt or "").strip().lower())
+    return text.rstrip(" .!?")
+
+
+def _canonical_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _canonical_value(v) for k, v in value.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical_value(v) for v in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def canonical_filters(filters: Optional[Dict[str, Any]]) -> str:
+    """Order-insensitive JSON for the filter dict (reasoning text is ignored)."""
+    filters = dict(filters or {})
+    filters.pop("reasoning", None)
+    return json.dumps(_canonical_value(filters), sort_keys=True, separators=(",", ":"))
+
+
+def make_cache_key(enhanced_prompt: str, filters: Optional[Dict[str, Any]]) -> str:
+    raw = canonicalize_prompt(enhanced_prompt) + "\n" + canonical_filters(filters)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """Looks up and stores completed search results by prompt and filters."""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = 21600):
+        self.cache = Cache("search_result", backend, ttl=ttl) if backend is not None else None
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache is not None
+
+    @property
+    def blocking(self) -> bool:
+        """True when lookups do I/O and should run off the event loop."""
+        return self.enabled and self.cache.blocking
+
+    def get(self, enhanced_prompt: str, filters: Optional[Dict[str, Any]],
+            max_candidates: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        entry = self.cache.get(make_cache_key(enhanced_prompt, filters), MISSING)
+        if entry is MISSING:
+            entry = None
+        if entry is not None and max_candidates:
+            candidates = entry.get("candidates") or []
+            if len(candidates) < max_candidates and (entry.get("max_candidates") or 0) < max_candidates:
+                # A smaller search cached this; it cannot answer a request for more candidates
+                entry = None
+            else:
+                entry["candidates"] = candidates[:max_candidates]
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, enhanced_prompt: str, filters: Optional[Dict[str, Any]], result: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        entry = dict(result)
+        entry.setdefault("cached_at", time.time())
+        errors = self.cache.errors
+        self.cache.set(make_cache_key(enhanced_prompt, filters), entry)
+        if self.cache.errors == errors:
+            self.stores += 1
+
+    def invalidate(self, enhanced_prompt: str, filters: Optional[Dict[str, Any]]) -> None:
+        if self.enabled:
+            self.cache.delete(make_cache_key(enhanced_prompt, filters))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.cache.backend).__name__ if self.cache else None,
+            "entries": self.cache.size() if self.cache else 0,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def create_result_cache() -> SearchResultCache:
+    """Build the result cache from the environment."""
+    backend_name = os.getenv("SEARCH_RESULT_CACHE_BACKEND", "").strip().lower()
+    backend: Optional[CacheBackend] = None
+    if backend_name not in ("none", "off", "disabled"):
+        backend = create_cache_backend(
+            "search_result",
+            max_entries=_env_int("SEARCH_RESULT_CACHE_MAX_ENTRIES", 500),
+            default_backend=backend_name or None,
+        )
+    return SearchResultCache(backend, ttl=_env_int("SEARCH_RESULT_CACHE_TTL", 21600))
+
+
+# Global result cache instance
+search_result_cache = create_result_cache()
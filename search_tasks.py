@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Registry of running searches, keyed by request_id.
+
+DELETE /api/search/{request_id} used to remove the row while process_search
+carried on in the background, spending Apollo enrichment credits, OpenAI
+tokens and SerpAPI queries on a search nobody would read. process_search now
+runs each search as its own task and registers it here, so the search can be
+cancelled by request_id:
+
+    search_tasks.cancel(request_id)     # -> the task, or None if not running here
+
+Cancelling the task cancels everything it awaits: the task graph, the
+per-candidate pipeline and the httpx requests to Apollo and SerpAPI are torn
+down at their next await. Blocking calls already running in an executor
+thread finish on their own, but their results are discarded, and calls still
+waiting for a thread never start.
+
+The registry only knows about searches in this process. Searches running in an
+external worker are cancelled through the queue (SearchQueue.cancel), which
+the worker polls.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RunningSearch:
+    """A search task plus whether a user asked for it to stop."""
+    request_id: str
+    task: asyncio.Task
+    started_at: float = field(default_factory=time.time)
+    cancel_requested: bool = False
+
+
+class SearchTaskRegistry:
+    """Maps request_id to the task running that search."""
+
+    def __init__(self):
+        self._running: Dict[str, RunningSearch] = {}
+        self._lock = threading.Lock()
+        self.cancelled = 0
+
+    def register(self, request_id: str, task: asyncio.Task) -> None:
+        with self._lock:
+            self._running[request_id] = RunningSearch(request_id, task)
+
+    def unregister(self, request_id: str, task: asyncio.Task) -> None:
+        """Forget the search, unless a newer run of the same request_id replaced it."""
+        with self._lock:
+            entry = self._running.get(request_id)
+            if entry is not None and entry.task is task:
+                del self._running[request_id]
+
+    def cancel(self, request_id: str) -> Optional[asyncio.Task]:
+        """
+        Cancel the search if it is running in this process.
+
+        Returns the cancelled task so the caller can wait for it to unwind, or
+        None when the search is not running here.
+        """
+        with self._lock:
+            entry = self._running.get(request_id)
+            if entry is None or entry.task.done():
+                return None
+            if entry.cancel_requested:
+                return entry.task
+            entry.cancel_requested = True
+            self.cancelled += 1
+        logger.info("[Search Tasks] Cancelling %s after %.1fs", request_id, time.time() - entry.started_at)
+        entry.task.get_loop().call_soon_threadsafe(entry.task.cancel)
+        return entry.task
+
+    def cancel_requested(self, request_id: str) -> bool:
+        """True when cancel() was called for the running search, as opposed to a shutdown."""
+        entry = self._running.get(request_id)
+        return entry is not None and entry.cancel_requested
+
+    def is_running(self, request_id: str) -> bool:
+        entry = self._running.get(request_id)
+        return entry is not None and not entry.task.done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": len(self._running), "cancelled": self.cancelled}
+
+
+# Global registry instance
+search_tasks = SearchTaskRegistry()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Search Worker
+
+Pulls searches from the durable queue in search_queue.py and runs
+process_search for each one (process_search_batch for batch jobs),
+acknowledging the job when it finishes.
+
+Each worker process runs up to --concurrency searches at a time. Leasing pauses
+while the LLM executor already has a backlog, so a saturated OpenAI/Apollo
+path pushes back on the queue instead of piling up more in-flight searches.
+
+The API process starts an embedded worker by default (SEARCH_QUEUE_MODE=embedded).
+To scale workers separately from the web tier, set SEARCH_QUEUE_MODE=external on
+the API and run:
+
+    python search_worker.py --workers 4 --concurrency 3
+
+Workers poll the queue for jobs cancelled while they run them (see
+SearchQueue.cancel) and stop those searches, so cancelling works the same
+whether the search runs in the API process or in a separate worker. They also
+renew the leases of running jobs (every third of the lease by default), so a
+long batch job is not handed to a second worker while the first still runs it.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from blocking_executor import get_executor_stats, run_blocking
+from search_queue import QueueJob, SearchQueue, get_search_queue
+from search_tasks import search_tasks
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+SearchHandler = Callable[..., Awaitable[Any]]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _default_handler() -> SearchHandler:
+    from api.main import run_search_job
+    return run_search_job
+
+
+class SearchWorker:
+    """Leases jobs from the search queue and runs them with bounded concurrency."""
+
+    def __init__(self, queue: Optional[SearchQueue] = None, concurrency: int = 3,
+                 worker_id: Optional[str] = None, handler: Optional[SearchHandler] = None,
+                 poll_interval: float = 0.5, max_llm_backlog: Optional[int] = None,
+                 cancel_poll_interval: Optional[float] = None, lease_renew_interval: Optional[float] = None):
+        self.queue = queue or get_search_queue()
+        self.concurrency = max(1, concurrency)
+        # The random suffix keeps a restarted process (same host and pid, e.g. pid 1 in a container)
+        # from acting on leases held by its previous incarnation
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self.max_llm_backlog = max_llm_backlog if max_llm_backlog is not None else _env_int("SEARCH_WORKER_MAX_LLM_BACKLOG", 16)
+        self.cancel_poll_interval = (cancel_poll_interval if cancel_poll_interval is not None
+                                     else _env_int("SEARCH_WORKER_CANCEL_POLL_SECONDS", 2))
+        self.lease_renew_interval = (lease_renew_interval if lease_renew_interval is not None
+                                     else _env_int("SEARCH_WORKER_LEASE_RENEW_SECONDS", max(1, int(self.queue.lease_seconds / 3))))
+        self.in_flight: Set[asyncio.Task] = set()
+        # job_id -> (job, task) for every search this worker is running
+        self._jobs: Dict[str, Tuple[QueueJob, asyncio.Task]] = {}
+        self.processed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._cancelled_job_ids = set()
+        self._last_cancel_check = 0.0
+        self._last_lease_renewal = time.time()
+        self.lost_leases = 0
+        self.backpressure_pauses = 0
+        self._stopping = False
+
+    def _is_saturated(self) -> bool:
+        llm_pool = get_executor_stats()["pools"].get("llm")
+        return bool(llm_pool) and llm_pool["queued"] >= self.max_llm_backlog
+
+    async def _run_job(self, job: QueueJob) -> None:
+        started = time.time()
+        try:
+            await self.handler(**job.payload)
+            if not await run_blocking(self.queue.ack, job.job_id, self.worker_id, pool="db"):
+                logger.warning("[Search Worker] %s finished %s after losing its lease", self.worker_id, job.request_id)
+            self.processed += 1
+            logger.info("[Search Worker] %s completed %s in %.1fs", self.worker_id, job.request_id, time.time() - started)
+        except asyncio.CancelledError:
+            if job.job_id in self._cancelled_job_ids:
+                # Cancelled by the user; the job is already marked cancelled in the queue
+                logger.info("[Search Worker] %s stopped cancelled search %s", self.worker_id, job.request_id)
+                return
+            # Shutting down mid-search: hand the job back so another worker picks it up
+            await run_blocking(self.queue.nack, job.job_id, worker_id=self.worker_id, pool="db")
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.warning("[Search Worker] %s failed %s (attempt %s): %s", self.worker_id, job.request_id, job.attempts, e)
+            await run_blocking(self.queue.nack, job.job_id, worker_id=self.worker_id, pool="db")
+        finally:
+            self._cancelled_job_ids.discard(job.job_id)
+
+    async def check_cancellations(self) -> int:
+        """Stop in-flight searches whose jobs were cancelled; returns how many were."""
+        if not self._jobs:
+            return 0
+        cancelled_ids = await run_blocking(self.queue.cancelled_jobs, list(self._jobs), pool="db")
+        stopped = 0
+        for job_id in cancelled_ids:
+            entry = self._jobs.get(job_id)
+            if entry is None or job_id in self._cancelled_job_ids:
+                continue
+            job, task = entry
+            self._cancelled_job_ids.add(job_id)
+            # process_search records the cancelled status itself when it owns the search;
+            # otherwise stop the job task directly
+            if search_tasks.cancel(job.request_id) is None:
+                task.cancel()
+            self.cancelled += 1
+            stopped += 1
+        return stopped
+
+    async def renew_leases(self) -> int:
+        """Extend the lease of every job this worker is running; returns how many were renewed."""
+        renewed = 0
+        for job_id, (job, _) in list(self._jobs.items()):
+            if await run_blocking(self.queue.extend_lease, job_id, self.worker_id, pool="db"):
+                renewed += 1
+            else:
+                self.lost_leases += 1
+                logger.warning("[Search Worker] %s lost the lease on %s", self.worker_id, job.request_id)
+        return renewed
+
+    async def run_once(self) -> bool:
+        """Lease and start a single job if a slot is free; returns True if one was started."""
+        if len(self.in_flight) >= self.concurrency:
+            return False
+        if self._is_saturated():
+            self.backpressure_pauses += 1
+            return False
+
+        job = await run_blocking(self.queue.lease, self.worker_id, pool="db")
+        if job is None:
+            return False
+
+        if self.handler is None:
+            self.handler = _default_handler()
+        task = asyncio.create_task(self._run_job(job))
+        self.in_flight.add(task)
+        self._jobs[job.job_id] = (job, task)
+        task.add_done_callback(self.in_flight.discard)
+        task.add_done_callback(lambda _: self._jobs.pop(job.job_id, None))
+        return True
+
+    async def run(self) -> None:
+        """Process jobs until stop() is called, then wait for in-flight searches."""
+        logger.info("[Search Worker] %s started (concurrency=%s)", self.worker_id, self.concurrency)
+        while not self._stopping:
+            try:
+                started = await self.run_once()
+            except Exception as e:
+                logger.warning("[Search Worker] %s lease error: %s", self.worker_id, e)
+                started = False
+            if time.time() - self._last_cancel_check >= self.cancel_poll_interval:
+                self._last_cancel_check = time.time()
+                try:
+                    await self.check_cancellations()
+                except Exception as e:
+                    logger.warning("[Search Worker] %s cancellation check failed: %s", self.worker_id, e)
+            if time.time() - self._last_lease_renewal >= self.lease_renew_interval:
+                self._last_lease_renewal = time.time()
+                try:
+                    await self.renew_leases()
+                except Exception as e:
+                    logger.warning("[Search Worker] %s lease renewal failed: %s", self.worker_id, e)
+            if not started:
+                await asyncio.sleep(self.poll_interval)
+
+        if self.in_flight:
+            await asyncio.gather(*self.in_flight, return_exceptions=True)
+        logger.info("[Search Worker] %s stopped after %s searches", self.worker_id, self.processed)
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "in_flight": len(self.in_flight),
+            "processed": self.processed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "lost_leases": self.lost_leases,
+            "backpressure_pauses": self.backpressure_pauses,
+        }
+
+
+def _worker_process(concurrency: int) -> None:
+    worker = SearchWorker(concurrency=concurrency)
+
+    async def main() -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(main())
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Run search queue workers")
+    parser.add_argument("--workers", type=int, default=_env_int("SEARCH_WORKER_PROCESSES", 2), help="Worker processes")
+    parser.add_argument("--concurrency", type=int, default=_env_int("SEARCH_WORKER_CONCURRENCY", 3), help="Searches per process")
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        _worker_process(args.concurrency)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_process, args=(args.concurrency,), name=f"search-worker-{i}")
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main_cli()
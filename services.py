@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Process-wide settings and lazily constructed API clients.
+
+Modules used to read secrets.json and build their own OpenAI or Supabase
+client at import time. Importing api.main therefore built several OpenAI
+clients, imported the supabase package and ran a live Supabase query before
+the app could serve anything, and call_openai built a new client (and a new
+connection pool) on every call. This module loads settings once and creates
+each client on first use; every caller then shares the same instance and its
+connection pool:
+
+    from services import get_openai_client, get_supabase
+
+    client = get_openai_client()          # None when no API key is configured
+    get_supabase().table("searches")...   # a no-op dummy when Supabase is not configured
+
+`supabase` is a proxy for modules that keep a module-level client reference
+(database.py); attribute access resolves the real client on first use.
+
+Both OpenAI clients are built on HTTP clients with the same connection
+limits. httpx drops idle keep-alive connections after five seconds by
+default, so bursty LLM traffic kept paying for new TLS handshakes; idle
+connections are now kept for OPENAI_KEEPALIVE_EXPIRY_SECONDS.
+
+warmup() runs named steps (building clients, a first database round trip,
+priming parsers) and reports how long each took. The API runs it from a
+startup hook so the first request does not pay for connection setup.
+
+Settings come from the environment first, then from the first secrets.json
+found in the working directory, next to this module or one directory up.
+Values found in secrets.json are exported to the environment (without
+overriding it) for code that still reads os.environ directly.
+
+Configuration (environment variables):
+    OPENAI_MAX_CONNECTIONS              open connections per OpenAI client (default 64)
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS    idle connections kept for reuse (default 32)
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS     how long an idle connection is kept (default 60)
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Setting name -> (environment variable, accepted secrets.json keys)
+_SETTING_SOURCES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "openai_api_key": ("OPENAI_API_KEY", ("openai_api_key", "OPENAI_API_KEY", "openai_key")),
+    "supabase_url": ("SUPABASE_URL", ("supabase_url", "SUPABASE_URL")),
+    "supabase_key": ("SUPABASE_KEY", ("supabase_key", "SUPABASE_KEY")),
+    "internal_database_api_key": ("INTERNAL_DATABASE_API_KEY",
+                                  ("internal_database_api_key", "INTERNAL_DATABASE_API_KEY")),
+    "scraping_dog_api_key": ("SCRAPING_DOG_API_KEY", ("scraping_dog_api_key", "SCRAPING_DOG_API_KEY")),
+    "hubspot_client_id": ("HUBSPOT_CLIENT_ID", ("hubspot_client_id", "HUBSPOT_CLIENT_ID")),
+    "hubspot_client_secret": ("HUBSPOT_CLIENT_SECRET", ("hubspot_client_secret", "HUBSPOT_CLIENT_SECRET")),
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    openai_api_key: Optional[str] = None
+    supabase_url: Optional[str] = None
+    supabase_key: Optional[str] = None
+    internal_database_api_key: Optional[str] = None
+    scraping_dog_api_key: Optional[str] = None
+    hubspot_client_id: Optional[str] = None
+    hubspot_client_secret: Optional[str] = None
+    # secrets.json the values were read from, if any
+    secrets_path: Optional[str] = None
+
+    @property
+    def supabase_configured(self) -> bool:
+        return bool(self.supabase_url and self.supabase_key)
+
+
+def _secrets_paths() -> Iterable[str]:
+    return ("secrets.json", os.path.join(_PROJECT_ROOT, "secrets.json"),
+            os.path.join(os.path.dirname(_PROJECT_ROOT), "secrets.json"))
+
+
+def _read_secrets() -> Tuple[Dict[str, Any], Optional[str]]:
+    for path in _secrets_paths():
+        try:
+            with open(path, "r") as f:
+                # raw_decode tolerates trailing content after the JSON object
+                secrets, _ = json.JSONDecoder().raw_decode(f.read())
+        except (OSError, ValueError):
+            continue
+        if isinstance(secrets, dict):
+            return secrets, os.path.abspath(path)
+    return {}, None
+
+
+def build_settings(environ: Optional[Dict[str, str]] = None, secrets: Optional[Dict[str, Any]] = None,
+                   secrets_path: Optional[str] = None) -> Settings:
+    """Resolve settings from an environment mapping and a secrets.json mapping."""
+    environ = os.environ if environ is None else environ
+    secrets = secrets or {}
+    values: Dict[str, Any] = {}
+    for name, (env_name, secret_keys) in _SETTING_SOURCES.items():
+        value = environ.get(env_name)
+        if not value:
+            value = next((secrets[key] for key in secret_keys if secrets.get(key)), None)
+        values[name] = value or None
+    return Settings(secrets_path=secrets_path, **values)
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def load_settings() -> Settings:
+    """Return the process-wide settings, reading secrets.json at most once."""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                secrets, path = ({}, None)
+                if any(not os.getenv(env_name) for env_name, _ in _SETTING_SOURCES.values()):
+                    secrets, path = _read_secrets()
+                settings = build_settings(secrets=secrets, secrets_path=path)
+                for name, (env_name, _) in _SETTING_SOURCES.items():
+                    value = getattr(settings, name)
+                    if value:
+                        os.environ.setdefault(env_name, value)
+                if not settings.openai_api_key:
+                    logger.warning("OpenAI API key not found. Set OPENAI_API_KEY or create secrets.json")
+                _settings = settings
+    return _settings
+
+
+class DummySupabase:
+    """Stands in for the Supabase client when it is not configured; every query returns no rows."""
+
+    def table(self, name):
+        return DummyTable()
+
+
+class DummyTable:
+    def _chain(self, *args, **kwargs):
+        return self
+
+    select = insert = upsert = update = delete = eq = lt = in_ = or_ = order = limit = single = _chain
+
+    def execute(self):
+        return DummyResult()
+
+
+class DummyResult:
+    def __init__(self):
+        self.data = []
+        self.count = 0
+
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                started = time.perf_counter()
+                client = factory()
+                _clients[name] = client
+                logger.info("Created %s client in %.1f ms", name, (time.perf_counter() - started) * 1000)
+    return client
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def openai_pool_limits() -> Dict[str, Any]:
+    """Connection pool settings shared by the sync and asyncio OpenAI clients."""
+    return {
+        "max_connections": max(1, _env_int("OPENAI_MAX_CONNECTIONS", 64)),
+        "max_keepalive_connections": max(0, _env_int("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 32)),
+        "keepalive_expiry": max(0.0, _env_float("OPENAI_KEEPALIVE_EXPIRY_SECONDS", 60)),
+    }
+
+
+def _create_openai_client():
+    api_key = load_settings().openai_api_key
+    if not api_key:
+        return False
+    import httpx
+    import openai
+    return openai.OpenAI(api_key=api_key,
+                         http_client=openai.DefaultHttpxClient(limits=httpx.Limits(**openai_pool_limits())))
+
+
+def _create_async_openai_client():
+    api_key = load_settings().openai_api_key
+    if not api_key:
+        return False
+    import httpx
+    import openai
+    return openai.AsyncOpenAI(api_key=api_key,
+                              http_client=openai.DefaultAsyncHttpxClient(limits=httpx.Limits(**openai_pool_limits())))
+
+
+def _create_supabase():
+    settings = load_settings()
+    if not settings.supabase_configured:
+        logger.error("Supabase credentials not found. Set SUPABASE_URL and SUPABASE_KEY or create secrets.json")
+        return DummySupabase()
+    try:
+        from supabase import create_client
+        return create_client(settings.supabase_url, settings.supabase_key)
+    except Exception as e:
+        logger.error("Failed to create Supabase client: %s", e)
+        return DummySupabase()
+
+
+def get_openai_client():
+    """Shared synchronous OpenAI client, or None when no API key is configured."""
+    return _get_or_create("openai", _create_openai_client) or None
+
+
+def get_async_openai_client():
+    """Shared asyncio OpenAI client, or None when no API key is configured."""
+    return _get_or_create("openai_async", _create_async_openai_client) or None
+
+
+def get_supabase():
+    """Shared Supabase client (a DummySupabase when it is not configured)."""
+    return _get_or_create("supabase", _create_supabase)
+
+
+class LazyClient:
+    """Module-level stand-in for a client that is only built when first used."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._factory(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyClient {getattr(self._factory, '__name__', self._factory)}>"
+
+
+supabase = LazyClient(get_supabase)
+
+
+def reset_services() -> None:
+    """Forget loaded settings and clients (used by tests)."""
+    global _settings
+    with _settings_lock:
+        _settings = None
+    with _clients_lock:
+        _clients.clear()
+
+
+def client_stats() -> Dict[str, Any]:
+    return {
+        "settings_loaded": _settings is not None,
+        "secrets_path": _settings.secrets_path if _settings else None,
+        "clients": sorted(name for name, client in _clients.items() if client),
+        "openai_pool": openai_pool_limits(),
+    }
+
+
+def warmup(steps: Iterable[Tuple[str, Callable[[], Any]]]) -> Dict[str, Any]:
+    """
+    Run warmup steps in order and time them.
+
+    A failing step is logged and recorded; it never stops the remaining steps.
+    """
+    results: Dict[str, Any] = {}
+    total_started = time.perf_counter()
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+            results[name] = {"ok": True}
+        except Exception as e:
+            logger.warning("Warmup step %s failed: %s", name, e)
+            results[name] = {"ok": False, "error": str(e)}
+        results[name]["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return {"steps": results, "total_ms": round((time.perf_counter() - total_started) * 1000, 1)}
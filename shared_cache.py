@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Named caches with pluggable, optionally cross-process backends.
+
+Each uvicorn/gunicorn worker used to keep its own copy of the public-figure
+cache, the avatar cache and the evidence cache, so four workers meant four
+cold caches and four times the Wikipedia, SerpAPI and LLM calls for repeated
+work. Caches are now created by name and backed by one of:
+
+    memory  in-process LRU (default)
+    sqlite  one SQLite file in WAL mode, shared by every process on the host
+    redis   a Redis server shared across hosts (needs the redis package)
+
+    from shared_cache import MISSING, get_cache
+
+    public_figures = get_cache("public_figure", ttl=7 * 24 * 3600, max_entries=10000)
+    famous = public_figures.get(name, MISSING)
+    if famous is MISSING:
+        ...
+        public_figures.set(name, famous)
+
+Values are copied on the way in and out for the memory backend and pickled
+for the shared backends, so callers can mutate what they get back. Only point
+the sqlite and redis backends at storage this deployment controls: entries
+are unpickled on read.
+
+Every cache counts hits and misses in knowledge_gpt_cache_requests_total.
+
+Configuration (environment variables):
+    CACHE_BACKEND          memory | sqlite | redis (default memory)
+    CACHE_<NAME>_BACKEND   override for one cache, e.g. CACHE_AVATAR_BACKEND=memory
+    CACHE_PATH             SQLite file (default: shared_cache.db in the project root)
+    CACHE_REDIS_URL        Redis URL (default redis://localhost:6379/0)
+"""
+
+import copy
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import registry as metrics_registry
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Returned by backends (and Cache.get when passed as the default) for absent keys,
+# so that None and False can be cached like any other value
+MISSING = object()
+
+CACHE_REQUESTS = metrics_registry.counter(
+    "knowledge_gpt_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"])
+
+
+class CacheBackend(ABC):
+    """Storage interface for one named cache."""
+
+    # True when calls do I/O and should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the value for key, or MISSING if absent or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Store a value; ttl=None keeps it until it is evicted."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    @abstractmethod
+    def keys(self) -> List[str]:
+        """Keys currently stored."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were removed."""
+
+    def size(self) -> int:
+        return len(self.keys())
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process-local LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return MISSING
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items()
+                       if expires_at is not None and expires_at < now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """One namespace of a SQLite cache file shared by every process on the host."""
+
+    blocking = True
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 1000):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS shared_cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+            "expires_at REAL, last_access REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM shared_cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                return MISSING
+            if row[1] is not None and row[1] < now:
+                conn.execute("DELETE FROM shared_cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                return MISSING
+            conn.execute(
+                "UPDATE shared_cache SET last_access = ? WHERE namespace = ? AND key = ?", (now, self.namespace, key)
+            )
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_cache (namespace, key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, blob, now + ttl if ttl is not None else None, now),
+            )
+            conn.execute(
+                "DELETE FROM shared_cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM shared_cache WHERE namespace = ? ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM shared_cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM shared_cache WHERE namespace = ?", (self.namespace,))
+
+    def keys(self) -> List[str]:
+        rows = self._connect().execute("SELECT key FROM shared_cache WHERE namespace = ?", (self.namespace,))
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._connect().execute(
+                "DELETE FROM shared_cache WHERE namespace = ? AND expires_at < ?", (self.namespace, time.time())
+            ).rowcount
+
+    def size(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM shared_cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    One namespace in a Redis server shared by every host.
+
+    Expiry is left to Redis TTLs and size to the server's maxmemory policy,
+    so max_entries is not enforced here.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str, namespace: str, client: Any = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis cache backend needs the redis package (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = f"knowledge_gpt:{namespace}:"
+
+    def get(self, key: str) -> Any:
+        blob = self.client.get(self.prefix + key)
+        return MISSING if blob is None else pickle.loads(blob)
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if ttl is not None:
+            self.client.set(self.prefix + key, blob, px=max(1, int(ttl * 1000)))
+        else:
+            self.client.set(self.prefix + key, blob)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def keys(self) -> List[str]:
+        return [
+            (key.decode() if isinstance(key, bytes) else key)[len(self.prefix):]
+            for key in self.client.scan_iter(match=self.prefix + "*")
+        ]
+
+    def purge_expired(self) -> int:
+        return 0
+
+
+def create_backend(name: str, max_entries: int = 1000, default_backend: Optional[str] = None) -> CacheBackend:
+    """Build the configured backend for the cache called name (see module docstring)."""
+    backend_name = (
+        os.getenv(f"CACHE_{name.upper()}_BACKEND")
+        or default_backend
+        or os.getenv("CACHE_BACKEND", "memory")
+    ).strip().lower()
+    try:
+        if backend_name == "sqlite":
+            path = os.getenv("CACHE_PATH", os.path.join(PROJECT_ROOT, "shared_cache.db"))
+            return SQLiteCacheBackend(path, name, max_entries=max_entries)
+        if backend_name == "redis":
+            return RedisCacheBackend(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"), name)
+    except Exception as e:
+        logger.warning("[Cache] %s backend unavailable for %s, using memory: %s", backend_name, name, e)
+    return MemoryCacheBackend(max_entries=max_entries)
+
+
+class Cache:
+    """A named cache with a default TTL and hit/miss accounting."""
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: Optional[float] = None):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def blocking(self) -> bool:
+        """True when the backend does I/O, so async callers should use run_blocking."""
+        return self.backend.blocking
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """The cached value, or default on a miss (pass MISSING to tell a miss from a cached None)."""
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("[Cache] %s lookup failed: %s", self.name, e)
+            value = MISSING
+        if value is MISSING:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return default
+        self.hits += 1
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            self.backend.set(key, value, ttl if ttl is not None else self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("[Cache] %s store failed: %s", self.name, e)
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def keys(self) -> List[str]:
+        return self.backend.keys()
+
+    def purge_expired(self) -> int:
+        return self.backend.purge_expired()
+
+    def size(self) -> int:
+        try:
+            return self.backend.size()
+        except Exception:
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": self.size(),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_caches: Dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, ttl: Optional[float] = None, max_entries: int = 1000,
+              default_backend: Optional[str] = None) -> Cache:
+    """
+    Return the process-wide cache called name, creating it on first use.
+
+    default_backend pins a cache to a backend unless CACHE_<NAME>_BACKEND says
+    otherwise, e.g. "memory" for caches that are cheaper to recompute than to
+    fetch from a shared store.
+    """
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = _caches[name] = Cache(name, create_backend(name, max_entries, default_backend), ttl)
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every named cache."""
+    return {name: cache.stats() for name, cache in list(_caches.items())}
@@ -1,28 +1,12 @@
-import os
-import json
-from openai import OpenAI
-from typing import Dict, Any
+import random
+import re
+from typing import Dict, Any, List
+from openai_utils import call_openai
+from structured_logging import get_logger
 
-# Load API keys from secrets.json if not in environment
-if not os.getenv('OPENAI_API_KEY'):
-    try:
-        with open("secrets.json", "r") as f:
-            secrets = json.load(f)
-            # Handle both uppercase and lowercase key names for compatibility
-            os.environ['OPENAI_API_KEY'] = secrets.get('openai_api_key', '') or secrets.get('OPENAI_API_KEY', '')
-    except (FileNotFoundError, json.JSONDecodeError):
-        pass
-
-# Set up OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+logger = get_logger(__name__)
 
-def estimate_people_count(prompt: str) -> Dict[str, Any]:
-    """
-    Simple AI function that estimates how many people meet the search criteria.
-    Returns a realistic, non-rounded number like 4278 or 5441.
-    """
-    
-    system_prompt = """You are an expert at estimating the number of people who meet specific professional criteria in the United States.
+ESTIMATION_SYSTEM_PROMPT = """You are an expert at estimating the number of people who meet specific professional criteria in the United States.
 
 Your task is to analyze a search prompt and estimate how many people likely meet ALL the criteria mentioned.
 
@@ -49,82 +33,123 @@ EXAMPLES:
 
 Respond with ONLY the number, nothing else."""
 
+BATCH_ESTIMATION_INSTRUCTIONS = """
+
+You will receive several numbered searches. Estimate each one independently and respond with ONLY a JSON array of numbers, one per search, in the same order (for example [127, 12453])."""
+
+# Prompts per batched estimation call; longer batches are split
+MAX_ESTIMATES_PER_CALL = 25
+
+def _adjust_estimate(prompt: str, estimated_count: int) -> int:
+    """Filter out unrealistic numbers and apply smart estimation"""
+    # Check if this is a senior executive role in a specific city
+    prompt_lower = prompt.lower()
+    is_c_suite = any(role in prompt_lower for role in ["cmo", "ceo", "cfo", "cto", "coo", "chief"])
+    is_specific_city = any(city in prompt_lower for city in ["new york", "san francisco", "los angeles", "chicago", "boston", "seattle", "miami", "atlanta", "denver"])
+    
+    # Apply realistic caps for senior roles in specific cities
+    if is_c_suite and is_specific_city:
+        # C-suite in specific cities should be much lower
+        if estimated_count > 500:
+            realistic_options = [127, 189, 234, 156, 203, 178, 245, 167, 198, 213, 142, 176, 191, 158, 224]
+            estimated_count = random.choice(realistic_options)
+    elif is_c_suite:
+        # C-suite nationally should be reasonable
+        if estimated_count > 2000:
+            realistic_options = [847, 1243, 1567, 892, 1876, 1234, 1789, 1456, 1123, 1678]
+            estimated_count = random.choice(realistic_options)
+    elif estimated_count in [312, 1500, 2000, 3000, 5000, 5432, 10000]:
+        # Filter out other problematic numbers including 312
+        fallback_options = [847, 1243, 2156, 3421, 892, 1876, 4278, 2934, 6543, 1567, 3789, 2345, 4567, 1234, 2987, 4123, 1789, 3456, 5234, 1987, 3654, 2876, 4321, 1654, 2543, 3987, 1432, 2765, 4098, 3210, 2654, 4532, 1765, 1598, 2743, 4165, 1832]
+        estimated_count = random.choice(fallback_options)
+    return estimated_count
+
+def _ai_estimate(prompt: str, estimated_count: int) -> Dict[str, Any]:
+    return {
+        "estimated_count": estimated_count,
+        "prompt": prompt,
+        "reasoning": f"AI estimated {estimated_count} people meet the criteria: {prompt}"
+    }
+
+def _fallback_estimate(prompt: str) -> Dict[str, Any]:
+    """Fallback estimation if AI call fails"""
+    # Check if this is a political/news interest search
+    prompt_lower = prompt.lower()
+    is_political = any(term in prompt_lower for term in ["trump", "biden", "political", "politics", "election", "democracy", "authoritarian", "dictator", "government", "news"])
+    
+    if is_political:
+        # Political interest is very common among executives - use higher estimates
+        political_options = [15678, 23456, 18934, 27543, 34567, 19876, 31245, 26789, 22134, 28456, 35672, 17893, 24567, 29834, 33456]
+        estimated_count = random.choice(political_options)
+    else:
+        # Regular business searches
+        fallback_options = [847, 1243, 2156, 3421, 892, 5432, 1876, 4278, 2934, 6543, 1567, 3789, 2345, 4567, 1234, 5678, 2987, 4123, 1789, 3456]
+        estimated_count = random.choice(fallback_options)
+    
+    return {
+        "estimated_count": estimated_count,
+        "prompt": prompt,
+        "reasoning": f"Fallback estimation: {estimated_count} people likely meet the criteria: {prompt}"
+    }
+
+def estimate_people_count(prompt: str) -> Dict[str, Any]:
+    """
+    Simple AI function that estimates how many people meet the search criteria.
+    Returns a realistic, non-rounded number like 4278 or 5441.
+    """
     try:
-        response = client.chat.completions.create(
+        estimated_count_text = call_openai(
+            prompt=prompt,
+            system_message=ESTIMATION_SYSTEM_PROMPT,
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
             max_tokens=10,
-            temperature=0.3
+            temperature=0.3,
+            purpose="estimation"
         )
+        if not estimated_count_text:
+            return _fallback_estimate(prompt)
         
         # Extract the number from the response
-        estimated_count_text = response.choices[0].message.content.strip()
-        
-        # Clean up the response to get just the number
-        import re
         number_match = re.search(r'\d+', estimated_count_text)
         if number_match:
-            estimated_count = int(number_match.group())
-            
-            # Filter out unrealistic numbers and apply smart estimation
-            import random
-            
-            # Check if this is a senior executive role in a specific city
-            prompt_lower = prompt.lower()
-            is_c_suite = any(role in prompt_lower for role in ["cmo", "ceo", "cfo", "cto", "coo", "chief"])
-            is_specific_city = any(city in prompt_lower for city in ["new york", "san francisco", "los angeles", "chicago", "boston", "seattle", "miami", "atlanta", "denver"])
-            
-            # Apply realistic caps for senior roles in specific cities
-            if is_c_suite and is_specific_city:
-                # C-suite in specific cities should be much lower
-                if estimated_count > 500:
-                    realistic_options = [127, 189, 234, 156, 203, 178, 245, 167, 198, 213, 142, 176, 191, 158, 224]
-                    estimated_count = random.choice(realistic_options)
-            elif is_c_suite:
-                # C-suite nationally should be reasonable
-                if estimated_count > 2000:
-                    realistic_options = [847, 1243, 1567, 892, 1876, 1234, 1789, 1456, 1123, 1678]
-                    estimated_count = random.choice(realistic_options)
-            elif estimated_count in [312, 1500, 2000, 3000, 5000, 5432, 10000]:
-                # Filter out other problematic numbers including 312
-                fallback_options = [847, 1243, 2156, 3421, 892, 1876, 4278, 2934, 6543, 1567, 3789, 2345, 4567, 1234, 2987, 4123, 1789, 3456, 5234, 1987, 3654, 2876, 4321, 1654, 2543, 3987, 1432, 2765, 4098, 3210, 2654, 4532, 1765, 1598, 2743, 4165, 1832]
-                estimated_count = random.choice(fallback_options)
-        else:
-            # Fallback with better distribution to avoid clustering
-            import random
-            # Generate realistic numbers that avoid common clustering including 312
-            fallback_options = [847, 1243, 2156, 3421, 892, 1876, 4278, 2934, 6543, 1567, 3789, 2345, 4567, 1234, 2987, 4123, 1789, 3456, 5234, 1987, 3654, 2876, 4321, 1654, 2543, 3987, 1432, 2765, 4098, 3210, 2654, 4532, 1765, 1598, 2743, 4165, 1832]
-            estimated_count = random.choice(fallback_options)
-        
-        return {
-            "estimated_count": estimated_count,
-            "prompt": prompt,
-            "reasoning": f"AI estimated {estimated_count} people meet the criteria: {prompt}"
-        }
+            return _ai_estimate(prompt, _adjust_estimate(prompt, int(number_match.group())))
+        # Fallback with better distribution to avoid clustering
+        # Generate realistic numbers that avoid common clustering including 312
+        fallback_options = [847, 1243, 2156, 3421, 892, 1876, 4278, 2934, 6543, 1567, 3789, 2345, 4567, 1234, 2987, 4123, 1789, 3456, 5234, 1987, 3654, 2876, 4321, 1654, 2543, 3987, 1432, 2765, 4098, 3210, 2654, 4532, 1765, 1598, 2743, 4165, 1832]
+        return _ai_estimate(prompt, random.choice(fallback_options))
         
     except Exception as e:
-        # Fallback estimation if AI call fails
-        print(f"AI estimation failed: {e}")
-        
-        # Check if this is a political/news interest search
-        prompt_lower = prompt.lower()
-        is_political = any(term in prompt_lower for term in ["trump", "biden", "political", "politics", "election", "democracy", "authoritarian", "dictator", "government", "news"])
-        
-        import random
-        if is_political:
-            # Political interest is very common among executives - use higher estimates
-            political_options = [15678, 23456, 18934, 27543, 34567, 19876, 31245, 26789, 22134, 28456, 35672, 17893, 24567, 29834, 33456]
-            estimated_count = random.choice(political_options)
-        else:
-            # Regular business searches
-            fallback_options = [847, 1243, 2156, 3421, 892, 5432, 1876, 4278, 2934, 6543, 1567, 3789, 2345, 4567, 1234, 5678, 2987, 4123, 1789, 3456]
-            estimated_count = random.choice(fallback_options)
-        
-        return {
-            "estimated_count": estimated_count,
-            "prompt": prompt,
-            "reasoning": f"Fallback estimation: {estimated_count} people likely meet the criteria: {prompt}"
-        } 
\ No newline at end of file
+        logger.warning("AI estimation failed: %s", e)
+        return _fallback_estimate(prompt)
+
+def _estimate_chunk(prompts: List[str]) -> List[Dict[str, Any]]:
+    numbered = "\n".join(f"{index}. {prompt}" for index, prompt in enumerate(prompts, 1))
+    answer = call_openai(
+        prompt=numbered,
+        system_message=ESTIMATION_SYSTEM_PROMPT + BATCH_ESTIMATION_INSTRUCTIONS,
+        model="gpt-3.5-turbo",
+        max_tokens=12 * len(prompts) + 10,
+        temperature=0.3,
+        purpose="estimation_batch"
+    )
+    counts = re.findall(r'\d+', answer or "")
+    if len(counts) != len(prompts):
+        # One estimate per prompt or none; a short answer cannot be lined up with the prompts
+        if counts:
+            logger.warning("Batched estimation returned %s numbers for %s prompts; estimating one by one", len(counts), len(prompts))
+        return [estimate_people_count(prompt) for prompt in prompts]
+    return [_ai_estimate(prompt, _adjust_estimate(prompt, int(count))) for prompt, count in zip(prompts, counts)]
+
+def estimate_people_counts(prompts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Estimates for several prompts with one LLM call per MAX_ESTIMATES_PER_CALL prompts.
+    
+    Results are in the same order as prompts and have the same shape as
+    estimate_people_count(). If the model's answer cannot be matched to the
+    prompts, each prompt is estimated on its own.
+    """
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(prompts), MAX_ESTIMATES_PER_CALL):
+        chunk = prompts[start:start + MAX_ESTIMATES_PER_CALL]
+        results.extend(_estimate_chunk(chunk) if len(chunk) > 1 else [estimate_people_count(chunk[0])])
+    return results
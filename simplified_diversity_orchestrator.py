@@ -19,6 +19,9 @@ from uniqueness_aware_evidence_validator import UniquenessAwareEvidenceValidator
 from explanation_analyzer import ExplanationAnalyzer, SearchableClaim
 from web_search_engine import WebSearchEngine
 from evidence_models import create_enhanced_candidate_response
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 @dataclass
@@ -56,6 +59,9 @@ class SimplifiedDiversityOrchestrator:
         # Web search engine (will be injected)
         self.web_search_engine = None
         
+        # One search's candidates run concurrently against the shared registry
+        self._registry_lock = asyncio.Lock()
+        
         # Statistics
         self.stats = {
             'candidates_processed': 0,
@@ -86,7 +92,7 @@ class SimplifiedDiversityOrchestrator:
         
         enhanced_candidates = []
         
-        print(f"[Diversity Orchestrator] Processing {len(candidates)} candidates with diversity")
+        logger.info("[Diversity Orchestrator] Processing %s candidates with diversity", len(candidates))
         
         for i, candidate in enumerate(candidates):
             try:
@@ -99,14 +105,14 @@ class SimplifiedDiversityOrchestrator:
                 self.stats['candidates_processed'] += 1
                 
             except Exception as e:
-                print(f"[Diversity Orchestrator] Error processing candidate {candidate.get('id', 'unknown')}: {e}")
+                logger.warning("[Diversity Orchestrator] Error processing candidate %s: %s", candidate.get('id', 'unknown'), e)
                 # Return original candidate on error
                 enhanced_candidates.append(candidate)
         
         # Update final statistics
         self._update_final_statistics()
         
-        print(f"[Diversity Orchestrator] Completed processing with {self.stats['unique_domains']} unique domains")
+        logger.info("[Diversity Orchestrator] Completed processing with %s unique domains", self.stats['unique_domains'])
         
         return enhanced_candidates
     
@@ -123,10 +129,10 @@ class SimplifiedDiversityOrchestrator:
         # Extract explanations from candidate
         explanations = self._extract_explanations_from_candidate(candidate)
         if not explanations:
-            print(f"[Diversity Orchestrator] No explanations found for candidate {candidate_id}")
+            logger.debug("[Diversity Orchestrator] No explanations found for candidate %s", candidate_id)
             return candidate
         
-        print(f"[Diversity Orchestrator] Processing candidate {candidate_id} with {len(explanations)} explanations")
+        logger.debug("[Diversity Orchestrator] Processing candidate %s with %s explanations", candidate_id, len(explanations))
         
         # Analyze explanations to extract claims
         all_claims = []
@@ -135,14 +141,14 @@ class SimplifiedDiversityOrchestrator:
             all_claims.extend(claims)
         
         if not all_claims:
-            print(f"[Diversity Orchestrator] No searchable claims found for candidate {candidate_id}")
+            logger.debug("[Diversity Orchestrator] No searchable claims found for candidate %s", candidate_id)
             return candidate
         
         # Prioritize and limit claims (reduced to prevent hanging)
         prioritized_claims = sorted(all_claims, key=lambda c: (c.priority, c.confidence), reverse=True)
         selected_claims = prioritized_claims[:1]  # Limit to top 1 claim to prevent hanging
         
-        print(f"[Diversity Orchestrator] Processing {len(selected_claims)} claims for candidate {candidate_id}")
+        logger.debug("[Diversity Orchestrator] Processing %s claims for candidate %s", len(selected_claims), candidate_id)
         
         # Generate diverse queries for each claim
         all_queries = []
@@ -157,10 +163,10 @@ class SimplifiedDiversityOrchestrator:
             all_queries.extend(diverse_queries[:1])  # Limit to top 1 query per claim to prevent hanging
         
         if not all_queries:
-            print(f"[Diversity Orchestrator] No queries generated for candidate {candidate_id}")
+            logger.debug("[Diversity Orchestrator] No queries generated for candidate %s", candidate_id)
             return candidate
         
-        print(f"[Diversity Orchestrator] Generated {len(all_queries)} diverse queries for candidate {candidate_id}")
+        logger.debug("[Diversity Orchestrator] Generated %s diverse queries for candidate %s", len(all_queries), candidate_id)
         
         # Execute web searches with timeout protection
         try:
@@ -170,52 +176,54 @@ class SimplifiedDiversityOrchestrator:
             )
             successful_results = [r for r in search_results if r.success]
         except asyncio.TimeoutError:
-            print(f"[Diversity Orchestrator] Search timed out for candidate {candidate_id}")
+            logger.warning("[Diversity Orchestrator] Search timed out for candidate %s", candidate_id)
             search_results = []
             successful_results = []
         
-        print(f"[Diversity Orchestrator] Completed {len(successful_results)}/{len(search_results)} searches for candidate {candidate_id}")
+        logger.debug("[Diversity Orchestrator] Completed %s/%s searches for candidate %s", len(successful_results), len(search_results), candidate_id)
         
-        # Validate and rank with uniqueness
-        evidence_urls = []
+        # Validate and register under the lock so two candidates cannot both claim the same URL
+        async with self._registry_lock:
+            # Validate and rank with uniqueness
+            evidence_urls = []
         
-        if successful_results:
-            print(f"[Diversity Orchestrator] Processing {len(successful_results)} successful results for {len(selected_claims)} claims")
-            for i, claim in enumerate(selected_claims):
-                # Find search results for this claim
-                claim_results = self._find_results_for_claim(successful_results, claim)
-                print(f"[Diversity Orchestrator] Claim {i+1}: Found {len(claim_results)} matching results")
+            if successful_results:
+                logger.debug("[Diversity Orchestrator] Processing %s successful results for %s claims", len(successful_results), len(selected_claims))
+                for i, claim in enumerate(selected_claims):
+                    # Find search results for this claim
+                    claim_results = self._find_results_for_claim(successful_results, claim)
+                    logger.debug("[Diversity Orchestrator] Claim %s: Found %s matching results", i+1, len(claim_results))
                 
-                if claim_results:
-                    # Validate with uniqueness constraints (now includes URL accessibility check)
-                    claim_evidence = await self.uniqueness_validator.validate_with_uniqueness(
-                        results=claim_results,
-                        claim=claim,
-                        candidate_id=candidate_id,
-                        existing_evidence=evidence_urls
-                    )
-                    print(f"[Diversity Orchestrator] Claim {i+1}: Validation returned {len(claim_evidence)} evidence URLs")
-                    evidence_urls.extend(claim_evidence)
-                else:
-                    print(f"[Diversity Orchestrator] Claim {i+1}: No matching results found")
+                    if claim_results:
+                        # Validate with uniqueness constraints (now includes URL accessibility check)
+                        claim_evidence = await self.uniqueness_validator.validate_with_uniqueness(
+                            results=claim_results,
+                            claim=claim,
+                            candidate_id=candidate_id,
+                            existing_evidence=evidence_urls
+                        )
+                        logger.debug("[Diversity Orchestrator] Claim %s: Validation returned %s evidence URLs", i+1, len(claim_evidence))
+                        evidence_urls.extend(claim_evidence)
+                    else:
+                        logger.debug("[Diversity Orchestrator] Claim %s: No matching results found", i+1)
             
-            # Apply final diversity filters
-            final_evidence = self._apply_final_diversity_filters(evidence_urls)
-        else:
-            # Fallback: generate simple evidence URLs when searches fail
-            print(f"[Diversity Orchestrator] No search results, using fallback URLs for candidate {candidate_id}")
-            final_evidence = self._generate_fallback_evidence(candidate, selected_claims)
+                # Apply final diversity filters
+                final_evidence = self._apply_final_diversity_filters(evidence_urls)
+            else:
+                # Fallback: generate simple evidence URLs when searches fail
+                logger.debug("[Diversity Orchestrator] No search results, using fallback URLs for candidate %s", candidate_id)
+                final_evidence = self._generate_fallback_evidence(candidate, selected_claims)
         
-        # Register evidence usage
-        if final_evidence:
-            self.uniqueness_validator.register_evidence_usage(final_evidence, candidate_id)
+            # Register evidence usage
+            if final_evidence:
+                self.uniqueness_validator.register_evidence_usage(final_evidence, candidate_id)
         
         # Update statistics
         self.stats['urls_found'] += len(final_evidence)
         
         processing_time = time.time() - start_time
         
-        print(f"[Diversity Orchestrator] Found {len(final_evidence)} diverse URLs for candidate {candidate_id} in {processing_time:.2f}s")
+        logger.debug("[Diversity Orchestrator] Found %s diverse URLs for candidate %s in %.2fs", len(final_evidence), candidate_id, processing_time)
         
         # Create enhanced response
         enhanced_candidate = create_enhanced_candidate_response(
@@ -355,7 +363,7 @@ class SimplifiedDiversityOrchestrator:
                 
                 return evidence_urls
         except Exception as e:
-            print(f"[Diversity Orchestrator] Fallback generation failed: {e}")
+            logger.warning("[Diversity Orchestrator] Fallback generation failed: %s", e)
         
         return []
     
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing.
+
+When several callers ask for the same thing at the same time, only the first
+one (the leader) does the work; the others attach to the leader's in-flight
+future and receive the same result or exception. Nothing is cached once the
+call finishes - that is the job of the result caches. Leaders and coalesced
+callers are counted per group in knowledge_gpt_single_flight_calls_total.
+
+Used at three levels:
+    search      concurrent identical searches share one process_search run
+    apollo      concurrent enrichment calls for the same Apollo person id
+    serp        concurrent SerpAPI requests for the same query
+
+Usage:
+    from single_flight import get_single_flight
+
+    flight = get_single_flight("serp")
+    results = await flight.do(query_key, lambda: fetch(query))
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from metrics import SINGLE_FLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+class FlightCancelledError(Exception):
+    """Raised to followers when the leader was cancelled before it produced a result."""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.errors = 0
+
+    async def do_with_status(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run func once per key across concurrent callers.
+
+        Returns (result, is_leader). Followers get the leader's result, or its
+        exception re-raised. If the leader is cancelled (e.g. its search was
+        deleted) followers get FlightCancelledError rather than a
+        CancelledError that would look like their own cancellation.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.followers += 1
+            SINGLE_FLIGHT_CALLS.inc(flight=self.name, role="coalesced")
+            # shield: a follower being cancelled must not cancel the leader's work
+            return await asyncio.shield(future), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.leaders += 1
+        SINGLE_FLIGHT_CALLS.inc(flight=self.name, role="leader")
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_exception(FlightCancelledError(f"{self.name} leader for {key!r} was cancelled"))
+            future.exception()
+            raise
+        except BaseException as e:
+            self.errors += 1
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting on it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, True
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func once per key across concurrent callers and return its result."""
+        result, _ = await self.do_with_status(key, func)
+        return result
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.followers
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.followers,
+            "errors": self.errors,
+            "coalesce_rate": round(self.followers / calls, 3) if calls else 0.0,
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Return the named single-flight group, creating it on first use."""
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.setdefault(name, SingleFlight(name))
+    return group
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Coalescing counts for every group."""
+    return {name: group.stats() for name, group in list(_groups.items())}
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Structured, level-gated logging for the search path.
+
+The request path used to print() everywhere: pretty-printed Apollo payloads,
+one line per enriched person and per candidate, raw OpenAI responses at ERROR
+level. Every print is a synchronous stdout write plus eager f-string
+formatting, whether anyone reads it or not.
+
+Here every module gets a logger from get_logger(__name__):
+
+    logger = get_logger(__name__)
+    logger.info("[Apollo API] Received %s people", len(people), page=page)
+    logger.debug("[Internal Database] Enriched %s", name)
+
+- Messages use %-style arguments, so nothing is formatted unless the level is
+  enabled. Keyword arguments become structured fields on the record.
+- Records go onto a bounded in-memory queue; a background listener thread does
+  the JSON rendering and the stdout write. When the queue is full records are
+  dropped and counted instead of blocking the request.
+- Levels can be set per module, and high-volume DEBUG records can be sampled.
+
+Configuration (environment variables):
+    LOG_LEVEL         default level (INFO)
+    LOG_LEVELS        per-module overrides, e.g. "apollo_api_call=WARNING,api.main=DEBUG"
+    LOG_SAMPLE_RATES  fraction of DEBUG records kept per module, e.g. "apollo_api_call=0.1"
+    LOG_FORMAT        json | text (default json)
+    LOG_QUEUE_SIZE    records buffered before dropping (default 10000)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+ROOT_LOGGER = "knowledge_gpt"
+
+# Attributes every LogRecord has; anything else on a record is a structured field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "fields"}
+
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "a=1,b=2" into {"a": "1", "b": "2"}."""
+    mapping = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            key, val = item.split("=", 1)
+            if key.strip():
+                mapping[key.strip()] = val.strip()
+    return mapping
+
+
+def _level(value: Any, default: int = logging.INFO) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    return level if isinstance(level, int) else default
+
+
+class StructuredLogger:
+    """Thin wrapper over a stdlib logger that turns keyword arguments into fields."""
+
+    __slots__ = ("name", "_logger")
+
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+        self.name = logger.name[len(ROOT_LOGGER) + 1:] if logger.name.startswith(ROOT_LOGGER + ".") else logger.name
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def setLevel(self, level: Any) -> None:
+        self._logger.setLevel(_level(level))
+
+    def _log(self, level: int, msg: str, args: tuple, fields: Dict[str, Any]) -> None:
+        exc_info = fields.pop("exc_info", None)
+        self._logger.log(level, msg, *args, exc_info=exc_info,
+                         extra={"fields": fields} if fields else None, stacklevel=3)
+
+    def debug(self, msg: str, *args: Any, **fields: Any) -> None:
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, msg, args, fields)
+
+    def info(self, msg: str, *args: Any, **fields: Any) -> None:
+        if self._logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, msg, args, fields)
+
+    def warning(self, msg: str, *args: Any, **fields: Any) -> None:
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, msg, args, fields)
+
+    def error(self, msg: str, *args: Any, **fields: Any) -> None:
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, msg, args, fields)
+
+    def exception(self, msg: str, *args: Any, **fields: Any) -> None:
+        fields.setdefault("exc_info", True)
+        self.error(msg, *args, **fields)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every N DEBUG records per (module, message template).
+
+    Counting per template rather than at random keeps the first occurrence of
+    every message and makes sampling deterministic.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, name: str) -> float:
+        module = name[len(ROOT_LOGGER) + 1:] if name.startswith(ROOT_LOGGER + ".") else name
+        while module:
+            if module in self.rates:
+                return self.rates[module]
+            module = module.rpartition(".")[0]
+        return self.rates.get("*", 1.0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not self.rates:
+            return True
+        rate = self._rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        every = max(1, round(1.0 / rate))
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % every:
+            return False
+        record.sampled_every = every
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Puts records on a bounded queue; drops (and counts) them when it is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now (they may be mutated later); JSON rendering
+        # and the write happen on the listener thread
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    fields = dict(getattr(record, "fields", None) or {})
+    for key, value in vars(record).items():
+        if key not in _RESERVED and key not in fields:
+            fields[key] = value
+    return fields
+
+
+def _short_name(name: str) -> str:
+    return name[len(ROOT_LOGGER) + 1:] if name.startswith(ROOT_LOGGER + ".") else name
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": _short_name(record.name),
+            "msg": record.getMessage(),
+        }
+        entry.update(_record_fields(record))
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human readable lines with fields appended as key=value."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{datetime.fromtimestamp(record.created).strftime('%H:%M:%S')} {record.levelname:<7} {_short_name(record.name)}: {record.getMessage()}"
+        fields = _record_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+_state_lock = threading.Lock()
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(stream=None, force: bool = False) -> None:
+    """Install the queue handler and listener on the knowledge_gpt logger (idempotent)."""
+    global _handler, _listener
+    with _state_lock:
+        if _handler is not None and not force:
+            return
+        _stop_listener()
+
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(_level(os.getenv("LOG_LEVEL", "INFO")))
+        root.propagate = False
+        for module, level in _parse_mapping(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(f"{ROOT_LOGGER}.{module}").setLevel(_level(level))
+
+        try:
+            queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        except ValueError:
+            queue_size = 10000
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json").lower() == "text" else JSONFormatter())
+
+        rates = {}
+        for module, rate in _parse_mapping(os.getenv("LOG_SAMPLE_RATES", "")).items():
+            try:
+                rates[module] = float(rate)
+            except ValueError:
+                pass
+
+        _handler = NonBlockingQueueHandler(log_queue)
+        _handler.addFilter(SamplingFilter(rates))
+        root.addHandler(_handler)
+        _listener = QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # drains the queue before returning
+        _listener = None
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    with _state_lock:
+        _stop_listener()
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Return the structured logger for a module, configuring logging on first use."""
+    if _handler is None:
+        configure_logging()
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+
+
+def set_log_level(module: str, level: Any) -> None:
+    """Change a module's level at runtime."""
+    logging.getLogger(f"{ROOT_LOGGER}.{module}" if module else ROOT_LOGGER).setLevel(_level(level))
+
+
+def logging_stats() -> Dict[str, Any]:
+    return {
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+    }
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Dependency-graph executor for the search pipeline.
+
+Several process_search stages only need the prompt (people estimation, prompt
+enhancement and filter parsing, search-context analysis), yet they used to run
+one after another, with the estimate at the very end. A TaskGraph starts each
+task the moment its dependencies are done, so every prompt-only task begins as
+soon as the search is accepted, and callers join on the results where needed.
+
+Stages that run inline in the caller (the Apollo retry loop, the candidate
+pipeline) can be recorded so that the logged critical path covers the whole
+search.
+
+Usage:
+    graph = TaskGraph("search abc")
+    graph.add("estimate", lambda: run_blocking(estimate_people_count, prompt))
+    graph.add("enhance", enhance)
+    graph.add("filters", parse_filters, deps=["enhance"])
+
+    filters = await graph.result("filters")
+    ...
+    graph.log_summary()
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from metrics import STAGE_SECONDS
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class TaskNode:
+    """One task in the graph and its timing."""
+    name: str
+    deps: List[str]
+    task: Optional[asyncio.Task] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class TaskGraph:
+    """Launches tasks as soon as their dependencies finish and records timings."""
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.nodes: Dict[str, TaskNode] = {}
+        self.created_at = time.time()
+
+    def add(self, name: str, func: Callable[..., Awaitable[Any]], deps: Sequence[str] = ()) -> TaskNode:
+        """
+        Schedule func to run once every dependency has finished.
+
+        func is called with the dependency results as positional arguments, in
+        the order given in deps. Dependencies must already be in the graph.
+        """
+        if name in self.nodes:
+            raise ValueError(f"Task '{name}' already exists in graph '{self.name}'")
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Task '{name}' depends on unknown tasks: {missing}")
+
+        node = TaskNode(name=name, deps=list(deps))
+
+        async def runner() -> Any:
+            dep_results = [await self.nodes[dep].task for dep in node.deps]
+            node.started_at = time.time()
+            outcome = "error"
+            try:
+                result = await func(*dep_results)
+                outcome = "ok"
+                return result
+            except Exception as e:
+                node.error = str(e)
+                raise
+            finally:
+                node.finished_at = time.time()
+                STAGE_SECONDS.observe(node.finished_at - node.started_at, stage=name, outcome=outcome)
+
+        node.task = asyncio.create_task(runner())
+        self.nodes[name] = node
+        return node
+
+    async def result(self, name: str) -> Any:
+        """Wait for a task and return its result (re-raising its exception)."""
+        return await self.nodes[name].task
+
+    def record(self, name: str, started_at: float, finished_at: Optional[float] = None,
+               deps: Sequence[str] = ()) -> TaskNode:
+        """Record a stage that ran inline in the caller so it shows up in the timings."""
+        node = TaskNode(name=name, deps=list(deps), created_at=started_at,
+                        started_at=started_at, finished_at=finished_at or time.time())
+        self.nodes[name] = node
+        return node
+
+    def critical_path(self) -> List[TaskNode]:
+        """Walk back from the last task to finish through its latest-finishing dependency."""
+        finished = [node for node in self.nodes.values() if node.finished_at is not None]
+        if not finished:
+            return []
+
+        path = []
+        node = max(finished, key=lambda n: n.finished_at)
+        while node is not None:
+            path.append(node)
+            deps = [self.nodes[d] for d in node.deps if self.nodes[d].finished_at is not None]
+            node = max(deps, key=lambda n: n.finished_at) if deps else None
+        return list(reversed(path))
+
+    def timings(self) -> Dict[str, Any]:
+        """Per-task offsets and durations, the critical path, and the time saved versus running serially."""
+        finished = [node for node in self.nodes.values() if node.finished_at is not None]
+        wall_time = max((n.finished_at for n in finished), default=self.created_at) - self.created_at
+        serial_time = sum(node.duration for node in finished)
+        return {
+            "wall_time": round(wall_time, 3),
+            "serial_time": round(serial_time, 3),
+            "saved_time": round(max(0.0, serial_time - wall_time), 3),
+            "critical_path": [node.name for node in self.critical_path()],
+            "tasks": {
+                node.name: {
+                    "start_offset": round(node.started_at - self.created_at, 3) if node.started_at else None,
+                    "duration": round(node.duration, 3),
+                    "deps": node.deps,
+                    "error": node.error,
+                }
+                for node in self.nodes.values()
+            },
+        }
+
+    def log_summary(self) -> Dict[str, Any]:
+        timings = self.timings()
+        path = " -> ".join(
+            f"{name} ({timings['tasks'][name]['duration']:.2f}s)" for name in timings["critical_path"]
+        )
+        logger.info("[Task Graph] %s: critical path %s", self.name, path)
+        logger.info("[Task Graph] %s: wall %.2fs vs serial %.2fs (saved %.2fs)", self.name, timings['wall_time'], timings['serial_time'], timings['saved_time'])
+        return timings
+
+    async def close(self) -> None:
+        """Cancel tasks nobody joined and collect their exceptions."""
+        pending = [node.task for node in self.nodes.values() if node.task is not None]
+        for task in pending:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for per-client rate limiting and the in-flight cap on new searches.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from admission_control import (
+    AdmissionController, AdmissionRejected, MemoryRateLimitBackend, SQLiteRateLimitBackend, client_key
+)
+
+
+class TestTokenBuckets(unittest.TestCase):
+
+    def test_burst_then_reject_then_refill(self):
+        backend = MemoryRateLimitBackend()
+        rate = 20.0  # tokens per second
+        self.assertEqual(backend.take("a", rate, burst=2), 0)
+        self.assertEqual(backend.take("a", rate, burst=2), 0)
+        wait = backend.take("a", rate, burst=2)
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 1 / rate)
+        # Other clients have their own bucket
+        self.assertEqual(backend.take("b", rate, burst=2), 0)
+        time.sleep(wait + 0.01)
+        self.assertEqual(backend.take("a", rate, burst=2), 0)
+
+    def test_sqlite_buckets_are_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "admission.db")
+            worker_one, worker_two = SQLiteRateLimitBackend(path), SQLiteRateLimitBackend(path)
+            self.assertEqual(worker_one.take("a", 0.01, burst=1), 0)
+            self.assertGreater(worker_two.take("a", 0.01, burst=1), 0)
+
+    def test_client_key_prefers_api_key_and_hashes_it(self):
+        key = client_key({"x-api-key": "secret-key"}, "10.0.0.1")
+        self.assertTrue(key.startswith("key:"))
+        self.assertNotIn("secret", key)
+        self.assertEqual(client_key({"authorization": "Bearer secret-key"}, "10.0.0.1"), key)
+
+    def test_forwarded_for_is_read_only_from_trusted_proxy_hops(self):
+        # Not trusted by default: a spoofed header cannot mint new buckets
+        with patch.dict(os.environ):
+            os.environ.pop("ADMISSION_TRUSTED_PROXY_HOPS", None)
+            self.assertEqual(client_key({"x-forwarded-for": "1.2.3.4"}, "10.0.0.1"), "ip:10.0.0.1")
+        # One proxy appends the real peer; whatever the client sent before it is ignored
+        spoofed = {"x-forwarded-for": "6.6.6.6, 1.2.3.4"}
+        self.assertEqual(client_key(spoofed, "10.0.0.1", 1), "ip:1.2.3.4")
+        self.assertEqual(client_key(spoofed, "10.0.0.1", 2), "ip:6.6.6.6")
+        self.assertEqual(client_key({"x-forwarded-for": "1.2.3.4"}, "10.0.0.1", 2), "ip:10.0.0.1")
+
+
+class TestInFlightCap(unittest.TestCase):
+
+    def controller(self, active, **kwargs):
+        async def in_flight():
+            return active[0]
+        options = dict(rate_per_minute=0, max_in_flight=2, max_waiters=1, wait_seconds=0.3, poll_seconds=0.01)
+        options.update(kwargs)
+        return AdmissionController(in_flight=in_flight, backend=MemoryRateLimitBackend(), **options)
+
+    def test_waiter_is_admitted_when_a_slot_frees(self):
+        active = [2]
+        admission = self.controller(active)
+
+        async def scenario():
+            waiter = asyncio.create_task(admission.acquire("a"))
+            await asyncio.sleep(0.05)
+            self.assertEqual(admission.waiting, 1)
+            # A second waiter does not fit in the wait queue
+            with self.assertRaises(AdmissionRejected) as rejected:
+                await admission.acquire("b")
+            self.assertEqual(rejected.exception.reason, "queue_full")
+            active[0] = 1
+            return await waiter
+
+        self.assertTrue(asyncio.run(scenario()))
+        self.assertEqual(admission.outcomes, {"queue_full": 1, "queued": 1})
+
+    def test_wait_times_out(self):
+        admission = self.controller([5])
+        with self.assertRaises(AdmissionRejected) as rejected:
+            asyncio.run(admission.acquire("a"))
+        self.assertEqual(rejected.exception.reason, "wait_timeout")
+        self.assertEqual(rejected.exception.retry_after, 1)
+
+    def test_reserved_slots_count_until_released(self):
+        admission = self.controller([1], wait_seconds=0.05)
+
+        async def scenario():
+            slot = await admission.acquire("a")
+            with self.assertRaises(AdmissionRejected):
+                await admission.acquire("b")
+            admission.release(slot)
+            return await admission.acquire("c")
+
+        self.assertTrue(asyncio.run(scenario()))
+
+    def test_multi_search_requests_reserve_a_slot_per_search(self):
+        admission = self.controller([1], max_in_flight=4, wait_seconds=0.05)
+
+        async def scenario():
+            slots = await admission.acquire("a", cost=3)
+            self.assertEqual((slots, admission.reserved), (3, 3))
+            with self.assertRaises(AdmissionRejected):
+                await admission.acquire("b")
+            admission.release(slots)
+            with self.assertRaises(AdmissionRejected) as rejected:
+                await admission.acquire("c", cost=5)
+            return rejected.exception.reason
+
+        self.assertEqual(asyncio.run(scenario()), "too_large")
+        self.assertEqual(admission.reserved, 0)
+
+    def test_cost_is_not_clamped_to_the_bucket(self):
+        admission = self.controller([0], rate_per_minute=30, burst=10, max_in_flight=0)
+
+        async def scenario():
+            with self.assertRaises(AdmissionRejected) as too_large:
+                await admission.acquire("a", cost=50)
+            await admission.acquire("a", cost=8)
+            with self.assertRaises(AdmissionRejected) as limited:
+                await admission.acquire("a", cost=5)
+            return too_large.exception.reason, limited.exception.reason
+
+        self.assertEqual(asyncio.run(scenario()), ("too_large", "rate_limited"))
+
+
+class TestCreateSearchAdmission(unittest.TestCase):
+
+    def test_rate_limited_client_gets_429_with_retry_after(self):
+        from fastapi.testclient import TestClient
+        from api import main
+
+        class FakeQueue:
+            max_depth = 0
+
+            def __init__(self):
+                self.jobs = []
+
+            def depth(self):
+                return len(self.jobs)
+
+            def active(self):
+                return len(self.jobs)
+
+            def enqueue(self, request_id, payload, priority=0):
+                self.jobs.append(request_id)
+
+        queue = FakeQueue()
+        admission = AdmissionController(in_flight=main._active_searches, backend=MemoryRateLimitBackend(),
+                                        rate_per_minute=1, burst=1, max_in_flight=10)
+        with patch.object(main, "admission", admission), \
+             patch.object(main, "get_search_queue", return_value=queue), \
+             patch.object(main, "store_search_to_database", lambda data: 1):
+            client = TestClient(main.app)
+            body = {"prompt": "Find CMOs in Florida evaluating marketing automation"}
+            first = client.post("/api/search", json=body, headers={"X-API-Key": "integration-1"})
+            second = client.post("/api/search", json=body, headers={"X-API-Key": "integration-1"})
+            other = client.post("/api/search", json=body, headers={"X-API-Key": "integration-2"})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 429)
+        self.assertGreaterEqual(int(second.headers["retry-after"]), 1)
+        self.assertEqual(other.status_code, 200)
+        self.assertEqual(len(queue.jobs), 2)
+        self.assertEqual(admission.reserved, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded executors used by the async search pipeline.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+import unittest
+
+import blocking_executor
+from blocking_executor import run_blocking, set_async_pipeline_enabled
+
+request_var = contextvars.ContextVar("request_var", default=None)
+
+
+class TestBlockingExecutor(unittest.TestCase):
+    """Test run_blocking in async and inline modes."""
+
+    def tearDown(self):
+        set_async_pipeline_enabled(True)
+
+    def test_runs_in_named_pool(self):
+        """Blocking calls should run on the requested pool's threads."""
+        result = asyncio.run(run_blocking(lambda: threading.current_thread().name, pool="db"))
+        self.assertTrue(result.startswith("pipeline-db"))
+
+    def test_inline_mode_runs_on_caller_thread(self):
+        """With the async mode disabled calls run inline (legacy behaviour)."""
+        set_async_pipeline_enabled(False)
+        caller = threading.current_thread().name
+        result = asyncio.run(run_blocking(lambda: threading.current_thread().name))
+        self.assertEqual(result, caller)
+
+    def test_context_and_exceptions_propagate(self):
+        """Context variables reach the worker and exceptions reach the caller."""
+        async def scenario():
+            request_var.set("req-1")
+            seen = await run_blocking(request_var.get)
+            with self.assertRaises(ValueError):
+                await run_blocking(int, "not a number")
+            return seen
+
+        self.assertEqual(asyncio.run(scenario()), "req-1")
+
+    def test_event_loop_stays_responsive(self):
+        """A slow blocking call should not stall other coroutines."""
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                for _ in range(5):
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            await asyncio.gather(run_blocking(time.sleep, 0.2), ticker())
+            return ticks
+
+        self.assertEqual(asyncio.run(scenario()), 5)
+
+    def test_executor_stats(self):
+        """Stats should list created pools with their bounds."""
+        asyncio.run(run_blocking(lambda: None, pool="http"))
+        stats = blocking_executor.get_executor_stats()
+        self.assertTrue(stats["async_enabled"])
+        self.assertEqual(stats["pools"]["http"]["max_workers"], blocking_executor.DEFAULT_POOL_SIZES["http"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for candidate identity resolution.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_index import CandidateIndex, canonical_linkedin_url, linkedin_slug, normalize_name
+
+
+class TestIdentityNormalization(unittest.TestCase):
+
+    def test_linkedin_urls_reduce_to_one_slug(self):
+        for url in ("linkedin.com/in/Jane-Doe/", "https://www.linkedin.com/in/jane-doe?trk=x",
+                    "http://uk.linkedin.com/in/jane-doe"):
+            self.assertEqual(linkedin_slug(url), "in/jane-doe")
+        self.assertIsNone(linkedin_slug("https://example.com/in/jane-doe"))
+        self.assertIsNone(linkedin_slug("https://www.linkedin.com/company/acme"))
+        self.assertEqual(canonical_linkedin_url("linkedin.com/in/Jane-Doe/"), "https://www.linkedin.com/in/jane-doe")
+
+    def test_names_ignore_case_accents_and_punctuation(self):
+        self.assertEqual(normalize_name("  José  O'Neil "), "jose oneil")
+
+
+class TestCandidateIndex(unittest.TestCase):
+
+    def test_find_by_strongest_identity(self):
+        jane = {"name": "Jane Doe", "linkedin_url": "https://www.linkedin.com/in/jane-doe", "email": "jane@acme.com"}
+        index = CandidateIndex([jane, {"name": "Bob Roe"}])
+
+        self.assertIs(index.find({"linkedin_url": "linkedin.com/in/JANE-DOE"}), jane)
+        self.assertIs(index.find({"email": "Jane@Acme.com "}), jane)
+        self.assertIs(index.find({"name": "jane doe"}), jane)
+        self.assertIsNone(index.find({"name": "Someone Else"}))
+
+    def test_shared_name_with_different_profiles_is_not_merged(self):
+        index = CandidateIndex()
+        self.assertTrue(index.add({"name": "John Smith", "linkedin_url": "linkedin.com/in/john-smith-1"}))
+        self.assertTrue(index.add({"name": "John Smith", "linkedin_url": "linkedin.com/in/john-smith-2"}))
+        self.assertFalse(index.add({"name": "John Smith", "linkedin_url": "https://linkedin.com/in/john-smith-2/"}))
+        self.assertEqual(len(index), 2)
+
+    def test_store_people_skips_duplicates(self):
+        import database
+
+        inserted = []
+
+        class Table:
+            def insert(self, row):
+                inserted.append(row)
+                return self
+
+            def execute(self):
+                return self
+
+        people = [
+            {"name": "Jane Doe", "linkedin_url": "linkedin.com/in/jane-doe/"},
+            {"name": "Jane Doe", "linkedin_url": "https://www.linkedin.com/in/Jane-Doe", "accuracy": 90},
+        ]
+        with patch.object(database.supabase, "table", lambda name: Table()):
+            self.assertTrue(database.store_people_to_database(1, people))
+        self.assertEqual([row["linkedin_url"] for row in inserted], ["https://www.linkedin.com/in/jane-doe"])
+
+    def test_exclusion_index_matches_any_url_form(self):
+        import database
+
+        with patch.object(database, "get_current_exclusions",
+                          return_value=[{"linkedin_url": "https://linkedin.com/in/excluded", "name": "Jane Doe"}]), \
+             patch.object(database, "_exclusion_index", None):
+            excluded = database.get_exclusion_index()
+
+        self.assertIn({"linkedin_url": "www.linkedin.com/in/Excluded/"}, excluded)
+        # Exclusions match on the profile only, never on a shared name
+        self.assertNotIn({"name": "Jane Doe", "linkedin_url": "linkedin.com/in/other"}, excluded)
+
+
+if __name__ == "__main__":
+    unittest.main()
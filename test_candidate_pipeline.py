@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-candidate stage pipeline used by process_search.
+"""
+
+import asyncio
+import time
+import unittest
+
+from candidate_pipeline import CandidatePipeline, PipelineStage
+
+
+class TestCandidatePipeline(unittest.TestCase):
+
+    def test_stages_overlap_across_candidates(self):
+        """Candidate 1's second stage should run while candidate 2 is in the first."""
+        async def slow_stage(index, candidate):
+            await asyncio.sleep(0.1)
+            return candidate
+
+        async def scenario():
+            pipeline = CandidatePipeline([
+                PipelineStage("behavioral", slow_stage, concurrency=3),
+                PipelineStage("evidence", slow_stage, concurrency=3),
+            ])
+            start = time.time()
+            for i in range(3):
+                pipeline.submit({"name": f"c{i}"})
+            await pipeline.finish()
+            return time.time() - start
+
+        # Strict phases would take 0.6s; pipelined it is about 0.2s
+        self.assertLess(asyncio.run(scenario()), 0.4)
+
+    def test_stage_concurrency_is_bounded(self):
+        running = 0
+        peak = 0
+
+        async def tracked_stage(index, candidate):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return candidate
+
+        async def scenario():
+            pipeline = CandidatePipeline([PipelineStage("evidence", tracked_stage, concurrency=2)])
+            for i in range(5):
+                pipeline.submit({"name": f"c{i}"})
+            return await pipeline.finish()
+
+        results = asyncio.run(scenario())
+        self.assertEqual(len(results), 5)
+        self.assertLessEqual(peak, 2)
+
+    def test_results_keep_submission_order(self):
+        async def variable_stage(index, candidate):
+            await asyncio.sleep(0.05 if index == 0 else 0.0)
+            candidate["done"] = True
+            return candidate
+
+        finalized = []
+
+        async def scenario():
+            pipeline = CandidatePipeline(
+                [PipelineStage("photo", variable_stage)],
+                on_finalized=lambda index, candidate: finalized.append(index)
+            )
+            for i in range(3):
+                pipeline.submit({"name": f"c{i}"})
+            return await pipeline.finish()
+
+        results = asyncio.run(scenario())
+        self.assertEqual([c["name"] for c in results], ["c0", "c1", "c2"])
+        self.assertEqual(finalized[-1], 0)  # the slow candidate finalizes last
+
+    def test_failed_stage_keeps_candidate(self):
+        async def failing_stage(index, candidate):
+            raise RuntimeError("search provider down")
+
+        async def marking_stage(index, candidate):
+            candidate["stored"] = True
+            return candidate
+
+        async def scenario():
+            pipeline = CandidatePipeline([
+                PipelineStage("evidence", failing_stage),
+                PipelineStage("store", marking_stage),
+            ])
+            pipeline.submit({"name": "c0"})
+            return await pipeline.finish(), pipeline.stats()
+
+        results, stats = asyncio.run(scenario())
+        self.assertTrue(results[0]["stored"])
+        self.assertEqual(stats["stages"]["evidence"]["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
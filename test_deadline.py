@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the end-to-end search deadline and the degraded pipeline paths it drives.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from deadline import (
+    Deadline, budget_timeout, budgeted_client, reset_current_deadline, set_current_deadline
+)
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_stage_timeouts_come_from_remaining_budget(self):
+        deadline = Deadline.start(30)
+        self.assertAlmostEqual(deadline.timeout(), 30, delta=0.1)
+        self.assertEqual(deadline.timeout(cap=10), 10)
+        self.assertAlmostEqual(deadline.timeout(reserve=20), 10, delta=0.1)
+        self.assertAlmostEqual(deadline.timeout(share=0.5), 15, delta=0.1)
+        self.assertFalse(deadline.short(20))
+        self.assertTrue(deadline.short(40))
+
+    def test_spent_budget_still_hands_out_a_floor(self):
+        deadline = Deadline(expires_at=time.time() - 5, budget=30)
+        self.assertTrue(deadline.expired)
+        self.assertEqual(deadline.remaining(), 0.0)
+        self.assertEqual(deadline.timeout(cap=60, floor=2.0), 2.0)
+        self.assertAlmostEqual(deadline.child(3).remaining(), 3, delta=0.1)
+
+    def test_round_trips_through_job_payload(self):
+        deadline = Deadline.start(45)
+        self.assertEqual(Deadline.from_dict(deadline.to_dict()), deadline)
+        self.assertIsNone(Deadline.from_dict(None))
+        self.assertIsNone(Deadline.from_dict({"expires_at": "soon"}))
+
+    def test_context_deadline_caps_nested_calls(self):
+        self.assertEqual(budget_timeout(10.0), 10.0)
+        client = MagicMock()
+        self.assertIs(budgeted_client(client), client)
+
+        token = set_current_deadline(Deadline.start(4))
+        try:
+            self.assertLessEqual(budget_timeout(10.0), 4.0)
+            budgeted_client(client)
+            options = client.with_options.call_args.kwargs
+            self.assertLessEqual(options["timeout"], 4.0)
+            self.assertEqual(options["max_retries"], 0)
+        finally:
+            reset_current_deadline(token)
+        self.assertEqual(budget_timeout(10.0), 10.0)
+
+
+class TestSearchDegradation(unittest.TestCase):
+    """A search whose budget is nearly spent finishes on the cheap paths."""
+
+    def run_search(self, deadline, handler="process_search", max_candidates=3):
+        """Run one search against faked providers and record what it spent."""
+        from api import main
+        from search_result_cache import SearchResultCache
+        from shared_cache import MemoryCacheBackend
+
+        self.stored_searches = {}
+        self.apollo_calls = []
+        self.assessment_calls = []
+        self.behavioral_calls = []
+        self.cache = SearchResultCache(MemoryCacheBackend(), ttl=60)
+
+        def fake_get_search(request_id):
+            return dict(self.stored_searches.get(request_id, {"id": 1, "request_id": request_id, "status": "processing"}))
+
+        def fake_store_search(search_data):
+            self.stored_searches[search_data["request_id"]] = dict(search_data)
+            return 1
+
+        async def fake_apollo(filters, page=1, per_page=5, deadline=None):
+            self.apollo_calls.append(deadline)
+            return [{"name": f"Person {page}", "title": "CMO", "linkedin_url": f"https://linkedin.com/in/p{page}"}]
+
+        def fake_assessment(prompt, people, *args, use_llm=True, **kwargs):
+            self.assessment_calls.append(use_llm)
+            return [{"name": p["name"], "linkedin_url": p["linkedin_url"], "accuracy": 90, "reasons": []} for p in people]
+
+        def fake_behavioral(*args, **kwargs):
+            self.behavioral_calls.append(1)
+            return {"behavioral_insight": "x", "scores": {}}
+
+        async def not_public(name):
+            return False
+
+        with patch.object(main, "search_result_cache", self.cache), \
+             patch.object(main, "get_search_from_database", fake_get_search), \
+             patch.object(main, "store_search_to_database", fake_store_search), \
+             patch.object(main, "store_people_to_database", lambda search_id, people: True), \
+             patch.object(main, "parse_prompt_to_internal_database_filters", lambda prompt, ridiculous=None: {"person_filters": {}}), \
+             patch.object(main, "search_people_via_internal_database", fake_apollo), \
+             patch.object(main, "select_top_candidates", fake_assessment), \
+             patch.object(main, "enhance_behavioral_data_ai", fake_behavioral), \
+             patch.object(main, "estimate_people_count", lambda prompt: {"estimated_count": 7}), \
+             patch.object(main, "is_public_figure", not_public), \
+             patch.object(main, "EVIDENCE_INTEGRATION_AVAILABLE", False):
+            asyncio.run(getattr(main, handler)(
+                request_id="short", prompt="Find CMOs in Florida",
+                max_candidates=max_candidates, deadline=deadline.to_dict()
+            ))
+        return main
+
+    def test_short_budget_uses_one_page_and_heuristics(self):
+        main = self.run_search(Deadline(expires_at=time.time() + 1.0, budget=60.0))
+
+        # Only one page despite wanting three candidates, each page sized from the budget
+        self.assertEqual(len(self.apollo_calls), 1)
+        self.assertLessEqual(self.apollo_calls[0].budget, main.MIN_PAGE_SECONDS)
+        self.assertEqual(self.assessment_calls, [False])
+        self.assertEqual(self.behavioral_calls, [])
+        self.assertEqual(self.stored_searches["short"]["status"], "completed")
+        # A degraded result must not be replayed to later searches
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_job_whose_deadline_expired_while_queued_gets_a_fresh_budget(self):
+        expired = Deadline(expires_at=time.time() - 5.0, budget=60.0)
+        main = self.run_search(expired, handler="run_search_job", max_candidates=1)
+
+        # The paid page call gets a real budget and the search is not degraded into an empty result
+        self.assertTrue(self.apollo_calls)
+        self.assertGreater(self.apollo_calls[0].budget, main.MIN_PAGE_SECONDS)
+        self.assertEqual(self.assessment_calls, [True])
+        self.assertEqual(self.stored_searches["short"]["status"], "completed")
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_job_with_budget_left_keeps_its_deadline(self):
+        from api import main
+
+        deadline = Deadline.start(60.0).to_dict()
+        self.assertIs(main._leased_deadline(deadline, "r"), deadline)
+        self.assertIsNone(main._leased_deadline(None, "r"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-generated demo example pool.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from api.main import DemoSearchGenerator
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        message = SimpleNamespace(content=f'"Find CFOs who are hiring {self.calls}"')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class FakeClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+
+
+class TestDemoPool(unittest.TestCase):
+
+    def test_reads_never_call_the_llm(self):
+        generator = DemoSearchGenerator(pool_per_category=1)
+        with patch.object(generator, "_get_client", side_effect=AssertionError("LLM called on read")):
+            example = generator.generate_search_example()
+            examples = generator.get_search_examples(20)
+
+        self.assertEqual(example["source"], "fallback")
+        self.assertEqual(len(examples), 20)
+        self.assertEqual(len({id(e) for e in examples}), 20)
+        self.assertEqual(generator.get_search_examples(0), [])
+
+    def test_refresh_replaces_stale_entries_with_bounded_concurrency(self):
+        generator = DemoSearchGenerator(pool_per_category=1, refresh_batch=6, concurrency=2)
+        client = FakeClient()
+        generator._client = client
+
+        replaced = asyncio.run(generator.refresh_pool())
+
+        self.assertEqual(replaced, 6)
+        self.assertEqual(client.chat.completions.calls, 6)
+        self.assertLessEqual(client.chat.completions.peak, 2)
+        self.assertEqual(generator.stats()["fresh"], 6)
+        ai_examples = [e for e in generator._examples if "source" not in e]
+        self.assertEqual(len(ai_examples), 6)
+        self.assertTrue(ai_examples[0]["search_query"].startswith("Find CFOs"))
+        # Fresh entries are left alone on the next refresh; only stale ones are regenerated
+        category = ai_examples[0]["category"]
+        self.assertEqual(generator.generate_search_example(category)["search_query"], ai_examples[0]["search_query"])
+
+    def test_failed_generation_keeps_serving_old_entry(self):
+        generator = DemoSearchGenerator(pool_per_category=1, refresh_batch=3)
+
+        async def failing(category):
+            return None
+
+        with patch.object(generator, "generate_ai_example", failing):
+            self.assertEqual(asyncio.run(generator.refresh_pool()), 0)
+
+        self.assertEqual(generator.failures, 3)
+        self.assertEqual(len(generator._examples), len(generator.search_categories))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the diversity orchestrator when one search's candidates look up
+evidence concurrently against its shared URL registry.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import simplified_diversity_orchestrator
+from simplified_diversity_orchestrator import SimplifiedDiversityOrchestrator
+
+
+class FakeValidator:
+    """Picks the first URL nobody has registered yet, yielding to the loop in between."""
+
+    def __init__(self, urls):
+        self.urls = urls
+        self.registered = []
+
+    async def validate_with_uniqueness(self, results, claim, candidate_id, existing_evidence=None):
+        free = [url for url in self.urls if url not in self.registered]
+        await asyncio.sleep(0.01)
+        return free[:1]
+
+    def register_evidence_usage(self, evidence_urls, candidate_id):
+        self.registered.extend(evidence_urls)
+
+
+class TestConcurrentCandidates(unittest.TestCase):
+
+    def test_concurrent_candidates_never_claim_the_same_url(self):
+        orchestrator = SimplifiedDiversityOrchestrator()
+        validator = FakeValidator(["https://a.example", "https://b.example", "https://c.example"])
+        orchestrator.uniqueness_validator = validator
+
+        async def search_for_evidence(queries):
+            await asyncio.sleep(0)
+            return [SimpleNamespace(success=True)]
+
+        orchestrator.set_web_search_engine(SimpleNamespace(search_for_evidence=search_for_evidence))
+        claim = SimpleNamespace(priority=1, confidence=1.0)
+
+        async def scenario():
+            return await asyncio.gather(*(
+                orchestrator.process_candidates_with_diversity([{"id": f"c{i}", "name": f"Candidate {i}"}])
+                for i in range(3)
+            ))
+
+        with patch.object(orchestrator, "_extract_explanations_from_candidate", return_value=["Evaluating CRMs"]), \
+             patch.object(orchestrator.explanation_analyzer, "extract_claims", return_value=[claim]), \
+             patch.object(orchestrator.enhanced_query_generator, "generate_diverse_queries", return_value=["q"]), \
+             patch.object(orchestrator, "_apply_final_diversity_filters", side_effect=lambda urls: urls), \
+             patch.object(simplified_diversity_orchestrator, "create_enhanced_candidate_response",
+                          side_effect=lambda candidate, urls, processing_time: dict(candidate, evidence_urls=urls)):
+            batches = asyncio.run(scenario())
+
+        urls = [batch[0]["evidence_urls"][0] for batch in batches]
+        self.assertEqual(sorted(urls), validator.urls)
+
+
+if __name__ == "__main__":
+    unittest.main()
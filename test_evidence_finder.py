@@ -10,6 +10,7 @@ import unittest
 import asyncio
 import time
 import json
+import threading
 from unittest.mock import Mock, patch, AsyncMock
 from typing import List, Dict, Any
 
@@ -24,6 +25,7 @@ from evidence_models import (
     extract_explanations_from_candidate
 )
 from evidence_cache import EvidenceCache, SearchResultCache, PerformanceMonitor
+from shared_cache import MemoryCacheBackend, cache_stats
 from url_evidence_finder import URLEvidenceFinder
 from evidence_integration import EvidenceIntegrationService
 
@@ -398,7 +400,8 @@ class TestEvidenceCache(unittest.TestCase):
     """Test cases for evidence caching functionality."""
     
     def setUp(self):
-        self.cache = EvidenceCache(max_size=5, default_ttl=1)  # Small cache with short TTL for testing
+        # Small cache with short TTL for testing, kept apart from the process-wide evidence cache
+        self.cache = EvidenceCache(max_size=5, default_ttl=1, backend=MemoryCacheBackend(max_entries=5))
     
     def test_cache_put_and_get(self):
         """Test basic cache put and get operations."""
@@ -456,6 +459,32 @@ class TestEvidenceCache(unittest.TestCase):
         self.assertEqual(stats['misses'], 1)
         self.assertEqual(stats['total_requests'], 2)
         self.assertGreater(stats['hit_rate'], 0)
+    
+    def test_default_cache_is_a_shared_cache(self):
+        """Test the default evidence cache is reported with the other shared caches."""
+        EvidenceCache()
+        self.assertIn("evidence", cache_stats())
+    
+    def test_blocking_backends_are_called_off_the_event_loop(self):
+        """Test async callers only leave the event loop thread for backends that do I/O."""
+        class RecordingBackend(MemoryCacheBackend):
+            def __init__(self, blocking):
+                super().__init__()
+                self.blocking = blocking
+                self.threads = []
+            
+            def get(self, key):
+                self.threads.append(threading.get_ident())
+                return super().get(key)
+        
+        async def lookup(cache):
+            return threading.get_ident(), await cache.call(cache.get, "key1")
+        
+        for blocking in (True, False):
+            backend = RecordingBackend(blocking)
+            loop_thread, result = asyncio.run(lookup(EvidenceCache(backend=backend)))
+            self.assertIsNone(result)
+            self.assertEqual(backend.threads[0] != loop_thread, blocking)
 
 
 class TestPerformanceMonitor(unittest.TestCase):
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for page sizing and speculative prefetch in the candidate retry loop.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from fetch_planner import FetchPlanner, YieldModel, filters_key
+
+
+class TestPageSizing(unittest.TestCase):
+
+    async def no_fetch(self, page, per_page):
+        return []
+
+    def test_default_matches_previous_page_size(self):
+        self.assertEqual(FetchPlanner({}, 3, self.no_fetch, model=YieldModel()).per_page, 9)
+
+    def test_low_yield_filters_get_bigger_pages(self):
+        model = YieldModel()
+        filters = {"person_filters": {"person_titles": ["CMO"]}}
+        for _ in range(10):
+            model.observe(filters_key(filters), requested=10, returned=5, kept=2)
+
+        self.assertAlmostEqual(model.estimate(filters_key(filters)), 0.2, delta=0.01)
+        self.assertEqual(FetchPlanner(filters, 3, self.no_fetch, model=model).per_page, 18)
+        self.assertEqual(FetchPlanner(filters, 3, self.no_fetch, model=model, max_per_page=12).per_page, 12)
+        # Unseen filters fall back to the overall average
+        self.assertEqual(FetchPlanner({"other": 1}, 3, self.no_fetch, model=model).per_page, 18)
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_prefetched_page_is_reused_and_extra_work_cancelled(self):
+        calls = []
+        cancelled = []
+
+        async def fetch(page, per_page):
+            calls.append(page)
+            try:
+                await asyncio.sleep(0.01 if page < 3 else 10)
+            except asyncio.CancelledError:
+                cancelled.append(page)
+                raise
+            return [{"name": f"p{page}"}]
+
+        async def scenario():
+            planner = FetchPlanner({}, 3, fetch, model=YieldModel())
+            first = await planner.fetch(1)
+            self.assertTrue(planner.should_prefetch(len(first), have=0))
+            planner.prefetch(2)
+            second = await planner.fetch(2)
+            planner.prefetch(3)
+            await asyncio.sleep(0)
+            await planner.cancel()
+            return first, second, planner.stats()
+
+        first, second, stats = asyncio.run(scenario())
+        self.assertEqual((first, second), ([{"name": "p1"}], [{"name": "p2"}]))
+        self.assertEqual(calls, [1, 2, 3])
+        self.assertEqual(cancelled, [3])
+        self.assertEqual(stats["prefetch_hits"], 1)
+
+
+class TestRetryLoopPrefetch(unittest.TestCase):
+    """process_search fetches page 2 while page 1 is still being assessed."""
+
+    def test_next_page_starts_before_assessment(self):
+        from api import main
+        from search_result_cache import SearchResultCache
+
+        stored_searches = {}
+        events = []
+
+        def fake_get_search(request_id):
+            return dict(stored_searches.get(request_id, {"id": 1, "request_id": request_id, "status": "processing"}))
+
+        def fake_store_search(search_data):
+            stored_searches[search_data["request_id"]] = dict(search_data)
+            return 1
+
+        async def fake_apollo(filters, page=1, per_page=5, deadline=None):
+            events.append(("fetch", page, per_page))
+            await asyncio.sleep(0.05)
+            # One usable person per page, so every page falls short of the target
+            return [{"name": f"Person {page}", "title": "CMO", "linkedin_url": f"https://linkedin.com/in/p{page}"}]
+
+        def fake_assessment(prompt, people, *args, **kwargs):
+            time.sleep(0.02)
+            events.append(("assessed", people[0]["name"]))
+            return [{"name": p["name"], "linkedin_url": p["linkedin_url"], "accuracy": 90, "reasons": []} for p in people]
+
+        async def not_public(name):
+            return False
+
+        with patch.object(main, "search_result_cache", SearchResultCache(None)), \
+             patch("fetch_planner.yield_model", YieldModel()), \
+             patch.object(main, "get_search_from_database", fake_get_search), \
+             patch.object(main, "store_search_to_database", fake_store_search), \
+             patch.object(main, "store_people_to_database", lambda search_id, people: True), \
+             patch.object(main, "parse_prompt_to_internal_database_filters", lambda prompt, ridiculous=None: {"person_filters": {}}), \
+             patch.object(main, "search_people_via_internal_database", fake_apollo), \
+             patch.object(main, "select_top_candidates", fake_assessment), \
+             patch.object(main, "enhance_behavioral_data_ai", lambda *args, **kwargs: {"behavioral_insight": "x", "scores": {}}), \
+             patch.object(main, "estimate_people_count", lambda prompt: {"estimated_count": 7}), \
+             patch.object(main, "is_public_figure", not_public), \
+             patch.object(main, "EVIDENCE_INTEGRATION_AVAILABLE", False):
+            asyncio.run(main.process_search("prefetch", "Find CMOs in Florida", max_candidates=2))
+
+        self.assertEqual(events[:3], [("fetch", 1, 6), ("fetch", 2, 6), ("assessed", "Person 1")])
+        self.assertEqual(stored_searches["prefetch"]["status"], "completed")
+
+
+if __name__ == "__main__":
+    unittest.main()
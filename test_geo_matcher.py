@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled geographic matcher used by the US-only location filter.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from geo_matcher import GeoLocation, is_us, resolve_location, us_person_locations
+
+
+class TestResolveLocation(unittest.TestCase):
+
+    def test_us_homonyms_of_foreign_cities(self):
+        self.assertEqual(resolve_location("Paris, Texas"), GeoLocation("Paris", "Texas", "United States"))
+        self.assertEqual(resolve_location("Dublin, OH").country, "United States")
+        self.assertEqual(resolve_location("Paris").country, "France")
+
+    def test_no_substring_false_positives(self):
+        for location in ("Indianapolis, Indiana", "Milwaukee, Wisconsin", "New Mexico", "Woman's Hospital, Boston"):
+            self.assertTrue(is_us(location), location)
+
+    def test_foreign_locations(self):
+        self.assertEqual(resolve_location("Toronto, Ontario, Canada"), GeoLocation("Toronto", "Ontario", "Canada"))
+        self.assertEqual(resolve_location("Greater London Area").country, "United Kingdom")
+        self.assertEqual(resolve_location("Mexico City, Mexico").country, "Mexico")
+        self.assertFalse(is_us("Bengaluru, Karnataka, India"))
+
+    def test_georgia_state_versus_country(self):
+        self.assertTrue(is_us("Atlanta, Georgia"))
+        self.assertEqual(resolve_location("Tbilisi, Georgia").country, "Georgia")
+        self.assertEqual(resolve_location("Athens, Georgia"), GeoLocation("Athens", "Georgia", "United States"))
+        self.assertEqual(resolve_location("Athens, GA").region, "Georgia")
+        self.assertEqual(resolve_location("Athens, Greece").country, "Greece")
+
+    def test_us_towns_named_after_countries(self):
+        for location in ("Panama City, Florida", "Lebanon, Tennessee", "Lebanon, NH", "Jordan, Minnesota"):
+            self.assertEqual(resolve_location(location).country, "United States", location)
+        self.assertEqual(resolve_location("Beirut, Lebanon").country, "Lebanon")
+        self.assertEqual(resolve_location("Panama").country, "Panama")
+
+    def test_state_codes_only_as_their_own_part(self):
+        self.assertEqual(resolve_location("Austin, TX").region, "Texas")
+        self.assertIsNone(resolve_location("me in the office").country)
+
+    def test_unknown_locations_use_default(self):
+        self.assertTrue(is_us("San Francisco Bay Area"))
+        self.assertFalse(is_us("San Francisco Bay Area", default=False))
+        self.assertTrue(is_us(None))
+
+
+class TestPersonLocations(unittest.TestCase):
+
+    def test_us_locations_are_not_widened(self):
+        self.assertEqual(us_person_locations(["California", "London"]), ["California"])
+        self.assertEqual(us_person_locations(["Germany"]), ["United States"])
+        self.assertEqual(us_person_locations(["Athens, Georgia", "Lebanon, NH"]), ["Athens, Georgia", "Lebanon, NH"])
+        self.assertEqual(us_person_locations(None), ["United States"])
+
+
+if __name__ == "__main__":
+    unittest.main()
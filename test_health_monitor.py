@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for cached, concurrent health probes.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from health_monitor import HealthMonitor
+
+
+class CountingProbe:
+    def __init__(self, delay=0.0, result=None, error=None):
+        self.delay = delay
+        self.result = result if result is not None else {"ok": True}
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class TestHealthMonitor(unittest.TestCase):
+
+    def test_probes_run_concurrently_and_snapshot_is_cached(self):
+        slow_a, slow_b = CountingProbe(delay=0.1), CountingProbe(delay=0.1)
+        monitor = HealthMonitor({"a": slow_a, "b": slow_b}, interval_seconds=60)
+
+        async def scenario():
+            started = time.perf_counter()
+            first = await monitor.get_snapshot()
+            elapsed = time.perf_counter() - started
+            second = await monitor.get_snapshot()
+            return first, second, elapsed
+
+        first, second, elapsed = asyncio.run(scenario())
+        self.assertLess(elapsed, 0.18)
+        self.assertEqual((slow_a.calls, slow_b.calls), (1, 1))
+        self.assertEqual(first["checked_at"], second["checked_at"])
+        self.assertTrue(second["results"]["a"].ok)
+
+    def test_forced_refresh_is_rate_limited(self):
+        probe = CountingProbe()
+        monitor = HealthMonitor({"probe": probe}, min_refresh_seconds=60)
+
+        async def scenario():
+            await monitor.get_snapshot()
+            return await monitor.get_snapshot(refresh=True)
+
+        snapshot = asyncio.run(scenario())
+        self.assertEqual(probe.calls, 1)
+        self.assertTrue(snapshot["refresh_rate_limited"])
+
+        monitor.min_refresh_seconds = 0
+        snapshot = asyncio.run(monitor.get_snapshot(refresh=True))
+        self.assertEqual(probe.calls, 2)
+        self.assertFalse(snapshot["refresh_rate_limited"])
+
+    def test_failing_and_slow_probes_are_recorded(self):
+        monitor = HealthMonitor({
+            "broken": CountingProbe(error=RuntimeError("connection refused")),
+            "hung": CountingProbe(delay=5),
+            "fine": CountingProbe(),
+        }, probe_timeout_seconds=0.05)
+
+        results = asyncio.run(monitor.get_snapshot())["results"]
+        self.assertEqual(results["broken"].error, "connection refused")
+        self.assertIn("timed out", results["hung"].error)
+        self.assertTrue(results["fine"].ok)
+
+
+class TestComprehensiveHealthEndpoint(unittest.TestCase):
+
+    def test_endpoint_reads_snapshot(self):
+        from api import main
+
+        webhook = {"accessible_endpoints": [{"endpoint": "/api/hubspot/oauth/health"}], "failed_endpoints": [],
+                   "total_tested": 1, "response_times": {"/api/hubspot/oauth/health": 12.0}}
+        auth = {"hubspot_client_id_configured": True, "hubspot_client_secret_configured": True}
+        connectivity = {"external_accessibility": True, "https_available": True}
+        sync = {"environment_info": {"detected_environment": "production"},
+                "sync_status": {"synchronized": True, "issues": [], "health_score": 100.0}}
+        probes = {
+            "prismatic_connectivity": CountingProbe(result=connectivity),
+            "webhook_validation": CountingProbe(result=webhook),
+            "auth_validation": CountingProbe(result=auth),
+            "deployment_sync": CountingProbe(result=sync),
+        }
+
+        async def scenario():
+            first = await main.comprehensive_health_check()
+            second = await main.comprehensive_health_check(refresh=True)
+            return first, second
+
+        with patch.object(main, "health_monitor", HealthMonitor(probes, min_refresh_seconds=60)):
+            first, second = asyncio.run(scenario())
+
+        self.assertEqual(first["overall_status"], "healthy")
+        self.assertTrue(second["snapshot"]["refresh_rate_limited"])
+        self.assertEqual([probe.calls for probe in probes.values()], [1, 1, 1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for idempotency keys on search creation: key stores, claims and the
+Idempotency-Key handling of POST /api/search.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from idempotency import (
+    IdempotencyConflict, IdempotencyKeys, IdempotencyRecord, MemoryIdempotencyBackend,
+    SQLiteIdempotencyBackend, idempotency_key
+)
+from search_queue import QueueFullError
+
+
+def record(request_id, fingerprint="f", ttl=60.0):
+    return IdempotencyRecord(request_id, fingerprint, time.time() + ttl)
+
+
+class TestBackends(unittest.TestCase):
+
+    def test_memory_keys_expire_and_are_capped(self):
+        backend = MemoryIdempotencyBackend(max_keys=2)
+        self.assertIsNone(backend.claim("a", record("r1", ttl=0.05)))
+        self.assertEqual(backend.claim("a", record("r2")).request_id, "r1")
+        time.sleep(0.06)
+        self.assertIsNone(backend.claim("a", record("r2")))
+        backend.claim("b", record("r3"))
+        backend.claim("c", record("r4"))
+        self.assertEqual(len(backend), 2)
+        self.assertIsNone(backend.claim("a", record("r5")))
+
+    def test_release_only_forgets_the_owning_request(self):
+        backend = MemoryIdempotencyBackend()
+        backend.claim("a", record("r1"))
+        backend.release("a", "someone-else")
+        self.assertEqual(backend.claim("a", record("r2")).request_id, "r1")
+        backend.release("a", "r1")
+        self.assertIsNone(backend.claim("a", record("r2")))
+
+    def test_sqlite_keys_are_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "idempotency.db")
+            worker_one, worker_two = SQLiteIdempotencyBackend(path), SQLiteIdempotencyBackend(path)
+            self.assertIsNone(worker_one.claim("a", record("r1")))
+            self.assertEqual(worker_two.claim("a", record("r2")), worker_one.claim("a", record("r3")))
+            worker_two.release("a", "r1")
+            self.assertIsNone(worker_one.claim("a", record("r4", ttl=-1)))
+            self.assertIsNone(worker_two.claim("a", record("r5")))
+
+
+class TestClaims(unittest.TestCase):
+
+    def test_keys_are_scoped_per_client_and_bodies_must_match(self):
+        keys = IdempotencyKeys(backend=MemoryIdempotencyBackend(), ttl_seconds=60)
+
+        async def scenario():
+            first = await keys.claim("key:a", "retry-1", "body", "r1")
+            again = await keys.claim("key:a", "retry-1", "body", "r2")
+            other_client = await keys.claim("key:b", "retry-1", "body", "r3")
+            with self.assertRaises(IdempotencyConflict):
+                await keys.claim("key:a", "retry-1", "different body", "r4")
+            return first, again, other_client
+
+        first, again, other_client = asyncio.run(scenario())
+        self.assertFalse(first.replayed)
+        self.assertTrue(again.replayed)
+        self.assertEqual(again.record.request_id, "r1")
+        self.assertFalse(other_client.replayed)
+        self.assertEqual(keys.outcomes, {"new": 2, "replayed": 1, "conflict": 1})
+
+    def test_broken_store_fails_open(self):
+        class BrokenBackend(MemoryIdempotencyBackend):
+            def claim(self, key, record):
+                raise OSError("disk full")
+
+        keys = IdempotencyKeys(backend=BrokenBackend(), ttl_seconds=60)
+        self.assertIsNone(asyncio.run(keys.claim("key:a", "retry-1", "body", "r1")))
+
+    def test_key_comes_from_header_or_body(self):
+        self.assertEqual(idempotency_key({"idempotency-key": " abc "}, "body-key"), "abc")
+        self.assertEqual(idempotency_key({}, "body-key"), "body-key")
+        self.assertIsNone(idempotency_key({}, "  "))
+        with self.assertRaises(ValueError):
+            idempotency_key({"idempotency-key": "x" * 300})
+
+
+class FakeQueue:
+    max_depth = 0
+
+    def __init__(self, fail_first=False):
+        self.jobs = []
+        self.fail_first = fail_first
+
+    def depth(self):
+        return len(self.jobs)
+
+    def active(self):
+        return len(self.jobs)
+
+    def enqueue(self, request_id, payload, priority=0):
+        if self.fail_first:
+            self.fail_first = False
+            raise QueueFullError(1, 1)
+        self.jobs.append(request_id)
+
+
+class TestCreateSearchIdempotency(unittest.TestCase):
+
+    def post_searches(self, queue, bodies, headers=None):
+        from fastapi.testclient import TestClient
+        from admission_control import AdmissionController, MemoryRateLimitBackend
+        from api import main
+
+        searches = {}
+
+        def store_search(data):
+            searches[data["request_id"]] = dict(data)
+            return len(searches)
+
+        admission = AdmissionController(in_flight=None, backend=MemoryRateLimitBackend(), rate_per_minute=0)
+        keys = IdempotencyKeys(backend=MemoryIdempotencyBackend(), ttl_seconds=60)
+        with patch.object(main, "admission", admission), \
+             patch.object(main, "idempotency", keys), \
+             patch.object(main, "get_search_queue", return_value=queue), \
+             patch.object(main, "store_search_to_database", store_search), \
+             patch.object(main, "get_search_status_from_database", lambda request_id: searches.get(request_id)):
+            client = TestClient(main.app)
+            return [client.post("/api/search", json=body, headers=headers) for body in bodies]
+
+    def test_retry_returns_the_original_search(self):
+        queue = FakeQueue()
+        body = {"prompt": "Find CMOs in Florida evaluating marketing automation"}
+        first, retry, changed = self.post_searches(
+            queue, [body, body, dict(body, max_candidates=5)], headers={"Idempotency-Key": "order-42"})
+
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertEqual(retry.status_code, 200, retry.text)
+        self.assertEqual(retry.json()["request_id"], first.json()["request_id"])
+        self.assertEqual(retry.json()["status"], "processing")
+        self.assertEqual(retry.headers["idempotent-replayed"], "true")
+        self.assertNotIn("idempotent-replayed", first.headers)
+        self.assertEqual(changed.status_code, 422)
+        self.assertEqual(queue.jobs, [first.json()["request_id"]])
+
+    def test_failed_create_releases_the_key(self):
+        queue = FakeQueue(fail_first=True)
+        body = {"prompt": "Find CMOs in Florida evaluating marketing automation", "idempotency_key": "order-43"}
+        failed, retry = self.post_searches(queue, [body, body])
+
+        self.assertEqual(failed.status_code, 503, failed.text)
+        self.assertEqual(retry.status_code, 200, retry.text)
+        self.assertNotIn("idempotent-replayed", retry.headers)
+        self.assertEqual(queue.jobs, [retry.json()["request_id"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON codec layer and response compression.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import json_codec
+import json_response
+from json_codec import StdlibJSONCodec, decode_column, encode_column
+from json_response import CompressionMiddleware, FastJSONResponse
+
+
+class TestCodecs(unittest.TestCase):
+
+    def codecs(self):
+        codecs = [StdlibJSONCodec()]
+        if json_codec.orjson is not None:
+            codecs.append(json_codec.OrjsonCodec())
+        return codecs
+
+    def test_codecs_agree_on_search_payloads(self):
+        payload = {"name": "José", "tags": {"cmo"}, "scores": {"cmi": 0.5}, "urls": [{"url": "https://x.com"}]}
+        encoded = {codec.name: codec.dumps(payload) for codec in self.codecs()}
+        self.assertEqual(len(set(encoded.values())), 1, encoded)
+        self.assertEqual(json_codec.loads(encoded["stdlib"])["tags"], ["cmo"])
+
+    def test_values_outside_json_are_still_encoded(self):
+        for codec in self.codecs():
+            self.assertEqual(codec.loads(codec.dumps({"n": 2 ** 70}))["n"], 2 ** 70)
+            stamp = codec.loads(codec.dumps({"at": datetime(2025, 1, 1, tzinfo=timezone.utc)}))["at"]
+            self.assertTrue(stamp.startswith("2025-01-01"))
+
+    def test_columns_round_trip_and_bad_json_gives_default(self):
+        self.assertEqual(decode_column(encode_column({"a": [1, 2]}), {}), {"a": [1, 2]})
+        self.assertEqual(decode_column("{not json", []), [])
+        self.assertEqual(decode_column({"already": "decoded"}), {"already": "decoded"})
+
+    def test_unknown_codec_falls_back_to_stdlib(self):
+        self.assertIsInstance(json_codec.create_codec("nope"), StdlibJSONCodec)
+
+
+def make_app(**middleware_options):
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, **middleware_options)
+
+    @app.get("/big")
+    async def big():
+        return FastJSONResponse({"candidates": [{"name": f"Person {i}", "title": "CMO"} for i in range(200)]})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            yield "data: " + "x" * 4000 + "\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+class TestCompression(unittest.TestCase):
+
+    def test_large_json_is_gzipped_when_accepted(self):
+        client = TestClient(make_app(minimum_size=500, mode="gzip"))
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertEqual(len(response.json()["candidates"]), 200)
+        # httpx decompresses transparently; the wire size is in content-length
+        self.assertLess(int(response.headers["content-length"]), len(response.content))
+
+    def test_small_streaming_and_unaccepted_responses_pass_through(self):
+        client = TestClient(make_app(minimum_size=500, mode="gzip"))
+        self.assertNotIn("content-encoding", client.get("/small", headers={"Accept-Encoding": "gzip"}).headers)
+        self.assertNotIn("content-encoding", client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers)
+        self.assertNotIn("content-encoding", client.get("/big", headers={"Accept-Encoding": "identity"}).headers)
+        self.assertNotIn("content-encoding", client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers)
+
+    def test_vary_is_set_on_every_negotiated_compressible_response(self):
+        client = TestClient(make_app(minimum_size=500, mode="gzip"))
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", small.headers)
+        self.assertIn("Accept-Encoding", small.headers["vary"])
+        self.assertNotIn("vary", client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers)
+
+    def test_large_bodies_are_compressed_off_the_event_loop(self):
+        offloaded = []
+
+        async def fake_run_blocking(func, *args, pool="llm"):
+            offloaded.append((len(args[0]), pool))
+            return func(*args)
+
+        with patch.object(json_response, "run_blocking", fake_run_blocking):
+            client = TestClient(make_app(minimum_size=500, mode="gzip", offload_size=2000))
+            self.assertEqual(client.get("/big", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"], "gzip")
+            client = TestClient(make_app(minimum_size=500, mode="gzip", offload_size=10 ** 6))
+            self.assertEqual(len(client.get("/big", headers={"Accept-Encoding": "gzip"}).json()["candidates"]), 200)
+        self.assertEqual(len(offloaded), 1)
+        self.assertEqual(offloaded[0][1], "compression")
+
+    def test_compression_can_be_disabled(self):
+        client = TestClient(make_app(minimum_size=500, mode="off"))
+        self.assertNotIn("content-encoding", client.get("/big", headers={"Accept-Encoding": "gzip"}).headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the metrics registry and the Prometheus metrics endpoint.
+"""
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from metrics import MetricsRegistry, LLM_SECONDS, LLM_TOKENS, llm_call
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_counter_and_gauge_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs processed", ["status"])
+        counter.inc(status="ok")
+        counter.inc(2, status="ok")
+        gauge = registry.gauge("queue_depth", "Queue depth")
+        gauge.set(4)
+        gauge.dec()
+
+        text = registry.render()
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{status="ok"} 3', text)
+        self.assertIn("queue_depth 3", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, stage="filters")
+
+        text = registry.render()
+        self.assertIn('stage_seconds_bucket{stage="filters",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="filters",le="1"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="filters",le="+Inf"} 3', text)
+        self.assertIn('stage_seconds_count{stage="filters"} 3', text)
+        self.assertIn('stage_seconds_sum{stage="filters"} 5.55', text)
+
+    def test_timer_fills_in_outcome(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("db_seconds", "DB writes", ["table", "outcome"])
+        with histogram.time(table="people"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with histogram.time(table="people"):
+                raise RuntimeError("write failed")
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["people,ok"]["count"], 1)
+        self.assertEqual(snapshot["people,error"]["count"], 1)
+
+    def test_unknown_labels_and_conflicting_registration_rejected(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("calls_total", "Calls", ["purpose"])
+        with self.assertRaises(ValueError):
+            counter.inc(model="gpt")
+        self.assertIs(registry.counter("calls_total", "Calls", ["purpose"]), counter)
+        with self.assertRaises(ValueError):
+            registry.gauge("calls_total", "Calls", ["purpose"])
+
+    def test_llm_call_records_latency_and_tokens(self):
+        response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30))
+        before = LLM_TOKENS.value(purpose="unit_test", model="gpt-test", kind="prompt")
+        with llm_call("unit_test", "gpt-test") as call:
+            call.record_usage(response)
+
+        self.assertEqual(LLM_TOKENS.value(purpose="unit_test", model="gpt-test", kind="prompt") - before, 120)
+        self.assertGreaterEqual(LLM_SECONDS.snapshot()["unit_test,gpt-test,ok"]["count"], 1)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        from fastapi.testclient import TestClient
+        from api import main
+
+        response = TestClient(main.app).get("/api/system/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("# TYPE knowledge_gpt_stage_duration_seconds histogram", response.text)
+        self.assertIn("knowledge_gpt_search_queue_depth", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
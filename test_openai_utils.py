@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared LLM gateway in openai_utils: sync and asyncio calls on
+the pooled clients, JSON parsing and the connection pool settings.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openai_utils
+import services
+
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def fake_async_openai(*answers):
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return completion(answers[min(len(requests), len(answers)) - 1])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client, requests
+
+
+class TestAsyncCalls(unittest.TestCase):
+
+    def test_async_call_uses_the_shared_client_and_leaves_messages_alone(self):
+        client, requests = fake_async_openai("  Paris  ")
+        history = [{"role": "assistant", "content": "Hello"}]
+        with patch.object(openai_utils, "get_async_openai_client", return_value=client):
+            answer = asyncio.run(openai_utils.call_openai_async(
+                "Capital of France?", system_message="Be brief", messages=history, model="gpt-3.5-turbo"))
+        self.assertEqual(answer, "Paris")
+        self.assertEqual([m["role"] for m in requests[0]["messages"]], ["system", "assistant", "user"])
+        self.assertEqual(history, [{"role": "assistant", "content": "Hello"}])
+
+    def test_async_json_call_retries_until_the_expected_keys_arrive(self):
+        client, requests = fake_async_openai("", '{"person_filters": {}, "reasoning": "ok"}')
+        with patch.object(openai_utils, "get_async_openai_client", return_value=client):
+            parsed = asyncio.run(openai_utils.call_openai_for_json_async(
+                "Parse this", expected_keys=["person_filters", "reasoning"]))
+        self.assertEqual(parsed, {"person_filters": {}, "reasoning": "ok"})
+        self.assertEqual(len(requests), 2)
+        self.assertIn("Required JSON keys: person_filters, reasoning", requests[0]["messages"][-1]["content"])
+
+    def test_missing_key_returns_none(self):
+        with patch.object(openai_utils, "get_async_openai_client", return_value=None):
+            self.assertIsNone(asyncio.run(openai_utils.call_openai_async("Hi")))
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        services.reset_services()
+        self.addCleanup(services.reset_services)
+
+    def test_clients_share_the_configured_keepalive_pool(self):
+        env = {"OPENAI_API_KEY": "sk-test", "OPENAI_MAX_CONNECTIONS": "12", "OPENAI_KEEPALIVE_EXPIRY_SECONDS": "45"}
+        with patch.dict(os.environ, env):
+            limits = services.openai_pool_limits()
+            sync_client = services.get_openai_client()
+            async_client = services.get_async_openai_client()
+        self.assertEqual((limits["max_connections"], limits["keepalive_expiry"]), (12, 45.0))
+        for client in (sync_client, async_client):
+            pool = client._client._transport._pool
+            self.assertEqual(pool._max_connections, 12)
+            self.assertEqual(pool._keepalive_expiry, 45.0)
+        # with_options() copies keep the same HTTP client, and so the same pool
+        self.assertIs(async_client.with_options(timeout=5)._client, async_client._client)
+
+
+if __name__ == "__main__":
+    unittest.main()
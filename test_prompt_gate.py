@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass prompt gate used by create_search and the search pipeline.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from prompt_formatting import is_ridiculous_prompt
+from prompt_gate import ParsedPrompt, normalize_prompt, parse_prompt
+
+
+class TestPromptGate(unittest.TestCase):
+
+    def test_generic_terms_become_executives(self):
+        self.assertEqual(
+            normalize_prompt("Find People and contacts who lead sales teams"),
+            "Find executives and executives who executives sales teams"
+        )
+        # Whole words only
+        self.assertEqual(normalize_prompt("Find leaders at leading firms"), "Find leaders at leading firms")
+
+    def test_accepted_prompt(self):
+        parsed = parse_prompt("  Find people running marketing agencies in Ohio ")
+        self.assertFalse(parsed.rejected)
+        self.assertEqual(parsed.normalized, "Find executives running marketing agencies in Ohio")
+        self.assertIn("generic_terms_replaced", parsed.flags)
+
+    def test_rejections_follow_create_search_order(self):
+        self.assertEqual(parse_prompt("Find me someone like Elon Musk").rejection_reason, "public_figure")
+        self.assertEqual(parse_prompt("find me anybody who can help").rejection_reason, "vague")
+        self.assertEqual(parse_prompt("Find CMOs").rejection_reason, "too_broad")
+
+        parsed = parse_prompt("Find John Smith at Google", user_first_name="Chris")
+        self.assertEqual(parsed.rejection_reason, "specific_person")
+        self.assertIn("John Smith", parsed.detected_names)
+        self.assertIn("John Smith", parsed.rejection_message)
+
+    def test_ridiculous_flag(self):
+        self.assertTrue(is_ridiculous_prompt("Pizza delivery drivers buying quantum hardware"))
+        self.assertFalse(is_ridiculous_prompt("CISOs evaluating enterprise cybersecurity"))
+        self.assertTrue(parse_prompt("Find baristas who need enterprise cybersecurity tools").ridiculous)
+
+    def test_round_trips_through_job_payload(self):
+        parsed = parse_prompt("Find people running marketing agencies in Ohio")
+        restored = ParsedPrompt.from_dict(parsed.to_dict())
+        self.assertEqual(restored, parsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Tests for batch searches: prompt dedupe, batch-scoped sharing, batched
+estimation and the POST/GET /api/search/batch endpoints.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+import openai_utils
+import simple_estimation
+from search_batches import SearchBatch, dedupe_prompts, reset_current_batch, set_current_batch, shared, summarize_batch
+
+
+class TestBatchHelpers(unittest.TestCase):
+
+    def test_identical_prompts_point_at_the_first_one(self):
+        prompts = ["Find CMOs in Florida", "find  cmos in florida", "Find CFOs in Texas", "Find CMOs in Florida"]
+        self.assertEqual(dedupe_prompts(prompts), [None, 0, None, 0])
+
+    def test_batch_is_processing_until_every_child_is_terminal(self):
+        items = [{"request_id": "a"}, {"request_id": "b"}, {"request_id": None, "error": "rejected"}]
+        status, counts = summarize_batch(items, {"a": {"status": "completed"}})
+        self.assertEqual((status, counts), ("processing", {"completed": 1, "processing": 1, "failed": 1}))
+        status, counts = summarize_batch(items, {"a": {"status": "completed"}, "b": {"status": "failed"}})
+        self.assertEqual((status, counts), ("completed", {"completed": 1, "failed": 2}))
+
+
+class TestSharedCalls(unittest.TestCase):
+
+    def test_calls_are_shared_within_a_batch_and_failures_are_retried(self):
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            if value == "boom" and calls.count("boom") == 1:
+                raise RuntimeError("first attempt fails")
+            return [value]
+
+        async def scenario():
+            batch = SearchBatch("batch-1")
+            token = set_current_batch(batch)
+            try:
+                together = await asyncio.gather(*(shared("page", "k", lambda: fetch("x")) for _ in range(3)))
+                later = await shared("page", "k", lambda: fetch("x"))
+                with self.assertRaises(RuntimeError):
+                    await shared("page", "boom", lambda: fetch("boom"))
+                retried = await shared("page", "boom", lambda: fetch("boom"))
+            finally:
+                reset_current_batch(token)
+            # Outside a batch every call runs
+            await shared("page", "k", lambda: fetch("x"))
+            return batch, together, later, retried
+
+        batch, together, later, retried = asyncio.run(scenario())
+        self.assertEqual(together, [["x"]] * 3)
+        self.assertEqual(later, ["x"])
+        self.assertEqual(retried, ["boom"])
+        self.assertEqual(calls, ["x", "boom", "boom", "x"])
+        self.assertEqual(batch.report()["shared"]["page"], {"calls": 3, "reused": 3})
+
+
+def fake_openai(*answers):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        content = answers[min(len(requests), len(answers)) - 1]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client, requests
+
+
+class TestBatchedEstimation(unittest.TestCase):
+
+    def test_one_call_estimates_every_prompt(self):
+        client, requests = fake_openai("[4278, 893]")
+        with patch.object(openai_utils, "get_openai_client", return_value=client):
+            estimates = simple_estimation.estimate_people_counts(["Marketing managers in Ohio", "Nurses in Utah"])
+        self.assertEqual(len(requests), 1)
+        self.assertIn("1. Marketing managers in Ohio", requests[0]["messages"][1]["content"])
+        self.assertEqual([e["estimated_count"] for e in estimates], [4278, 893])
+        self.assertEqual(estimates[1]["prompt"], "Nurses in Utah")
+
+    def test_unmatched_answer_falls_back_to_one_call_per_prompt(self):
+        client, requests = fake_openai("[4278]", "611", "733")
+        with patch.object(openai_utils, "get_openai_client", return_value=client):
+            estimates = simple_estimation.estimate_people_counts(["Marketing managers in Ohio", "Nurses in Utah"])
+        self.assertEqual(len(requests), 3)
+        self.assertEqual([e["estimated_count"] for e in estimates], [611, 733])
+
+
+class FakeQueue:
+    max_depth = 0
+
+    def __init__(self):
+        self.jobs = []
+        self.weights = []
+
+    def depth(self):
+        return len(self.jobs)
+
+    def active(self):
+        return len(self.jobs)
+
+    def enqueue(self, request_id, payload, priority=0, weight=1):
+        self.jobs.append((request_id, payload))
+        self.weights.append(weight)
+
+
+class TestBatchEndpoints(unittest.TestCase):
+
+    def test_batch_runs_distinct_prompts_once_and_shares_pages(self):
+        from fastapi.testclient import TestClient
+        from admission_control import AdmissionController, MemoryRateLimitBackend
+        from api import main
+
+        queue, searches, batches, statuses = FakeQueue(), {}, {}, {}
+        page_fetches, estimate_calls, ran = [], [], []
+
+        def store_search(data):
+            searches[data["request_id"]] = dict(data)
+            return len(searches)
+
+        def store_batch(data):
+            batches[data["batch_id"]] = dict(data)
+            return True
+
+        def estimate_counts(prompts):
+            estimate_calls.append(list(prompts))
+            return [{"estimated_count": 100 + i, "prompt": p, "reasoning": "test"} for i, p in enumerate(prompts)]
+
+        async def fake_process_search(request_id, prompt, max_candidates=3, include_linkedin=True,
+                                      force_refresh=False, parsed_prompt=None, deadline=None):
+            ran.append(request_id)
+            estimate = main.current_batch().estimate_for(prompt)
+
+            async def fetch():
+                page_fetches.append(prompt)
+                await asyncio.sleep(0.01)
+                return [{"name": "Jane Doe"}]
+
+            # Every prompt in this test parses to the same filters
+            await main.batch_shared("apollo_page", ("same filters", 1, 10), fetch)
+            statuses[request_id] = {"request_id": request_id, "status": "completed",
+                                    "estimated_count": estimate["estimated_count"]}
+
+        admission = AdmissionController(in_flight=None, backend=MemoryRateLimitBackend(),
+                                        rate_per_minute=0.6, burst=10, max_in_flight=0)
+        prompts = ["Find CMOs in Florida evaluating marketing automation",
+                   "find cmos in florida evaluating marketing automation",
+                   "Find VPs of Sales at SaaS companies in Texas",
+                   "   "]
+        with patch.object(main, "admission", admission), \
+             patch.object(main, "get_search_queue", return_value=queue), \
+             patch.object(main, "store_search_to_database", store_search), \
+             patch.object(main, "store_batch_to_database", store_batch), \
+             patch.object(main, "get_batch_from_database", lambda batch_id: dict(batches[batch_id]) if batch_id in batches else None), \
+             patch.object(main, "get_search_statuses_from_database", lambda ids: {i: statuses[i] for i in ids if i in statuses}), \
+             patch.object(main, "estimate_people_counts", estimate_counts), \
+             patch.object(main, "process_search", fake_process_search):
+            client = TestClient(main.app)
+            created = client.post("/api/search/batch", json={"prompts": prompts})
+            self.assertEqual(created.status_code, 200, created.text)
+            body = created.json()
+            self.assertEqual([item["duplicate_of"] for item in body["items"]], [None, 0, None, None])
+            self.assertIsNone(body["items"][3]["request_id"])
+            self.assertEqual(body["items"][3]["error"], "Prompt cannot be empty")
+            self.assertEqual(len(searches), 3)
+            self.assertEqual(len(queue.jobs), 1)
+            self.assertEqual(queue.weights, [2])
+            # Two distinct searches, two rate-limit tokens
+            self.assertEqual(admission.backend.take("ip:testclient", 0.01, 10.0, 8.0), 0.0)
+            self.assertGreater(admission.backend.take("ip:testclient", 0.01, 10.0, 1.0), 0.0)
+
+            batch_id, payload = queue.jobs[0]
+            self.assertEqual(batch_id, body["batch_id"])
+            pending = client.get(f"/api/search/batch/{batch_id}").json()
+            self.assertEqual(pending["status"], "processing")
+
+            asyncio.run(main.run_search_job(**payload))
+            done = client.get(f"/api/search/batch/{batch_id}").json()
+
+            # Redelivered after its worker died with one search unfinished: only that one runs again
+            batches[batch_id]["status"] = "processing"
+            unfinished = body["items"][2]["request_id"]
+            statuses[unfinished]["status"] = "processing"
+            asyncio.run(main.run_search_job(**payload))
+            self.assertEqual(ran[3:], [unfinished])
+            self.assertEqual(estimate_calls[1:], [[prompts[2]]])
+            # The checks below are about the first run
+            del ran[3:], estimate_calls[1:], page_fetches[1:]
+
+        self.assertEqual(estimate_calls, [[prompts[0], prompts[2]]])
+        self.assertEqual(len(ran), 3)
+        self.assertEqual(len(page_fetches), 1)
+        self.assertEqual(done["status"], "completed")
+        self.assertEqual(done["counts"], {"completed": 3, "failed": 1})
+        self.assertEqual([item["estimated_count"] for item in done["items"][:3]], [100, 100, 101])
+        self.assertEqual(done["timings"]["shared"]["apollo_page"], {"calls": 1, "reused": 2})
+        self.assertIn("searches", done["timings"]["stages_ms"])
+
+    def test_batch_limits_are_enforced(self):
+        from fastapi.testclient import TestClient
+        from api import main
+
+        client = TestClient(main.app)
+        self.assertEqual(client.post("/api/search/batch", json={"prompts": []}).status_code, 400)
+        with patch.dict(os.environ, {"BATCH_MAX_PROMPTS": "2"}):
+            response = client.post("/api/search/batch", json={"prompts": ["a b c", "d e f", "g h i"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("at most 2", response.json()["detail"])
+        self.assertEqual(client.get("/api/search/batch/missing").status_code, 404)
+
+    def test_batches_pay_a_token_per_search(self):
+        from fastapi.testclient import TestClient
+        from admission_control import AdmissionController, MemoryRateLimitBackend
+        from api import main
+
+        admission = AdmissionController(in_flight=None, backend=MemoryRateLimitBackend(),
+                                        rate_per_minute=0.6, burst=3, max_in_flight=0)
+        prompts = ["Find CMOs in Florida", "Find CFOs in Texas", "Find CTOs in Ohio", "Find VPs of Sales in Utah"]
+        with patch.object(main, "admission", admission), \
+             patch.object(main, "get_search_queue", return_value=FakeQueue()):
+            client = TestClient(main.app)
+            too_large = client.post("/api/search/batch", json={"prompts": prompts})
+            # Two tokens spent outside the batch leave one, too few for two searches
+            admission.backend.take("ip:testclient", 0.01, 3.0, 2.0)
+            limited = client.post("/api/search/batch", json={"prompts": prompts[:2]})
+        self.assertEqual(too_large.status_code, 400)
+        self.assertIn("at most 3", too_large.json()["detail"])
+        self.assertEqual(limited.status_code, 429)
+
+
+if __name__ == "__main__":
+    unittest.main()
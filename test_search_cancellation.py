@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for cancelling queued and running searches.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from search_queue import SearchQueue, SQLiteQueueBackend
+from search_tasks import SearchTaskRegistry
+from search_worker import SearchWorker
+
+
+class QueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queue = SearchQueue(SQLiteQueueBackend(os.path.join(self.tmpdir.name, "queue.db")))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class TestSearchTaskRegistry(unittest.TestCase):
+
+    def test_cancel_stops_registered_task(self):
+        registry = SearchTaskRegistry()
+
+        async def scenario():
+            task = asyncio.create_task(asyncio.sleep(10))
+            registry.register("r1", task)
+            self.assertIs(registry.cancel("r1"), task)
+            self.assertTrue(registry.cancel_requested("r1"))
+            await asyncio.wait({task})
+            registry.unregister("r1", task)
+            return task
+
+        self.assertTrue(asyncio.run(scenario()).cancelled())
+        self.assertIsNone(registry.cancel("r1"))
+        self.assertEqual(registry.stats(), {"running": 0, "cancelled": 1})
+
+
+class TestQueueCancellation(QueueTestCase):
+
+    def test_cancelled_pending_job_is_never_leased(self):
+        self.queue.enqueue("r1", {"request_id": "r1"})
+        self.assertEqual(self.queue.cancel("r1"), 1)
+        self.assertIsNone(self.queue.lease("w1"))
+        self.assertEqual(self.queue.stats()["cancelled"], 1)
+
+    def test_worker_stops_cancelled_running_job(self):
+        handler_cancelled = []
+
+        async def handler(request_id):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                handler_cancelled.append(request_id)
+                raise
+
+        async def scenario():
+            job = self.queue.enqueue("r1", {"request_id": "r1"})
+            worker = SearchWorker(queue=self.queue, concurrency=1, handler=handler, poll_interval=0.01)
+            await worker.run_once()
+            await asyncio.sleep(0.01)
+            self.queue.cancel("r1")
+            self.assertEqual(await worker.check_cancellations(), 1)
+            await asyncio.gather(*worker.in_flight)
+            return job, worker
+
+        job, worker = asyncio.run(scenario())
+        self.assertEqual(handler_cancelled, ["r1"])
+        # Not handed back to the queue for another attempt
+        self.assertEqual(self.queue.backend.get_job(job.job_id).status, "cancelled")
+        self.assertEqual(worker.stats()["cancelled"], 1)
+
+
+class TestCancelSearch(QueueTestCase):
+    """Cancelling through process_search and the API."""
+
+    @classmethod
+    def setUpClass(cls):
+        from api import main
+        cls.main = main
+
+    def test_running_search_is_cancelled_and_recorded(self):
+        main = self.main
+        stored_searches = {}
+
+        def fake_get_search(request_id, fields=None):
+            return dict(stored_searches.get(request_id, {"id": 1, "request_id": request_id, "status": "processing"}))
+
+        def fake_store_search(search_data):
+            stored_searches[search_data["request_id"]] = dict(search_data)
+            return 1
+
+        async def scenario():
+            apollo_started = asyncio.Event()
+            apollo_cancelled = []
+
+            async def hanging_apollo(filters, page=1, per_page=5, deadline=None):
+                apollo_started.set()
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    apollo_cancelled.append(page)
+                    raise
+
+            with patch.object(main, "parse_prompt_to_internal_database_filters", lambda prompt, ridiculous=None: {"person_filters": {}}), \
+                 patch.object(main, "search_people_via_internal_database", hanging_apollo):
+                search = asyncio.create_task(main.process_search("r1", "Find CMOs in Florida", force_refresh=True))
+                await asyncio.wait_for(apollo_started.wait(), timeout=10)
+                self.assertTrue(await main._cancel_running_search("r1"))
+                await search
+            return apollo_cancelled
+
+        with patch.object(main, "get_search_queue", return_value=self.queue), \
+             patch.object(main, "get_search_from_database", fake_get_search), \
+             patch.object(main, "store_search_to_database", fake_store_search), \
+             patch.object(main, "estimate_people_count", lambda prompt: {"estimated_count": 7}), \
+             patch.object(main, "EVIDENCE_INTEGRATION_AVAILABLE", False):
+            apollo_cancelled = asyncio.run(scenario())
+
+        self.assertEqual(apollo_cancelled, [1])
+        self.assertEqual(stored_searches["r1"]["status"], "cancelled")
+        self.assertFalse(main.search_tasks.is_running("r1"))
+
+    def test_cancel_endpoint(self):
+        from fastapi.testclient import TestClient
+
+        main = self.main
+        self.queue.enqueue("queued", {"request_id": "queued"})
+        rows = {
+            "queued": {"id": 1, "request_id": "queued", "status": "processing"},
+            "done": {"id": 2, "request_id": "done", "status": "completed"},
+        }
+        stored = {}
+        client = TestClient(main.app)
+        with patch.object(main, "get_search_queue", return_value=self.queue), \
+             patch.object(main, "get_search_status_from_database", lambda request_id: rows.get(request_id)), \
+             patch.object(main, "get_search_from_database", lambda request_id: dict(rows[request_id])), \
+             patch.object(main, "store_search_to_database", lambda data: stored.update({data["request_id"]: data})):
+            response = client.post("/api/search/queued/cancel")
+            self.assertEqual(client.post("/api/search/done/cancel").status_code, 409)
+            self.assertEqual(client.post("/api/search/missing/cancel").status_code, 404)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"request_id": "queued", "status": "cancelled", "was_running": False})
+        self.assertEqual(stored["queued"]["status"], "cancelled")
+        self.assertIsNone(self.queue.lease("w1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
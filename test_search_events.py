@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the search progress event bus and the SSE endpoint.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from search_events import SearchEventBus
+
+
+class TestSearchEventBus(unittest.TestCase):
+    """Test publishing, replay and terminal handling."""
+
+    def test_sequences_and_sse_format(self):
+        bus = SearchEventBus()
+        first = bus.publish("r1", "started", prompt="p")
+        second = bus.publish("r1", "filters_parsed", filters={"a": 1})
+        self.assertEqual((first.sequence, second.sequence), (1, 2))
+
+        frame = second.to_sse()
+        self.assertTrue(frame.startswith("id: 2\nevent: filters_parsed\ndata: "))
+        self.assertEqual(json.loads(frame.split("data: ", 1)[1])["filters"], {"a": 1})
+
+    def test_subscriber_gets_replay_then_live_events(self):
+        bus = SearchEventBus()
+        bus.publish("r1", "started")
+
+        async def scenario():
+            received = []
+
+            async def consume():
+                async for event in bus.subscribe("r1"):
+                    received.append(event.event)
+
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0)
+            bus.publish("r1", "candidate", index=0)
+            bus.publish("r1", "completed")
+            await asyncio.wait_for(task, timeout=1)
+            return received
+
+        self.assertEqual(asyncio.run(scenario()), ["started", "candidate", "completed"])
+        self.assertEqual(bus.subscriber_count(), 0)
+
+    def test_resume_after_last_event_id(self):
+        bus = SearchEventBus()
+        for name in ("started", "filters_parsed", "completed"):
+            bus.publish("r1", name)
+
+        async def scenario():
+            return [event.event async for event in bus.subscribe("r1", after_sequence=2)]
+
+        self.assertEqual(asyncio.run(scenario()), ["completed"])
+
+    def test_searches_that_go_silent_are_expired(self):
+        bus = SearchEventBus(history_ttl=60, abandoned_ttl=0.05)
+        bus.publish("abandoned", "started")
+        bus.publish("finished", "completed")
+        self.assertEqual(bus.stats()["active_searches"], 1)
+
+        time.sleep(0.06)
+        bus.publish("running", "started")
+        self.assertEqual(bus.history("abandoned"), [])
+        self.assertEqual(len(bus.history("finished")), 1)
+        self.assertEqual(bus.stats(), {"tracked_searches": 2, "active_searches": 1, "subscribers": 0})
+
+    def test_timeout_yields_none(self):
+        bus = SearchEventBus()
+
+        async def scenario():
+            async for event in bus.subscribe("r1", timeout=0.01):
+                return event
+
+        self.assertIsNone(asyncio.run(scenario()))
+
+
+class TestSearchEventsEndpoint(unittest.TestCase):
+    """Test GET /api/search/{request_id}/events."""
+
+    @classmethod
+    def setUpClass(cls):
+        from api import main
+        cls.main = main
+
+    def test_completed_search_returns_snapshot(self):
+        from fastapi.testclient import TestClient
+
+        search = {"id": 7, "request_id": "done-1", "status": "completed", "prompt": "p", "filters": "{}"}
+        with patch.object(self.main, "get_search_from_database", return_value=dict(search)), \
+             patch.object(self.main, "get_people_for_search", return_value=[{"name": "Jane Doe"}]):
+            client = TestClient(self.main.app)
+            response = client.get("/api/search/done-1/events")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertIn("event: snapshot", response.text)
+        self.assertIn("Jane Doe", response.text)
+
+    def test_live_events_are_streamed(self):
+        from fastapi.testclient import TestClient
+
+        self.main.search_event_bus.publish("live-1", "started")
+        self.main.search_event_bus.publish("live-1", "candidate", index=0, candidate={"name": "Jane Doe"})
+        self.main.search_event_bus.publish("live-1", "completed", candidate_count=1)
+
+        search = {"id": 8, "request_id": "live-1", "status": "processing", "prompt": "p"}
+        with patch.object(self.main, "get_search_from_database", return_value=dict(search)):
+            client = TestClient(self.main.app)
+            response = client.get("/api/search/live-1/events")
+
+        events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+        self.assertEqual(events, ["started", "candidate", "completed"])
+
+    def test_stream_closes_when_a_search_was_cancelled_without_live_events(self):
+        from fastapi.testclient import TestClient
+
+        # Open while processing; the cancelled event was published by another process
+        statuses = iter(["processing"])
+
+        def get_search(request_id, fields=None):
+            return {"id": 9, "request_id": request_id, "status": next(statuses, "cancelled"), "prompt": "p"}
+
+        with patch.object(self.main, "get_search_from_database", get_search), \
+             patch.object(self.main, "get_people_for_search", return_value=[]), \
+             patch.dict(os.environ, {"SEARCH_EVENTS_KEEPALIVE_SECONDS": "0.05"}):
+            client = TestClient(self.main.app)
+            response = client.get("/api/search/cancelled-1/events")
+
+        self.assertIn("event: snapshot", response.text)
+        self.assertIn("cancelled", response.text)
+        self.assertNotIn("keep-alive", response.text)
+
+    def test_unknown_search_is_404(self):
+        from fastapi.testclient import TestClient
+
+        with patch.object(self.main, "get_search_from_database", return_value=None):
+            client = TestClient(self.main.app)
+            response = client.get("/api/search/missing/events")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset pagination and field projection on the search endpoints.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+import database
+from database import (
+    SEARCH_FIELDS, build_select, decode_search_cursor, encode_search_cursor, get_searches_page
+)
+
+
+class RecordingQuery:
+    """Minimal Supabase query builder that records the calls made on it."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+
+    def execute(self):
+        limit = next(args[0] for name, args, _ in self.calls if name == "limit")
+        return type("Result", (), {"data": self.rows[:limit]})()
+
+
+class RecordingClient:
+
+    def __init__(self, rows):
+        self.query = RecordingQuery(rows)
+
+    def table(self, name):
+        return self.query
+
+
+def make_rows(count):
+    return [{"id": 100 - i, "created_at": f"2025-01-01T00:00:{59 - i:02d}+00:00", "status": "completed"}
+            for i in range(count)]
+
+
+class TestProjection(unittest.TestCase):
+
+    def test_select_defaults_to_all_columns(self):
+        self.assertEqual(build_select(None, SEARCH_FIELDS), "*")
+
+    def test_required_columns_come_first_without_duplicates(self):
+        self.assertEqual(build_select(["status", "id"], SEARCH_FIELDS, required=("id",)), "id,status")
+
+    def test_unknown_columns_are_rejected(self):
+        with self.assertRaises(ValueError):
+            build_select(["status", "password"], SEARCH_FIELDS)
+
+
+class TestSearchesPage(unittest.TestCase):
+
+    def test_cursor_round_trip(self):
+        cursor = encode_search_cursor({"id": 5, "created_at": "2025-01-01T00:00:00+00:00"})
+        self.assertEqual(decode_search_cursor(cursor), ("2025-01-01T00:00:00+00:00", 5))
+        with self.assertRaises(ValueError):
+            decode_search_cursor("not-a-cursor")
+        injected = encode_search_cursor({"id": 5, "created_at": '2025-01-01",id.gt.0,created_at.eq."x'})
+        with self.assertRaises(ValueError):
+            decode_search_cursor(injected)
+
+    def test_first_page_returns_next_cursor(self):
+        client = RecordingClient(make_rows(5))
+        with patch.object(database, "supabase", client):
+            searches, next_cursor = get_searches_page(limit=3, fields=["status"])
+
+        self.assertEqual([s["id"] for s in searches], [100, 99, 98])
+        self.assertEqual(decode_search_cursor(next_cursor)[1], 98)
+        calls = client.query.calls
+        self.assertIn(("select", ("id,created_at,status",), {}), calls)
+        self.assertIn(("limit", (4,), {}), calls)
+        self.assertFalse(any(name == "or_" for name, _, _ in calls))
+
+    def test_cursor_becomes_keyset_filter(self):
+        client = RecordingClient(make_rows(2))
+        cursor = encode_search_cursor({"id": 98, "created_at": "2025-01-01T00:00:57+00:00"})
+        with patch.object(database, "supabase", client):
+            searches, next_cursor = get_searches_page(limit=3, cursor=cursor)
+
+        self.assertIsNone(next_cursor)
+        self.assertEqual(len(searches), 2)
+        keyset = [args[0] for name, args, _ in client.query.calls if name == "or_"]
+        self.assertEqual(keyset, [
+            'created_at.lt."2025-01-01T00:00:57+00:00",'
+            'and(created_at.eq."2025-01-01T00:00:57+00:00",id.lt.98)'
+        ])
+
+
+class TestSearchEndpoints(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from api import main
+        cls.main = main
+
+    def test_status_view_skips_candidates(self):
+        from fastapi.testclient import TestClient
+
+        status_row = {"id": 7, "request_id": "r1", "status": "completed", "completed_at": "2025-01-01T00:00:00+00:00"}
+        with patch.object(self.main, "get_search_status_from_database", return_value=status_row), \
+             patch.object(self.main, "get_people_for_search") as people:
+            response = TestClient(self.main.app).get("/api/search/r1?view=status")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["processing_complete"])
+        self.assertNotIn("candidates", response.json())
+        people.assert_not_called()
+
+    def test_candidate_fields_are_projected(self):
+        from fastapi.testclient import TestClient
+
+        search = {"id": 7, "request_id": "r1", "status": "completed"}
+        with patch.object(self.main, "get_search_from_database", return_value=dict(search)), \
+             patch.object(self.main, "get_people_for_search", return_value=[{"id": 1, "name": "Jane", "accuracy": 90}]) as people:
+            response = TestClient(self.main.app).get("/api/search/r1?candidate_fields=name,accuracy")
+
+        self.assertEqual(response.json()["candidates"], [{"id": 1, "name": "Jane", "accuracy": 90}])
+        self.assertEqual(people.call_args[0][1], ["name", "accuracy"])
+
+    def test_list_rejects_unknown_fields_and_bad_cursor(self):
+        from fastapi.testclient import TestClient
+
+        client = TestClient(self.main.app)
+        self.assertEqual(client.get("/api/search?fields=password").status_code, 400)
+        with patch.object(self.main, "get_searches_page", side_effect=ValueError("Invalid cursor")):
+            self.assertEqual(client.get("/api/search?cursor=bogus").status_code, 400)
+        forged = encode_search_cursor({"id": 1, "created_at": "yesterday"})
+        self.assertEqual(client.get(f"/api/search?cursor={forged}").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable search queue and the search worker.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from search_queue import QueueFullError, SearchQueue, SQLiteQueueBackend
+from search_worker import SearchWorker
+
+
+class QueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backend = SQLiteQueueBackend(os.path.join(self.tmpdir.name, "queue.db"))
+        self.queue = SearchQueue(self.backend, max_depth=3, lease_seconds=60, max_attempts=2)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class TestSearchQueue(QueueTestCase):
+    """Test priority ordering, leases and acknowledgement."""
+
+    def test_priority_then_fifo(self):
+        self.queue.enqueue("low", {"request_id": "low"}, priority=0)
+        self.queue.enqueue("high", {"request_id": "high"}, priority=5)
+        self.queue.enqueue("low-2", {"request_id": "low-2"}, priority=0)
+
+        order = [self.queue.lease("w1").request_id for _ in range(3)]
+        self.assertEqual(order, ["high", "low", "low-2"])
+        self.assertIsNone(self.queue.lease("w1"))
+
+    def test_active_counts_every_search_in_a_batch_job(self):
+        self.queue.enqueue("single", {"request_id": "single"})
+        self.queue.enqueue("batch", {"batch_id": "batch"}, weight=5)
+        self.assertEqual(self.queue.active(), 6)
+        job = self.queue.lease("w1")
+        self.assertEqual(self.queue.active(), 6)
+        self.queue.ack(job.job_id)
+        self.assertEqual(self.queue.active(), 6 - job.weight)
+
+    def test_ack_and_stats(self):
+        self.queue.enqueue("r1", {"request_id": "r1"})
+        job = self.queue.lease("w1")
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(self.queue.stats()["in_flight"], 1)
+
+        self.assertTrue(self.queue.ack(job.job_id))
+        stats = self.queue.stats()
+        self.assertEqual(stats["depth"], 0)
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["completed"], 1)
+
+    def test_finished_jobs_are_purged_after_the_retention_period(self):
+        for request_id in ("old", "recent", "queued"):
+            self.queue.enqueue(request_id, {"request_id": request_id})
+        old, recent = self.queue.lease("w1"), self.queue.lease("w1")
+        self.queue.ack(old.job_id)
+        self.queue.ack(recent.job_id)
+        self.backend._connect().execute(
+            "UPDATE search_jobs SET finished_at = ? WHERE job_id = ?", (time.time() - 8 * 86400, old.job_id))
+
+        self.assertEqual(self.queue.purge_finished(), 1)
+        self.assertIsNone(self.backend.get_job(old.job_id))
+        self.assertEqual(self.backend.get_job(recent.job_id).status, "done")
+        self.assertEqual(self.queue.depth(), 1)
+
+    def test_nack_requeues_until_attempts_exhausted(self):
+        self.queue.enqueue("r1", {"request_id": "r1"})
+        job = self.queue.lease("w1")
+        self.queue.nack(job.job_id)
+        self.assertEqual(self.queue.depth(), 1)
+
+        job = self.queue.lease("w1")
+        self.queue.nack(job.job_id)
+        self.assertEqual(self.backend.get_job(job.job_id).status, "dead")
+
+    def test_expired_lease_is_redelivered(self):
+        self.queue.lease_seconds = 0.01
+        self.queue.enqueue("r1", {"request_id": "r1"})
+        first = self.queue.lease("crashed-worker")
+        time.sleep(0.05)
+
+        second = self.queue.lease("w2")
+        self.assertEqual(second.job_id, first.job_id)
+        self.assertEqual(second.worker_id, "w2")
+
+    def test_only_the_lease_holder_can_ack_or_extend(self):
+        self.queue.lease_seconds = 0.05
+        self.queue.enqueue("r1", {"request_id": "r1"})
+        first = self.queue.lease("w1")
+        self.assertTrue(self.queue.extend_lease(first.job_id, "w1"))
+        time.sleep(0.03)
+        self.assertTrue(self.queue.extend_lease(first.job_id, "w1"))
+        time.sleep(0.03)
+        self.assertIsNone(self.queue.lease("w2"), "an extended lease must not be redelivered")
+
+        time.sleep(0.06)
+        second = self.queue.lease("w2")
+        self.assertEqual(second.job_id, first.job_id)
+        self.assertFalse(self.queue.extend_lease(first.job_id, "w1"))
+        self.assertFalse(self.queue.ack(first.job_id, "w1"))
+        self.assertFalse(self.queue.nack(first.job_id, worker_id="w1"))
+        self.assertEqual(self.backend.get_job(first.job_id).status, "leased")
+        self.assertTrue(self.queue.ack(second.job_id, "w2"))
+
+    def test_backpressure(self):
+        for i in range(3):
+            self.queue.enqueue(f"r{i}", {"request_id": f"r{i}"})
+        with self.assertRaises(QueueFullError):
+            self.queue.enqueue("r3", {"request_id": "r3"})
+
+
+class TestSearchWorker(QueueTestCase):
+    """Test that workers run jobs with bounded concurrency and ack them."""
+
+    def test_worker_processes_jobs(self):
+        seen = []
+        running = 0
+        max_running = 0
+
+        async def handler(request_id, **kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.02)
+            seen.append(request_id)
+            running -= 1
+
+        for i in range(3):
+            self.queue.enqueue(f"r{i}", {"request_id": f"r{i}", "prompt": "p"})
+
+        async def scenario():
+            worker = SearchWorker(queue=self.queue, concurrency=2, handler=handler, poll_interval=0.01)
+            task = asyncio.create_task(worker.run())
+            for _ in range(100):
+                if worker.processed == 3:
+                    break
+                await asyncio.sleep(0.01)
+            worker.stop()
+            await task
+            return worker
+
+        worker = asyncio.run(scenario())
+        self.assertEqual(sorted(seen), ["r0", "r1", "r2"])
+        self.assertLessEqual(max_running, 2)
+        self.assertEqual(self.queue.stats()["completed"], 3)
+        self.assertEqual(worker.stats()["in_flight"], 0)
+
+    def test_long_jobs_keep_their_lease(self):
+        self.queue.lease_seconds = 0.1
+        runs = []
+
+        async def handler(request_id, **kwargs):
+            runs.append(request_id)
+            await asyncio.sleep(0.35)
+
+        job = self.queue.enqueue("batch", {"request_id": "batch"})
+
+        async def scenario():
+            worker = SearchWorker(queue=self.queue, concurrency=2, handler=handler, poll_interval=0.01,
+                                  lease_renew_interval=0.02)
+            task = asyncio.create_task(worker.run())
+            for _ in range(100):
+                if worker.processed == 1:
+                    break
+                await asyncio.sleep(0.01)
+            worker.stop()
+            await task
+            return worker
+
+        worker = asyncio.run(scenario())
+        self.assertEqual(runs, ["batch"])
+        self.assertEqual(worker.stats()["lost_leases"], 0)
+        finished = self.backend.get_job(job.job_id)
+        self.assertEqual((finished.status, finished.attempts), ("done", 1))
+
+    def test_failed_job_is_nacked(self):
+        async def handler(**kwargs):
+            raise RuntimeError("boom")
+
+        self.queue.enqueue("r1", {"request_id": "r1"})
+
+        async def scenario():
+            worker = SearchWorker(queue=self.queue, concurrency=1, handler=handler, poll_interval=0.01)
+            await worker.run_once()
+            await asyncio.gather(*worker.in_flight)
+            return worker
+
+        worker = asyncio.run(scenario())
+        self.assertEqual(worker.failed, 1)
+        self.assertEqual(self.queue.depth(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for the full-search result cache.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from search_result_cache import SearchResultCache, canonical_filters, make_cache_key
+from shared_cache import MemoryCacheBackend, SQLiteCacheBackend
+
+FILTERS = {"person_filters": {"person_titles": ["CMO", "Chief Marketing Officer"], "person_locations": ["Florida"]}}
+
+
+class TestCacheKeys(unittest.TestCase):
+
+    def test_trivially_different_prompts_share_a_key(self):
+        self.assertEqual(
+            make_cache_key("Find CMOs in Florida", FILTERS),
+            make_cache_key("  find cmos   in florida. ", FILTERS)
+        )
+
+    def test_filter_order_and_reasoning_do_not_matter(self):
+        reordered = {
+            "reasoning": "LLM explanation",
+            "person_filters": {"person_locations": ["florida"], "person_titles": ["Chief Marketing Officer", "CMO"]},
+        }
+        self.assertEqual(canonical_filters(FILTERS), canonical_filters(reordered))
+
+    def test_different_filters_get_different_keys(self):
+        other = {"person_filters": {"person_titles": ["CFO"], "person_locations": ["Florida"]}}
+        self.assertNotEqual(make_cache_key("Find CMOs", FILTERS), make_cache_key("Find CMOs", other))
+
+
+class TestCandidateCounts(unittest.TestCase):
+
+    def test_hits_cover_the_requested_candidate_count(self):
+        cache = SearchResultCache(MemoryCacheBackend(), ttl=60)
+        people = [{"name": f"Person {i}"} for i in range(3)]
+        cache.put("Find CMOs in Florida", FILTERS, {"candidates": people, "max_candidates": 3})
+        self.assertEqual(len(cache.get("Find CMOs in Florida", FILTERS, 1)["candidates"]), 1)
+        self.assertEqual(len(cache.get("Find CMOs in Florida", FILTERS, 3)["candidates"]), 3)
+        self.assertIsNone(cache.get("Find CMOs in Florida", FILTERS, 10))
+        # A run asked for 10 that found only 3 is the full answer for 10
+        cache.put("Find CMOs in Florida", FILTERS, {"candidates": people, "max_candidates": 10})
+        self.assertEqual(len(cache.get("Find CMOs in Florida", FILTERS, 10)["candidates"]), 3)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+
+class BackendContract:
+    """Shared checks for the cache over every shared_cache backend."""
+
+    def make_cache(self, max_entries, ttl=60):
+        raise NotImplementedError
+
+    def test_round_trip_and_expiry(self):
+        cache = self.make_cache(10)
+        cache.put("Find CMOs", FILTERS, {"candidates": [{"name": "Jane"}]})
+        self.assertEqual(cache.get("Find CMOs", FILTERS)["candidates"][0]["name"], "Jane")
+
+        short = self.make_cache(10, ttl=0.01)
+        short.put("Find CFOs", FILTERS, {"x": 1})
+        time.sleep(0.03)
+        self.assertIsNone(short.get("Find CFOs", FILTERS))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = self.make_cache(2)
+        cache.put("a", FILTERS, {"v": 1})
+        time.sleep(0.01)
+        cache.put("b", FILTERS, {"v": 2})
+        time.sleep(0.01)
+        cache.get("a", FILTERS)
+        time.sleep(0.01)
+        cache.put("c", FILTERS, {"v": 3})
+
+        self.assertIsNotNone(cache.get("a", FILTERS))
+        self.assertIsNone(cache.get("b", FILTERS))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+
+class TestInMemoryBackend(BackendContract, unittest.TestCase):
+
+    def make_cache(self, max_entries, ttl=60):
+        return SearchResultCache(MemoryCacheBackend(max_entries=max_entries), ttl=ttl)
+
+    def test_returned_entries_are_copies(self):
+        cache = self.make_cache(10)
+        cache.put("Find CMOs", FILTERS, {"candidates": []})
+        cache.get("Find CMOs", FILTERS)["candidates"].append("mutated")
+        self.assertEqual(cache.get("Find CMOs", FILTERS)["candidates"], [])
+        self.assertFalse(cache.blocking)
+
+
+class TestSQLiteBackend(BackendContract, unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_cache(self, max_entries, ttl=60):
+        path = os.path.join(self.tmpdir.name, "cache.db")
+        return SearchResultCache(SQLiteCacheBackend(path, "search_result", max_entries=max_entries), ttl=ttl)
+
+    def test_processes_share_results(self):
+        api, worker = self.make_cache(10), self.make_cache(10)
+        worker.put("Find CMOs", FILTERS, {"candidates": [{"name": "Jane"}]})
+        self.assertEqual(api.get("Find CMOs", FILTERS)["candidates"], [{"name": "Jane"}])
+        self.assertTrue(api.blocking)
+
+
+class TestProcessSearchUsesCache(unittest.TestCase):
+    """A repeated search should be completed from the cache without calling Apollo."""
+
+    def test_second_search_is_served_from_cache(self):
+        from api import main
+
+        stored_searches = {}
+        apollo_calls = []
+
+        def fake_get_search(request_id):
+            return dict(stored_searches.get(request_id, {"id": 1, "request_id": request_id, "status": "processing"}))
+
+        def fake_store_search(search_data):
+            stored_searches[search_data["request_id"]] = dict(search_data)
+            return 1
+
+        async def fake_apollo(filters, page=1, per_page=5, deadline=None):
+            apollo_calls.append(page)
+            return [{"name": f"Person {i}", "title": "CMO", "linkedin_url": f"https://linkedin.com/in/p{i}"} for i in range(per_page)]
+
+        def fake_assessment(prompt, people, *args, **kwargs):
+            return [{"name": p["name"], "linkedin_url": p["linkedin_url"], "accuracy": 90, "reasons": []} for p in people[:3]]
+
+        async def not_public(name):
+            return False
+
+        cache = SearchResultCache(MemoryCacheBackend(), ttl=60)
+        with patch.object(main, "search_result_cache", cache), \
+             patch.object(main, "get_search_from_database", fake_get_search), \
+             patch.object(main, "store_search_to_database", fake_store_search), \
+             patch.object(main, "store_people_to_database", lambda search_id, people: True), \
+             patch.object(main, "parse_prompt_to_internal_database_filters", lambda prompt, ridiculous=None: dict(FILTERS)), \
+             patch.object(main, "search_people_via_internal_database", fake_apollo), \
+             patch.object(main, "select_top_candidates", fake_assessment), \
+             patch.object(main, "enhance_behavioral_data_ai", lambda *a, **k: {"behavioral_insight": "x", "scores": {}}), \
+             patch.object(main, "estimate_people_count", lambda prompt: {"estimated_count": 42}), \
+             patch.object(main, "is_public_figure", not_public), \
+             patch.object(main, "EVIDENCE_INTEGRATION_AVAILABLE", False):
+            asyncio.run(main.process_search("first", "Find CMOs in Florida", max_candidates=3))
+            calls_after_first = len(apollo_calls)
+            asyncio.run(main.process_search("second", "find cmos in florida", max_candidates=3))
+
+        self.assertEqual(len(apollo_calls), calls_after_first)
+        self.assertEqual(cache.hits, 1)
+        second = stored_searches["second"]
+        self.assertEqual(second["status"], "completed")
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["cached_from_request_id"], "first")
+        self.assertEqual(second["estimated_count"], 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for lazily loaded settings and shared clients.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services
+from services import DummySupabase, build_settings, warmup
+
+SETTING_ENV = ["OPENAI_API_KEY", "SUPABASE_URL", "SUPABASE_KEY", "INTERNAL_DATABASE_API_KEY",
+               "SCRAPING_DOG_API_KEY", "HUBSPOT_CLIENT_ID", "HUBSPOT_CLIENT_SECRET"]
+
+
+class ServicesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.environ = patch.dict(os.environ)
+        self.environ.start()
+        for name in SETTING_ENV:
+            os.environ.pop(name, None)
+        services.reset_services()
+
+    def tearDown(self):
+        self.environ.stop()
+        services.reset_services()
+
+    def use_secrets(self, secrets):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "secrets.json")
+        with open(path, "w") as f:
+            json.dump(secrets, f)
+        paths = patch.object(services, "_secrets_paths", return_value=[os.path.join(tmp.name, "missing.json"), path])
+        paths.start()
+        self.addCleanup(paths.stop)
+        return path
+
+
+class TestSettings(ServicesTestCase):
+
+    def test_environment_wins_and_secret_aliases_are_accepted(self):
+        settings = build_settings({"SUPABASE_URL": "https://env.supabase.co"},
+                                  {"supabase_url": "https://file.supabase.co", "SUPABASE_KEY": "k",
+                                   "openai_key": "sk-file", "scraping_dog_api_key": ""})
+        self.assertEqual(settings.supabase_url, "https://env.supabase.co")
+        self.assertEqual(settings.openai_api_key, "sk-file")
+        self.assertIsNone(settings.scraping_dog_api_key)
+        self.assertTrue(settings.supabase_configured)
+
+    def test_secrets_are_read_once_and_exported_without_overriding(self):
+        path = self.use_secrets({"openai_api_key": "sk-file", "internal_database_api_key": "db-file"})
+        os.environ["INTERNAL_DATABASE_API_KEY"] = "db-env"
+        with patch.object(services, "_read_secrets", wraps=services._read_secrets) as read:
+            settings = services.load_settings()
+            self.assertIs(services.load_settings(), settings)
+        self.assertEqual(read.call_count, 1)
+        self.assertEqual(settings.secrets_path, os.path.abspath(path))
+        self.assertEqual(os.environ["OPENAI_API_KEY"], "sk-file")
+        self.assertEqual(os.environ["INTERNAL_DATABASE_API_KEY"], "db-env")
+
+
+class TestClients(ServicesTestCase):
+
+    def test_openai_client_is_shared_and_absent_without_a_key(self):
+        self.use_secrets({})
+        self.assertIsNone(services.get_openai_client())
+        services.reset_services()
+        os.environ["OPENAI_API_KEY"] = "sk-test"
+        client = services.get_openai_client()
+        self.assertIsNotNone(client)
+        self.assertIs(services.get_openai_client(), client)
+        self.assertEqual(services.client_stats()["clients"], ["openai"])
+
+    def test_unconfigured_supabase_is_a_dummy_behind_the_proxy(self):
+        self.use_secrets({})
+        self.assertIsInstance(services.get_supabase(), DummySupabase)
+        result = services.supabase.table("searches").select("id").eq("request_id", "x").execute()
+        self.assertEqual(result.data, [])
+        # Tests patch the module-level client; the proxy must restore cleanly
+        with patch.object(services.supabase, "table", lambda name: "patched"):
+            self.assertEqual(services.supabase.table("searches"), "patched")
+        self.assertIsInstance(services.supabase.table("searches"), services.DummyTable)
+
+
+class TestWarmup(unittest.TestCase):
+
+    def test_failing_steps_are_reported_and_do_not_stop_the_rest(self):
+        ran = []
+
+        def broken():
+            raise RuntimeError("no route to host")
+
+        report = warmup([("first", lambda: ran.append(1)), ("broken", broken), ("last", lambda: ran.append(2))])
+        self.assertEqual(ran, [1, 2])
+        self.assertTrue(report["steps"]["first"]["ok"])
+        self.assertEqual(report["steps"]["broken"], {"ok": False, "error": "no route to host",
+                                                     "ms": report["steps"]["broken"]["ms"]})
+        self.assertGreaterEqual(report["total_ms"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
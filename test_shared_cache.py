@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the named caches and their backends.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from shared_cache import (
+    CACHE_REQUESTS, MISSING, Cache, MemoryCacheBackend, RedisCacheBackend, SQLiteCacheBackend, create_backend
+)
+
+
+class FakeRedis:
+    """Just enough of the redis client for RedisCacheBackend."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match=None):
+        prefix = match.rstrip("*") if match else ""
+        return [key for key in list(self.data) if key.startswith(prefix)]
+
+
+class TestMemoryBackend(unittest.TestCase):
+
+    def test_lru_eviction_and_ttl(self):
+        cache = Cache("memory_test", MemoryCacheBackend(max_entries=2))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(sorted(cache.keys()), ["a", "c"])
+
+        cache.set("short", "x", ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("short"))
+
+    def test_false_is_a_hit_and_values_are_copied(self):
+        cache = Cache("memory_copy_test", MemoryCacheBackend())
+        cache.set("famous", False)
+        self.assertIs(cache.get("famous", MISSING), False)
+        self.assertIs(cache.get("unknown", MISSING), MISSING)
+
+        value = {"items": [1]}
+        cache.set("dict", value)
+        cache.get("dict")["items"].append(2)
+        value["items"].append(3)
+        self.assertEqual(cache.get("dict"), {"items": [1]})
+
+    def test_hits_and_misses_are_counted(self):
+        cache = Cache("metrics_test", MemoryCacheBackend())
+        before = CACHE_REQUESTS.value(cache="metrics_test", result="hit")
+        cache.get("k")
+        cache.set("k", "v")
+        cache.get("k")
+        self.assertEqual(CACHE_REQUESTS.value(cache="metrics_test", result="hit"), before + 1)
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+
+class TestSharedBackends(unittest.TestCase):
+
+    def test_sqlite_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            worker_one = Cache("public_figure", SQLiteCacheBackend(path, "public_figure"))
+            worker_two = Cache("public_figure", SQLiteCacheBackend(path, "public_figure"))
+            other = Cache("avatar", SQLiteCacheBackend(path, "avatar"))
+
+            worker_one.set("jane doe", True)
+            self.assertIs(worker_two.get("jane doe", MISSING), True)
+            self.assertIs(other.get("jane doe", MISSING), MISSING)
+
+            worker_two.set("gone", 1, ttl=0.01)
+            time.sleep(0.02)
+            self.assertEqual(worker_one.purge_expired(), 1)
+            self.assertIs(worker_one.get("gone", MISSING), MISSING)
+
+    def test_redis_backend_with_fake_client(self):
+        client = FakeRedis()
+        cache = Cache("evidence", RedisCacheBackend("redis://unused", "evidence", client=client))
+        cache.set("q", {"urls": ["https://example.com"]}, ttl=60)
+        self.assertEqual(cache.get("q"), {"urls": ["https://example.com"]})
+        self.assertEqual(cache.keys(), ["q"])
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+
+    def test_unavailable_backend_falls_back_to_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["CACHE_FALLBACK_TEST_BACKEND"] = "sqlite"
+            os.environ["CACHE_PATH"] = os.path.join(tmp, "missing", "cache.db")
+            try:
+                backend = create_backend("fallback_test", 10)
+            finally:
+                del os.environ["CACHE_FALLBACK_TEST_BACKEND"]
+                del os.environ["CACHE_PATH"]
+        self.assertIsInstance(backend, MemoryCacheBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight coalescing of concurrent identical work.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test_key")
+
+from metrics import SINGLE_FLIGHT_CALLS
+from single_flight import FlightCancelledError, SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"value": 42}
+
+        async def scenario():
+            return await asyncio.gather(*(flight.do_with_status("k", work) for _ in range(5)))
+
+        results = asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == {"value": 42} for result, _ in results))
+        self.assertEqual(sum(1 for _, leader in results if leader), 1)
+        self.assertEqual(flight.stats()["coalesced"], 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_calls_are_counted_in_the_metrics_registry(self):
+        flight = SingleFlight("metrics-test")
+        before = SINGLE_FLIGHT_CALLS.value(flight="metrics-test", role="coalesced")
+
+        async def work():
+            await asyncio.sleep(0.01)
+            return 1
+
+        async def scenario():
+            await asyncio.gather(*(flight.do("k", work) for _ in range(3)))
+
+        asyncio.run(scenario())
+        self.assertEqual(SINGLE_FLIGHT_CALLS.value(flight="metrics-test", role="coalesced") - before, 2)
+        self.assertGreaterEqual(SINGLE_FLIGHT_CALLS.value(flight="metrics-test", role="leader"), 1)
+
+    def test_exceptions_reach_every_caller(self):
+        flight = SingleFlight("test")
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("apollo down")
+
+        async def scenario():
+            return await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(flight.stats()["errors"], 1)
+
+    def test_sequential_calls_are_not_cached(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            return len(calls)
+
+        async def scenario():
+            return [await flight.do("k", work), await flight.do("k", work)]
+
+        self.assertEqual(asyncio.run(scenario()), [1, 2])
+
+    def test_cancelled_follower_does_not_cancel_leader(self):
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def scenario():
+            leader = asyncio.create_task(flight.do("k", work))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flight.do("k", work))
+            await asyncio.sleep(0.01)
+            follower.cancel()
+            return await leader
+
+        self.assertEqual(asyncio.run(scenario()), "done")
+
+    def test_cancelled_leader_fails_followers_without_cancelling_them(self):
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(10)
+
+        async def scenario():
+            leader = asyncio.create_task(flight.do("k", work))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flight.do("k", work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with self.assertRaises(FlightCancelledError):
+                await follower
+            return flight.in_flight()
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+
+class TestSearchCoalescing(unittest.TestCase):
+    """Concurrent identical searches should run the pipeline once."""
+
+    def run_searches(self, *searches):
+        """Run the (request_id, prompt, options) searches concurrently against faked providers."""
+        from api import main
+        from search_result_cache import SearchResultCache
+
+        self.stored_searches = {}
+        self.apollo_calls = []
+
+        def fake_get_search(request_id):
+            return dict(self.stored_searches.get(request_id, {"id": 1, "request_id": request_id, "status": "processing"}))
+
+        def fake_store_search(search_data):
+            self.stored_searches[search_data["request_id"]] = dict(search_data)
+            return 1
+
+        async def fake_apollo(filters, page=1, per_page=5, deadline=None):
+            self.apollo_calls.append(page)
+            await asyncio.sleep(0.05)
+            return [{"name": f"Person {i}", "title": "CMO", "linkedin_url": f"https://linkedin.com/in/p{i}"} for i in range(per_page)]
+
+        def fake_assessment(prompt, people, *args, **kwargs):
+            return [{"name": p["name"], "linkedin_url": p["linkedin_url"], "accuracy": 90, "reasons": []} for p in people[:3]]
+
+        async def not_public(name):
+            return False
+
+        async def scenario():
+            await asyncio.gather(*(
+                main.process_search(request_id, prompt, max_candidates=3, **options)
+                for request_id, prompt, options in searches
+            ))
+
+        with patch.object(main, "search_result_cache", SearchResultCache(None)), \
+             patch.object(main, "get_search_from_database", fake_get_search), \
+             patch.object(main, "store_search_to_database", fake_store_search), \
+             patch.object(main, "store_people_to_database", lambda search_id, people: True), \
+             patch.object(main, "parse_prompt_to_internal_database_filters", lambda prompt, ridiculous=None: {"person_filters": {}}), \
+             patch.object(main, "search_people_via_internal_database", fake_apollo), \
+             patch.object(main, "select_top_candidates", fake_assessment), \
+             patch.object(main, "enhance_behavioral_data_ai", lambda *a, **k: {"behavioral_insight": "x", "scores": {}}), \
+             patch.object(main, "estimate_people_count", lambda prompt: {"estimated_count": 7}), \
+             patch.object(main, "is_public_figure", not_public), \
+             patch.object(main, "EVIDENCE_INTEGRATION_AVAILABLE", False):
+            asyncio.run(scenario())
+
+    def test_duplicate_searches_share_leader_result(self):
+        self.run_searches(
+            ("leader", "Find CMOs in Florida", {}),
+            ("follower", "find CMOs in Florida.", {}),
+        )
+
+        self.assertEqual(len(self.apollo_calls), 1)
+        follower = self.stored_searches["follower"]
+        self.assertEqual(follower["status"], "completed")
+        self.assertEqual(follower["cached_from_request_id"], "leader")
+        self.assertEqual(follower["estimated_count"], 7)
+
+    def test_searches_differing_in_linkedin_option_run_separately(self):
+        self.run_searches(
+            ("with_linkedin", "Find CMOs in Florida", {"include_linkedin": True}),
+            ("without_linkedin", "Find CMOs in Florida", {"include_linkedin": False}),
+        )
+
+        self.assertEqual(len(self.apollo_calls), 2)
+        self.assertEqual(self.stored_searches["without_linkedin"]["status"], "completed")
+        self.assertNotEqual(self.stored_searches["without_linkedin"].get("cached_from_request_id"), "with_linkedin")
+
+
+if __name__ == "__main__":
+    unittest.main()
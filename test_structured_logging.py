@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the structured, queue-backed logging layer.
+"""
+
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from structured_logging import (
+    NonBlockingQueueHandler, SamplingFilter, configure_logging, get_logger, shutdown_logging
+)
+
+
+class CountingArg:
+    """Argument that records whether it was ever formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "arg"
+
+
+class TestStructuredLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        configure_logging(force=True)
+
+    def configure(self, **env):
+        with patch.dict(os.environ, env):
+            configure_logging(stream=self.stream, force=True)
+
+    def records(self):
+        shutdown_logging()  # drains the queue into the stream
+        return [json.loads(line) for line in self.stream.getvalue().splitlines() if line]
+
+    def test_json_records_carry_fields(self):
+        self.configure(LOG_LEVEL="INFO", LOG_FORMAT="json")
+        get_logger("apollo_api_call").info("[Apollo API] Received %s people", 5, page=2)
+
+        record = self.records()[0]
+        self.assertEqual(record["level"], "INFO")
+        self.assertEqual(record["logger"], "apollo_api_call")
+        self.assertEqual(record["msg"], "[Apollo API] Received 5 people")
+        self.assertEqual(record["page"], 2)
+
+    def test_disabled_levels_are_never_formatted(self):
+        self.configure(LOG_LEVEL="INFO")
+        arg = CountingArg()
+        get_logger("api.main").debug("Candidates list: %s", arg)
+
+        self.assertEqual(self.records(), [])
+        self.assertEqual(arg.formatted, 0)
+
+    def test_per_module_levels(self):
+        self.configure(LOG_LEVEL="WARNING", LOG_LEVELS="apollo_api_call=DEBUG")
+        get_logger("apollo_api_call").debug("kept")
+        get_logger("database").info("dropped")
+
+        self.assertEqual([r["msg"] for r in self.records()], ["kept"])
+
+    def test_exceptions_are_rendered(self):
+        self.configure()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            get_logger("api.main").exception("Search failed")
+
+        record = self.records()[0]
+        self.assertEqual(record["level"], "ERROR")
+        self.assertIn("ValueError: boom", record["exc"])
+
+
+class TestSamplingAndBackpressure(unittest.TestCase):
+
+    def make_record(self, level, msg="enriched %s"):
+        return logging.LogRecord("knowledge_gpt.apollo_api_call", level, __file__, 1, msg, ("x",), None)
+
+    def test_debug_records_are_sampled_per_template(self):
+        sampler = SamplingFilter({"apollo_api_call": 0.25})
+        kept = [sampler.filter(self.make_record(logging.DEBUG)) for _ in range(8)]
+        self.assertEqual(kept, [True, False, False, False, True, False, False, False])
+        # Other templates and higher levels are unaffected
+        self.assertTrue(sampler.filter(self.make_record(logging.DEBUG, "other %s")))
+        self.assertTrue(all(sampler.filter(self.make_record(logging.WARNING)) for _ in range(3)))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(self.make_record(logging.INFO))
+        handler.handle(self.make_record(logging.INFO))
+        self.assertEqual(handler.queue.qsize(), 1)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_arguments_are_merged_before_queueing(self):
+        handler = NonBlockingQueueHandler(queue.Queue())
+        payload = {"page": 1}
+        handler.handle(logging.LogRecord("knowledge_gpt.x", logging.INFO, __file__, 1, "payload %s", (payload,), None))
+        payload["page"] = 2
+        self.assertEqual(handler.queue.get_nowait().getMessage(), "payload {'page': 1}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the dependency-graph executor used by process_search.
+"""
+
+import asyncio
+import time
+import unittest
+
+from task_graph import TaskGraph
+
+
+def delayed(value, delay):
+    async def run(*deps):
+        await asyncio.sleep(delay)
+        return (value, deps) if deps else value
+    return run
+
+
+class TestTaskGraph(unittest.TestCase):
+
+    def test_independent_tasks_run_concurrently(self):
+        async def scenario():
+            graph = TaskGraph("test")
+            start = time.time()
+            graph.add("estimate", delayed("estimate", 0.1))
+            graph.add("enhance", delayed("enhanced", 0.05))
+            graph.add("filters", delayed("filters", 0.05), deps=["enhance"])
+            graph.add("context", delayed("context", 0.1))
+            results = [await graph.result(name) for name in ("estimate", "filters", "context")]
+            return results, time.time() - start, graph
+
+        results, elapsed, graph = asyncio.run(scenario())
+        self.assertEqual(results[1], ("filters", ("enhanced",)))
+        self.assertLess(elapsed, 0.2)  # serial would be 0.3s
+
+        timings = graph.timings()
+        self.assertGreater(timings["saved_time"], 0.1)
+
+    def test_critical_path_follows_latest_dependency(self):
+        async def scenario():
+            graph = TaskGraph("test")
+            graph.add("enhance", delayed("e", 0.01))
+            graph.add("filters", delayed("f", 0.05), deps=["enhance"])
+            graph.add("context", delayed("c", 0.01))
+            await graph.result("filters")
+            await graph.result("context")
+            graph.record("people", time.time() - 0.01, deps=["filters", "context"])
+            return graph.timings()
+
+        timings = asyncio.run(scenario())
+        self.assertEqual(timings["critical_path"], ["enhance", "filters", "people"])
+
+    def test_failure_propagates_to_dependents(self):
+        async def boom():
+            raise RuntimeError("llm down")
+
+        async def scenario():
+            graph = TaskGraph("test")
+            graph.add("enhance", boom)
+            graph.add("filters", delayed("f", 0.0), deps=["enhance"])
+            try:
+                await graph.result("filters")
+            finally:
+                await graph.close()
+            return graph
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(scenario())
+
+    def test_unknown_dependency_rejected(self):
+        async def scenario():
+            TaskGraph("test").add("filters", delayed("f", 0.0), deps=["enhance"])
+
+        with self.assertRaises(ValueError):
+            asyncio.run(scenario())
+
+    def test_close_cancels_unjoined_tasks(self):
+        async def scenario():
+            graph = TaskGraph("test")
+            graph.add("estimate", delayed("estimate", 10))
+            await graph.close()
+            return graph.nodes["estimate"].task
+
+        self.assertTrue(asyncio.run(scenario()).cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
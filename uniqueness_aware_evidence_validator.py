@@ -19,6 +19,9 @@ from alternative_source_manager import AlternativeSourceManager, SourceTier
 from explanation_analyzer import SearchableClaim
 from web_search_engine import SearchResult, URLCandidate
 from url_validator import URLValidator, validate_evidence_urls
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 @dataclass
@@ -109,44 +112,44 @@ class UniquenessAwareEvidenceValidator(EvidenceValidator):
         all_candidates = []
         
         # Collect all URL candidates from search results
-        print(f"[Uniqueness Validator] Processing {len(results)} search results")
+        logger.debug("[Uniqueness Validator] Processing %s search results", len(results))
         for result in results:
             if result.success:
-                print(f"[Uniqueness Validator] Processing successful result with {len(result.urls)} URLs")
+                logger.debug("[Uniqueness Validator] Processing successful result with %s URLs", len(result.urls))
                 for url_candidate in result.urls:
-                    print(f"[Uniqueness Validator] Checking URL: {url_candidate.url}")
+                    logger.debug("[Uniqueness Validator] Checking URL: %s", url_candidate.url)
                     
                     # Skip if URL already used globally
                     if not self.global_registry.is_url_available(url_candidate.url):
-                        print(f"[Uniqueness Validator] Skipped (already used): {url_candidate.url}")
+                        logger.debug("[Uniqueness Validator] Skipped (already used): %s", url_candidate.url)
                         continue
                     
                     # Skip if domain already overused
                     domain = self._extract_domain(url_candidate.url)
                     if self.global_registry.is_domain_overused(domain, threshold=3):
-                        print(f"[Uniqueness Validator] Skipped (domain overused): {domain}")
+                        logger.debug("[Uniqueness Validator] Skipped (domain overused): %s", domain)
                         continue
                     
                     # Validate URL quality (from parent class)
                     if self.validate_url_quality(url_candidate):
-                        print(f"[Uniqueness Validator] URL passed quality check: {url_candidate.url}")
+                        logger.debug("[Uniqueness Validator] URL passed quality check: %s", url_candidate.url)
                         enhanced_url = self._create_enhanced_evidence_url(
                             url_candidate, claim, result, existing_evidence
                         )
                         if enhanced_url:
-                            print(f"[Uniqueness Validator] Created enhanced URL: {enhanced_url.url}")
+                            logger.debug("[Uniqueness Validator] Created enhanced URL: %s", enhanced_url.url)
                             all_candidates.append(enhanced_url)
                         else:
-                            print(f"[Uniqueness Validator] Failed to create enhanced URL for: {url_candidate.url}")
+                            logger.warning("[Uniqueness Validator] Failed to create enhanced URL for: %s", url_candidate.url)
                     else:
-                        print(f"[Uniqueness Validator] URL failed quality check: {url_candidate.url}")
+                        logger.debug("[Uniqueness Validator] URL failed quality check: %s", url_candidate.url)
             else:
-                print(f"[Uniqueness Validator] Skipped unsuccessful result")
+                logger.debug("[Uniqueness Validator] Skipped unsuccessful result")
         
         # Validate URLs are accessible (filter out 404s, timeouts, etc.)
-        print(f"[Uniqueness Validator] Validating {len(all_candidates)} URLs for accessibility...")
+        logger.debug("[Uniqueness Validator] Validating %s URLs for accessibility...", len(all_candidates))
         validated_candidates = await self._validate_url_accessibility(all_candidates)
-        print(f"[Uniqueness Validator] {len(validated_candidates)}/{len(all_candidates)} URLs passed accessibility check")
+        logger.debug("[Uniqueness Validator] %s/%s URLs passed accessibility check", len(validated_candidates), len(all_candidates))
         
         # Remove duplicates and apply uniqueness constraints
         unique_candidates = self._enforce_uniqueness_constraints(validated_candidates)
@@ -280,7 +283,7 @@ class UniquenessAwareEvidenceValidator(EvidenceValidator):
             return enhanced_evidence
             
         except Exception as e:
-            print(f"[Enhanced Validator] Error creating enhanced evidence URL: {e}")
+            logger.warning("[Enhanced Validator] Error creating enhanced evidence URL: %s", e)
             return None
     
     def _enforce_uniqueness_constraints(
@@ -627,9 +630,9 @@ class UniquenessAwareEvidenceValidator(EvidenceValidator):
             else:
                 invalid_count += 1
                 error_msg = validation_result.error_message if validation_result else "No validation result"
-                print(f"[Uniqueness Validator] Filtered out inaccessible URL: {candidate.url} ({error_msg})")
+                logger.debug("[Uniqueness Validator] Filtered out inaccessible URL: %s (%s)", candidate.url, error_msg)
         
-        print(f"[Uniqueness Validator] URL accessibility check: {len(valid_candidates)}/{len(candidates)} URLs accessible ({invalid_count} filtered out)")
+        logger.debug("[Uniqueness Validator] URL accessibility check: %s/%s URLs accessible (%s filtered out)", len(valid_candidates), len(candidates), invalid_count)
         
         return valid_candidates
 
@@ -24,6 +24,9 @@ from evidence_models import (
     extract_explanations_from_candidate,
     serialize_evidence_urls
 )
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class URLEvidenceFinder:
@@ -77,14 +80,14 @@ class URLEvidenceFinder:
                 all_claims.extend(claims)
             
             if not all_claims:
-                print("[Evidence Finder] No searchable claims found in explanations")
+                logger.debug("[Evidence Finder] No searchable claims found in explanations")
                 return []
             
             # Limit and prioritize claims
             prioritized_claims = sorted(all_claims, key=lambda c: (c.priority, c.confidence), reverse=True)
             selected_claims = prioritized_claims[:self.max_claims_per_candidate]
             
-            print(f"[Evidence Finder] Processing {len(selected_claims)} claims from {len(explanations)} explanations")
+            logger.debug("[Evidence Finder] Processing %s claims from %s explanations", len(selected_claims), len(explanations))
             
             # Step 2: Generate search queries for each claim with diversity
             all_queries = []
@@ -97,16 +100,16 @@ class URLEvidenceFinder:
                 all_queries.extend(limited_queries)
             
             if not all_queries:
-                print("[Evidence Finder] No search queries generated")
+                logger.debug("[Evidence Finder] No search queries generated")
                 return []
             
-            print(f"[Evidence Finder] Generated {len(all_queries)} search queries")
+            logger.debug("[Evidence Finder] Generated %s search queries", len(all_queries))
             
             # Step 3: Execute web searches
             search_results = await self.web_search_engine.search_for_evidence(all_queries)
             
             successful_searches = [r for r in search_results if r.success]
-            print(f"[Evidence Finder] Completed {len(successful_searches)}/{len(search_results)} searches successfully")
+            logger.debug("[Evidence Finder] Completed %s/%s searches successfully", len(successful_searches), len(search_results))
             
             # Step 4: Validate and rank evidence URLs with uniqueness
             evidence_urls = []
@@ -134,13 +137,13 @@ class URLEvidenceFinder:
             self.stats['evidence_urls_found'] += len(final_evidence)
             self.stats['processing_time_total'] += processing_time
             
-            print(f"[Evidence Finder] Found {len(final_evidence)} evidence URLs in {processing_time:.2f}s")
+            logger.debug("[Evidence Finder] Found %s evidence URLs in %.2fs", len(final_evidence), processing_time)
             
             return final_evidence
             
         except Exception as e:
             processing_time = time.time() - start_time
-            print(f"[Evidence Finder Error] Failed to find evidence: {str(e)}")
+            logger.error("[Evidence Finder Error] Failed to find evidence: %s", str(e))
             return []
     
     async def process_candidate(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
@@ -158,13 +161,13 @@ class URLEvidenceFinder:
         try:
             # Validate candidate
             if not validate_candidate_for_evidence_processing(candidate):
-                print(f"[Evidence Finder] Invalid candidate format: {candidate.get('id', 'unknown')}")
+                logger.debug("[Evidence Finder] Invalid candidate format: %s", candidate.get('id', 'unknown'))
                 return self._create_failed_candidate_response(candidate, "Invalid candidate format")
             
             # Extract explanations
             explanations = extract_explanations_from_candidate(candidate)
             if not explanations:
-                print(f"[Evidence Finder] No explanations found for candidate: {candidate.get('id', 'unknown')}")
+                logger.debug("[Evidence Finder] No explanations found for candidate: %s", candidate.get('id', 'unknown'))
                 return self._create_empty_candidate_response(candidate)
             
             # Find evidence
@@ -181,7 +184,7 @@ class URLEvidenceFinder:
             
         except Exception as e:
             processing_time = time.time() - start_time
-            print(f"[Evidence Finder Error] Failed to process candidate {candidate.get('id', 'unknown')}: {str(e)}")
+            logger.error("[Evidence Finder Error] Failed to process candidate %s: %s", candidate.get('id', 'unknown'), str(e))
             return self._create_failed_candidate_response(candidate, str(e), processing_time)
     
     async def process_candidates_batch(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -196,7 +199,7 @@ class URLEvidenceFinder:
         """
         start_time = time.time()
         
-        print(f"[Evidence Finder] Processing batch of {len(candidates)} candidates")
+        logger.info("[Evidence Finder] Processing batch of %s candidates", len(candidates))
         
         if self.enable_batch_optimization:
             return await self._process_candidates_optimized(candidates)
@@ -208,7 +211,7 @@ class URLEvidenceFinder:
                 enhanced_candidates.append(enhanced)
             
             batch_time = time.time() - start_time
-            print(f"[Evidence Finder] Completed batch processing in {batch_time:.2f}s")
+            logger.info("[Evidence Finder] Completed batch processing in %.2fs", batch_time)
             
             return enhanced_candidates
     
@@ -246,7 +249,7 @@ class URLEvidenceFinder:
                 if claim_key not in all_unique_claims:
                     all_unique_claims[claim_key] = claim
         
-        print(f"[Evidence Finder] Extracted {len(all_unique_claims)} unique claims from {len(candidates)} candidates")
+        logger.debug("[Evidence Finder] Extracted %s unique claims from %s candidates", len(all_unique_claims), len(candidates))
         
         # Step 2: Generate queries for unique claims
         all_queries = []
@@ -258,7 +261,7 @@ class URLEvidenceFinder:
             all_queries.extend(limited_queries)
             claim_to_queries[claim_key] = limited_queries
         
-        print(f"[Evidence Finder] Generated {len(all_queries)} total queries")
+        logger.debug("[Evidence Finder] Generated %s total queries", len(all_queries))
         
         # Step 3: Execute all searches in batch
         search_results = await self.web_search_engine.search_for_evidence(all_queries)
@@ -302,7 +305,7 @@ class URLEvidenceFinder:
             enhanced_candidates.append(enhanced_candidate)
         
         batch_time = time.time() - start_time
-        print(f"[Evidence Finder] Completed optimized batch processing in {batch_time:.2f}s")
+        logger.info("[Evidence Finder] Completed optimized batch processing in %.2fs", batch_time)
         
         return enhanced_candidates
     
@@ -14,6 +14,11 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+from metrics import URL_VALIDATION_SECONDS
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 
 @dataclass
 class URLValidationResult:
@@ -118,7 +123,9 @@ class URLValidator:
             URLValidationResult with validation status
         """
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, self._validate_url_sync, url)
+        result = await loop.run_in_executor(self.executor, self._validate_url_sync, url)
+        URL_VALIDATION_SECONDS.observe(result.response_time or 0.0, outcome="valid" if result.is_valid else "invalid")
+        return result
     
     async def validate_urls(self, urls: List[str]) -> List[URLValidationResult]:
         """
@@ -196,7 +203,7 @@ async def validate_evidence_urls(evidence_urls: List[Dict[str, Any]]) -> List[Di
     if not urls_to_validate:
         return evidence_urls
     
-    print(f"[URL Validator] Validating {len(urls_to_validate)} evidence URLs...")
+    logger.debug("[URL Validator] Validating %s evidence URLs...", len(urls_to_validate))
     
     async with URLValidator(timeout=3.0, max_concurrent=5) as validator:
         validation_results = await validator.validate_urls(urls_to_validate)
@@ -218,9 +225,9 @@ async def validate_evidence_urls(evidence_urls: List[Dict[str, Any]]) -> List[Di
         else:
             invalid_count += 1
             error_msg = validation_result.error_message if validation_result else "No validation result"
-            print(f"[URL Validator] Filtered out invalid URL: {url} ({error_msg})")
+            logger.debug("[URL Validator] Filtered out invalid URL: %s (%s)", url, error_msg)
     
-    print(f"[URL Validator] Kept {len(valid_evidence)}/{len(evidence_urls)} URLs ({invalid_count} filtered out)")
+    logger.info("[URL Validator] Kept %s/%s URLs (%s filtered out)", len(valid_evidence), len(evidence_urls), invalid_count)
     
     return valid_evidence
 
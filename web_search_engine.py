@@ -14,6 +14,16 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from openai import OpenAI
 from search_query_generator import SearchQuery
+from blocking_executor import run_blocking
+from single_flight import get_single_flight
+from metrics import EXTERNAL_API_SECONDS
+from deadline import budget_timeout
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Identical SERP queries issued concurrently (e.g. by coalesced candidates) share one request
+serp_flight = get_single_flight("serp")
 
 
 @dataclass
@@ -65,20 +75,20 @@ def load_search_config() -> WebSearchConfig:
                 secrets = json.load(f)
                 config.serpapi_key = secrets.get('SERP_API_KEY')
                 config.openai_api_key = secrets.get('OPENAI_API_KEY')
-                print(f"[Web Search Config] Loaded API keys from secrets.json")
+                logger.info("[Web Search Config] Loaded API keys from secrets.json")
         else:
-            print(f"[Web Search Config] secrets.json not found at {secrets_path}")
+            logger.info("[Web Search Config] secrets.json not found at %s", secrets_path)
     except Exception as e:
-        print(f"[Web Search Config] Error loading secrets.json: {e}")
+        logger.warning("[Web Search Config] Error loading secrets.json: %s", e)
     
     # Override with environment variables if available
     if os.getenv('SERP_API_KEY'):
         config.serpapi_key = os.getenv('SERP_API_KEY')
-        print(f"[Web Search Config] Using SERP_API_KEY from environment")
+        logger.info("[Web Search Config] Using SERP_API_KEY from environment")
     
     if os.getenv('OPENAI_API_KEY'):
         config.openai_api_key = os.getenv('OPENAI_API_KEY')
-        print(f"[Web Search Config] Using OPENAI_API_KEY from environment")
+        logger.info("[Web Search Config] Using OPENAI_API_KEY from environment")
     
     return config
 
@@ -90,19 +100,19 @@ def load_search_config_safely() -> WebSearchConfig:
         
         # Validate that we got a proper WebSearchConfig object
         if not isinstance(config, WebSearchConfig):
-            print(f"[Web Search Config] Invalid config type: {type(config)}, creating default")
+            logger.warning("[Web Search Config] Invalid config type: %s, creating default", type(config))
             return WebSearchConfig()
         
         # Validate that required attributes exist
         if not hasattr(config, 'timeout'):
-            print(f"[Web Search Config] Config missing timeout attribute, creating default")
+            logger.warning("[Web Search Config] Config missing timeout attribute, creating default")
             return WebSearchConfig()
         
-        print(f"[Web Search Config] Successfully loaded valid configuration")
+        logger.info("[Web Search Config] Successfully loaded valid configuration")
         return config
         
     except Exception as e:
-        print(f"[Web Search Config] Error in safe config loading: {e}, using default")
+        logger.warning("[Web Search Config] Error in safe config loading: %s, using default", e)
         return WebSearchConfig()
 
 
@@ -131,7 +141,7 @@ class WebSearchEngine:
             if validate_config(config):
                 self.config = config
             else:
-                print(f"[Web Search Engine] Invalid config provided: {type(config)}, using default")
+                logger.warning("[Web Search Engine] Invalid config provided: %s, using default", type(config))
                 self.config = WebSearchConfig()
         
         self.client = None  # Will be lazy loaded
@@ -179,9 +189,17 @@ class WebSearchEngine:
                 "engine": "google"
             }
             
-            response = requests.get("https://serpapi.com/search", params=search_params, timeout=self.timeout)
-            response.raise_for_status()
-            results = response.json()
+            request_timeout = budget_timeout(self.timeout)
+
+            def fetch_results():
+                with EXTERNAL_API_SECONDS.time(service="serpapi", endpoint="search"):
+                    response = requests.get("https://serpapi.com/search", params=search_params, timeout=request_timeout)
+                    response.raise_for_status()
+                    return response.json()
+            
+            # requests is blocking; run it on the bounded HTTP pool so the event loop stays free
+            serp_key = (query.query, search_params["num"])
+            results = await serp_flight.do(serp_key, lambda: run_blocking(fetch_results, pool="http"))
             
             # Parse results into URLCandidate objects
             url_candidates = []
@@ -228,7 +246,7 @@ class WebSearchEngine:
             
         except Exception as e:
             execution_time = time.time() - start_time
-            print(f"[Web Search SerpAPI Error] {str(e)}")
+            logger.error("[Web Search SerpAPI Error] %s", str(e))
             
             return SearchResult(
                 query=query,
@@ -260,12 +278,12 @@ class WebSearchEngine:
         # Limit number of queries to prevent hanging
         limited_queries = queries[:self.max_requests_per_batch]
         if len(queries) > self.max_requests_per_batch:
-            print(f"[Web Search] Limited to {self.max_requests_per_batch} queries (from {len(queries)})")
+            logger.info("[Web Search] Limited to %s queries (from %s)", self.max_requests_per_batch, len(queries))
         
         # Process queries with rate limiting and timeout
         for i, query in enumerate(limited_queries):
             try:
-                print(f"[Web Search] Processing query {i+1}/{len(limited_queries)}: {query.query[:50]}...")
+                logger.debug("[Web Search] Processing query %s/%s: %s...", i+1, len(limited_queries), query.query[:50])
                 
                 # Enforce rate limiting
                 await self._enforce_rate_limit()
@@ -273,18 +291,18 @@ class WebSearchEngine:
                 # Execute search with simple timeout
                 result = await asyncio.wait_for(
                     self._execute_search(query),
-                    timeout=self.timeout  # Use configured timeout
+                    timeout=budget_timeout(self.timeout)  # Configured timeout, capped by the search's budget
                 )
                 results.append(result)
                 
                 # Log successful search
                 if result.success:
-                    print(f"[Web Search] Found {len(result.urls)} URLs for query: {query.query[:50]}...")
+                    logger.debug("[Web Search] Found %s URLs for query: %s...", len(result.urls), query.query[:50])
                 else:
-                    print(f"[Web Search] Failed query: {query.query[:50]}... - {result.error_message}")
+                    logger.warning("[Web Search] Failed query: %s... - %s", query.query[:50], result.error_message)
                 
             except asyncio.TimeoutError:
-                print(f"[Web Search] Query timed out: {query.query[:50]}...")
+                logger.warning("[Web Search] Query timed out: %s...", query.query[:50])
                 # Use fallback for timed out queries
                 fallback_urls = self._get_fallback_urls(query) if self.fallback_enabled else []
                 results.append(SearchResult(
@@ -296,7 +314,7 @@ class WebSearchEngine:
                     error_message='Query timed out'
                 ))
             except Exception as e:
-                print(f"[Web Search Error] Query failed: {query.query[:50]}... - {str(e)}")
+                logger.error("[Web Search Error] Query failed: %s... - %s", query.query[:50], str(e))
                 # Use fallback for failed queries
                 fallback_urls = self._get_fallback_urls(query) if self.fallback_enabled else []
                 results.append(SearchResult(
@@ -308,28 +326,28 @@ class WebSearchEngine:
                     error_message=str(e)
                 ))
         
-        print(f"[Web Search] Completed batch: {len(results)} results")
+        logger.info("[Web Search] Completed batch: %s results", len(results))
         return results
     
 
     
     async def _execute_search(self, query: SearchQuery) -> SearchResult:
         """Execute single search query using real web search APIs."""
-        print(f"[Web Search] Executing real search for: {query.query[:50]}...")
+        logger.debug("[Web Search] Executing real search for: %s...", query.query[:50])
         
         # Strategy 1: Try SerpAPI first (if API key available)
         if self.config.serpapi_key:
-            print(f"[Web Search] Trying SerpAPI for: {query.query[:30]}...")
+            logger.debug("[Web Search] Trying SerpAPI for: %s...", query.query[:30])
             result = await self._search_with_serpapi(query)
             if result.success and result.urls:
-                print(f"[Web Search] SerpAPI found {len(result.urls)} URLs")
+                logger.debug("[Web Search] SerpAPI found %s URLs", len(result.urls))
                 return result
             else:
-                print(f"[Web Search] SerpAPI failed: {result.error_message}")
+                logger.warning("[Web Search] SerpAPI failed: %s", result.error_message)
         
         # Strategy 2: Final fallback to contextual URL generation
         if self.config.enable_fallback_urls:
-            print(f"[Web Search] Using fallback URL generation for: {query.query[:30]}...")
+            logger.debug("[Web Search] Using fallback URL generation for: %s...", query.query[:30])
             fallback_urls = self._get_fallback_urls(query)
             
             return SearchResult(
@@ -440,7 +458,7 @@ class WebSearchEngine:
             
             return self._fallback_generator.generate_fallback_urls(query, max_urls=3)
         except Exception as e:
-            print(f"[Web Search] Fallback generation failed: {str(e)}")
+            logger.warning("[Web Search] Fallback generation failed: %s", str(e))
             return []
     
     async def _enforce_rate_limit(self):